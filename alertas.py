@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+#
+# Alertas clinicas declarativas sobre los indices calculados.
+# Cada Regla es una comparacion sobre nombres de nodos del grafo (entradas del formulario o
+# formulas de grafo_formulas.py), p. ej. 'ppc < 60', 'driving_p > 15' o 'tam < 65 and lactato > 2'.
+# Gramatica: comparaciones (<, <=, >, >=, ==) entre nodos y numeros (o textos de un <select>),
+# encadenables ('2 < lactato <= 4') y unidas con and / or.
+#
+# Un conjunto de reglas se compila una sola vez, como compilar_plan(), a una funcion en linea recta:
+#   - 'python': valores de un Evaluador -> una bandera por regla (resaltado de los paneles)
+#   - 'numpy':  columnas de calcular_lote() -> una mascara booleana por regla (lotes y API)
+#   - 'js':     el mismo texto para formulas.js (generar_js.py), que resalta al recalcular en el navegador
+# Un valor ausente (None / NaN) o complejo no cumple ninguna comparacion, asi que nunca dispara una regla.
+#
+# Uso: python alertas.py --verificar          (paridad escalar / vectorizada)
+#      python alertas.py --medir 300 5000     (300 reglas sobre 5000 pacientes)
+
+import ast
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from esquema_entradas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION
+from grafo_formulas import NODOS
+
+NIVELES = ('aviso', 'critica')  # de menor a mayor gravedad
+
+_COMPARADORES = {ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '=='}
+_UNIONES = {  # destino -> (and, or)
+    'python': (' and ', ' or '),
+    'numpy': (' & ', ' | '),
+    'js': (' && ', ' || '),
+}
+
+
+def _variables(expresion):
+    """Valida la expresion de una regla y devuelve los nodos que usa, en orden de aparicion."""
+    try:
+        arbol = ast.parse(expresion, mode='eval').body
+    except SyntaxError:
+        raise ValueError(f"Regla mal escrita: {expresion!r}") from None
+    variables = []
+
+    def visitar(nodo):
+        if isinstance(nodo, ast.BoolOp):
+            for valor in nodo.values:
+                visitar(valor)
+        elif isinstance(nodo, ast.Compare):
+            terminos = [nodo.left, *nodo.comparators]
+            if any(type(op) not in _COMPARADORES for op in nodo.ops):
+                raise ValueError(f"Solo se admiten <, <=, >, >= y == en las reglas: {expresion!r}")
+            for termino in terminos:
+                if isinstance(termino, ast.Name):
+                    if termino.id not in NODOS and termino.id not in ENTRADAS_NUMERICAS + ENTRADAS_SELECCION:
+                        raise ValueError(f"Nodo desconocido '{termino.id}' en la regla {expresion!r}")
+                    variables.append(termino.id)
+                elif not (isinstance(termino, ast.Constant) and type(termino.value) in (int, float, str)):
+                    raise ValueError(f"Solo se comparan nodos con numeros o textos: {expresion!r}")
+            if not any(isinstance(termino, ast.Name) for termino in terminos):
+                raise ValueError(f"La comparacion no usa ningun nodo: {expresion!r}")
+            textos = [t for t in terminos if isinstance(t, ast.Constant) and isinstance(t.value, str)
+                      or isinstance(t, ast.Name) and t.id in ENTRADAS_SELECCION]
+            if textos and (len(terminos) != 2 or len(textos) != 2 or not isinstance(nodo.ops[0], ast.Eq)):
+                raise ValueError(f"Los campos de seleccion solo se comparan con == 'texto': {expresion!r}")
+        else:
+            raise ValueError(f"Se esperaban comparaciones unidas con and / or: {expresion!r}")
+
+    visitar(arbol)
+    return tuple(dict.fromkeys(variables))
+
+
+@dataclass(frozen=True)
+class Regla:
+    """Alerta con nombre, expresion sobre nodos del grafo, nivel ('aviso' o 'critica') y mensaje."""
+    nombre: str
+    expresion: str
+    nivel: str = 'aviso'
+    mensaje: str = ''
+    variables: tuple = field(default=(), init=False, compare=False)  # nodos que usa la expresion
+
+    def __post_init__(self):
+        if self.nivel not in NIVELES:
+            raise ValueError(f"Nivel de alerta desconocido '{self.nivel}' (validos: {', '.join(NIVELES)})")
+        object.__setattr__(self, 'variables', _variables(self.expresion))
+
+    def a_dict(self):
+        return {'nombre': self.nombre, 'expresion': self.expresion, 'nivel': self.nivel, 'mensaje': self.mensaje}
+
+
+# --- REGLAS DE LA UNIDAD ---
+REGLAS = (
+    Regla('hipotension', 'tam < 65', 'critica', "TAM menor de 65 mmHg"),
+    Regla('ppc_baja', 'ppc < 60', 'critica', "PPC menor de 60 mmHg"),
+    Regla('pic_alta', 'pic > 22', 'critica', "PIC estimada mayor de 22 mmHg"),
+    Regla('lactato_alto', 'lactato > 2', 'aviso', "Lactato mayor de 2 mmol/L"),
+    Regla('lactato_muy_alto', 'lactato > 4', 'critica', "Lactato mayor de 4 mmol/L"),
+    Regla('ic_bajo', 'ic < 2.2', 'aviso', "IC menor de 2.2 L/min/m²"),
+    Regla('driving_alto', 'driving_p > 15', 'aviso', "Driving pressure mayor de 15 cmH₂O"),
+    Regla('shunt_alto', 'shunt > 20', 'aviso', "Shunt mayor del 20 %"),
+    Regla('exto2_alta', 'exto2 > 30', 'aviso', "Extraccion de O₂ mayor del 30 %"),
+    Regla('presion_llenado_alta', 'e_eprim > 14', 'aviso', "E/E' mayor de 14"),
+)
+
+
+def seleccionar_reglas(nombres=None, nivel=None, reglas=REGLAS):
+    """
+    Subconjunto de 'reglas' por nombre (sin repetir) y/o nivel minimo. Lanza ValueError si algun
+    nombre no existe.
+    """
+    if nombres:
+        nombres = dict.fromkeys(nombres)
+        por_nombre = {regla.nombre: regla for regla in reglas}
+        desconocidas = [n for n in nombres if n not in por_nombre]
+        if desconocidas:
+            raise ValueError(f"Reglas desconocidas: {', '.join(desconocidas)}")
+        reglas = tuple(por_nombre[n] for n in nombres)
+    if nivel:
+        if nivel not in NIVELES:
+            raise ValueError(f"Nivel de alerta desconocido '{nivel}' (validos: {', '.join(NIVELES)})")
+        reglas = tuple(regla for regla in reglas if NIVELES.index(regla.nivel) >= NIVELES.index(nivel))
+    return tuple(reglas)
+
+
+# --- COMPILACION ---
+def traducir(expresion, destino):
+    """Texto de la expresion para 'python', 'numpy' o 'js'; cada nodo se lee de la variable v_<nodo>."""
+    union_y, union_o = _UNIONES[destino]
+
+    def termino(nodo):
+        # json.dumps escribe numeros y textos validos tanto en Python como en JS
+        return f'v_{nodo.id}' if isinstance(nodo, ast.Name) else json.dumps(nodo.value)
+
+    def traducir_nodo(nodo):
+        if isinstance(nodo, ast.BoolOp):
+            union = union_y if isinstance(nodo.op, ast.And) else union_o
+            return '(' + union.join(traducir_nodo(valor) for valor in nodo.values) + ')'
+        terminos = [termino(t) for t in [nodo.left, *nodo.comparators]]
+        comparaciones = []
+        for izquierda, op, derecha in zip(terminos, nodo.ops, terminos[1:]):
+            signo = '===' if destino == 'js' and isinstance(op, ast.Eq) else _COMPARADORES[type(op)]
+            comparaciones.append(f'({izquierda} {signo} {derecha})')
+        return comparaciones[0] if len(comparaciones) == 1 else '(' + union_y.join(comparaciones) + ')'
+
+    return traducir_nodo(ast.parse(expresion, mode='eval').body)
+
+
+def _valor_escalar(valor):
+    """None y complejos no cumplen ninguna comparacion: se leen como NaN."""
+    return float('nan') if valor is None or isinstance(valor, complex) else valor
+
+
+@lru_cache(maxsize=8)
+def compilar_reglas(reglas, destino='python'):
+    """
+    Funcion en linea recta que evalua todas las reglas de una vez:
+      'python': f(valores) -> tupla de bool, con 'valores' el dict de un Evaluador
+      'numpy':  f(columnas, n) -> tupla de mascaras de n elementos, con 'columnas' un DataFrame o dict de arrays
+    Cada nodo se lee una sola vez aunque lo usen muchas reglas. La aplicacion solo compila REGLAS;
+    un subconjunto se sirve con columnas_de() sobre la mascara completa, no con otra compilacion.
+    """
+    variables = dict.fromkeys(nombre for regla in reglas for nombre in regla.variables)
+    if destino == 'python':
+        lineas = ['def _evaluar_reglas(valores, _leer):']
+        lineas += [f'    v_{nombre} = _leer(valores.get({nombre!r}))' for nombre in variables]
+        lector = _valor_escalar
+    else:
+        import numpy as np
+
+        def lector(columnas, nombre, n):
+            if nombre not in columnas:
+                return np.full(n, np.nan)
+            columna = np.asarray(columnas[nombre])
+            return columna.astype('float64') if columna.dtype.kind in 'iub' else columna
+
+        lineas = ['def _evaluar_reglas(columnas, n, _leer):']
+        lineas += [f'    v_{nombre} = _leer(columnas, {nombre!r}, n)' for nombre in variables]
+    expresiones = [traducir(regla.expresion, destino) for regla in reglas]
+    lineas.append('    return (' + ''.join(f'{e}, ' for e in expresiones) + ')')
+    espacio = {}
+    exec(compile('\n'.join(lineas), '<reglas de alerta>', 'exec'), espacio)
+    funcion = espacio['_evaluar_reglas']
+    if destino == 'python':
+        return lambda valores: funcion(valores, lector)
+    return lambda columnas, n: funcion(columnas, n, lector)
+
+
+def reglas_activas(valores, reglas=REGLAS):
+    """Reglas que cumple un paciente; 'valores' es el dict de nodos de un Evaluador."""
+    return [regla for regla, activa in zip(reglas, compilar_reglas(reglas)(valores)) if activa]
+
+
+def niveles_por_nodo(activas):
+    """{nodo: nivel mas grave} de los nodos que aparecen en las reglas activas (para resaltar sus filas)."""
+    niveles = {}
+    for regla in activas:
+        for nombre in regla.variables:
+            if nombre not in niveles or NIVELES.index(regla.nivel) > NIVELES.index(niveles[nombre]):
+                niveles[nombre] = regla.nivel
+    return niveles
+
+
+def evaluar_lote(columnas, reglas=REGLAS):
+    """
+    Matriz booleana (pacientes x reglas) sobre columnas ya calculadas, p. ej.
+    calcular_lote(df, incluir_entradas=True). Las columnas que falten se tratan como vacias.
+    """
+    import numpy as np
+
+    n = len(columnas) if hasattr(columnas, 'columns') else len(next(iter(columnas.values()), ()))
+    mascaras = compilar_reglas(reglas, 'numpy')(columnas, n) if reglas else ()
+    if not mascaras:
+        return np.zeros((n, 0), dtype=bool)
+    return np.column_stack([np.broadcast_to(np.asarray(m, dtype=bool), (n,)) for m in mascaras])
+
+
+def columnas_de(seleccion, reglas=REGLAS):
+    """Indices en 'reglas' de las reglas de 'seleccion' (para mascara[:, indices])."""
+    posiciones = {regla: i for i, regla in enumerate(reglas)}
+    return [posiciones[regla] for regla in seleccion]
+
+
+# --- VERIFICACION ---
+def verificar_paridad(registros, reglas=REGLAS):
+    """
+    Compara evaluar_lote() sobre calcular_lote() con reglas_activas() paciente a paciente.
+    Se omiten los pacientes que el calculo escalar rechaza (division por cero), que el lote deja en NaN.
+    Devuelve (discrepancias [(indice, regla, escalar, vectorizado)], pacientes comparados).
+    """
+    import pandas as pd
+
+    from esquema_entradas import parsear_entradas
+    from grafo_formulas import Evaluador, plan_de_evaluacion
+    from motor_vectorizado import calcular_lote
+
+    mascara = evaluar_lote(calcular_lote(pd.DataFrame(registros), incluir_entradas=True), reglas)
+    plan = plan_de_evaluacion(tuple(dict.fromkeys(n for regla in reglas for n in regla.variables)))
+    discrepancias, comparados = [], 0
+    for i, registro in enumerate(registros):
+        evaluador = Evaluador(parsear_entradas(registro))
+        try:
+            evaluador.evaluar(plan)
+        except ZeroDivisionError:
+            continue
+        comparados += 1
+        activas = set(reglas_activas(evaluador.valores, reglas))
+        for j, regla in enumerate(reglas):
+            if (regla in activas) != bool(mascara[i, j]):
+                discrepancias.append((i, regla.nombre, regla in activas, bool(mascara[i, j])))
+    return discrepancias, comparados
+
+
+def reglas_sinteticas(n, semilla=0):
+    """n reglas de umbral sobre columnas derivadas al azar (para medir el coste de evaluarlas)."""
+    import random
+
+    from motor_vectorizado import COLUMNAS_DERIVADAS
+
+    rnd = random.Random(semilla)
+    columnas = list(COLUMNAS_DERIVADAS)
+    reglas = []
+    for i in range(n):
+        a, b = rnd.sample(columnas, 2)
+        expresion = f'{a} {rnd.choice("<>")} {rnd.uniform(0, 100):.1f}'
+        if rnd.random() < 0.3:
+            expresion += f' {rnd.choice(["and", "or"])} {b} {rnd.choice("<>")} {rnd.uniform(0, 100):.1f}'
+        reglas.append(Regla(f'regla_{i}', expresion, rnd.choice(NIVELES)))
+    return tuple(reglas)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Reglas de alerta clinica")
+    parser.add_argument('--verificar', type=int, nargs='?', const=2000, metavar='N',
+                        help="Paridad escalar / vectorizada sobre N pacientes aleatorios")
+    parser.add_argument('--medir', type=int, nargs=2, metavar=('REGLAS', 'PACIENTES'),
+                        help="Tiempo de evaluar REGLAS reglas sinteticas sobre PACIENTES pacientes")
+    argumentos = parser.parse_args()
+
+    from recalculo_cohorte import cohorte_sintetica
+
+    if argumentos.verificar:
+        registros = cohorte_sintetica(argumentos.verificar)
+        discrepancias, comparados = verificar_paridad(registros)
+        discrepancias_sinteticas, _ = verificar_paridad(registros, reglas_sinteticas(200))
+        print(f"{comparados} pacientes, {len(discrepancias)} discrepancias con REGLAS, "
+              f"{len(discrepancias_sinteticas)} con 200 reglas sinteticas")
+        for d in (discrepancias + discrepancias_sinteticas)[:20]:
+            print(d)
+    if argumentos.medir:
+        import pandas as pd
+
+        from motor_vectorizado import calcular_lote
+
+        n_reglas, n_pacientes = argumentos.medir
+        reglas = reglas_sinteticas(n_reglas)
+        columnas = calcular_lote(pd.DataFrame(cohorte_sintetica(n_pacientes)), incluir_entradas=True)
+        inicio = time.perf_counter()
+        compilar_reglas(reglas, 'numpy')
+        compilacion = time.perf_counter() - inicio
+        tiempos = []
+        for _ in range(20):
+            inicio = time.perf_counter()
+            mascara = evaluar_lote(columnas, reglas)
+            tiempos.append(time.perf_counter() - inicio)
+        print(f"{n_reglas} reglas x {n_pacientes} pacientes: compilacion {compilacion * 1000:.1f} ms, "
+              f"evaluacion {min(tiempos) * 1000:.2f} ms (mejor de 20), {int(mascara.sum())} alertas")
@@ -1,1193 +1,1278 @@
-# -*- coding: utf-8 -*-
-#
-# Aplicacion Flask para replicar logica de una hoja de calculo de Excel.
-# Esta version utiliza Flask, resultados condicionales, boton de calculo e impresion.
-#
-# REQUISITOS: 'Flask', 'pandas', 'openpyxl', 'gunicorn' (para despliegue global)
-# INSTRUCCION: Coloca tu archivo de Excel nombrado 'datos.xlsx' en la misma carpeta.
-
-from flask import Flask, request, render_template_string
-import pandas as pd
-import json
-import math
-import datetime
-import re 
-
-# 1. Configuracion de la aplicacion Flask
-app = Flask(__name__)
-EXCEL_FILE_PATH = 'datos.xlsx'
-datos_hojas = {}
-error_lectura = None
-
-# --- CONSTANTES DE CONFIGURACION ---
-HOJAS_PANEL = [
-    'Panel',
-    'Microdinamia',
-    'Macrodinamia',
-    'Ventilatorio',
-    'Neurocritico' 
-]
-
-BACKGROUND_IMAGES = {}
-
-# --- Funcion para cargar el Excel ---
-def cargar_datos_excel():
-    """Carga todas las hojas del archivo de Excel usando pandas."""
-    global datos_hojas, error_lectura
-    try:
-        # Nota: La lectura de Excel se mantiene solo como ejemplo funcional.
-        # El código asume que no depende de datos del archivo Excel para los cálculos de esta versión.
-        # datos_hojas = pd.read_excel(EXCEL_FILE_PATH, sheet_name=HOJAS_PANEL)
-        error_lectura = None
-        return True
-    except FileNotFoundError:
-        error_lectura = f"ERROR: El archivo '{EXCEL_FILE_PATH}' no se encontro en la carpeta."
-        return False
-    except ValueError as ve:
-        error_lectura = f"ERROR al leer el archivo Excel: {ve}"
-        return False
-    except Exception as e:
-        error_lectura = f"ERROR al leer el archivo Excel: {e}"
-        return False
-
-# Carga inicial de datos
-cargar_datos_excel()
-
-# Definicion del template HTML (Mantenido sin cambios para no romper la interfaz)
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>ICU-CRIPTOS | Monitoreo UCI</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        @media print {
-            body * { visibility: hidden !important; }
-            #print-area, #print-area * { visibility: visible !important; }
-            #print-area { 
-                position: absolute; left: 0; top: 0; 
-                padding: 10px; 
-                margin: 0;
-                font-size: 8pt; 
-            }
-            .print-hidden { display: none !important; }
-            .bg-panel::before { content: none !important; } 
-            .bg-panel { background-image: none !important; background-color: #ffffff !important; box-shadow: none !important; border: none !important;}
-        }
-        
-        /* --- ESTILOS DE FONDO Y TRANSPARENCIA (SOLICITADOS POR EL USUARIO) --- */
-        body { 
-            font-family: 'Inter', sans-serif; 
-            background-color: #f8fafc;
-            /* IMAGEN DE FONDO PROPORCIONADA POR EL USUARIO (Imgur) */
-            background-image: url('https://i.imgur.com/7zQ8s18.jpeg');
-            background-size: cover; 
-            background-position: center; /* Centrado */
-            background-attachment: fixed;
-        }
-        /* Tarjeta principal con 50% de transparencia */
-        .main-app-card {
-             background-color: rgba(255, 255, 255, 0.5); /* Alpha 0.5 para 50% de transparencia */
-             backdrop-filter: blur(5px);
-        }
-        
-        .subtitle-italic { font-style: italic; }
-        .input-base { transition: background-color 0.2s; border-radius: 0.5rem; font-size: 0.875rem; }
-        .text-base { font-size: 0.875rem; }
-        .text-xl { font-size: 1.125rem; }
-        .text-2xl { font-size: 1.5rem; }
-        .text-4xl { font-size: 2.25rem; }
-
-        /* Estilos para Fondos y Superposiciones */
-        .bg-panel {
-            background-size: cover; background-position: center; position: relative; overflow: hidden;
-            border: 1px solid rgba(255, 255, 255, 0.2);
-        }
-        .bg-panel::before {
-            content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0;
-            background-color: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(1px); z-index: 1;
-        }
-        .bg-panel > * { position: relative; z-index: 10; }
-        
-        /* ESTILO DEL SEPARADOR / TÍTULO DE SECCIÓN */
-        .result-separator { 
-            color: #4338ca; /* Indigo 700 */
-            font-size: 1.1rem; /* Un poco más grande */
-            font-weight: 800; 
-            margin-top: 15px; margin-bottom: 8px;
-            padding-bottom: 4px; border-bottom: 2px solid #a5b4fc; 
-            text-transform: uppercase;
-        }
-    </style>
-</head>
-<body class="p-4 md:p-8">
-    <div class="max-w-4xl mx-auto rounded-2xl shadow-xl p-6 md:p-10 main-app-card">
-        
-        <h1 class="text-4xl font-extrabold text-center text-indigo-700 mb-1 print-hidden">
-            Monitoreo UCI
-        </h1>
-        <p class="text-center text-gray-700 mb-2 text-xl subtitle-italic leading-tight print-hidden">
-            ICU–CRIPTOS| Hemodynamic, Respiratory & Neurocritical Intelligence<br>
-            <span class="text-gray-500 text-base">Monitoreo del paciente critico, en la palma de mi mano</span>
-        </p>
-
-        <!-- FRASE DE AUTOR MOVIDA AQUÍ -->
-        <p class="text-center text-sm text-gray-600 mb-6 font-semibold print-hidden">
-            Elaborada por X. Real, P. Olivos y O. Bolaños | Agradecimiento especial a G. Maldonado por su colaboración
-        </p>
-        
-        {% if error_lectura %}
-            <div class="p-4 mb-6 bg-red-100 border border-red-400 text-red-700 rounded-lg text-base print-hidden">
-                <p class="font-bold">Error de Carga:</p>
-                <p>{{ error_lectura }}</p>
-            </div>
-        {% else %}
-            <form method="POST" action="/" class="p-6 border border-gray-200 rounded-xl shadow-inner bg-gray-50 mb-8 space-y-6 print-hidden" id="data-form">
-                
-                <!-- 1. Datos Antropometricos -->
-                <div class="grid md:grid-cols-4 gap-4 text-base">
-                    <div class="md:col-span-4">
-                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Datos Antropometricos</h2>
-                    </div>
-                    {% for label, name, type, placeholder, options in [
-                        ("Sexo:", "sexo", "select", "H", [("H", "Hombre"), ("M", "Mujer")]),
-                        ("Edad (anos):", "edad_anos", "number", "anos", None),
-                        ("Peso (Kg):", "peso_kg", "number", "Kg", None),
-                        ("Talla (m):", "talla_m", "number", "m", None)
-                    ] %}
-                    <div>
-                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                        {% if type == 'select' %}
-                        <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm focus:ring-indigo-500 focus:border-indigo-500 bg-white">
-                            <option value="">Selecciona</option>
-                            {% for value, text in options %}
-                            <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
-                            {% endfor %}
-                        </select>
-                        {% else %}
-                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                               placeholder="{{ placeholder }}" 
-                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm focus:ring-indigo-500 focus:border-indigo-500 bg-white" 
-                               oninput="updateBackground(this)">
-                        {% endif %}
-                    </div>
-                    {% endfor %}
-                </div>
-                
-                <!-- 2. Signos Vitales -->
-                <div class="grid md:grid-cols-4 gap-4 text-base">
-                    <div class="md:col-span-4">
-                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Signos Vitales</h2>
-                    </div>
-                    {% for label, name, placeholder, type, options in [
-                        ("TAS:", "tas", "mmHg", "number", None), 
-                        ("TAD:", "tad", "mmHg", "number", None), 
-                        ("FC:", "fc", "lpm", "number", None), 
-                        ("SatO₂ Pulsioximetria:", "sato2_sv", "%", "number", None)
-                    ] %}
-                    <div>
-                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                               placeholder="{{ placeholder }}" 
-                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
-                               oninput="updateBackground(this)">
-                    </div>
-                    {% endfor %}
-                </div>
-                
-                <!-- 3. Gasometria Arterial y Venosa -->
-                <div class="grid grid-cols-1 md:grid-cols-2 gap-6">
-                    <!-- Gasometria Arterial -->
-                    <div class="bg-gray-100 p-4 rounded-lg">
-                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Gasometria Arterial 🩸</h2>
-                        <div class="grid grid-cols-2 gap-4 text-sm">
-                            {% for label, name, placeholder, type, options in [
-                                ("pH:", "ph_a", "pH", "number", None), 
-                                ("PaCO₂:", "paco2", "mmHg", "number", None), 
-                                ("PaO₂:", "pao2", "mmHg", "number", None),
-                                ("SatO₂ (a):", "sato2_a", "%", "number", None), 
-                                ("Lactato:", "lactato", "mmol/L", "number", None), 
-                                ("Hb (g/dL):", "hb", "g/dL", "number", None)
-                            ] %}
-                            <div>
-                                <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                                <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                       placeholder="{{ placeholder }}" 
-                                       class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
-                                       oninput="updateBackground(this)">
-                            </div>
-                            {% endfor %}
-                        </div>
-                    </div>
-                    
-                    <!-- Gasometria Venosa -->
-                    <div class="bg-gray-100 p-4 rounded-lg">
-                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Gasometria Venosa 🔵</h2>
-                        <div class="grid grid-cols-2 gap-4 text-sm">
-                            {% for label, name, placeholder, type, options in [
-                                ("pHv:", "ph_v", "pH", "number", None), 
-                                ("PvCO₂:", "pvco2", "mmHg", "number", None), 
-                                ("PvO₂:", "pvo2", "mmHg", "number", None),
-                                ("SatvO₂:", "satvo2", "%", "number", None)
-                            ] %}
-                            <div>
-                                <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                                <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                       placeholder="{{ placeholder }}" 
-                                       class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
-                                       oninput="updateBackground(this)">
-                            </div>
-                            {% endfor %}
-                        </div>
-                    </div>
-                </div>
-
-                <!-- 4. Macrodinamia (POCUS) -->
-                <div class="grid grid-cols-5 gap-4 text-sm bg-gray-50 p-4 rounded-lg shadow-inner">
-                    <div class="col-span-5">
-                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">POCUS (Macrodinamia) 🩺</h2>
-                    </div>
-                    {% for label, name, placeholder, type, options in [
-                        ("VTI:", "vti", "cm", "number", None),
-                        ("TSVI:", "tsvi", "cm", "number", None),
-                        ("VCI:", "vci", "cm", "number", None),
-                        ("PVC Medido:", "pvc_medido", "mmHg", "number", None),
-                        ("VCI Colaps.:", "vci_colaps", "Selecciona Colapso", "select", [("total", "Total"), (">50%", ">50%"), ("<50%", "<50%"), ("No cambios", "No cambios")])
-                    ] %}
-                    <div>
-                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                        {% if type == 'select' %}
-                        <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
-                            <option value="">{{ placeholder }}</option>
-                            {% for value, text in options %}
-                            <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
-                            {% endfor %}
-                        </select>
-                        {% else %}
-                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                               placeholder="{{ placeholder }}" 
-                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
-                               oninput="updateBackground(this)">
-                        {% endif %}
-                    </div>
-                    {% endfor %}
-                </div>
-
-                <!-- 5. Hemodinamia (VI/VD) -->
-                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
-                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Hemodinamia (ECHO Av.)</h2>
-                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
-                        <!-- VI -->
-                        {% for label, name, placeholder, type, options in [
-                            ("MAPSE L:", "mapse_l", "cm", "number", None), 
-                            ("MAPSE S:", "mapse_s", "cm", "number", None), 
-                            ("E (onda):", "e_onda", "m/s", "number", None), 
-                            ("A (onda):", "a_onda", "m/s", "number", None), 
-                            ("E' lat:", "eprim_lat", "cm/s", "number", None), 
-                            ("E' med:", "eprim_med", "cm/s", "number", None),
-                            ("VFS:", "vfs", "ml", "number", None), 
-                            ("VFD:", "vfd", "ml", "number", None), 
-                            ("Long. VI:", "long_vi", "cm", "number", None)
-                        ] %}
-                        <div>
-                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                   placeholder="{{ placeholder }}" 
-                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
-                                   oninput="updateBackground(this)">
-                        </div>
-                        {% endfor %}
-                        <!-- VD -->
-                        {% for label, name, placeholder, type, options in [
-                            ("VTmax:", "vtmax", "m/s", "number", None), 
-                            ("TAPSE:", "tapse", "mm", "number", None), 
-                            ("VTI Pulmonar:", "vti_pulmonar", "cm", "number", None)
-                        ] %}
-                        <div>
-                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                   placeholder="{{ placeholder }}" 
-                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
-                                   oninput="updateBackground(this)">
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-
-                <!-- 6. Datos Ventilatorios -->
-                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
-                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Datos Ventilatorios 🌬️</h2>
-                    <div class="grid grid-cols-3 gap-4 text-sm">
-                        {% for label, name, type, placeholder, options in [
-                            ("MODO:", "modo", "select", "Selecciona Modo", [("PCV", "PCV"), ("VCV", "VCV")]),
-                            ("VT protec. (ml/kg):", "vt_protec", "number", "ml/kg", None),
-                            ("VT Ventilador (ml):", "vt_ventilador", "number", "ml", None),
-                            ("FR (lpm):", "fr", "number", "lpm", None),
-                            ("PeCO₂ (mmHg):", "peco2", "number", "mmHg", None),
-                            ("PEEP (cmH₂O):", "peep", "number", "cmH₂O", None),
-                            ("FIO₂ (0.x):", "fio2", "number", "0.x", None),
-                            ("Plateau (cmH₂O):", "plateau", "number", "cmH₂O", None),
-                            ("Ppico (cmH₂O):", "ppico", "number", "cmH₂O", None),
-                            ("Cstat (medida):", "cstat_input", "number", "ml/cmH₂O", None),
-                            ("Cdin (medida):", "cdin_input", "number", "ml/cmH₂O", None),
-                            ("V/min (L/min):", "v_min", "number", "L/min", None),
-                            ("POCC (cmH₂O):", "pocc", "number", "cmH₂O", None)
-                        ] %}
-                        <div>
-                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                            {% if type == 'select' %}
-                            <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
-                                <option value="">Selecciona</option>
-                                {% for value, text in options %}
-                                <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
-                                {% endfor %}
-                            </select>
-                            {% else %}
-                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                   placeholder="{{ placeholder }}" 
-                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
-                                   oninput="updateBackground(this)">
-                            {% endif %}
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-
-                <!-- 7. Monitorizacion Neurocritica -->
-                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
-                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Monitorizacion Neurocritica 🧠</h2>
-                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
-                        {% for label, name, placeholder, type, options in [
-                            ("VS (ACM):", "vs_acm", "cm/s", "number", None), 
-                            ("VD (ACM):", "vd_acm", "cm/s", "number", None),
-                            ("VS (AB):", "vs_ab", "cm/s", "number", None), 
-                            ("VD (AB):", "vd_ab", "cm/s", "number", None),
-                            ("Arteria Medida:", "vaso_dtc", "Selecciona Arteria", "select", [("ACM", "ACM"), ("ACA", "ACA"), ("ACP", "ACP"), ("AB", "AB")]),
-                            ("VS (Gen.):", "vs_dtc", "cm/s", "number", None), 
-                            ("VD (Gen.):", "vd_dtc", "cm/s", "number", None),
-                            ("VM Art. Carotida Int.:", "vm_aci", "cm/s", "number", None), 
-                            ("VM Art. Vertebral:", "vm_ave", "cm/s", "number", None),
-                            ("VNO Der. (mm):", "vno_der", "mm", "number", None), 
-                            ("VNO Izq. (mm):", "vno_izq", "mm", "number", None), 
-                            ("DGO (mm):", "vno_dgo", "mm", "number", None),
-                            ("pH jO₂:", "ph_jo2", "pH", "number", None), 
-                            ("PjCO₂:", "paco2_jo2", "mmHg", "number", None), 
-                            ("PjO₂:", "pao2_jo2", "mmHg", "number", None),
-                            ("SjO₂:", "sato2_jo2", "%", "number", None), 
-                            ("Lactato jO₂:", "lactato_jo2", "mmol/L", "number", None)
-                        ] %}
-                        <div>
-                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
-                            {% if type == 'select' %}
-                            <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
-                                <option value="">{{ placeholder }}</option>
-                                {% for value, text in options %}
-                                <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
-                                {% endfor %}
-                            </select>
-                            {% else %}
-                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
-                                   placeholder="{{ placeholder }}" 
-                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
-                                   oninput="updateBackground(this)">
-                            {% endif %}
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-                
-                <!-- BOTONES DE ACCION -->
-                <div class="flex justify-center mt-6 space-x-4">
-                    <button type="submit" name="action" value="calculate"
-                            class="bg-indigo-600 hover:bg-indigo-700 text-white font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
-                        Mostrar Resultados
-                    </button>
-                    <button type="button" onclick="clearForm()"
-                            class="bg-yellow-300 hover:bg-yellow-400 text-gray-800 font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
-                        Limpiar
-                    </button>
-                </div>
-            </form>
-
-            <!-- 3. SECCION DE RESULTADOS -->
-            {% if results_json and not error_calculo and show_results %}
-                <div class="mt-8" id="print-area">
-                    <h2 class="text-2xl font-bold text-gray-800 mb-4 print-hidden">Resultados por Seccion</h2>
-                    <div class="flex justify-between text-sm text-gray-500 mb-4">
-                        <span>Fecha y Hora: {{ now }}</span>
-                    </div>
-
-                    <div class="grid md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-                        
-                        {% set results = json.loads(results_json) %}
-                        {% for panel_nombre, panel_data in results.items() %}
-                            {% set bg_img = BACKGROUND_IMAGES.get(panel_nombre, '') %}
-                            {% if panel_data and not panel_data.get('error') %}
-                                <div class="bg-panel rounded-xl shadow-md p-5 transition duration-200 hover:shadow-lg"
-                                     style="{% if bg_img %}background-image: url('{{ bg_img }}');{% endif %}">
-                                    <h3 class="text-xl font-bold mb-3 text-indigo-700">{{ panel_nombre }}</h3>
-                                    
-                                    <div class="text-sm space-y-1">
-                                        {% for key, valor in panel_data.items() %}
-                                            {# CORRECCIÓN CRÍTICA: Solo el separador principal empieza con -- #}
-                                            {% if key.startswith('--') %}
-                                                <div class="result-separator">
-                                                    {{ key | replace('--', '') | trim }}
-                                                </div>
-                                            {% else %}
-                                                <div class="flex justify-between items-start py-1 border-b border-gray-200 last:border-b-0">
-                                                    <span class="text-gray-600 font-medium w-1/2 pr-2">{{ key }}:</span>
-                                                    <span class="text-gray-900 font-bold w-1/2 text-right">{{ valor | safe }}</span>
-                                                </div>
-                                            {% endif %}
-                                        {% endfor %}
-                                    </div>
-                                </div>
-                            {% endif %}
-                        {% endfor %}
-                    </div>
-                    
-                    <!-- Cuadro de Abreviaturas Ventilatorias -->
-                    {% if 'Ventilatorio' in results and not results.Ventilatorio.get('error') %}
-                        <div class="mt-8 p-5 bg-blue-50 border-l-4 border-blue-400 rounded-lg shadow-inner text-base">
-                            <h4 class="text-lg font-semibold text-blue-800 mb-3">Abreviaturas Ventilatorias</h4>
-                            <div class="grid grid-cols-2 sm:grid-cols-3 gap-2 text-sm text-gray-700">
-                                <div><span class="font-bold">EM:</span> Espacio Muerto</div>
-                                <div><span class="font-bold">EV:</span> Eficiencia Ventilatoria</div>
-                                <div><span class="font-bold">Shunt:</span> Cortocircuito Intrapulmonar</div>
-                                <div><span class="font-bold">PpMt:</span> Presion transpulmonar muscular</div>
-                                <div><span class="font-bold">PM:</span> Poder Mecanico</div>
-                                <div><span class="font-bold">Raw:</span> Resistencia de Via Aerea</div>
-                            </div>
-                        </div>
-                    {% endif %}
-                </div>
-                
-                <div class="flex justify-center mt-8 print-hidden">
-                    <button onclick="window.print()" type="button"
-                            class="bg-green-600 hover:bg-green-700 text-white font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
-                        Imprimir Resultados
-                    </button>
-                </div>
-                
-            {% elif error_calculo and show_results %}
-                <div class="mt-8 p-4 bg-red-100 border border-red-400 text-red-700 rounded-lg text-base print-hidden" role="alert">
-                    <p class="font-bold">Error en el Calculo de Formulas</p>
-                    <p class="sm">
-                        {{ error_calculo }}
-                        <br>
-                        <span class="font-semibold text-xs text-red-600 block mt-1">
-                            Asegurese de que todos los campos relevantes para el calculo tengan un valor numerico valido.
-                        </span>
-                    </p>
-                </div>
-            {% endif %}
-        {% endif %}
-    </div>
-    
-    <!-- FOOTER SOLICITADO (OCULTADO para mover el contenido) -->
-    <footer class="text-center text-sm text-gray-500 mt-8 pb-4 print-hidden hidden">
-        Elaborada por X. Real, P. Olivos y O. Bolaños
-    </footer>
-
-    <script>
-        function updateBackground(element) {
-            const isSelect = element.tagName === 'SELECT';
-            let value = element.value.trim();
-            element.classList.remove('bg-white', 'bg-green-100', 'bg-red-100');
-            if (isSelect) {
-                if (value !== '' && value !== 'Selecciona' && value !== 'Selecciona Colapso' && value !== 'Selecciona Modo' && value !== 'Selecciona Vaso' && value !== 'Selecciona Arteria') {
-                    element.classList.add('bg-green-100');
-                } else {
-                    element.classList.add('bg-white');
-                }
-            } else {
-                value = value.replace(',', '.');
-                const isNumeric = !isNaN(parseFloat(value)) && isFinite(value);
-                if (value === '') {
-                    element.classList.add('bg-white');
-                } else if (isNumeric) {
-                    element.classList.add('bg-green-100');
-                } else {
-                    element.classList.add('bg-red-100');
-                }
-            }
-        }
-        document.addEventListener('DOMContentLoaded', () => {
-            document.querySelectorAll('.input-base').forEach(updateBackground);
-        });
-        function clearForm() {
-            document.querySelectorAll('#data-form input, #data-form select').forEach(element => {
-                if (element.tagName === 'SELECT') {
-                    element.selectedIndex = 0; 
-                } else {
-                    element.value = '';
-                }
-                updateBackground(element);
-            });
-            document.getElementById('data-form').submit();
-        }
-    </script>
-</body>
-</html>
-"""
-
-# 4. --- Logica de Replicacion de Formulas ---
-def replicar_formulas(user_inputs):
-    """
-    Funcion que replica la logica de las formulas de Excel.
-    Recibe la entrada dinamica del usuario.
-    """
-    resultados = {}
-
-    if error_lectura or not datos_hojas:
-        # Se comenta la linea original para permitir la ejecución sin el archivo Excel
-        # return {"error": "No se cargaron los datos de Excel."}, None
-        pass # Continuar aunque el archivo Excel no esté presente
-
-    # --- ENTRADAS DEL USUARIO ---
-    
-    try:
-        def get_float(name):
-            val = user_inputs.get(name)
-            if val is None or val == '':
-                return None
-            try:
-                # Reemplaza comas por puntos para permitir formatos decimales.
-                return float(str(val).replace(',', '.'))
-            except ValueError:
-                return None
-        
-        # Antropometricos
-        sexo = user_inputs.get('sexo')
-        edad = get_float('edad_anos')
-        peso_kg = get_float('peso_kg')
-        talla_m = get_float('talla_m')
-        
-        # Signos Vitales
-        tas = get_float('tas')
-        tad = get_float('tad')
-        fc = get_float('fc')
-        sato2_sv = get_float('sato2_sv') # SatO₂ Pulsioximetria
-        
-        # Gasometria Arterial
-        ph_a = get_float('ph_a')
-        paco2 = get_float('paco2') # PaCO₂
-        pao2 = get_float('pao2')
-        sato2_a = get_float('sato2_a') # SatO₂ (a)
-        lactato = get_float('lactato')
-        hb = get_float('hb')
-        
-        # Gasometria Venosa
-        ph_v = get_float('ph_v')
-        pvco2 = get_float('pvco2') # PvCO₂
-        pvo2 = get_float('pvo2')
-        satvo2 = get_float('satvo2') # SatvO₂
-
-        # Macrodinamia / POCUS
-        vti = get_float('vti')
-        tsvi = get_float('tsvi')
-        vci = get_float('vci')
-        vci_colaps = user_inputs.get('vci_colaps')
-        pvc_medido = get_float('pvc_medido')
-        
-        # Hemodinamia (VI/VD)
-        mapse_l = get_float('mapse_l')
-        mapse_s = get_float('mapse_s')
-        e_onda = get_float('e_onda')
-        a_onda = get_float('a_onda')
-        eprim_lat = get_float('eprim_lat')
-        eprim_med = get_float('eprim_med')
-        vfs = get_float('vfs') 
-        vfd = get_float('vfd')
-        long_vi = get_float('long_vi')
-        vtmax = get_float('vtmax')
-        tapse = get_float('tapse') 
-        vti_pulmonar = get_float('vti_pulmonar') 
-
-        # Ventilatorio Inputs
-        modo = user_inputs.get('modo') 
-        vt_protec_ml_kg = get_float('vt_protec') 
-        vt_ventilador = get_float('vt_ventilador') 
-        fr = get_float('fr') 
-        peco2 = get_float('peco2') # PeCO₂
-        peep = get_float('peep') 
-        fio2 = get_float('fio2') # FiO₂
-        plateau = get_float('plateau') 
-        ppico = get_float('ppico') 
-        cstat_input = get_float('cstat_input') 
-        cdin_input = get_float('cdin_input') 
-        v_min = get_float('v_min') # V/min
-        pocc = get_float('pocc') 
-
-        # Neurocritico Inputs
-        vs_acm = get_float('vs_acm')
-        vd_acm = get_float('vd_acm')
-        vs_ab = get_float('vs_ab')
-        vd_ab = get_float('vd_ab')
-        vaso_dtc = user_inputs.get('vaso_dtc')
-        vs_dtc = get_float('vs_dtc')
-        vd_dtc = get_float('vd_dtc')
-        vm_aci = get_float('vm_aci')
-        vm_ave = get_float('vm_ave')
-        vno_der = get_float('vno_der')
-        vno_izq = get_float('vno_izq')
-        vno_dgo = get_float('vno_dgo')
-        ph_jo2 = get_float('ph_jo2') 
-        paco2_jo2 = get_float('paco2_jo2') 
-        pao2_jo2 = get_float('pao2_jo2') 
-        sato2_jo2 = get_float('sato2_jo2')
-        lactato_jo2 = get_float('lactato_jo2') 
-        
-        # Verificar si hay suficientes datos base para iniciar
-        if not (peso_kg and talla_m):
-             # Si no hay peso y talla, no se pueden calcular SCT/PI, pero se puede intentar con otros.
-             # Solo retornar si no hay NINGÚN dato de entrada para evitar un mensaje de error vacío.
-             if not any(user_inputs.values()):
-                 return json.dumps(resultados), None
-        
-        # --- CALCULOS INTERMEDIOS BASE (PANEL) ---
-        
-        # D20: TAM 
-        tam = None
-        if tas is not None and tad is not None:
-            tam = (tas + (2 * tad)) / 3
-        
-        # SCT (D10)
-        talla_cm = talla_m * 100 if talla_m is not None else None
-        sct = (0.020247 * (peso_kg ** 0.425) * (talla_m ** 0.725)) * 10 if peso_kg is not None and talla_m is not None else None
-        
-        # D11: PI (Peso Ideal) -- FÓRMULA DE MILLER/BROCA CORREGIDA
-        pi = None
-        if talla_m is not None and sexo in ["H", "M"]:
-            talla_pulgadas_menos_60 = (talla_m * 100 / 2.54) - 60
-            if sexo == "H":
-                pi = 56.2 + 1.41 * talla_pulgadas_menos_60
-            elif sexo == "M":
-                pi = 53.1 + 1.36 * talla_pulgadas_menos_60
-
-        # --- CALCULOS DE MACRODINAMIA CENTRAL (POCUS) ---
-
-        # D10: VS (Volumen Sistolico - Macrodinamia)
-        vs_macro = ((tsvi ** 2) * 0.785) * vti if tsvi is not None and vti is not None else None
-        
-        # D11: GC (Gasto Cardiaco - Macrodinamia)
-        gc = None
-        if vs_macro is not None and fc is not None:
-            try:
-                gc = (vs_macro / 1000) * fc
-            except ZeroDivisionError:
-                pass
-
-        # D12: IC (Indice Cardíaco)
-        ic = gc / sct if sct is not None and gc is not None and sct != 0.0 else None
-        
-        # D15: PVC ECO
-        pvc_eco = None
-        if vci is not None and vci_colaps is not None and vci > 0:
-            if vci < 1.5: pvc_eco = 5
-            elif vci >= 1.5 and vci <= 2.5:
-                if vci_colaps in ["total", ">50%"]: pvc_eco = 8
-                elif vci_colaps == "<50%": pvc_eco = 13
-            elif vci > 2.5:
-                if vci_colaps == "<50%": pvc_eco = 18
-                elif vci_colaps == "No cambios": pvc_eco = 20
-        elif pvc_medido is not None:
-             pvc_eco = pvc_medido
-
-        # --- CALCULOS DE MICRODINAMIA (BASE) ---
-        cao2, cvo2, davo2, exto2, cco2, shunt = None, None, None, None, None, None
-        
-        # Contenido Arterial de O2 (CaO2)
-        if hb is not None and sato2_a is not None and pao2 is not None:
-            sato2_frac = sato2_a / 100.0
-            cao2 = (1.36 * hb * sato2_frac) + (0.0031 * pao2)
-        
-        # Contenido Venoso de O2 (CvO2)
-        if hb is not None and satvo2 is not None and pvo2 is not None:
-            satvo2_frac = satvo2 / 100.0
-            cvo2 = (1.36 * hb * satvo2_frac) + (0.0031 * pvo2)
-        
-        # Contenido Capilar de O2 (CcO2)
-        if hb is not None and pao2 is not None:
-            cco2 = (1.36 * hb * 1.0) + (0.0031 * pao2) 
-        
-        davo2 = cao2 - cvo2 if cao2 is not None and cvo2 is not None else None
-        
-        if davo2 is not None and cao2 is not None and cao2 != 0.0:
-            exto2 = (davo2 / cao2) * 100 
-        
-        # Shunt Base (para uso en Ventilatorio y Microdinamia)
-        shunt_denominador = cco2 - cvo2 if cco2 is not None and cvo2 is not None else None
-        shunt_numerador = cco2 - cao2 if cco2 is not None and cao2 is not None else None
-        if shunt_denominador is not None and shunt_numerador is not None and shunt_denominador != 0.0:
-            shunt = (shunt_numerador / shunt_denominador) * 100
-        
-        # *****************************************************************
-        # --- INICIO DE LA LOGICA DE TUS 6 HOJAS ---
-        # *****************************************************************
-        
-        # --- 1. PANEL ---
-        panel_resultados = {}
-        
-        # Antropometricos
-        imc = peso_kg / (talla_m ** 2) if talla_m is not None and peso_kg is not None and talla_m != 0.0 else None
-        act = None
-        if sexo is not None and edad is not None and peso_kg is not None and talla_cm is not None:
-            if sexo == "H":
-                act = 2.447 - (0.09156 * edad) + (0.3362 * peso_kg) + (0.1074 * talla_cm)
-            elif sexo == "M":
-                act = -2.097 + (0.1069 * talla_cm) + (0.2466 * peso_kg)
-
-        panel_resultados['-- Datos Antropometricos --'] = " "
-        if user_inputs.get('sexo'): panel_resultados['Sexo'] = sexo
-        if edad is not None: panel_resultados['Edad'] = f"{edad:.0f} anos"
-        if peso_kg is not None: panel_resultados['Peso'] = f"{peso_kg:.0f} Kg"
-        if talla_m is not None: panel_resultados['Talla'] = f"{talla_m:.2f} m"
-        if imc is not None: panel_resultados['IMC'] = f"{imc:.2f}"
-        if sct is not None: panel_resultados['SCT'] = f"{sct:.2f} m²"
-        if pi is not None: panel_resultados['PI'] = f"{pi:.2f} Kg"
-        if act is not None: panel_resultados['ACT'] = f"{act:.2f} L"
-        
-        # Signos Vitales y Gasometrias
-        panel_resultados['-- Signos Vitales --'] = " "
-        if tas is not None: panel_resultados['TAS'] = f"{tas:.0f} mmHg"
-        if tad is not None: panel_resultados['TAD'] = f"{tad:.0f} mmHg"
-        if tam is not None: panel_resultados['TAM'] = f"{tam:.0f} mmHg"
-        if fc is not None: panel_resultados['FC'] = f"{fc:.0f} lpm"
-        if sato2_sv is not None: panel_resultados['SatO₂ Pulsioximetria'] = f"{sato2_sv:.0f} %"
-        
-        panel_resultados['-- Gasometria Arterial 🩸 --'] = " "
-        if ph_a is not None: panel_resultados['pH (a)'] = f"{ph_a:.2f}"
-        if paco2 is not None: panel_resultados['PaCO₂'] = f"{paco2:.1f} mmHg"
-        if pao2 is not None: panel_resultados['PaO₂'] = f"{pao2:.1f} mmHg"
-        if sato2_a is not None: panel_resultados['SatO₂ (a)'] = f"{sato2_a:.1f} %"
-        if lactato is not None: panel_resultados['Lactato'] = f"{lactato:.2f} mmol/L"
-        if hb is not None: panel_resultados['Hb'] = f"{hb:.1f} g/dL"
-        
-        panel_resultados['-- Gasometria Venosa 🔵 --'] = " "
-        if ph_v is not None: panel_resultados['pHv'] = f"{ph_v:.2f}"
-        if pvco2 is not None: panel_resultados['PvCO₂'] = f"{pvco2:.1f} mmHg"
-        if pvo2 is not None: panel_resultados['PvO₂'] = f"{pvo2:.1f} mmHg"
-        if satvo2 is not None: panel_resultados['SatvO₂'] = f"{satvo2:.1f} %"
-        
-        resultados['Panel'] = {k: v for k, v in panel_resultados.items() if (isinstance(v, str) and v.startswith('--')) or not (isinstance(v, str) and v.startswith('Error'))}
-
-
-        # --- 2. MACRODINAMIA (POCUS Central) ---
-        macrodinamia_resultados = {}
-        
-        tsvi_inf = (0.01 * talla_cm) + 0.25 if talla_cm is not None else None
-        
-        rvs = None
-        # Cálculo seguro: requiere tam, pvc_eco y gc, y gc debe ser diferente de cero
-        if tam is not None and pvc_eco is not None and gc is not None and gc != 0.0:
-            rvs = ((tam - pvc_eco) * 80) / gc
-            
-        rvsi = rvs / sct if sct is not None and rvs is not None and sct != 0.0 else None
-
-        if tsvi is not None: macrodinamia_resultados['TSVI'] = f"{tsvi:.2f} cm"
-        if vti is not None: macrodinamia_resultados['VTI'] = f"{vti:.2f} cm"
-        if tsvi_inf is not None: macrodinamia_resultados['TSVI Inferido'] = f"{tsvi_inf:.2f} cm"
-        if vs_macro is not None: macrodinamia_resultados['VS'] = f"{vs_macro:.0f} ml"
-        if gc is not None: macrodinamia_resultados['GC'] = f"{gc:.2f} L/min"
-        if ic is not None: macrodinamia_resultados['IC'] = f"{ic:.2f} L/min/m²"
-        if vci is not None: macrodinamia_resultados['VCI'] = f"{vci:.2f} cm"
-        if vci_colaps and vci_colaps != 'Selecciona Colapso': macrodinamia_resultados['VCI Colaps.'] = f"{vci_colaps}"
-        if pvc_eco is not None: macrodinamia_resultados['PVC ECO'] = f"{pvc_eco:.0f} mmHg"
-        if pvc_medido is not None: macrodinamia_resultados['PVC Medido'] = f"{pvc_medido:.0f} mmHg"
-        if rvs is not None: macrodinamia_resultados['RVS'] = f"{rvs:.0f} dyn.s/cm⁵"
-        if rvsi is not None: macrodinamia_resultados['RVSI'] = f"{rvsi:.0f} dyn.s/cm⁵/m²"
-
-        resultados['Macrodinamia'] = {k: v for k, v in macrodinamia_resultados.items() if not (isinstance(v, str) and v.startswith('Error'))}
-
-
-        # --- 3. MICRODINAMIA ---
-        micro_resultados = {}
-        
-        vo2 = gc * davo2 * 10 if gc is not None and davo2 is not None else None
-        vo2i = vo2 / sct if sct is not None and vo2 is not None and sct != 0.0 else None
-        do2 = (gc * cao2) * 10 if gc is not None and cao2 is not None else None
-        do2i = do2 / sct if sct is not None and do2 is not None and sct != 0.0 else None
-        davco2 = pvco2 - paco2 if pvco2 is not None and paco2 is not None else None
-        
-        # GC Fick: Formula =((D8*100)/D5)/D8. Mapeo: D8 -> vo2, D5 -> davo2.
-        gc_fick_calc = None
-        # Cálculo seguro: requiere vo2 y davo2, y ambos deben ser diferentes de cero.
-        if vo2 is not None and davo2 is not None and vo2 != 0.0 and davo2 != 0.0:
-            # Implementando la formula literal de Excel: (VO2 * 100 / DavO2) / VO2
-            # raw_gc_fick = ((vo2 * 100) / davo2) / vo2 
-            # Si la formula es para calcular el GC (L/min), debe ser:
-            # GC (L/min) = VO2 * 10 / DavO2 (donde DavO2 está en ml/dL)
-            gc_fick_calc = (vo2 * 10) / (davo2 * 100) 
-
-        # Inserción de resultados de Microdinamia
-        if cao2 is not None: micro_resultados['CaO₂'] = f"{cao2:.2f} ml/dL"
-        if cvo2 is not None: micro_resultados['CvO₂'] = f"{cvo2:.2f} ml/dL"
-        if cco2 is not None: micro_resultados['CcO₂'] = f"{cco2:.2f} ml/dL"
-        if davo2 is not None: micro_resultados['DavO₂'] = f"{davo2:.2f} ml/dL"
-        if vo2 is not None: micro_resultados['VO₂'] = f"{vo2:.2f} ml/min"
-        if vo2i is not None: micro_resultados['VO₂I'] = f"{vo2i:.2f} ml/min/m²"
-        if do2 is not None: micro_resultados['DO₂'] = f"{do2:.2f} ml/min"
-        if do2i is not None: micro_resultados['DO₂I'] = f"{do2i:.2f} ml/min/m²"
-        if exto2 is not None: micro_resultados['ExtO₂'] = f"{exto2:.2f} %"
-        if davco2 is not None: micro_resultados['DavCO₂'] = f"{davco2:.1f} mmHg"
-        if lactato is not None: micro_resultados['Lactato'] = f"{lactato:.2f} mmol/L"
-        if satvo2 is not None: micro_resultados['SatvO₂'] = f"{satvo2:.1f} %" 
-        if gc_fick_calc is not None: micro_resultados['GC Fick'] = f"{gc_fick_calc:.2f} L/min" 
-        
-        resultados['Microdinamia'] = {k: v for k, v in micro_resultados.items() if not (isinstance(v, str) and v.startswith('Error'))}
-
-
-        # --- 4. HEMODINAMIA (VI/VD) ---
-        hemodinamia_resultados = {}
-        
-        # VI Calculos
-        eprim_prom = (eprim_lat + eprim_med) / 2 if eprim_lat is not None and eprim_med is not None else None
-        e_eprim = e_onda / eprim_prom if e_onda is not None and eprim_prom is not None and eprim_prom != 0.0 else None
-        fevi_simp = ((vfd - vfs) / vfd) * 100 if vfd is not None and vfs is not None and vfd != 0.0 else None
-        
-        # Strain MAPSE: Se aplica la negación al resultado final para que sea negativo.
-        strain_mapse = None
-        if mapse_l is not None and mapse_s is not None and long_vi is not None and long_vi != 0.0:
-            raw_strain = ((mapse_l + mapse_s) / 2) / long_vi * 100
-            strain_mapse = -raw_strain 
-        
-        # Ea = (0.9 * TAS) / VS_Macro
-        ea = (0.9 * tas) / vs_macro if tas is not None and vs_macro is not None and vs_macro != 0.0 else None
-        
-        # Ee = (0.9 * TAS) / VFS
-        ee = (0.9 * tas) / vfs if tas is not None and vfs is not None and vfs != 0.0 else None
-        
-        # AVA = Ea / Ee
-        ava = ea / ee if ea is not None and ee is not None and ee != 0.0 else None
-        
-        power_c = (tam * gc) / 451 if tam is not None and gc is not None else None
-        
-        hemodinamia_resultados['-- Ventriculo Izquierdo --'] = " "
-        if mapse_l is not None: hemodinamia_resultados['MAPSE L'] = f"{mapse_l:.2f} cm" 
-        if mapse_s is not None: hemodinamia_resultados['MAPSE S'] = f"{mapse_s:.2f} cm" 
-        if e_onda is not None: hemodinamia_resultados['E'] = f"{e_onda:.2f} m/s" 
-        if a_onda is not None: hemodinamia_resultados['A'] = f"{a_onda:.2f} m/s" 
-        if e_onda is not None and a_onda is not None and a_onda != 0.0: hemodinamia_resultados['E/A'] = f"{e_onda/a_onda:.2f}" 
-        if eprim_lat is not None: hemodinamia_resultados['E\' lat'] = f"{eprim_lat:.2f} cm/s" 
-        if eprim_med is not None: hemodinamia_resultados['E\' med'] = f"{eprim_med:.2f} cm/s" 
-        if eprim_prom is not None: hemodinamia_resultados['E\' Prom'] = f"{eprim_prom:.2f} cm/s" 
-        if e_eprim is not None: hemodinamia_resultados['E/E\''] = f"{e_eprim:.2f}" 
-        if vfs is not None: hemodinamia_resultados['VFS'] = f"{vfs:.0f} ml" 
-        if vfd is not None: hemodinamia_resultados['VFD'] = f"{vfd:.0f} ml" 
-        if fevi_simp is not None: hemodinamia_resultados['FEVI SIMP'] = f"{fevi_simp:.1f} %" 
-        if long_vi is not None: hemodinamia_resultados['Long. VI'] = f"{long_vi:.1f} cm" 
-        if strain_mapse is not None: hemodinamia_resultados['Strain MAPSE'] = f"{strain_mapse:.2f} %" 
-        if ea is not None: hemodinamia_resultados['Ea'] = f"{ea:.2f} mmHg/ml" 
-        if ee is not None: hemodinamia_resultados['Ee'] = f"{ee:.2f} mmHg/ml" 
-        if ava is not None: hemodinamia_resultados['AVA'] = f"{ava:.2f}" 
-        if power_c is not None: hemodinamia_resultados['Power C'] = f"{power_c:.2f} W" 
-        
-        # VD Calculos
-        welch = (e_eprim * 1.24) + 1.9 if e_eprim is not None else None
-        gradiente_it = 4 * (vtmax ** 2) if vtmax is not None else None
-        psap = gradiente_it + pvc_eco if gradiente_it is not None and pvc_eco is not None else None 
-        pmap = ((0.6 * psap) + 2) if psap is not None else None
-        rvs_pulm = (((vtmax / vti_pulmonar) * 10) + 0.16) if vtmax is not None and vti_pulmonar is not None and vti_pulmonar != 0.0 else None
-        rvs_pulm_in = (((pmap - welch) / ic) * 80) if pmap is not None and welch is not None and ic is not None and ic != 0.0 else None
-        avd = tapse / psap if tapse is not None and psap is not None and psap != 0.0 else None
-
-        hemodinamia_resultados['-- Ventriculo Derecho --'] = " "
-        if welch is not None: hemodinamia_resultados['Welch'] = f"{welch:.2f}" 
-        if vtmax is not None: hemodinamia_resultados['VTmax'] = f"{vtmax:.2f} m/s" 
-        if gradiente_it is not None: hemodinamia_resultados['Gradiente IT'] = f"{gradiente_it:.2f} mmHg" 
-        if tapse is not None: hemodinamia_resultados['TAPSE'] = f"{tapse:.2f} mm" 
-        if vti_pulmonar is not None: hemodinamia_resultados['VTI Pulmonar'] = f"{vti_pulmonar:.2f} cm" 
-        if psap is not None: hemodinamia_resultados['PSAP'] = f"{psap:.2f} mmHg" 
-        if pmap is not None: hemodinamia_resultados['PMAP'] = f"{pmap:.2f} mmHg" 
-        if rvs_pulm is not None: hemodinamia_resultados['RVSPulm.'] = f"{rvs_pulm:.2f} UW" 
-        if rvs_pulm_in is not None: hemodinamia_resultados['RVSPulm. In.'] = f"{rvs_pulm_in:.2f} Dynas/m²" 
-        if avd is not None: hemodinamia_resultados['AVD'] = f"{avd:.2f}" 
-        
-        resultados['Hemodinamia'] = {k: v for k, v in hemodinamia_resultados.items() if (isinstance(v, str) and v.startswith('--')) or not (isinstance(v, str) and v.startswith('Error'))}
-
-
-        # --- 5. VENTILATORIO ---
-        ventilatorio_resultados = {}
-        
-        # Fórmulas de cálculo condicional (Raw, Cstat Calc, etc.)
-        
-        # Cálculo de PI con la fórmula exacta de Excel (ya calculado en BASE)
-        peso_sdra = pi 
-        vt_protec_calc = vt_protec_ml_kg * peso_sdra if vt_protec_ml_kg is not None and peso_sdra is not None else None
-        
-        # Driving Pressure Calculation
-        driving_p = plateau - peep if plateau is not None and peep is not None else None 
-        
-        # Compliance Static Calculation (Requires driving_p != 0)
-        cstat_calc = None
-        if vt_ventilador is not None and driving_p is not None and driving_p != 0.0:
-            cstat_calc = vt_ventilador / driving_p
-            
-        ppico_menos_peep = ppico - peep if ppico is not None and peep is not None else None
-        
-        # Compliance Dynamic Calculation (Requires ppico_menos_peep != 0)
-        cdin_calc = None
-        if vt_ventilador is not None and ppico_menos_peep is not None and ppico_menos_peep != 0.0:
-            cdin_calc = vt_ventilador / ppico_menos_peep
-            
-        raw = ppico - plateau if ppico is not None and plateau is not None else None
-
-        # --- FÓRMULAS DE MONITOREO VENTILATORIO CON CORRECCIÓN DE NONE ---
-        
-        # 1. EM (Espacio Muerto Fisiológico)
-        em_calc = None
-        if paco2 is not None and peco2 is not None and paco2 != 0.0:
-            em_numerador = (paco2 - peco2)
-            em_calc = (em_numerador / paco2) * 100 
-        
-        # 2. EV (Eficiencia Ventilatoria)
-        ev_calc = None
-        # CORRECCIÓN: Asegurar que PI no sea None antes de usarlo en la división.
-        if pi is not None and paco2 is not None and v_min is not None:
-            ev_denominador = ((pi / 10) * 37.5)
-            if ev_denominador != 0.0:
-                ev_numerador = (paco2 * v_min)
-                ev_calc = ev_numerador / ev_denominador
-
-        # 3. Shunt (Reutiliza el cálculo base)
-        # La variable 'shunt' se calculó en la sección de Microdinamia base.
-
-        # 4. PM (Power Mechanical)
-        pm_calc = None
-        # CORRECCIÓN: Asegurar que todos los inputs requeridos para C1 no sean None.
-        if vt_ventilador is not None and fr is not None:
-            C1 = 0.098 * fr * (vt_ventilador / 1000)
-            
-            if modo == "VCV" and ppico is not None and driving_p is not None:
-                # Se asume que driving_p ya está calculado de forma segura
-                term_p = ppico - (driving_p / 2) 
-                pm_calc = C1 * term_p
-            
-            elif modo == "PCV" and driving_p is not None and peep is not None:
-                # Se asume que driving_p ya está calculado de forma segura
-                term_p = driving_p + peep
-                pm_calc = C1 * term_p
-        
-        # 5. PpMt
-        ppmt_calc = None
-        # CORRECCIÓN: Asegurar que ppico, peep y pocc no sean None.
-        if ppico is not None and peep is not None and pocc is not None:
-            ppmt_numerador = (ppico - peep) - 2
-            ppmt_denominador = 3 * pocc 
-            if pocc != 0.0: # Simplificando la comprobación de denominador
-                ppmt_calc = ppmt_numerador / ppmt_denominador
-        
-        # --- Inserción de Inputs y Cálculos de Ventilatorio ---
-        
-        if modo and modo != 'Selecciona Modo': ventilatorio_resultados['MODO'] = modo
-        if peso_sdra is not None: ventilatorio_resultados['Peso SDRA (PI)'] = f"{peso_sdra:.2f} Kg"
-        if vt_protec_ml_kg is not None: ventilatorio_resultados['VT protec.'] = f"{vt_protec_ml_kg:.1f} ml/Kg"
-        if vt_protec_calc is not None: ventilatorio_resultados['VT protec. C.'] = f"{vt_protec_calc:.0f} ml"
-        if vt_ventilador is not None: ventilatorio_resultados['VT Ventilador'] = f"{vt_ventilador:.0f} ml"
-        if fr is not None: ventilatorio_resultados['FR'] = f"{fr:.0f} lpm"
-        if paco2 is not None: ventilatorio_resultados['PaCO₂'] = f"{paco2:.1f} mmHg"
-        if peco2 is not None: ventilatorio_resultados['PeCO₂'] = f"{peco2:.1f} mmHg"
-        if peep is not None: ventilatorio_resultados['PEEP'] = f"{peep:.0f} cmH₂O"
-        if fio2 is not None: ventilatorio_resultados['FIO₂'] = f"{fio2:.2f}" 
-        if plateau is not None: ventilatorio_resultados['Plateau'] = f"{plateau:.0f} cmH₂O"
-        if driving_p is not None: ventilatorio_resultados['Driving P.'] = f"{driving_p:.0f} cmH₂O"
-        if ppico is not None: ventilatorio_resultados['Ppico'] = f"{ppico:.0f} cmH₂O"
-        if cstat_input is not None: ventilatorio_resultados['Cstat (medida)'] = f"{cstat_input:.1f} ml/cmH₂O"
-        if cstat_calc is not None: ventilatorio_resultados['Cstat Calc'] = f"{cstat_calc:.1f} ml/cmH₂O"
-        if cdin_input is not None: ventilatorio_resultados['Cdin (medida)'] = f"{cdin_input:.1f} ml/cmH₂O"
-        if cdin_calc is not None: ventilatorio_resultados['Cdin Calc'] = f"{cdin_calc:.1f} ml/cmH₂O"
-        if raw is not None: ventilatorio_resultados['Raw'] = f"{raw:.1f} cmH₂O/L/s"
-        if v_min is not None: ventilatorio_resultados['V/min'] = f"{v_min:.1f} L/min"
-        if pocc is not None: ventilatorio_resultados['POCC'] = f"{pocc:.1f} cmH₂O"
-        if em_calc is not None: ventilatorio_resultados['EM'] = f"{em_calc:.2f} %" 
-        if ev_calc is not None: ventilatorio_resultados['EV'] = f"{ev_calc:.2f}" 
-        if shunt is not None: ventilatorio_resultados['Shunt'] = f"{shunt:.2f} %" # Reutiliza el cálculo base
-        if pm_calc is not None: ventilatorio_resultados['PM'] = f"{pm_calc:.2f} J/min"
-        if ppmt_calc is not None: ventilatorio_resultados['PpMt'] = f"{ppmt_calc:.2f}"
-
-        resultados['Ventilatorio'] = {k: v for k, v in ventilatorio_resultados.items() if not (isinstance(v, str) and v.startswith('Error'))}
-
-
-        # --- 6. NEUROCRÍTICO ---
-        neuro_resultados = {}
-        
-        # Calculos Previos
-        vm_acm = (vs_acm + (2 * vd_acm)) / 3 if vs_acm is not None and vd_acm is not None else None
-        ip_acm = (vs_acm - vd_acm) / vm_acm if vs_acm is not None and vd_acm is not None and vm_acm is not None and vm_acm != 0.0 else None
-        ir_acm = (vs_acm - vd_acm) / vs_acm if vs_acm is not None and vd_acm is not None and vs_acm != 0.0 else None
-        
-        # Cálculo seguro de PIC y PPC
-        pic = None
-        if ip_acm is not None:
-             pic_raw = (10.93 * ip_acm) - 1.28
-             # Limitar PIC a 0 si es negativo
-             pic = max(0, pic_raw) if pic_raw is not None else None 
-             
-        ppc = tam - pic if tam is not None and pic is not None else None
-        
-        vm_ab = (vs_ab + (2 * vd_ab)) / 3 if vs_ab is not None and vd_ab is not None else None
-        ip_ab = (vs_ab - vd_ab) / vm_ab if vs_ab is not None and vd_ab is not None and vm_ab is not None and vm_ab != 0.0 else None
-        ir_ab = (vs_ab - vd_ab) / vs_ab if vs_ab is not None and vd_ab is not None and vs_ab != 0.0 else None
-
-        vm_dtc = (vs_dtc + (2 * vd_dtc)) / 3 if vs_dtc is not None and vd_dtc is not None else None
-        ip_dtc = (vs_dtc - vd_dtc) / vm_dtc if vs_dtc is not None and vd_dtc is not None and vm_dtc is not None and vm_dtc != 0.0 else None
-        ir_dtc = (vs_dtc - vd_dtc) / vs_dtc if vs_dtc is not None and vd_dtc is not None and vs_dtc != 0.0 else None
-
-        il = vm_acm / vm_aci if vm_acm is not None and vm_aci is not None and vm_aci != 0.0 else None
-        isou = vm_ab / vm_ave if vm_ab is not None and vm_ave is not None and vm_ave != 0.0 else None
-        vno_dgo_calc = (vno_der + vno_izq) / (2 * vno_dgo) if vno_der is not None and vno_izq is not None and vno_dgo is not None and vno_dgo != 0.0 else None
-
-        sjo2_calc = sato2_jo2
-        
-        # CÁLCULOS NEUROCRÍTICOS
-        cvjo2 = None
-        # Cálculo seguro: requiere hb, sjo2_calc, y pao2_jo2
-        if hb is not None and sjo2_calc is not None and pao2_jo2 is not None:
-             cvjo2 = (1.36 * hb * (sjo2_calc / 100.0)) + (0.0031 * pao2_jo2)
-             
-        avdo2_calc = cao2 - cvjo2 if cao2 is not None and cvjo2 is not None else None
-        
-        ceo2_calc = None
-        if avdo2_calc is not None and cao2 is not None and cao2 != 0.0:
-            ceo2_calc = (avdo2_calc / cao2) * 100
-
-
-        # --- SECCION 1: DTC (ACM) - ORDEN FORZADO ---
-        neuro_resultados['-- DTC (ACM) --'] = " "
-        
-        if vs_acm is not None: neuro_resultados['VS (ACM)'] = f"{vs_acm:.1f} cm/s"
-        if vd_acm is not None: neuro_resultados['VD (ACM)'] = f"{vd_acm:.1f} cm/s"
-        if vm_acm is not None: neuro_resultados['VM (ACM)'] = f"{vm_acm:.1f} cm/s"
-        if ip_acm is not None: neuro_resultados['IP (ACM)'] = f"{ip_acm:.2f}"
-        if ir_acm is not None: neuro_resultados['IR (ACM)'] = f"{ir_acm:.2f}"
-        if pic is not None: neuro_resultados['PIC (Calc.)'] = f"{pic:.1f} mmHg"
-        if ppc is not None: neuro_resultados['PPC (Calc.)'] = f"{ppc:.1f} mmHg"
-
-        # --- SECCION 2: DTC (AB) ---
-        neuro_resultados['-- DTC (AB) --'] = " "
-        if vs_ab is not None: neuro_resultados['VS (AB)'] = f"{vs_ab:.1f} cm/s"
-        if vd_ab is not None: neuro_resultados['VD (AB)'] = f"{vd_ab:.1f} cm/s" 
-        if vm_ab is not None: neuro_resultados['VM (AB)'] = f"{vm_ab:.1f} cm/s"
-        # Usamos abs() si es posible, aunque los indices de pulsatilidad/resistencia no deberían ser negativos
-        if ip_ab is not None: neuro_resultados['IP (AB)'] = f"{abs(ip_ab):.2f}" 
-        if ir_ab is not None: neuro_resultados['IR (AB)'] = f"{abs(ir_ab):.2f}" 
-
-        # --- SECCION 3: DTC (GENERICO) ---
-        neuro_resultados['-- DTC (Genérico) --'] = " "
-        
-        if user_inputs.get('vaso_dtc') and user_inputs.get('vaso_dtc') != 'Selecciona Arteria': 
-            neuro_resultados['Arteria Medida'] = vaso_dtc
-            
-        if vs_dtc is not None: neuro_resultados['VS'] = f"{vs_dtc:.1f} cm/s"
-        if vd_dtc is not None: neuro_resultados['VD'] = f"{vd_dtc:.1f} cm/s"
-        if vm_dtc is not None: neuro_resultados['VM'] = f"{vm_dtc:.1f} cm/s"
-        if ip_dtc is not None: neuro_resultados['IP'] = f"{ip_dtc:.2f}"
-        if ir_dtc is not None: neuro_resultados['IR (DTc)'] = f"{ir_dtc:.2f}"
-
-        # --- SECCION 4: FLUJO VASCULAR ---
-        neuro_resultados['-- Flujo Vascular Extracraneal --'] = " "
-        if vm_aci is not None: neuro_resultados['VM Art. Carótida Int.'] = f"{vm_aci:.1f} cm/s"
-        if vm_ave is not None: neuro_resultados['VM Art. Vertebral'] = f"{vm_ave:.1f} cm/s"
-
-        neuro_resultados['-- Indices Combinados --'] = " "
-        if il is not None: neuro_resultados['Indice Lindergard'] = f"{il:.2f}"
-        if isou is not None: neuro_resultados['Indice de Soustiel'] = f"{isou:.2f}"
-        
-        # --- SECCION 5: VNO ---
-        neuro_resultados['-- VNO (Vaina Nervio Optico) --'] = " "
-        if vno_der is not None: neuro_resultados['Der.'] = f"{vno_der:.1f} mm"
-        if vno_izq is not None: neuro_resultados['Izq.'] = f"{vno_izq:.1f} mm"
-        if vno_dgo is not None: neuro_resultados['DGO'] = f"{vno_dgo:.1f} mm"
-        if vno_dgo_calc is not None: neuro_resultados['VNO/DGO'] = f"{vno_dgo_calc:.2f}"
-
-        # --- SECCION 6: GASOMETRÍA YUGULAR ---
-        neuro_resultados['-- Gasometria yugular (jO₂) --'] = " " 
-        if ph_jo2 is not None: neuro_resultados['pH'] = f"{ph_jo2:.2f}"
-        if paco2_jo2 is not None: neuro_resultados['PjCO₂'] = f"{paco2_jo2:.1f} mmHg"
-        if pao2_jo2 is not None: neuro_resultados['PjO₂'] = f"{pao2_jo2:.1f} mmHg"
-        if sato2_jo2 is not None: neuro_resultados['SjO₂'] = f"{sato2_jo2:.1f} %"
-        if lactato_jo2 is not None: neuro_resultados['Lactato'] = f"{lactato_jo2:.2f} mmol/L"
-
-        # TÍTULO Y RESULTADOS DE NEUROMONITOREO COMBINADO
-        neuro_resultados['-- Neuro / Golfo Yugular --'] = " "
-        
-        if sjo2_calc is not None: neuro_resultados['SjO₂ (Monit.)'] = f"{sjo2_calc:.1f} %"
-        
-        # AVDO₂ (Arteriovenous difference of oxygen content)
-        if avdo2_calc is not None: neuro_resultados['AVDO₂'] = f"{avdo2_calc:.2f}"
-        
-        # CEO₂ (Cerebral oxygen extraction)
-        if ceo2_calc is not None: neuro_resultados['CEO₂'] = f"{ceo2_calc:.2f} %"
-        
-        resultados['Neurocritico'] = {k: v for k, v in neuro_resultados.items() if not (isinstance(v, str) and v.startswith('Error'))}
-        
-        # ELIMINACIÓN DE BLOQUES REPETIDOS DE MICRODINAMIA Y HEMODINAMIA AL FINAL
-
-        return json.dumps(resultados), None
-
-    except ZeroDivisionError:
-        return None, "Error de Division por Cero. Revisa los campos que resultan en un cero en el denominador (e.g., PaCO₂, CI, VFD, VM, VTI Pulmonar, POCC, etc.)."
-    except Exception as e:
-        # Esto capturará cualquier error inesperado en la función y lo mostrará al usuario.
-        return None, f"Error inesperado durante el calculo: {e.__class__.__name__}: {e}"
-        
-# 5. Ruta principal de Flask
-@app.route('/', methods=['GET', 'POST'])
-def inicio():
-    """Maneja las solicitudes GET (mostrar formulario) y POST (calcular)."""
-    
-    error_calculo = None
-    results_json = None
-    show_results = False
-    
-    # Valores de inicio del formulario
-    user_inputs = {
-        'sexo': 'H', 'edad_anos': '', 'peso_kg': '', 'talla_m': '',
-        'tas': '', 'tad': '', 'fc': '', 'sato2_sv': '',
-        'ph_a': '', 'paco2': '', 'pao2': '', 'sato2_a': '', 'lactato': '', 'hb': '',
-        'ph_v': '', 'pvco2': '', 'pvo2': '', 'satvo2': '',
-        'vti': '', 'tsvi': '', 'vci': '', 'vci_colaps': 'Selecciona Colapso', 'pvc_medido': '',
-        'mapse_l': '', 'mapse_s': '', 'e_onda': '', 'a_onda': '', 'eprim_lat': '', 'eprim_med': '',
-        'vfs': '', 'vfd': '', 'long_vi': '',
-        'vtmax': '', 'tapse': '', 'vti_pulmonar': '',
-        'modo': 'Selecciona Modo', 'vt_protec': '', 'vt_ventilador': '', 'fr': '', 'peco2': '', 'peep': '',
-        'fio2': '', 'plateau': '', 'ppico': '', 'cstat_input': '', 'cdin_input': '',
-        'v_min': '', 'pocc': '',
-        'vs_acm': '', 'vd_acm': '', 'vs_ab': '', 'vd_ab': '', 'vaso_dtc': 'Selecciona Arteria', 'vs_dtc': '', 'vd_dtc': '',
-        'vm_aci': '', 'vm_ave': '', 'vno_der': '', 'vno_izq': '', 'vno_dgo': '',
-        'ph_jo2': '', 'paco2_jo2': '', 'pao2_jo2': '', 'sato2_jo2': '', 'lactato_jo2': '', 'pvo2_jo2': '' 
-    }
-    
-    if request.method == 'POST':
-        if request.form.get('action') == 'calculate':
-            show_results = True
-        
-        for key in user_inputs.keys():
-            val = request.form.get(key)
-            if val is not None:
-                user_inputs[key] = val 
-                
-        results_json, error_calculo = replicar_formulas(user_inputs)
-
-    now = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    
-    return render_template_string(
-        HTML_TEMPLATE, 
-        error_lectura=error_lectura,
-        results_json=results_json,
-        error_calculo=error_calculo,
-        inputs=user_inputs,
-        show_results=show_results,
-        now=now,
-        json=json, 
-        BACKGROUND_IMAGES=BACKGROUND_IMAGES 
-    )
-
-if __name__ == '__main__':
-    HTML_TEMPLATE = re.sub(r'[\s\n\t]+"""$', '"""', HTML_TEMPLATE)
+# -*- coding: utf-8 -*-
+#
+# Aplicacion Flask para replicar logica de una hoja de calculo de Excel.
+# Esta version utiliza Flask, resultados condicionales, boton de calculo e impresion.
+#
+# REQUISITOS: 'Flask', 'pandas', 'openpyxl', 'gunicorn' (para despliegue global)
+# INSTRUCCION: Coloca tu archivo de Excel nombrado 'datos.xlsx' en la misma carpeta.
+
+from flask import Flask, request, render_template, make_response, stream_with_context
+from jinja2 import ChoiceLoader, DictLoader
+import json
+import logging
+import math
+import os
+import datetime
+import gzip
+import hashlib
+import re 
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete la pagina inicial se sirve solo con gzip
+    brotli = None
+
+from cache_excel import hojas_en_cache, leer_hojas_con_cache
+from estaticos import leer_manifiesto
+from formulas_excel import usar_formulas_del_libro
+import metricas
+from esquema_entradas import VALORES_INICIALES, campos_de_grupo, como_registro, parsear_entradas, parsear_formulario
+from grafo_formulas import PANELES, Evaluador, Salida, Seccion, compilar_plan, plan_de_paneles
+from alertas import (NIVELES, REGLAS, columnas_de, compilar_reglas, evaluar_lote, niveles_por_nodo, reglas_activas,
+                     seleccionar_reglas)
+from historial import LIMITE_PAGINA, MAX_LIMITE_PAGINA, historial
+from serie_temporal import COLUMNAS, HORAS_TENDENCIA, almacen_series
+
+# 1. Configuracion de la aplicacion Flask
+app = Flask(__name__)
+EXCEL_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datos.xlsx')  # no depende del cwd
+datos_hojas = {}
+error_lectura = None
+
+# --- CONSTANTES DE CONFIGURACION ---
+HOJAS_PANEL = [
+    'Panel',
+    'Microdinamia',
+    'Macrodinamia',
+    'Ventilatorio',
+    'Neurocritico' 
+]
+
+BACKGROUND_IMAGES = {}
+
+# --- Estaticos generados: hoja de estilos (construir_css.py) y formulas en JS (generar_js.py) ---
+# El nombre lleva el hash del contenido: se sirven con cache de un ano y una version nueva cambia la URL.
+# La hoja va despues del <style> propio, en el mismo lugar de la cascada que ocupaba el CSS del CDN.
+CACHE_ESTATICOS_SEGUNDOS = 365 * 24 * 3600
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = CACHE_ESTATICOS_SEGUNDOS
+
+_MANIFIESTO_ESTATICOS = leer_manifiesto()
+
+def url_estatico(nombre_logico, aviso):
+    """URL del archivo vigente segun static/manifiesto.json, o None si no se ha generado."""
+    if nombre_logico not in _MANIFIESTO_ESTATICOS:
+        app.logger.warning(aviso)
+        return None
+    return f"{app.static_url_path}/{_MANIFIESTO_ESTATICOS[nombre_logico]}"
+
+URL_ESTILOS = url_estatico('css/estilos.css', "Sin hoja de estilos: se usara el CDN de Tailwind (python construir_css.py)")
+URL_FORMULAS_JS = url_estatico('js/formulas.js', "Sin formulas.js: sin recalculo en el navegador (python generar_js.py)")
+
+@app.after_request
+def cache_inmutable(respuesta):
+    # Los estaticos tienen nombre con hash: el navegador no necesita revalidarlos
+    if request.endpoint == 'static' and respuesta.status_code == 200:
+        respuesta.cache_control.immutable = True
+        respuesta.cache_control.public = True
+    return respuesta
+
+# --- Funcion para cargar el Excel ---
+def cargar_datos_excel():
+    """
+    Carga las hojas HOJAS_PANEL del archivo de Excel usando pandas.
+    El libro se parsea una sola vez y se guarda en una cache binaria junto al archivo
+    (ver cache_excel.py); las siguientes cargas, en este u otros workers, leen la cache.
+    """
+    global datos_hojas, error_lectura
+    try:
+        datos_hojas = leer_hojas_con_cache(EXCEL_FILE_PATH, HOJAS_PANEL)
+        error_lectura = None
+        return True
+    except FileNotFoundError:
+        error_lectura = f"ERROR: El archivo '{EXCEL_FILE_PATH}' no se encontro en la carpeta."
+        return False
+    except ValueError as ve:
+        error_lectura = f"ERROR al leer el archivo Excel: {ve}"
+        return False
+    except Exception as e:
+        error_lectura = f"ERROR al leer el archivo Excel: {e}"
+        return False
+
+def obtener_datos_hojas():
+    """Hojas del Excel cargadas de forma perezosa en el primer uso."""
+    if not datos_hojas and error_lectura is None:
+        cargar_datos_excel()
+    return datos_hojas
+
+def estado_excel():
+    """
+    Mensaje de error de lectura del libro para la pagina (None si se puede leer). Si la cache binaria
+    esta vigente el libro se sabe legible sin deserializar las hojas (ni importar pandas); si no,
+    se cargan con obtener_datos_hojas() para conocer el error.
+    """
+    if not datos_hojas and error_lectura is None and not hojas_en_cache(EXCEL_FILE_PATH, HOJAS_PANEL):
+        obtener_datos_hojas()
+    return error_lectura
+
+# Con FORMULAS_DESDE_EXCEL=1 las formulas que existen en el libro se compilan desde datos.xlsx
+# (ver formulas_excel.py) y sustituyen a las escritas a mano en grafo_formulas, salvo las de
+# formulas_excel.ESCRITOS_A_MANO; las diferencias con el ejemplo del libro van al log. El motor
+# vectorizado usa los mismos nodos (las formulas del libro, que no se traducen, fila a fila).
+if os.environ.get('FORMULAS_DESDE_EXCEL') == '1':
+    usar_formulas_del_libro(EXCEL_FILE_PATH, HOJAS_PANEL)
+
+# Nota: ya no se carga el Excel al importar el modulo. Se lee (desde la cache binaria) en el primer
+# obtener_datos_hojas(); con gunicorn lo hace preparar_arranque() en el maestro, antes del fork.
+
+# Definicion del template HTML (Mantenido sin cambios para no romper la interfaz)
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>ICU-CRIPTOS | Monitoreo UCI</title>
+    {% if not URL_ESTILOS %}<script src="https://cdn.tailwindcss.com"></script>{% endif %}
+    <style>
+        @media print {
+            body * { visibility: hidden !important; }
+            #print-area, #print-area * { visibility: visible !important; }
+            #print-area { 
+                position: absolute; left: 0; top: 0; 
+                padding: 10px; 
+                margin: 0;
+                font-size: 8pt; 
+            }
+            .print-hidden { display: none !important; }
+            .bg-panel::before { content: none !important; } 
+            .bg-panel { background-image: none !important; background-color: #ffffff !important; box-shadow: none !important; border: none !important;}
+        }
+        
+        /* --- ESTILOS DE FONDO Y TRANSPARENCIA (SOLICITADOS POR EL USUARIO) --- */
+        body { 
+            font-family: 'Inter', sans-serif; 
+            background-color: #f8fafc;
+            /* IMAGEN DE FONDO PROPORCIONADA POR EL USUARIO (Imgur) */
+            background-image: url('https://i.imgur.com/7zQ8s18.jpeg');
+            background-size: cover; 
+            background-position: center; /* Centrado */
+            background-attachment: fixed;
+        }
+        /* Tarjeta principal con 50% de transparencia */
+        .main-app-card {
+             background-color: rgba(255, 255, 255, 0.5); /* Alpha 0.5 para 50% de transparencia */
+             backdrop-filter: blur(5px);
+        }
+        
+        .subtitle-italic { font-style: italic; }
+        .input-base { transition: background-color 0.2s; border-radius: 0.5rem; font-size: 0.875rem; }
+        .text-base { font-size: 0.875rem; }
+        .text-xl { font-size: 1.125rem; }
+        .text-2xl { font-size: 1.5rem; }
+        .text-4xl { font-size: 2.25rem; }
+
+        /* Estilos para Fondos y Superposiciones */
+        .bg-panel {
+            background-size: cover; background-position: center; position: relative; overflow: hidden;
+            border: 1px solid rgba(255, 255, 255, 0.2);
+        }
+        .bg-panel::before {
+            content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0;
+            background-color: rgba(255, 255, 255, 0.9);
+            backdrop-filter: blur(1px); z-index: 1;
+        }
+        .bg-panel > * { position: relative; z-index: 10; }
+        
+        /* ESTILO DEL SEPARADOR / TÍTULO DE SECCIÓN */
+        .result-separator { 
+            color: #4338ca; /* Indigo 700 */
+            font-size: 1.1rem; /* Un poco más grande */
+            font-weight: 800; 
+            margin-top: 15px; margin-bottom: 8px;
+            padding-bottom: 4px; border-bottom: 2px solid #a5b4fc; 
+            text-transform: uppercase;
+        }
+
+        /* VALORES FUERA DE RANGO (reglas de alertas.py) */
+        span[data-alerta="aviso"] { color: #a16207; /* Yellow 700 */ }
+        span[data-alerta="critica"] { color: #b91c1c; /* Red 700 */ }
+        [data-alerta="critica"]::before { content: '▲ '; /* triangulo: no depende solo del color */ }
+    </style>
+    {% if URL_ESTILOS %}<link rel="stylesheet" href="{{ URL_ESTILOS }}">{% endif %}
+    {% if URL_FORMULAS_JS %}<script src="{{ URL_FORMULAS_JS }}" defer></script>{% endif %}
+</head>
+<body class="p-4 md:p-8">
+    <div class="max-w-4xl mx-auto rounded-2xl shadow-xl p-6 md:p-10 main-app-card">
+        
+        <h1 class="text-4xl font-extrabold text-center text-indigo-700 mb-1 print-hidden">
+            Monitoreo UCI
+        </h1>
+        <p class="text-center text-gray-700 mb-2 text-xl subtitle-italic leading-tight print-hidden">
+            ICU–CRIPTOS| Hemodynamic, Respiratory & Neurocritical Intelligence<br>
+            <span class="text-gray-500 text-base">Monitoreo del paciente critico, en la palma de mi mano</span>
+        </p>
+
+        <!-- FRASE DE AUTOR MOVIDA AQUÍ -->
+        <p class="text-center text-sm text-gray-600 mb-6 font-semibold print-hidden">
+            Elaborada por X. Real, P. Olivos y O. Bolaños | Agradecimiento especial a G. Maldonado por su colaboración
+        </p>
+        
+        {% if error_lectura %}
+            <div class="p-4 mb-6 bg-red-100 border border-red-400 text-red-700 rounded-lg text-base print-hidden">
+                <p class="font-bold">Error de Carga:</p>
+                <p>{{ error_lectura }}</p>
+            </div>
+        {% else %}
+            <form method="POST" action="/" class="p-6 border border-gray-200 rounded-xl shadow-inner bg-gray-50 mb-8 space-y-6 print-hidden" id="data-form">
+                
+                <!-- 0. Identificacion del paciente (opcional: guarda la serie temporal de la cama) -->
+                <div class="grid md:grid-cols-4 gap-4 text-base">
+                    <div>
+                        <label for="id_paciente" class="block text-sm font-medium text-gray-700">Cama / ID Paciente</label>
+                        <input type="text" id="id_paciente" name="id_paciente" value="{{ id_paciente or '' }}" maxlength="64"
+                               placeholder="Opcional: guarda tendencias"
+                               class="mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
+                    </div>
+                </div>
+                
+                <!-- 1. Datos Antropometricos -->
+                <div class="grid md:grid-cols-4 gap-4 text-base">
+                    <div class="md:col-span-4">
+                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Datos Antropometricos</h2>
+                    </div>
+                    {% for label, name, placeholder, type, options in campos_de_grupo('antropometricos') %}
+                    <div>
+                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                        {% if type == 'select' %}
+                        <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm focus:ring-indigo-500 focus:border-indigo-500 bg-white">
+                            <option value="">Selecciona</option>
+                            {% for value, text in options %}
+                            <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
+                            {% endfor %}
+                        </select>
+                        {% else %}
+                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                               placeholder="{{ placeholder }}" 
+                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm focus:ring-indigo-500 focus:border-indigo-500 bg-white" 
+                               oninput="updateBackground(this)">
+                        {% endif %}
+                    </div>
+                    {% endfor %}
+                </div>
+                
+                <!-- 2. Signos Vitales -->
+                <div class="grid md:grid-cols-4 gap-4 text-base">
+                    <div class="md:col-span-4">
+                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Signos Vitales</h2>
+                    </div>
+                    {% for label, name, placeholder, type, options in campos_de_grupo('signos_vitales') %}
+                    <div>
+                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                               placeholder="{{ placeholder }}" 
+                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
+                               oninput="updateBackground(this)">
+                    </div>
+                    {% endfor %}
+                </div>
+                
+                <!-- 3. Gasometria Arterial y Venosa -->
+                <div class="grid grid-cols-1 md:grid-cols-2 gap-6">
+                    <!-- Gasometria Arterial -->
+                    <div class="bg-gray-100 p-4 rounded-lg">
+                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Gasometria Arterial 🩸</h2>
+                        <div class="grid grid-cols-2 gap-4 text-sm">
+                            {% for label, name, placeholder, type, options in campos_de_grupo('gasometria_arterial') %}
+                            <div>
+                                <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                                <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                       placeholder="{{ placeholder }}" 
+                                       class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
+                                       oninput="updateBackground(this)">
+                            </div>
+                            {% endfor %}
+                        </div>
+                    </div>
+                    
+                    <!-- Gasometria Venosa -->
+                    <div class="bg-gray-100 p-4 rounded-lg">
+                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Gasometria Venosa 🔵</h2>
+                        <div class="grid grid-cols-2 gap-4 text-sm">
+                            {% for label, name, placeholder, type, options in campos_de_grupo('gasometria_venosa') %}
+                            <div>
+                                <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                                <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                       placeholder="{{ placeholder }}" 
+                                       class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm" 
+                                       oninput="updateBackground(this)">
+                            </div>
+                            {% endfor %}
+                        </div>
+                    </div>
+                </div>
+
+                <!-- 4. Macrodinamia (POCUS) -->
+                <div class="grid grid-cols-5 gap-4 text-sm bg-gray-50 p-4 rounded-lg shadow-inner">
+                    <div class="col-span-5">
+                        <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">POCUS (Macrodinamia) 🩺</h2>
+                    </div>
+                    {% for label, name, placeholder, type, options in campos_de_grupo('macrodinamia') %}
+                    <div>
+                        <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                        {% if type == 'select' %}
+                        <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
+                            <option value="">{{ placeholder }}</option>
+                            {% for value, text in options %}
+                            <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
+                            {% endfor %}
+                        </select>
+                        {% else %}
+                        <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                               placeholder="{{ placeholder }}" 
+                               class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
+                               oninput="updateBackground(this)">
+                        {% endif %}
+                    </div>
+                    {% endfor %}
+                </div>
+
+                <!-- 5. Hemodinamia (VI/VD) -->
+                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
+                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Hemodinamia (ECHO Av.)</h2>
+                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
+                        <!-- VI -->
+                        {% for label, name, placeholder, type, options in campos_de_grupo('hemodinamia_vi') %}
+                        <div>
+                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                   placeholder="{{ placeholder }}" 
+                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
+                                   oninput="updateBackground(this)">
+                        </div>
+                        {% endfor %}
+                        <!-- VD -->
+                        {% for label, name, placeholder, type, options in campos_de_grupo('hemodinamia_vd') %}
+                        <div>
+                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                   placeholder="{{ placeholder }}" 
+                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
+                                   oninput="updateBackground(this)">
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+
+                <!-- 6. Datos Ventilatorios -->
+                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
+                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Datos Ventilatorios 🌬️</h2>
+                    <div class="grid grid-cols-3 gap-4 text-sm">
+                        {% for label, name, placeholder, type, options in campos_de_grupo('ventilatorio') %}
+                        <div>
+                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                            {% if type == 'select' %}
+                            <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
+                                <option value="">Selecciona</option>
+                                {% for value, text in options %}
+                                <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
+                                {% endfor %}
+                            </select>
+                            {% else %}
+                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                   placeholder="{{ placeholder }}" 
+                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
+                                   oninput="updateBackground(this)">
+                            {% endif %}
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+
+                <!-- 7. Monitorizacion Neurocritica -->
+                <div class="bg-gray-50 p-4 rounded-lg shadow-inner">
+                    <h2 class="text-xl font-semibold text-gray-700 mb-4 border-b pb-2">Monitorizacion Neurocritica 🧠</h2>
+                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 text-sm">
+                        {% for label, name, placeholder, type, options in campos_de_grupo('neurocritico') %}
+                        <div>
+                            <label for="{{ name }}" class="block text-sm font-medium text-gray-700">{{ label }}</label>
+                            {% if type == 'select' %}
+                            <select name="{{ name }}" id="{{ name }}" onchange="updateBackground(this)" class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white">
+                                <option value="">{{ placeholder }}</option>
+                                {% for value, text in options %}
+                                <option value="{{ value }}" {% if inputs.get(name) == value %}selected{% endif %}>{{ text }}</option>
+                                {% endfor %}
+                            </select>
+                            {% else %}
+                            <input type="number" step="any" id="{{ name }}" name="{{ name }}" value="{{ inputs.get(name) or '' }}" 
+                                   placeholder="{{ placeholder }}" 
+                                   class="input-base mt-1 block w-full px-3 py-2 border border-gray-300 shadow-sm bg-white" 
+                                   oninput="updateBackground(this)">
+                            {% endif %}
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+                
+                <!-- BOTONES DE ACCION -->
+                <div class="flex justify-center mt-6 space-x-4">
+                    <button type="submit" name="action" value="calculate"
+                            class="bg-indigo-600 hover:bg-indigo-700 text-white font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
+                        Mostrar Resultados
+                    </button>
+                    <button type="button" onclick="clearForm()"
+                            class="bg-yellow-300 hover:bg-yellow-400 text-gray-800 font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
+                        Limpiar
+                    </button>
+                </div>
+            </form>
+
+            <!-- 3. SECCION DE RESULTADOS -->
+            <div id="resultados">
+{% include 'resultados.html' %}
+            </div>
+        {% endif %}
+    </div>
+    
+    <!-- FOOTER SOLICITADO (OCULTADO para mover el contenido) -->
+    <footer class="text-center text-sm text-gray-500 mt-8 pb-4 print-hidden hidden">
+        Elaborada por X. Real, P. Olivos y O. Bolaños
+    </footer>
+
+    <script>
+        function updateBackground(element) {
+            const isSelect = element.tagName === 'SELECT';
+            let value = element.value.trim();
+            element.classList.remove('bg-white', 'bg-green-100', 'bg-red-100');
+            if (isSelect) {
+                if (value !== '' && value !== 'Selecciona' && value !== 'Selecciona Colapso' && value !== 'Selecciona Modo' && value !== 'Selecciona Vaso' && value !== 'Selecciona Arteria') {
+                    element.classList.add('bg-green-100');
+                } else {
+                    element.classList.add('bg-white');
+                }
+            } else {
+                value = value.replace(',', '.');
+                const isNumeric = !isNaN(parseFloat(value)) && isFinite(value);
+                if (value === '') {
+                    element.classList.add('bg-white');
+                } else if (isNumeric) {
+                    element.classList.add('bg-green-100');
+                } else {
+                    element.classList.add('bg-red-100');
+                }
+            }
+        }
+        document.addEventListener('DOMContentLoaded', () => {
+            document.querySelectorAll('.input-base').forEach(updateBackground);
+        });
+        // "Mostrar Resultados" pide solo la seccion de resultados y la reemplaza en su sitio;
+        // sin fetch o ante un error se hace el envio normal de la pagina completa.
+        document.getElementById('data-form')?.addEventListener('submit', async (evento) => {
+            const formulario = evento.target;
+            const boton = evento.submitter;
+            if (!window.fetch || !boton || boton.value !== 'calculate' || formulario.dataset.completo) return;
+            evento.preventDefault();
+            const datos = new URLSearchParams(new FormData(formulario));
+            datos.append('action', 'calculate');
+            try {
+                const respuesta = await fetch('/resultados', {method: 'POST', body: datos});
+                if (!respuesta.ok) throw new Error(respuesta.status);
+                document.getElementById('resultados').innerHTML = await respuesta.text();
+            } catch (error) {
+                formulario.dataset.completo = '1';
+                formulario.requestSubmit(boton);
+            }
+        });
+        // Con formulas.js (generar_js.py) las tarjetas ya mostradas se recalculan mientras se escribe.
+        // Los errores se dejan al servidor: se muestran al pulsar "Mostrar Resultados".
+        function escaparHTML(texto) {
+            return String(texto).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})[c]);
+        }
+        function recalcularEnVivo() {
+            const rejilla = document.querySelector('#print-area > .grid');
+            if (!window.FormulasUCI || !rejilla) return;
+            const calculo = FormulasUCI.calcular(Object.fromEntries(new FormData(document.getElementById('data-form'))));
+            if (!calculo || calculo.error) return;
+            const estilos = {};
+            rejilla.querySelectorAll(':scope > div').forEach(tarjeta => {
+                estilos[tarjeta.querySelector('h3')?.textContent] = tarjeta.getAttribute('style') || '';
+            });
+            let html = '';
+            for (const [panel, filas] of Object.entries(calculo.paneles)) {
+                const claves = Object.keys(filas);
+                const alertas = calculo.alertas[panel] || {};
+                if (!claves.length) continue;
+                html += `<div class="bg-panel rounded-xl shadow-md p-5 transition duration-200 hover:shadow-lg" style="${escaparHTML(estilos[panel] || '')}">`
+                      + `<h3 class="text-xl font-bold mb-3 text-indigo-700">${escaparHTML(panel)}</h3><div class="text-sm space-y-1">`;
+                for (const clave of claves) {
+                    const separador = /^-- (.*) --$/.exec(clave);
+                    html += separador
+                        ? `<div class="result-separator">${escaparHTML(separador[1])}</div>`
+                        : `<div class="flex justify-between items-start py-1 border-b border-gray-200 last:border-b-0">`
+                          + `<span class="text-gray-600 font-medium w-1/2 pr-2">${escaparHTML(clave)}:</span>`
+                          + `<span class="text-gray-900 font-bold w-1/2 text-right"${alertas[clave] ? ` data-alerta="${alertas[clave]}"` : ''}>`
+                          + `${escaparHTML(filas[clave])}</span></div>`;
+                }
+                html += '</div></div>';
+            }
+            rejilla.innerHTML = html;
+        }
+        document.getElementById('data-form')?.addEventListener('input', recalcularEnVivo);
+        function clearForm() {
+            document.querySelectorAll('#data-form input, #data-form select').forEach(element => {
+                if (element.id === 'id_paciente') return;  // se limpian las mediciones, no la cama
+                if (element.tagName === 'SELECT') {
+                    element.selectedIndex = 0; 
+                } else {
+                    element.value = '';
+                }
+                updateBackground(element);
+            });
+            document.getElementById('data-form').submit();
+        }
+    </script>
+</body>
+</html>
+"""
+
+# Seccion de resultados (tarjetas de paneles, tendencias y abreviaturas). HTML_TEMPLATE la incluye
+# dentro de <div id="resultados"> y POST /resultados la devuelve sola para actualizarla en su sitio.
+RESULTADOS_TEMPLATE = """
+            {% if resultados is not none and not error_calculo and show_results %}
+                <div class="mt-8" id="print-area">
+                    <h2 class="text-2xl font-bold text-gray-800 mb-4 print-hidden">Resultados por Seccion</h2>
+                    <div class="flex justify-between text-sm text-gray-500 mb-4">
+                        <span>Fecha y Hora: {{ now }}</span>
+                    </div>
+
+                    <div class="grid md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
+                        
+                        {% for panel in resultados %}
+                            {% set bg_img = BACKGROUND_IMAGES.get(panel.nombre, '') %}
+                            {% if panel.filas %}
+                                <div class="bg-panel rounded-xl shadow-md p-5 transition duration-200 hover:shadow-lg"
+                                     style="{% if bg_img %}background-image: url('{{ bg_img }}');{% endif %}">
+                                    <h3 class="text-xl font-bold mb-3 text-indigo-700">{{ panel.nombre }}</h3>
+                                    
+                                    <div class="text-sm space-y-1">
+                                        {% for fila in panel.filas %}
+                                            {% if fila.es_separador %}
+                                                <div class="result-separator">
+                                                    {{ fila.titulo }}
+                                                </div>
+                                            {% else %}
+                                                <div class="flex justify-between items-start py-1 border-b border-gray-200 last:border-b-0">
+                                                    <span class="text-gray-600 font-medium w-1/2 pr-2">{{ fila.etiqueta }}:</span>
+                                                    <span class="text-gray-900 font-bold w-1/2 text-right"{% if fila.alerta %} data-alerta="{{ fila.alerta }}"{% endif %}>{{ fila.valor | safe }}</span>
+                                                </div>
+                                            {% endif %}
+                                        {% endfor %}
+                                    </div>
+                                </div>
+                            {% endif %}
+                        {% endfor %}
+                    </div>
+                    
+                    {% if tendencias %}
+                        <!-- Tendencias del paciente (serie temporal de las ultimas horas) -->
+                        <div class="mt-8 p-5 bg-white border border-gray-200 rounded-lg shadow-inner text-base">
+                            <h4 class="text-lg font-semibold text-gray-800 mb-3">Tendencias {{ id_paciente }} (ultimas {{ horas_tendencia }} h)</h4>
+                            <div class="grid sm:grid-cols-2 lg:grid-cols-3 gap-4 text-sm text-gray-700">
+                                {% for t in tendencias %}
+                                <div>
+                                    <div class="flex justify-between"><span class="font-bold">{{ t.etiqueta }}</span><span>{{ t.ultimo }}</span></div>
+                                    <svg viewBox="0 0 100 24" preserveAspectRatio="none" class="w-full h-8">
+                                        <polyline points="{{ t.puntos }}" fill="none" stroke="#4f46e5" stroke-width="1.5" vector-effect="non-scaling-stroke"/>
+                                    </svg>
+                                    <div class="flex justify-between text-xs text-gray-500"><span>min {{ t.minimo }}</span><span>n={{ t.n }}</span><span>max {{ t.maximo }}</span></div>
+                                </div>
+                                {% endfor %}
+                            </div>
+                        </div>
+                    {% endif %}
+                    
+                    <!-- Cuadro de Abreviaturas Ventilatorias -->
+                    {% if 'Ventilatorio' in resultados %}
+                        <div class="mt-8 p-5 bg-blue-50 border-l-4 border-blue-400 rounded-lg shadow-inner text-base">
+                            <h4 class="text-lg font-semibold text-blue-800 mb-3">Abreviaturas Ventilatorias</h4>
+                            <div class="grid grid-cols-2 sm:grid-cols-3 gap-2 text-sm text-gray-700">
+                                <div><span class="font-bold">EM:</span> Espacio Muerto</div>
+                                <div><span class="font-bold">EV:</span> Eficiencia Ventilatoria</div>
+                                <div><span class="font-bold">Shunt:</span> Cortocircuito Intrapulmonar</div>
+                                <div><span class="font-bold">PpMt:</span> Presion transpulmonar muscular</div>
+                                <div><span class="font-bold">PM:</span> Poder Mecanico</div>
+                                <div><span class="font-bold">Raw:</span> Resistencia de Via Aerea</div>
+                            </div>
+                        </div>
+                    {% endif %}
+                </div>
+                
+                <div class="flex justify-center mt-8 print-hidden">
+                    <button onclick="window.print()" type="button"
+                            class="bg-green-600 hover:bg-green-700 text-white font-bold py-2 px-6 rounded-lg shadow-lg transition duration-150 ease-in-out">
+                        Imprimir Resultados
+                    </button>
+                </div>
+                
+            {% elif error_calculo and show_results %}
+                <div class="mt-8 p-4 bg-red-100 border border-red-400 text-red-700 rounded-lg text-base print-hidden" role="alert">
+                    <p class="font-bold">Error en el Calculo de Formulas</p>
+                    <p class="sm">
+                        {{ error_calculo }}
+                        <br>
+                        <span class="font-semibold text-xs text-red-600 block mt-1">
+                            Asegurese de que todos los campos relevantes para el calculo tengan un valor numerico valido.
+                        </span>
+                    </p>
+                </div>
+            {% endif %}
+"""
+app.jinja_env.loader = ChoiceLoader([app.jinja_env.loader, DictLoader({'resultados.html': RESULTADOS_TEMPLATE})])
+
+# Plantilla compilada una sola vez por proceso (worker de gunicorn).
+# render_template_string() vuelve a parsear y compilar las ~500 lineas del
+# template en cada peticion; aqui se guarda el objeto Template ya compilado.
+# Los bucles del formulario de HTML_TEMPLATE leen los campos de esquema_entradas.CAMPOS
+app.jinja_env.globals['campos_de_grupo'] = campos_de_grupo
+app.jinja_env.globals['URL_ESTILOS'] = URL_ESTILOS
+app.jinja_env.globals['URL_FORMULAS_JS'] = URL_FORMULAS_JS
+
+_plantilla_compilada = None
+
+def obtener_plantilla():
+    """Devuelve el HTML_TEMPLATE compilado, compilandolo solo en el primer uso."""
+    global _plantilla_compilada
+    if _plantilla_compilada is None:
+        _plantilla_compilada = app.jinja_env.from_string(HTML_TEMPLATE)
+    return _plantilla_compilada
+
+# --- Pagina inicial prerenderizada ---
+# Un GET a '/' siempre produce el mismo formulario vacio (la fecha solo aparece con resultados):
+# se renderiza una vez por proceso, se guarda comprimida y se sirve con un ETag fuerte.
+_pagina_inicial = None
+
+def obtener_pagina_inicial():
+    """(cuerpo, {codificacion: bytes}, etag) del formulario vacio; se rehace si cambia error_lectura."""
+    global _pagina_inicial
+    error = estado_excel()
+    if _pagina_inicial is None or _pagina_inicial[0] != error:
+        cuerpo = render_template(
+            obtener_plantilla(),
+            error_lectura=error,
+            resultados=None,
+            error_calculo=None,
+            inputs=VALORES_INICIALES,
+            show_results=False,
+            now='',
+            BACKGROUND_IMAGES=BACKGROUND_IMAGES,
+        ).encode('utf-8')
+        comprimidos = {'gzip': gzip.compress(cuerpo, 9, mtime=0)}
+        if brotli is not None:
+            comprimidos['br'] = brotli.compress(cuerpo)
+        etag = hashlib.sha256(cuerpo).hexdigest()[:32]
+        _pagina_inicial = (error, cuerpo, comprimidos, etag)
+    return _pagina_inicial[1:]
+
+def responder_pagina_inicial():
+    """GET '/': 304 si el navegador ya la tiene; si no, la version comprimida que acepte."""
+    cuerpo, comprimidos, etag = obtener_pagina_inicial()
+    if etag in request.if_none_match:
+        respuesta = app.response_class(status=304)
+    else:
+        codificacion = next((c for c in ('br', 'gzip') if c in comprimidos and c in request.accept_encodings), None)
+        respuesta = app.response_class(comprimidos[codificacion] if codificacion else cuerpo, mimetype='text/html')
+        if codificacion:
+            respuesta.content_encoding = codificacion
+    respuesta.set_etag(etag)
+    respuesta.vary.add('Accept-Encoding')
+    # El navegador puede guardarla pero debe revalidar: tras un despliegue el ETag cambia
+    respuesta.cache_control.no_cache = True
+    return respuesta
+
+# --- Preparacion del arranque ---
+# Con gunicorn (preload_app, ver gunicorn.conf.py) corre una sola vez en el proceso maestro antes
+# del fork: los workers heredan las plantillas compiladas, la pagina inicial y el plan de formulas
+# y comparten esa memoria copy-on-write en vez de construirlos en su primera peticion.
+def preparar_arranque():
+    """Deja listo todo lo que la primera peticion construiria de forma perezosa."""
+    # Hojas del libro desde la cache binaria: con preload_app se leen una vez en el maestro y los
+    # workers las comparten en solo lectura (copy-on-write; gc.freeze() evita que el recolector las toque)
+    obtener_datos_hojas()
+    compilar_plan(plan_de_paneles(tuple(PANELES)))
+    compilar_reglas(REGLAS)
+    compilar_reglas(REGLAS, 'numpy')
+    with app.app_context():
+        app.jinja_env.get_template('resultados.html')
+        obtener_pagina_inicial()
+
+# --- Estructura de resultados ---
+@dataclass(slots=True)
+class Separador:
+    """Titulo de seccion dentro de un panel (las claves '-- ... --' del Excel)."""
+    titulo: str
+    es_separador = True
+
+
+@dataclass(slots=True)
+class Valor:
+    """
+    Fila de un panel: el valor calculado tal cual (float, texto de un <select>...) y su Salida.
+    El texto con unidades se genera la primera vez que alguien lo pide (el template o a_dict()).
+    'alerta' es el nivel de la regla mas grave que usa el nodo de la fila (None = sin alerta).
+    """
+    etiqueta: str
+    numero: object
+    salida: Salida
+    alerta: str = None
+    _texto: str = None
+    es_separador = False
+
+    @property
+    def valor(self):
+        if self._texto is None:
+            formato = self.salida.formato
+            self._texto = self.numero if formato is None else formato(self.numero)
+        return self._texto
+
+    @property
+    def unidad(self):
+        return self.salida.unidad
+
+    @property
+    def decimales(self):
+        return self.salida.decimales
+
+
+def _numero_json(valor):
+    """Valor calculado apto para JSON: no finitos -> None, complejos como texto."""
+    if isinstance(valor, complex):
+        return str(valor)
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
+
+
+@dataclass
+class PanelResultado:
+    nombre: str
+    filas: list = field(default_factory=list)
+
+
+class Resultados:
+    """Paneles de resultados en orden, entregados tal cual al template."""
+
+    def __init__(self):
+        self.paneles = []
+        self.alertas = []  # Reglas de alerta que cumple el paciente (alertas.py)
+
+    def agregar_panel(self, nombre):
+        """Agrega un panel vacio al final y lo devuelve."""
+        panel = PanelResultado(nombre)
+        self.paneles.append(panel)
+        return panel
+
+    def __iter__(self):
+        return iter(self.paneles)
+
+    def __contains__(self, nombre):
+        return any(panel.nombre == nombre for panel in self.paneles)
+
+    def a_dict(self, numeros=False):
+        """
+        Formato anidado {panel: {etiqueta: valor}}; los separadores se emiten como '-- titulo --'.
+        Con 'numeros' cada fila lleva el valor calculado (sin formato ni unidades) y se omiten los separadores.
+        """
+        salida = {}
+        for panel in self.paneles:
+            filas = {}
+            for fila in panel.filas:
+                if fila.es_separador:
+                    if not numeros:
+                        filas[f"-- {fila.titulo} --"] = " "
+                elif numeros:
+                    filas[fila.etiqueta] = _numero_json(fila.numero)
+                else:
+                    filas[fila.etiqueta] = fila.valor
+            salida[panel.nombre] = filas
+        return salida
+
+    def alertas_por_fila(self):
+        """{panel: {etiqueta: nivel}} de las filas resaltadas por alguna alerta."""
+        salida = {}
+        for panel in self.paneles:
+            filas = {fila.etiqueta: fila.alerta for fila in panel.filas if not fila.es_separador and fila.alerta}
+            if filas:
+                salida[panel.nombre] = filas
+        return salida
+
+    def a_json(self):
+        """Serializa a JSON solo cuando un cliente lo pide."""
+        return json.dumps(self.a_dict())
+
+
+# 4. --- Logica de Replicacion de Formulas ---
+# Tambien lo usa formulas.js (generar_js.py) para mostrar el mismo error en el navegador
+MENSAJE_DIVISION_CERO = "Error de Division por Cero. Revisa los campos que resultan en un cero en el denominador (e.g., PaCO₂, CI, VFD, VM, VTI Pulmonar, POCC, etc.)."
+
+def replicar_formulas(user_inputs, paneles=None, contexto=None):
+    """
+    Funcion que replica la logica de las formulas de Excel.
+    Recibe la entrada dinamica del usuario y, opcionalmente, la lista de paneles a calcular
+    (por defecto todos). Solo se evaluan los nodos del grafo que esos paneles necesitan.
+    Si se pasa un contexto (Evaluador de un envio anterior) solo se recalcula lo que
+    depende de los campos modificados.
+    """
+    resultados = Resultados()
+    registro = como_registro(user_inputs)
+
+    try:
+        if contexto is None:
+            evaluador = Evaluador(registro)
+        else:
+            evaluador = contexto
+            evaluador.actualizar(registro)
+        paneles = tuple(paneles or PANELES)
+        with metricas.TIEMPO_ETAPA['evaluacion'].time():
+            evaluador.evaluar(plan_de_paneles(paneles))
+        valores = evaluador.valores
+
+        # Verificar si hay suficientes datos base para iniciar
+        if not (valores.get('peso_kg') and valores.get('talla_m')):
+             # Si no hay peso y talla, no se pueden calcular SCT/PI, pero se puede intentar con otros.
+             # Solo retornar si no hay NINGÚN dato de entrada para evitar un mensaje de error vacío.
+             if not registro.hay_datos:
+                 return resultados, None
+
+        resultados.alertas = reglas_activas(valores)
+        niveles = niveles_por_nodo(resultados.alertas)
+        for nombre in paneles:
+            filas = resultados.agregar_panel(nombre).filas
+            for fila in PANELES[nombre]:
+                if isinstance(fila, Seccion):
+                    filas.append(Separador(fila.titulo))
+                elif fila.se_muestra(valores[fila.nodo]):
+                    filas.append(Valor(fila.etiqueta, valores[fila.nodo], fila, niveles.get(fila.nodo)))
+
+        return resultados, None
+
+    except ZeroDivisionError:
+        metricas.ERROR_DIVISION_CERO.inc()
+        return None, MENSAJE_DIVISION_CERO
+    except Exception as e:
+        # Esto capturará cualquier error inesperado en la función y lo mostrará al usuario.
+        metricas.ERROR_GENERICO.inc()
+        return None, f"Error inesperado durante el calculo: {e.__class__.__name__}: {e}"
+        
+# --- Cache LRU de resultados ---
+# Recargas, el boton Limpiar o varios medicos mirando al mismo paciente reenvian las mismas
+# entradas. La clave son las entradas ya normalizadas del RegistroPaciente ('7,35' y '7.35'
+# son la misma entrada), de modo que el mismo paciente escrito de dos formas comparte resultado.
+MAX_RESULTADOS_CACHE = 1024
+TTL_RESULTADOS_CACHE = 300  # segundos
+
+class CacheResultados:
+    """Cache LRU con limite de tamano y caducidad (TTL) y contadores de aciertos/fallos."""
+
+    def __init__(self, max_entradas=MAX_RESULTADOS_CACHE, ttl=TTL_RESULTADOS_CACHE):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+
+    def obtener(self, clave):
+        """Valor cacheado o None. Una entrada caducada se descarta y cuenta como fallo."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                caduca, valor = entrada
+                if caduca > time.monotonic():
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                del self._entradas[clave]
+                self.expirados += 1
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = self.fallos = self.expirados = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expirados': self.expirados,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'ttl_segundos': self.ttl,
+            }
+
+cache_resultados = CacheResultados()
+
+def clave_entradas(registro, paneles=None):
+    """
+    Tupla canonica de las entradas del registro mas los paneles.
+    Incluye si llego algun dato, que decide el resultado vacio de replicar_formulas().
+    """
+    return (tuple(paneles or PANELES), registro.clave(), registro.hay_datos)
+
+def replicar_formulas_con_cache(user_inputs, paneles=None, contexto=None):
+    """
+    replicar_formulas() detras de la cache LRU. Los Resultados cacheados se comparten entre
+    peticiones y no deben modificarse. Con un contexto de sesion, un acierto solo sincroniza
+    sus entradas (invalidando lo que cambio) sin recalcular nada.
+    """
+    registro = como_registro(user_inputs)
+    clave = clave_entradas(registro, paneles)
+    calculado = cache_resultados.obtener(clave)
+    if calculado is not None:
+        if contexto is not None:
+            contexto.actualizar(registro)
+            contexto.reevaluados = 0
+        return calculado
+    calculado = replicar_formulas(registro, paneles=paneles, contexto=contexto)
+    cache_resultados.guardar(clave, calculado)
+    return calculado
+
+# --- Contextos de evaluacion por sesion (recalculo incremental) ---
+# Cada navegador conserva en una cookie el id de su contexto; el worker guarda el
+# Evaluador del ultimo envio para recalcular solo lo afectado por los campos modificados.
+COOKIE_CONTEXTO = 'icu_ctx'
+MAX_CONTEXTOS = 512
+_contextos = OrderedDict()
+_contextos_lock = threading.Lock()
+
+def tomar_contexto(id_contexto, registro):
+    """Saca el contexto de la sesion (o crea uno nuevo) para usarlo en exclusiva durante la peticion."""
+    with _contextos_lock:
+        contexto = _contextos.pop(id_contexto, None)
+    return contexto if contexto is not None else Evaluador(registro)
+
+def devolver_contexto(id_contexto, contexto):
+    """Guarda el contexto para el siguiente envio, descartando los mas antiguos si se supera el limite."""
+    with _contextos_lock:
+        _contextos[id_contexto] = contexto
+        while len(_contextos) > MAX_CONTEXTOS:
+            _contextos.popitem(last=False)
+
+# 5. Ruta principal de Flask
+@app.route('/', methods=['GET', 'POST'])
+def inicio():
+    """Maneja las solicitudes GET (mostrar formulario) y POST (calcular)."""
+    
+    if request.method == 'GET':
+        return responder_pagina_inicial()
+    
+    envio = procesar_envio(request.form)
+
+    # JSON solo si el cliente lo solicita explicitamente (Accept: application/json)
+    if request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json':
+        if envio.error_calculo:
+            respuesta = respuesta_json({'error': envio.error_calculo}, 422)
+        else:
+            respuesta = app.response_class(envio.resultados.a_json(), mimetype='application/json')
+        return _con_contexto(respuesta, envio.id_contexto, envio.contexto)
+
+    with metricas.TIEMPO_ETAPA['render'].time():
+        respuesta = make_response(render_template(obtener_plantilla(), **_variables_plantilla(envio)))
+    return _con_contexto(respuesta, envio.id_contexto, envio.contexto)
+
+@app.route('/resultados', methods=['POST'])
+def fragmento_resultados():
+    """
+    Mismo calculo que POST '/', pero devuelve solo la seccion de resultados (RESULTADOS_TEMPLATE):
+    la pagina la reemplaza dentro de #resultados sin volver a renderizar ni transferir el formulario.
+    """
+    envio = procesar_envio(request.form)
+    with metricas.TIEMPO_ETAPA['render'].time():
+        respuesta = make_response(render_template('resultados.html', **_variables_plantilla(envio)))
+    return _con_contexto(respuesta, envio.id_contexto, envio.contexto)
+
+@dataclass(slots=True)
+class Envio:
+    """Un envio del formulario ya calculado, listo para renderizar."""
+    registro: object
+    resultados: object
+    error_calculo: object
+    show_results: bool
+    id_paciente: object
+    tendencias: object
+    id_contexto: str
+    contexto: object
+
+def procesar_envio(formulario):
+    """Parseo, calculo (con contexto de sesion y cache), auditoria y serie temporal de un POST."""
+    # Una sola pasada sobre el formulario: los campos ausentes conservan su valor inicial
+    with metricas.TIEMPO_ETAPA['formulario'].time():
+        registro = parsear_formulario(formulario)
+    if app.logger.isEnabledFor(logging.DEBUG):
+        for aviso in registro.advertencias():
+            app.logger.debug("Entrada sospechosa: %s", aviso)
+    show_results = formulario.get('action') == 'calculate'
+
+    id_contexto = request.cookies.get(COOKIE_CONTEXTO) or secrets.token_hex(16)
+    contexto = tomar_contexto(id_contexto, registro)
+    resultados, error_calculo = replicar_formulas_con_cache(registro, contexto=contexto)
+    if error_calculo is None:
+        devolver_contexto(id_contexto, contexto)
+    app.logger.debug("Recalculo: %d nodos reevaluados", contexto.reevaluados)
+
+    id_paciente = leer_id_paciente(formulario)
+    tendencias = None
+    # Auditoria: solo se encola; el hilo de historial.py lo escribe por lotes en SQLite
+    historial.registrar(registro.crudos, resultados, error_calculo, id_paciente)
+    if id_paciente and show_results and error_calculo is None:
+        registrar_en_serie(id_paciente, contexto)
+        tendencias = almacen_series.tendencias(id_paciente)
+    return Envio(registro, resultados, error_calculo, show_results, id_paciente, tendencias, id_contexto, contexto)
+
+def _variables_plantilla(envio):
+    return dict(
+        error_lectura=estado_excel(),
+        resultados=envio.resultados,
+        error_calculo=envio.error_calculo,
+        inputs=envio.registro.crudos,
+        show_results=envio.show_results,
+        id_paciente=envio.id_paciente,
+        tendencias=envio.tendencias,
+        horas_tendencia=HORAS_TENDENCIA,
+        now=datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+        BACKGROUND_IMAGES=BACKGROUND_IMAGES,
+    )
+
+# --- Serie temporal por paciente ---
+MAX_LONGITUD_ID_PACIENTE = 64
+
+def leer_id_paciente(datos):
+    """Id de cama/paciente opcional del formulario o del JSON ('' o ausente -> None)."""
+    id_paciente = datos.get('id_paciente')
+    if not isinstance(id_paciente, str):
+        return None
+    return id_paciente.strip()[:MAX_LONGITUD_ID_PACIENTE] or None
+
+def registrar_en_serie(id_paciente, evaluador):
+    """
+    Anexa la instantanea del calculo a partir del Evaluador que lo hizo (sin recalcular lo ya
+    evaluado); un fallo de disco no debe impedir mostrar los resultados.
+    """
+    try:
+        almacen_series.registrar(id_paciente, evaluador)
+    except (OSError, ArithmeticError, TypeError, ValueError) as e:
+        app.logger.warning("No se pudo guardar la serie de %s: %s", id_paciente, e)
+
+def _con_contexto(respuesta, id_contexto, contexto):
+    """Adjunta la cookie del contexto y el numero de nodos reevaluados en este envio."""
+    respuesta.headers['X-Nodos-Reevaluados'] = str(contexto.reevaluados)
+    respuesta.set_cookie(COOKIE_CONTEXTO, id_contexto, httponly=True, samesite='Lax')
+    return respuesta
+
+# --- Metricas (Prometheus) ---
+@app.after_request
+def contar_peticion(respuesta):
+    ruta = request.url_rule.rule if request.url_rule is not None else 'desconocida'
+    metricas.PETICIONES.labels(request.method, ruta, str(respuesta.status_code)).inc()
+    return respuesta
+
+@app.route('/metrics', methods=['GET'])
+def exponer_metricas():
+    """Histogramas por etapa, errores de calculo y peticiones, en formato de texto de Prometheus."""
+    cuerpo, tipo = metricas.exponer()
+    return app.response_class(cuerpo, mimetype=None, content_type=tipo)
+
+# 6. --- API JSON (integracion con la historia clinica electronica) ---
+MAX_PACIENTES_LOTE = 5000
+
+def respuesta_json(datos, status=200):
+    """Respuesta JSON conservando el orden de paneles y filas (jsonify los ordenaria)."""
+    return app.response_class(json.dumps(datos), status=status, mimetype='application/json')
+
+def _paneles_solicitados():
+    """Lee ?paneles=Panel,Neurocritico; None = todos. Lanza ValueError si algun panel no existe."""
+    valor = request.args.get('paneles')
+    if not valor:
+        return None
+    paneles = [p.strip() for p in valor.split(',') if p.strip()]
+    desconocidos = [p for p in paneles if p not in PANELES]
+    if desconocidos:
+        raise ValueError(f"Paneles desconocidos: {', '.join(desconocidos)}")
+    return paneles
+
+def _numeros_solicitados():
+    """?numeros=1: valores calculados sin formato (7.35 en vez de "7.35 mmHg"); unidades en /api/paneles."""
+    return request.args.get('numeros', '').lower() in ('1', 'true', 'si')
+
+def _resultado_api(user_inputs, paneles, numeros=False):
+    """Paneles de un paciente del lote, o {'error': ...} sin interrumpir al resto del lote."""
+    resultados, error_calculo = replicar_formulas_con_cache(parsear_entradas(user_inputs), paneles=paneles)
+    if error_calculo:
+        return {'error': error_calculo}
+    return resultados.a_dict(numeros)
+
+@app.route('/api/paneles', methods=['GET'])
+def api_paneles():
+    """Filas de cada panel con su unidad y decimales, para interpretar las respuestas con ?numeros=1."""
+    return respuesta_json({
+        nombre: [{'etiqueta': fila.etiqueta, 'nodo': fila.nodo, 'unidad': fila.unidad, 'decimales': fila.decimales}
+                 for fila in filas if isinstance(fila, Salida)]
+        for nombre, filas in PANELES.items()
+    })
+
+@app.route('/api/calcular', methods=['POST'])
+def api_calcular():
+    """Calcula un paciente. Acepta JSON con los mismos campos que el formulario (o el formulario mismo)."""
+    try:
+        paneles = _paneles_solicitados()
+    except ValueError as ve:
+        return respuesta_json({'error': str(ve)}, 400)
+    user_inputs = request.get_json(silent=True) if request.is_json else request.form
+    if not hasattr(user_inputs, 'get'):
+        return respuesta_json({'error': "Se esperaba un objeto JSON con los campos del paciente."}, 400)
+    registro = parsear_entradas(user_inputs)
+    id_paciente = leer_id_paciente(user_inputs)
+    # Con id de paciente el Evaluador del calculo se conserva para la instantanea de la serie
+    evaluador = Evaluador(registro) if id_paciente else None
+    resultados, error_calculo = replicar_formulas_con_cache(registro, paneles=paneles, contexto=evaluador)
+    if error_calculo:
+        return respuesta_json({'error': error_calculo}, 422)
+    if id_paciente:
+        registrar_en_serie(id_paciente, evaluador)
+    return respuesta_json(resultados.a_dict(_numeros_solicitados()))
+
+@app.route('/api/calcular/batch', methods=['POST'])
+def api_calcular_batch():
+    """Calcula varios pacientes en una sola peticion: [{...}, {...}] o {"pacientes": [...]}."""
+    try:
+        paneles = _paneles_solicitados()
+    except ValueError as ve:
+        return respuesta_json({'error': str(ve)}, 400)
+    pacientes, respuesta_error = _leer_lote()
+    if respuesta_error:
+        return respuesta_error
+    numeros = _numeros_solicitados()
+    return respuesta_json({'resultados': [_resultado_api(p, paneles, numeros) for p in pacientes]})
+
+def _leer_lote():
+    """(pacientes, None) de [{...}, {...}] o {"pacientes": [...]}; (None, respuesta de error) si no es valido."""
+    datos = request.get_json(silent=True)
+    pacientes = datos.get('pacientes') if isinstance(datos, dict) else datos
+    if not isinstance(pacientes, list) or not all(isinstance(p, dict) for p in pacientes):
+        return None, respuesta_json({'error': "Se esperaba una lista de objetos JSON con los campos de cada paciente."}, 400)
+    if len(pacientes) > MAX_PACIENTES_LOTE:
+        return None, respuesta_json({'error': f"El lote supera el maximo de {MAX_PACIENTES_LOTE} pacientes."}, 413)
+    return pacientes, None
+
+@app.route('/api/alertas', methods=['GET', 'POST'])
+def api_alertas():
+    """
+    GET: reglas de alerta vigentes. POST: lote de pacientes como /api/calcular/batch; devuelve solo
+    los que cumplen alguna regla y cuales. ?reglas=ppc_baja,lactato_alto y ?nivel=critica filtran las reglas.
+    El lote se calcula con motor_vectorizado y las reglas se evaluan como mascaras sobre sus columnas
+    (una division por cero deja el indice vacio en vez de rechazar al paciente).
+    """
+    try:
+        nombres = [n.strip() for n in request.args.get('reglas', '').split(',') if n.strip()]
+        reglas = seleccionar_reglas(nombres, request.args.get('nivel'))
+    except ValueError as ve:
+        return respuesta_json({'error': str(ve)}, 400)
+    descripcion = [regla.a_dict() for regla in reglas]
+    if request.method == 'GET':
+        return respuesta_json({'reglas': descripcion, 'niveles': list(NIVELES)})
+    pacientes, respuesta_error = _leer_lote()
+    if respuesta_error:
+        return respuesta_error
+    for i, paciente in enumerate(pacientes):
+        for campo, valor in paciente.items():
+            if not (valor is None or isinstance(valor, (str, int, float))):
+                return respuesta_json({'error': f"Paciente {i}, campo '{campo}': se esperaba un texto o un numero."}, 400)
+    import pandas as pd
+    from motor_vectorizado import calcular_lote
+
+    # Siempre se evalua REGLAS (compilado una vez); el filtro elige columnas de la mascara
+    mascara = evaluar_lote(calcular_lote(pd.DataFrame(pacientes), incluir_entradas=True))[:, columnas_de(reglas)]
+    con_alertas = [{'indice': int(i), 'id_paciente': leer_id_paciente(pacientes[i]),
+                    'alertas': [reglas[j].nombre for j in mascara[i].nonzero()[0]]}
+                   for i in mascara.any(axis=1).nonzero()[0]]
+    return respuesta_json({'reglas': descripcion, 'total': len(pacientes), 'pacientes': con_alertas})
+
+@app.route('/api/pacientes/<id_paciente>/serie', methods=['GET'])
+def api_serie_paciente(id_paciente):
+    """
+    Serie temporal de un paciente: ?variables=tam,gc&horas=72.
+    Devuelve los instantes (epoch en segundos) y un arreglo por variable (null donde no habia dato).
+    """
+    variables = [v for v in request.args.get('variables', 'tam,gc,do2,driving_p,ppc,lactato').split(',') if v]
+    desconocidas = [v for v in variables if v not in COLUMNAS]
+    if desconocidas:
+        return respuesta_json({'error': f"Variables desconocidas: {', '.join(desconocidas)}"}, 400)
+    try:
+        horas = float(request.args.get('horas', HORAS_TENDENCIA))
+    except ValueError:
+        return respuesta_json({'error': "El parametro 'horas' debe ser numerico."}, 400)
+    serie = almacen_series.serie(id_paciente.strip()[:MAX_LONGITUD_ID_PACIENTE])
+    tiempos, columnas = serie.ventana(variables, horas)
+    valores = {variable: [None if math.isnan(v) else v for v in columna.tolist()]
+               for variable, columna in zip(variables, columnas)}
+    return respuesta_json({'id_paciente': id_paciente, 'horas': horas, 't': tiempos.tolist(), 'series': valores})
+
+@app.route('/api/historial', methods=['GET'])
+def api_historial():
+    """
+    Historial de calculos, del mas reciente al mas antiguo: ?id_paciente=Cama%207&limite=50.
+    Para la pagina siguiente se repite la consulta con &cursor=<siguiente> de la respuesta.
+    """
+    try:
+        limite = max(1, min(int(request.args.get('limite', LIMITE_PAGINA)), MAX_LIMITE_PAGINA))
+        calculos, siguiente = historial.pagina(request.args.get('id_paciente'), request.args.get('cursor'), limite)
+    except ValueError:
+        return respuesta_json({'error': "Parametros 'limite' o 'cursor' invalidos."}, 400)
+    return respuesta_json({'calculos': calculos, 'siguiente': siguiente})
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache():
+    """Contadores de la cache de resultados (aciertos, fallos, caducados, ocupacion)."""
+    return respuesta_json(cache_resultados.estadisticas())
+
+@app.route('/api/carga-masiva', methods=['POST'])
+def api_carga_masiva():
+    """
+    Recibe un CSV o XLSX (campo 'archivo') con los nombres del formulario como encabezados
+    y devuelve en flujo un CSV con las columnas originales mas los indices calculados.
+    """
+    from carga_masiva import procesar_archivo
+
+    archivo = request.files.get('archivo')
+    if archivo is None or not archivo.filename:
+        return respuesta_json({'error': "Falta el archivo (campo 'archivo')."}, 400)
+    try:
+        contenido = procesar_archivo(archivo.filename, archivo.stream)
+    except Exception as e:
+        return respuesta_json({'error': f"No se pudo leer el archivo: {e}"}, 400)
+    nombre_salida = archivo.filename.rsplit('.', 1)[0] + '_resultados.csv'
+    return app.response_class(
+        stream_with_context(contenido),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{nombre_salida}"'},
+    )
+
+if __name__ == '__main__':
+    HTML_TEMPLATE = re.sub(r'[\s\n\t]+"""$', '"""', HTML_TEMPLATE)
     app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
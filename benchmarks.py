@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Benchmarks de rendimiento de la aplicacion.
+# Uso: python benchmarks.py [--repeticiones N] [--salida archivo.json] [--comparar anterior.json]
+#
+# Mide replicar_formulas() sola, el render de HTML_TEMPLATE solo y las peticiones GET/POST
+# completas a inicio() con el cliente de pruebas de Flask, sobre pacientes fijos (completo,
+# disperso y uno por panel). Informa ops/s, p50 y p99 y guarda los resultados en JSON
+# para comparar versiones.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import time
+import timeit
+
+from flask import render_template_string
+
+import app_de_excel
+from app_de_excel import app, HTML_TEMPLATE, BACKGROUND_IMAGES, replicar_formulas, obtener_plantilla
+from grafo_formulas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, PANELES, dependencias_de, nodos_de_panel
+
+# Paciente de ejemplo (valores de la hoja 'Panel' de datos.xlsx)
+PACIENTE_EJEMPLO = {
+    'sexo': 'M', 'edad_anos': '79', 'peso_kg': '68', 'talla_m': '1.59',
+    'tas': '90', 'tad': '43', 'fc': '79', 'sato2_sv': '87',
+    'ph_a': '7.08', 'paco2': '61', 'pao2': '71', 'sato2_a': '87', 'lactato': '3.1', 'hb': '14.1',
+    'ph_v': '7.02', 'pvco2': '68', 'pvo2': '38', 'satvo2': '62',
+    'vti': '14', 'tsvi': '1.7', 'vci': '1.8', 'vci_colaps': '<50%', 'pvc_medido': '13',
+    'modo': 'PCV', 'vt_protec': '7', 'vt_ventilador': '390', 'fr': '18', 'peco2': '42', 'peep': '5',
+    'fio2': '0.3', 'plateau': '20', 'ppico': '25',
+    'vs_acm': '90', 'vd_acm': '45', 'vs_ab': '100', 'vd_ab': '40',
+}
+
+# Paciente con todos los campos del formulario (resto de valores del libro y tipicos de UCI)
+PACIENTE_COMPLETO = dict(
+    PACIENTE_EJEMPLO,
+    mapse_l='9', mapse_s='10', e_onda='0.4', a_onda='0.61', eprim_lat='0.04', eprim_med='0.05',
+    vfs='89', vfd='106', long_vi='76', vtmax='2.8', tapse='15', vti_pulmonar='18',
+    cstat_input='26', cdin_input='20', v_min='7.0', pocc='0.8',
+    vaso_dtc='ACP', vs_dtc='60', vd_dtc='25', vm_aci='40', vm_ave='30',
+    vno_der='4', vno_izq='4', vno_dgo='19',
+    ph_jo2='7.08', paco2_jo2='30', pao2_jo2='40', sato2_jo2='70', lactato_jo2='3.96',
+)
+
+
+def paciente_de_panel(panel):
+    """Solo las entradas que necesita un panel, con los valores de PACIENTE_COMPLETO."""
+    necesarias = dependencias_de(nodos_de_panel(panel))
+    return {nombre: valor for nombre, valor in PACIENTE_COMPLETO.items() if nombre in necesarias}
+
+
+FIXTURES = {
+    'completo': PACIENTE_COMPLETO,
+    'ejemplo': PACIENTE_EJEMPLO,
+    'disperso': {'sexo': 'H', 'peso_kg': '80', 'talla_m': '1.75', 'tas': '120', 'tad': '70', 'fc': '88'},
+    **{f'panel_{panel.lower()}': paciente_de_panel(panel) for panel in PANELES},
+}
+assert set(PACIENTE_COMPLETO) == set(ENTRADAS_NUMERICAS) | set(ENTRADAS_SELECCION)
+
+
+def _contexto_render(paciente=PACIENTE_EJEMPLO):
+    resultados, error_calculo = replicar_formulas(paciente)
+    return dict(
+        error_lectura=app_de_excel.estado_excel(),
+        resultados=resultados,
+        error_calculo=error_calculo,
+        inputs=paciente,
+        show_results=True,
+        now='01/01/2024 00:00:00',
+        BACKGROUND_IMAGES=BACKGROUND_IMAGES,
+    )
+
+
+def bench_render(repeticiones=200):
+    """Compara el costo por render de render_template_string contra la plantilla compilada."""
+    contexto = _contexto_render()
+    with app.test_request_context('/'):
+        por_string = timeit.timeit(lambda: render_template_string(HTML_TEMPLATE, **contexto), number=repeticiones)
+        plantilla = obtener_plantilla()
+        compilada = timeit.timeit(lambda: plantilla.render(**contexto), number=repeticiones)
+    return {
+        'render_template_string (ms)': por_string / repeticiones * 1000,
+        'plantilla compilada (ms)': compilada / repeticiones * 1000,
+    }
+
+
+# --- MEDICION ---
+def medir(funcion, repeticiones, calentamiento=20):
+    """Tiempo de cada llamada (tras calentar) -> ops/s, p50 y p99 en milisegundos."""
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    reloj = time.perf_counter
+    for _ in range(repeticiones):
+        inicio = reloj()
+        funcion()
+        tiempos.append(reloj() - inicio)
+    tiempos.sort()
+    total = sum(tiempos)
+    return {
+        'ops_s': round(repeticiones / total, 1) if total else None,
+        'p50_ms': round(tiempos[len(tiempos) // 2] * 1000, 4),
+        'p99_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1000, 4),
+        'repeticiones': repeticiones,
+    }
+
+
+def _formulario(paciente):
+    return dict(paciente, action='calculate')
+
+
+def ejecutar(repeticiones=500):
+    """Corre todos los casos y devuelve {caso: {fixture: metricas}}."""
+    resultados = {'replicar_formulas': {}, 'render_plantilla': {}, 'get_inicio': {}, 'post_inicio': {}}
+    # Sin cache de resultados ni cookie de contexto: se mide el calculo completo en cada POST
+    cache = app_de_excel.cache_resultados
+    max_entradas, cache.max_entradas = cache.max_entradas, 0
+    cliente = app.test_client(use_cookies=False)
+    try:
+        for nombre, paciente in FIXTURES.items():
+            resultados['replicar_formulas'][nombre] = medir(lambda: replicar_formulas(paciente), repeticiones)
+            contexto = _contexto_render(paciente)
+            with app.test_request_context('/'):
+                plantilla = obtener_plantilla()
+                resultados['render_plantilla'][nombre] = medir(lambda: plantilla.render(**contexto), repeticiones)
+            formulario = _formulario(paciente)
+            resultados['post_inicio'][nombre] = medir(lambda: cliente.post('/', data=formulario), repeticiones)
+        resultados['get_inicio']['formulario_vacio'] = medir(lambda: cliente.get('/'), repeticiones)
+    finally:
+        cache.max_entradas = max_entradas
+        cache.limpiar()
+    return resultados
+
+
+def guardar(resultados, ruta):
+    documento = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(documento, f, indent=2, ensure_ascii=False)
+
+
+def imprimir(resultados, anteriores=None):
+    print(f"{'caso':<20} {'fixture':<26} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}  {'vs anterior':>11}")
+    for caso, por_fixture in resultados.items():
+        for fixture, metricas in por_fixture.items():
+            comparacion = ''
+            previo = (anteriores or {}).get(caso, {}).get(fixture)
+            if previo and previo.get('p50_ms'):
+                comparacion = f"{metricas['p50_ms'] / previo['p50_ms']:.2f}x p50"
+            print(f"{caso:<20} {fixture:<26} {metricas['ops_s']:>10} {metricas['p50_ms']:>9.3f} "
+                  f"{metricas['p99_ms']:>9.3f}  {comparacion:>11}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks de la calculadora UCI")
+    parser.add_argument('--repeticiones', type=int, default=500)
+    parser.add_argument('--salida', default=os.path.join('resultados_benchmarks',
+                                                         datetime.datetime.now().strftime('%Y%m%d_%H%M%S') + '.json'))
+    parser.add_argument('--comparar', help="JSON de una ejecucion anterior para comparar p50")
+    argumentos = parser.parse_args()
+
+    anteriores = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as f:
+            anteriores = json.load(f)['resultados']
+
+    for nombre, ms in bench_render().items():
+        print(f"{nombre:<30} {ms:8.3f}")
+    print()
+    resultados = ejecutar(argumentos.repeticiones)
+    imprimir(resultados, anteriores)
+    guardar(resultados, argumentos.salida)
+    print(f"\nResultados guardados en {argumentos.salida}")
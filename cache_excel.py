@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Cache binaria del libro de Excel.
+# pd.read_excel() sobre datos.xlsx es lento; las hojas se parsean una sola vez y se
+# guardan pickladas en un archivo junto al libro ('datos.xlsx.cache.pkl'). La cache
+# se invalida cuando cambian el tamano/mtime del libro y su hash SHA-256.
+# El archivo contiene dos pickles seguidos: la cabecera (version, firma, hash, clave) y
+# los datos. Comprobar que la cache sigue vigente solo lee la cabecera, sin deserializar
+# los DataFrames (lo que importaria pandas).
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+VERSION_CACHE = 3
+
+
+def ruta_cache(ruta_excel, sufijo='.cache.pkl'):
+    return ruta_excel + sufijo
+
+
+def _hash_archivo(ruta):
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 16), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _leer_cabecera(f):
+    try:
+        cabecera = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return cabecera if isinstance(cabecera, dict) and cabecera.get('version') == VERSION_CACHE else None
+
+
+def _leer_cache(ruta, clave):
+    """(cabecera, f) con el archivo abierto justo antes de los datos, o (None, None) si no sirve para 'clave'."""
+    try:
+        f = open(ruta, 'rb')
+    except OSError:
+        return None, None
+    cabecera = _leer_cabecera(f)
+    if cabecera is None or cabecera['clave'] != clave:
+        f.close()
+        return None, None
+    return cabecera, f
+
+
+_SIN_DATOS = object()
+
+
+def _leer_datos(f):
+    try:
+        return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return _SIN_DATOS
+
+
+def _escribir_cache(ruta, cabecera, datos):
+    """Escritura atomica (archivo temporal + os.replace) para que otro worker nunca lea un pickle a medias."""
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    try:
+        fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(cabecera, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except OSError:
+        # Directorio de solo lectura: se sigue sin cache en disco
+        pass
+
+
+def _firma(ruta_excel):
+    estado = os.stat(ruta_excel)
+    return estado.st_size, estado.st_mtime_ns
+
+
+def cache_vigente(ruta_excel, clave, sufijo='.cache.pkl'):
+    """
+    True si la cache de 'clave' corresponde al libro tal como esta (mismo tamano/mtime).
+    Solo lee la cabecera; ante la duda (p. ej. mtime distinto) devuelve False.
+    """
+    try:
+        firma = _firma(ruta_excel)
+    except OSError:
+        return False
+    cabecera, f = _leer_cache(ruta_cache(ruta_excel, sufijo), clave)
+    if f is None:
+        return False
+    f.close()
+    return cabecera['firma'] == firma
+
+
+def leer_con_cache(ruta_excel, clave, construir, sufijo='.cache.pkl'):
+    """
+    Devuelve construir() cacheado en disco junto al libro. 'clave' identifica lo que se construye
+    (hojas leidas, version del compilador...); la cache se reutiliza solo si la clave coincide y
+    el libro no cambio (tamano/mtime, o en su defecto el mismo SHA-256).
+    """
+    firma = _firma(ruta_excel)
+    ruta = ruta_cache(ruta_excel, sufijo)
+    cabecera, f = _leer_cache(ruta, clave)
+    sha = None
+    if cabecera is not None:
+        with f:
+            # mtime distinto (p. ej. tras un checkout) pero mismo contenido: se reutiliza y se actualiza la firma
+            if cabecera['firma'] != firma:
+                sha = _hash_archivo(ruta_excel)
+            if sha is None or sha == cabecera['sha256']:
+                datos = _leer_datos(f)
+                if datos is not _SIN_DATOS:
+                    if sha is not None:
+                        _escribir_cache(ruta, dict(cabecera, firma=firma), datos)
+                    return datos
+    if sha is None:
+        sha = _hash_archivo(ruta_excel)
+
+    datos = construir()
+    _escribir_cache(ruta, {
+        'version': VERSION_CACHE,
+        'firma': firma,
+        'sha256': sha,
+        'clave': clave,
+    }, datos)
+    return datos
+
+
+def leer_hojas_con_cache(ruta_excel, hojas):
+    """
+    Devuelve {hoja: DataFrame} para las hojas indicadas, usando la cache binaria si sigue vigente.
+    Propaga FileNotFoundError / ValueError de pandas igual que pd.read_excel().
+    """
+    hojas = list(hojas)
+
+    def leer():
+        import pandas as pd
+        return pd.read_excel(ruta_excel, sheet_name=hojas)
+
+    return leer_con_cache(ruta_excel, hojas, leer)
+
+
+def hojas_en_cache(ruta_excel, hojas):
+    """True si leer_hojas_con_cache() de estas hojas se serviria desde la cache sin tocar el libro."""
+    return cache_vigente(ruta_excel, list(hojas))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# Calculadora de linea de comandos para pipelines: pacientes en JSONL o CSV (archivo o stdin),
+# resultados en JSONL o CSV por stdout, registro a registro y sin levantar el servidor.
+# Uso: python calculadora.py pacientes.jsonl > resultados.jsonl
+#      cat ingresos.csv | python calculadora.py --entrada csv --salida csv --paneles Panel,Ventilatorio
+#      python calculadora.py pacientes.jsonl --numeros      (valores sin formato: 7.35 en vez de "7.35 mmHg")
+#
+# Cada registro pasa por replicar_formulas() (mismas formulas, reglas de visualizacion y mensajes
+# de error que la pagina y /api/calcular). Se lee y se escribe un registro cada vez, sin cache
+# de resultados, asi que la memoria no depende del tamano de la entrada. Si el registro trae
+# 'id_paciente' se copia a la salida para poder cruzarla con la entrada.
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+from esquema_entradas import parsear_entradas
+from grafo_formulas import PANELES, Salida
+
+
+def leer_jsonl(archivo):
+    """(numero de linea, registro o None si la linea no es un objeto JSON) por cada linea no vacia."""
+    for numero, linea in enumerate(io.TextIOWrapper(archivo, encoding='utf-8-sig'), 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError:
+            registro = None
+        yield numero, registro if isinstance(registro, dict) else None
+
+
+def leer_csv(archivo):
+    """(numero de fila, registro) por cada fila del CSV; separador ',' o ';' como en la carga masiva."""
+    from carga_masiva import filas_csv
+
+    encabezado, filas = filas_csv(archivo)
+    for numero, fila in enumerate(filas, 2):
+        yield numero, dict(zip(encabezado, fila))
+
+
+def calcular_registro(registro, paneles=None, numeros=False):
+    """
+    {panel: {etiqueta: valor}} como /api/calcular, o {'error': mensaje}.
+    Con 'numeros' cada fila mostrada lleva el valor calculado en vez del texto formateado.
+    """
+    from app_de_excel import replicar_formulas
+
+    resultados, error = replicar_formulas(parsear_entradas(registro), paneles=paneles)
+    if error:
+        return {'error': error}
+    return resultados.a_dict(numeros)
+
+
+def columnas_csv(paneles):
+    """Columnas 'Panel:Etiqueta' de todas las filas de los paneles, en el orden de la pagina."""
+    return [f"{nombre}:{fila.etiqueta}" for nombre in paneles for fila in PANELES[nombre] if isinstance(fila, Salida)]
+
+
+def procesar(registros, salida, formato='jsonl', paneles=None, numeros=False):
+    """Calcula y escribe cada registro a medida que llega. Devuelve (registros, con error)."""
+    paneles = list(paneles or PANELES)
+    escritor = None
+    if formato == 'csv':
+        columnas = columnas_csv(paneles)
+        escritor = csv.writer(salida, lineterminator='\n')
+        escritor.writerow(['registro', 'id_paciente', 'error'] + columnas)
+    total = errores = 0
+    for numero, registro in registros:
+        total += 1
+        if registro is None:
+            resultado = {'error': f"Linea {numero}: se esperaba un objeto JSON con los campos del paciente."}
+        else:
+            resultado = calcular_registro(registro, paneles, numeros)
+        errores += 'error' in resultado
+        id_paciente = (registro or {}).get('id_paciente')
+        if escritor is None:
+            if id_paciente is not None:
+                resultado = {'id_paciente': id_paciente, **resultado}
+            salida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+        else:
+            valores = {f"{nombre}:{etiqueta}": valor for nombre, filas in resultado.items() if nombre != 'error'
+                       for etiqueta, valor in filas.items()}
+            escritor.writerow([numero, id_paciente or '', resultado.get('error', '')] +
+                              [valores.get(columna, '') for columna in columnas])
+    return total, errores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Calcula los indices de la UCI para pacientes en JSONL o CSV")
+    parser.add_argument('archivo', nargs='?', help="Archivo de entrada; sin archivo (o '-') se lee stdin")
+    parser.add_argument('--entrada', choices=('jsonl', 'csv'),
+                        help="Formato de entrada; por defecto segun la extension del archivo (stdin: jsonl)")
+    parser.add_argument('--salida', choices=('jsonl', 'csv'), default='jsonl', help="Formato de salida por stdout")
+    parser.add_argument('--paneles', help="Paneles a calcular separados por comas (por defecto todos)")
+    parser.add_argument('--numeros', action='store_true', help="Valores numericos sin formato ni unidades")
+    argumentos = parser.parse_args()
+
+    paneles = [p.strip() for p in argumentos.paneles.split(',') if p.strip()] if argumentos.paneles else None
+    desconocidos = [p for p in paneles or () if p not in PANELES]
+    if desconocidos:
+        parser.error(f"Paneles desconocidos: {', '.join(desconocidos)} (disponibles: {', '.join(PANELES)})")
+
+    ruta = argumentos.archivo if argumentos.archivo not in (None, '-') else None
+    formato = argumentos.entrada or ('csv' if ruta and ruta.lower().endswith('.csv') else 'jsonl')
+    archivo = open(ruta, 'rb') if ruta else sys.stdin.buffer
+    try:
+        registros = leer_csv(archivo) if formato == 'csv' else leer_jsonl(archivo)
+        total, errores = procesar(registros, sys.stdout, argumentos.salida, paneles, argumentos.numeros)
+    except BrokenPipeError:
+        # 'calculadora.py ... | head' cierra la tuberia antes de terminar: se descarta lo pendiente
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
+    finally:
+        if ruta:
+            archivo.close()
+    print(f"{total} registros, {errores} con error", file=sys.stderr)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# Carga masiva de pacientes desde CSV o XLSX (exportaciones de toda la sala).
+# Las filas se leen en flujo, se agrupan en bloques y cada bloque pasa por el
+# motor vectorizado; el resultado se devuelve tambien en flujo como CSV, de modo
+# que la memoria usada depende del tamano del bloque y no del archivo.
+
+import codecs
+import csv
+import io
+from itertools import chain, islice
+
+import pandas as pd
+
+from motor_vectorizado import COLUMNAS_DERIVADAS, calcular_lote
+
+TAMANO_BLOQUE = 2000
+MUESTRA_CODIFICACION = 64 * 1024  # bytes leidos para decidir la codificacion de un CSV
+
+
+def _detectar_codificacion(muestra):
+    """UTF-8 si la muestra lo es; si no, cp1252 (exportaciones de Excel en Windows, superconjunto practico de Latin-1)."""
+    try:
+        muestra.decode('utf-8')  # la muestra termina en fin de linea: ningun caracter queda cortado
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def filas_csv(archivo, encoding=None):
+    """
+    Encabezado y filas de un CSV binario, leidos de forma perezosa. Detecta ',' o ';' como separador.
+    Sin 'encoding' la codificacion se decide con los primeros MUESTRA_CODIFICACION bytes, antes de
+    empezar a responder; un byte invalido mas adelante se sustituye por U+FFFD en vez de cortar el flujo.
+    """
+    lineas = iter(archivo)
+    muestra, tamano = [], 0
+    for linea in lineas:
+        muestra.append(linea)
+        tamano += len(linea)
+        if tamano >= MUESTRA_CODIFICACION:
+            break
+    encoding = encoding or _detectar_codificacion(b''.join(muestra))
+    if encoding == 'utf-8-sig' and muestra and muestra[0].startswith(codecs.BOM_UTF8):
+        muestra[0] = muestra[0][len(codecs.BOM_UTF8):]
+        encoding = 'utf-8'
+    texto = (linea.decode(encoding, errors='replace') for linea in chain(muestra, lineas))
+    primera_linea = next(texto, '')
+    separador = ';' if primera_linea.count(';') > primera_linea.count(',') else ','
+    encabezado = next(csv.reader([primera_linea], delimiter=separador), [])
+    return [c.strip() for c in encabezado], csv.reader(texto, delimiter=separador)
+
+
+def filas_xlsx(archivo):
+    """Encabezado y filas de la primera hoja de un XLSX usando openpyxl en modo read-only."""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    filas = libro.worksheets[0].iter_rows(values_only=True)
+    encabezado = [('' if c is None else str(c).strip()) for c in next(filas, ())]
+
+    def recorrer():
+        try:
+            yield from filas
+        finally:
+            libro.close()
+
+    return encabezado, recorrer()
+
+
+def bloques(encabezado, filas, tamano=TAMANO_BLOQUE):
+    """Agrupa las filas en DataFrames de como maximo 'tamano' registros."""
+    ancho = len(encabezado)
+    while True:
+        bloque = [tuple(fila[:ancho]) + ('',) * (ancho - len(fila)) for fila in islice(filas, tamano)]
+        if not bloque:
+            return
+        yield pd.DataFrame.from_records(bloque, columns=encabezado)
+
+
+def procesar_archivo(nombre_archivo, archivo, tamano=TAMANO_BLOQUE):
+    """
+    Generador de texto CSV: columnas originales del archivo seguidas de los indices derivados.
+    Lanza ValueError si la extension no es .csv ni .xlsx.
+    """
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower() if '.' in nombre_archivo else ''
+    if extension == 'csv':
+        encabezado, filas = filas_csv(archivo)
+    elif extension == 'xlsx':
+        encabezado, filas = filas_xlsx(archivo)
+    else:
+        raise ValueError("Formato no soportado: se aceptan archivos .csv o .xlsx")
+
+    def generar():
+        # La respuesta ya empezo (200): un fallo se informa como fila de error en el propio CSV
+        primero, inicio = True, 2
+        lector = bloques(encabezado, filas, tamano)
+        while True:
+            try:
+                df = next(lector, None)
+                if df is None:
+                    return
+                salida = pd.concat([df, calcular_lote(df)], axis=1)
+            except Exception as e:
+                yield _fila_de_error(f"ERROR a partir de la fila {inicio}: {e.__class__.__name__}: {e}", encabezado, primero)
+                return
+            buffer = io.StringIO()
+            salida.to_csv(buffer, header=primero, index=False)
+            primero, inicio = False, inicio + len(df)
+            yield buffer.getvalue()
+
+    return generar()
+
+
+def _fila_de_error(mensaje, encabezado, con_encabezado):
+    """Linea CSV con el mensaje en la primera columna (y el encabezado si aun no se habia escrito)."""
+    columnas = list(encabezado) + list(COLUMNAS_DERIVADAS)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator='\n')
+    if con_encabezado:
+        escritor.writerow(columnas)
+    escritor.writerow([mensaje] + [''] * (len(columnas) - 1))
+    return buffer.getvalue()
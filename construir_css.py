@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# Genera la hoja de estilos de la aplicacion: solo las clases utilitarias (estilo Tailwind v3)
+# que aparecen en HTML_TEMPLATE, mas el reset base (preflight).
+# Uso: python construir_css.py
+#
+# Sustituye al compilador de https://cdn.tailwindcss.com, que se descargaba y generaba el CSS
+# en cada navegador en cada carga y necesitaba internet. El resultado se publica como
+# static/css/estilos.<hash>.css y se registra en static/manifiesto.json (ver estaticos.py).
+# Hay que volver a ejecutarlo al anadir clases nuevas a la plantilla.
+
+import os
+import re
+import sys
+
+from estaticos import publicar
+
+# --- VALORES DEL TEMA (Tailwind v3) ---
+PALETA = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81'],
+}
+TONOS = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900']
+COLORES = {'white': '#fff', 'black': '#000', 'transparent': 'transparent'}
+COLORES.update({f'{familia}-{tono}': valor for familia, valores in PALETA.items() for tono, valor in zip(TONOS, valores)})
+
+TAMANOS_TEXTO = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'),
+}
+PESOS = {'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700, 'extrabold': 800}
+SOMBRAS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    'inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+    'none': '0 0 #0000',
+}
+REDONDEOS = {'': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem', 'xl': '0.75rem', '2xl': '1rem', 'full': '9999px'}
+ANCHOS_MAXIMOS = {'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem', '4xl': '56rem', '6xl': '72rem'}
+PUNTOS_DE_CORTE = {'sm': '640px', 'md': '768px', 'lg': '1024px', 'xl': '1280px'}
+PSEUDOCLASES = {'hover': ':hover', 'focus': ':focus', 'last': ':last-child', 'first': ':first-child'}
+CURVA = 'cubic-bezier(0.4, 0, 0.2, 1)'
+
+FIJAS = {
+    'block': 'display: block', 'inline-block': 'display: inline-block', 'flex': 'display: flex',
+    'grid': 'display: grid', 'hidden': 'display: none',
+    'items-start': 'align-items: flex-start', 'items-center': 'align-items: center',
+    'justify-between': 'justify-content: space-between', 'justify-center': 'justify-content: center',
+    'text-center': 'text-align: center', 'text-right': 'text-align: right', 'text-left': 'text-align: left',
+    'uppercase': 'text-transform: uppercase', 'italic': 'font-style: italic',
+    'leading-tight': 'line-height: 1.25', 'leading-normal': 'line-height: 1.5',
+    'mx-auto': 'margin-left: auto; margin-right: auto',
+    'w-full': 'width: 100%', 'w-1/2': 'width: 50%',
+    'border': 'border-width: 1px',
+    'transition': ('transition-property: color, background-color, border-color, text-decoration-color, fill, '
+                   f'stroke, opacity, box-shadow, transform, filter, backdrop-filter; transition-timing-function: {CURVA}; '
+                   'transition-duration: 150ms'),
+    'ease-in-out': f'transition-timing-function: {CURVA}',
+}
+
+PREFLIGHT = """*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb;--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-ring-color:rgb(59 130 246 / 0.5)}
+html{line-height:1.5;-webkit-text-size-adjust:100%;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji"}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+small{font-size:80%}
+button,input,optgroup,select,textarea{font-family:inherit;font-size:100%;font-weight:inherit;line-height:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,[type=button],[type=reset],[type=submit]{-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role=button]{cursor:pointer}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+
+def _espacio(valor):
+    return '0px' if valor == '0' else ('1px' if valor == 'px' else f'{int(valor) * 0.25:g}rem')
+
+
+_MARGENES = {'p': 'padding', 'm': 'margin'}
+_LADOS = {'': [''], 'x': ['-left', '-right'], 'y': ['-top', '-bottom'],
+          't': ['-top'], 'b': ['-bottom'], 'l': ['-left'], 'r': ['-right']}
+
+
+def declaraciones(utilidad):
+    """
+    CSS de una clase utilitaria sin variantes -> (selector_sufijo, declaraciones) o None si no es
+    una utilidad conocida (clases propias de la plantilla como 'bg-panel' o 'input-base').
+    """
+    if utilidad in FIJAS:
+        return '', FIJAS[utilidad]
+    m = re.fullmatch(r'([pm])([xytblr]?)-(\d+|px)', utilidad)
+    if m:
+        propiedad = _MARGENES[m.group(1)]
+        return '', '; '.join(f'{propiedad}{lado}: {_espacio(m.group(3))}' for lado in _LADOS[m.group(2)])
+    m = re.fullmatch(r'space-([xy])-(\d+)', utilidad)
+    if m:
+        inicio, fin = ('margin-left', 'margin-right') if m.group(1) == 'x' else ('margin-top', 'margin-bottom')
+        return ' > :not([hidden]) ~ :not([hidden])', f'{inicio}: {_espacio(m.group(2))}; {fin}: 0px'
+    m = re.fullmatch(r'gap-(\d+)', utilidad)
+    if m:
+        return '', f'gap: {_espacio(m.group(1))}'
+    m = re.fullmatch(r'h-(\d+)', utilidad)
+    if m:
+        return '', f'height: {_espacio(m.group(1))}'
+    m = re.fullmatch(r'grid-cols-(\d+)', utilidad)
+    if m:
+        return '', f'grid-template-columns: repeat({m.group(1)}, minmax(0, 1fr))'
+    m = re.fullmatch(r'col-span-(\d+)', utilidad)
+    if m:
+        return '', f'grid-column: span {m.group(1)} / span {m.group(1)}'
+    m = re.fullmatch(r'max-w-(\w+)', utilidad)
+    if m and m.group(1) in ANCHOS_MAXIMOS:
+        return '', f'max-width: {ANCHOS_MAXIMOS[m.group(1)]}'
+    m = re.fullmatch(r'text-(\w+)', utilidad)
+    if m and m.group(1) in TAMANOS_TEXTO:
+        tamano, interlineado = TAMANOS_TEXTO[m.group(1)]
+        return '', f'font-size: {tamano}; line-height: {interlineado}'
+    m = re.fullmatch(r'font-(\w+)', utilidad)
+    if m and m.group(1) in PESOS:
+        return '', f'font-weight: {PESOS[m.group(1)]}'
+    m = re.fullmatch(r'(bg|text|border|ring)-([a-z]+(?:-\d+)?)', utilidad)
+    if m and m.group(2) in COLORES:
+        propiedad = {'bg': 'background-color', 'text': 'color', 'border': 'border-color', 'ring': '--tw-ring-color'}
+        return '', f'{propiedad[m.group(1)]}: {COLORES[m.group(2)]}'
+    m = re.fullmatch(r'border-([tblr])(?:-(\d+))?', utilidad)
+    if m:
+        lado = {'t': 'top', 'b': 'bottom', 'l': 'left', 'r': 'right'}[m.group(1)]
+        return '', f'border-{lado}-width: {m.group(2) or 1}px'
+    m = re.fullmatch(r'shadow(?:-(\w+))?', utilidad)
+    if m and (m.group(1) or '') in SOMBRAS:
+        return '', (f'--tw-shadow: {SOMBRAS[m.group(1) or ""]}; box-shadow: var(--tw-ring-offset-shadow), '
+                    'var(--tw-ring-shadow), var(--tw-shadow)')
+    m = re.fullmatch(r'rounded(?:-(\w+))?', utilidad)
+    if m and (m.group(1) or '') in REDONDEOS:
+        return '', f'border-radius: {REDONDEOS[m.group(1) or ""]}'
+    m = re.fullmatch(r'duration-(\d+)', utilidad)
+    if m:
+        return '', f'transition-duration: {m.group(1)}ms'
+    return None
+
+
+def _orden(utilidad):
+    """Como en Tailwind, los lados concretos van despues de los generales: 'p-4 pb-0' deja pb en 0."""
+    if re.fullmatch(r'[pm][xy]-.*', utilidad):
+        return 1
+    if re.fullmatch(r'[pm][tblr]-.*|border-[tblr](-\d+)?', utilidad):
+        return 2
+    return 0
+
+
+def _selector(clase):
+    return '.' + re.sub(r'([:/.\[\]])', r'\\\1', clase)
+
+
+def clases_de_plantilla(plantilla):
+    """Clases de los atributos class="..." y de las llamadas classList.add/remove del JavaScript."""
+    clases = set()
+    for atributo in re.findall(r'class="([^"]*)"', plantilla):
+        clases.update(c for c in atributo.split() if '{' not in c and '}' not in c)
+    for argumentos in re.findall(r'classList\.\w+\(([^)]*)\)', plantilla):
+        clases.update(re.findall(r"'([^']+)'", argumentos))
+    return clases
+
+
+def generar_css(clases):
+    """CSS minimo para 'clases'; devuelve (css, clases_desconocidas)."""
+    base, por_punto = [], {punto: [] for punto in PUNTOS_DE_CORTE}
+    desconocidas = set()
+    # Orden de Tailwind: primero las utilidades sin prefijo, luego cada punto de corte de menor a mayor
+    for clase in sorted(clases):
+        *variantes, utilidad = clase.split(':')
+        resultado = declaraciones(utilidad)
+        if resultado is None or any(v not in PUNTOS_DE_CORTE and v not in PSEUDOCLASES for v in variantes):
+            desconocidas.add(clase)
+            continue
+        sufijo, cuerpo = resultado
+        pseudo = ''.join(PSEUDOCLASES[v] for v in variantes if v in PSEUDOCLASES)
+        regla = f'{_selector(clase)}{pseudo}{sufijo}{{{cuerpo}}}'
+        puntos = [v for v in variantes if v in PUNTOS_DE_CORTE]
+        (por_punto[puntos[0]] if puntos else base).append(((pseudo != '', _orden(utilidad)), regla))
+    # Dentro de cada grupo las variantes (hover, focus...) van al final para ganar en la cascada
+    partes = [PREFLIGHT] + [regla for _, regla in sorted(base, key=lambda r: r[0])]
+    for punto, reglas in por_punto.items():
+        if reglas:
+            partes.append(f'@media (min-width: {PUNTOS_DE_CORTE[punto]}){{'
+                          + ''.join(regla for _, regla in sorted(reglas, key=lambda r: r[0])) + '}')
+    return '\n'.join(partes) + '\n', desconocidas
+
+
+def construir(plantilla):
+    """Publica estilos.<hash>.css (ver estaticos.py). Devuelve (ruta, bytes, clases_desconocidas)."""
+    css, desconocidas = generar_css(clases_de_plantilla(plantilla))
+    ruta, tamano = publicar('css/estilos.css', css)
+    return ruta, tamano, desconocidas
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app_de_excel import HTML_TEMPLATE, RESULTADOS_TEMPLATE
+
+    ruta, tamano, desconocidas = construir(HTML_TEMPLATE + RESULTADOS_TEMPLATE)
+    print(f"static/{ruta}: {tamano} bytes")
+    if desconocidas:
+        print("Clases sin utilidad (propias de la plantilla o a anadir aqui):", ' '.join(sorted(desconocidas)))
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# Esquema declarativo de los campos del formulario.
+# Cada campo se declara una sola vez (nombre, etiqueta, unidad, opciones de los <select>,
+# rango plausible); de aqui salen las listas de entradas del grafo, los valores iniciales
+# del formulario, los bucles de la plantilla y el parser compilado que convierte
+# request.form (o un JSON) en un RegistroPaciente en una sola pasada.
+
+from dataclasses import dataclass
+from operator import attrgetter
+
+
+def get_float(val):
+    """Convierte un valor del formulario a float; vacio o invalido -> None."""
+    if val is None or val == '':
+        return None
+    try:
+        # Reemplaza comas por puntos para permitir formatos decimales.
+        return float(str(val).replace(',', '.'))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class Campo:
+    nombre: str
+    etiqueta: str
+    grupo: str                 # bloque del formulario donde se muestra
+    unidad: str = ''           # placeholder del <input> numerico
+    opciones: tuple = ()       # <select>: ((valor, texto), ...); vacio = campo numerico
+    inicial: str = ''          # valor inicial del formulario (texto de relleno en los <select>)
+    rango: tuple = None        # (minimo, maximo) plausible; fuera de rango solo genera advertencia
+
+    @property
+    def es_seleccion(self):
+        return bool(self.opciones)
+
+    def para_plantilla(self):
+        """(etiqueta, nombre, placeholder, tipo, opciones), como los bucles de la plantilla."""
+        if self.es_seleccion:
+            return (self.etiqueta, self.nombre, self.inicial, 'select', list(self.opciones))
+        return (self.etiqueta, self.nombre, self.unidad, 'number', None)
+
+
+CAMPOS = [
+    # 1. Datos Antropometricos
+    Campo('sexo', 'Sexo:', 'antropometricos', opciones=(('H', 'Hombre'), ('M', 'Mujer')), inicial='H'),
+    Campo('edad_anos', 'Edad (anos):', 'antropometricos', 'anos', rango=(0, 120)),
+    Campo('peso_kg', 'Peso (Kg):', 'antropometricos', 'Kg', rango=(0.5, 400)),
+    Campo('talla_m', 'Talla (m):', 'antropometricos', 'm', rango=(0.3, 2.5)),
+    # 2. Signos Vitales
+    Campo('tas', 'TAS:', 'signos_vitales', 'mmHg', rango=(20, 300)),
+    Campo('tad', 'TAD:', 'signos_vitales', 'mmHg', rango=(10, 200)),
+    Campo('fc', 'FC:', 'signos_vitales', 'lpm', rango=(10, 300)),
+    Campo('sato2_sv', 'SatO₂ Pulsioximetria:', 'signos_vitales', '%', rango=(0, 100)),
+    # 3. Gasometria Arterial
+    Campo('ph_a', 'pH:', 'gasometria_arterial', 'pH', rango=(6.5, 8.0)),
+    Campo('paco2', 'PaCO₂:', 'gasometria_arterial', 'mmHg', rango=(5, 200)),
+    Campo('pao2', 'PaO₂:', 'gasometria_arterial', 'mmHg', rango=(10, 700)),
+    Campo('sato2_a', 'SatO₂ (a):', 'gasometria_arterial', '%', rango=(0, 100)),
+    Campo('lactato', 'Lactato:', 'gasometria_arterial', 'mmol/L', rango=(0, 30)),
+    Campo('hb', 'Hb (g/dL):', 'gasometria_arterial', 'g/dL', rango=(1, 25)),
+    # Gasometria Venosa
+    Campo('ph_v', 'pHv:', 'gasometria_venosa', 'pH', rango=(6.5, 8.0)),
+    Campo('pvco2', 'PvCO₂:', 'gasometria_venosa', 'mmHg', rango=(5, 200)),
+    Campo('pvo2', 'PvO₂:', 'gasometria_venosa', 'mmHg', rango=(5, 700)),
+    Campo('satvo2', 'SatvO₂:', 'gasometria_venosa', '%', rango=(0, 100)),
+    # 4. Macrodinamia (POCUS)
+    Campo('vti', 'VTI:', 'macrodinamia', 'cm', rango=(1, 60)),
+    Campo('tsvi', 'TSVI:', 'macrodinamia', 'cm', rango=(0.5, 4)),
+    Campo('vci', 'VCI:', 'macrodinamia', 'cm', rango=(0.1, 4)),
+    Campo('pvc_medido', 'PVC Medido:', 'macrodinamia', 'mmHg', rango=(-5, 40)),
+    Campo('vci_colaps', 'VCI Colaps.:', 'macrodinamia', inicial='Selecciona Colapso',
+          opciones=(('total', 'Total'), ('>50%', '>50%'), ('<50%', '<50%'), ('No cambios', 'No cambios'))),
+    # 5. Hemodinamia (VI)
+    Campo('mapse_l', 'MAPSE L:', 'hemodinamia_vi', 'cm', rango=(0, 40)),
+    Campo('mapse_s', 'MAPSE S:', 'hemodinamia_vi', 'cm', rango=(0, 40)),
+    Campo('e_onda', 'E (onda):', 'hemodinamia_vi', 'm/s', rango=(0, 3)),
+    Campo('a_onda', 'A (onda):', 'hemodinamia_vi', 'm/s', rango=(0, 3)),
+    Campo('eprim_lat', "E' lat:", 'hemodinamia_vi', 'cm/s', rango=(0, 30)),
+    Campo('eprim_med', "E' med:", 'hemodinamia_vi', 'cm/s', rango=(0, 30)),
+    Campo('vfs', 'VFS:', 'hemodinamia_vi', 'ml', rango=(5, 500)),
+    Campo('vfd', 'VFD:', 'hemodinamia_vi', 'ml', rango=(10, 600)),
+    Campo('long_vi', 'Long. VI:', 'hemodinamia_vi', 'cm', rango=(1, 150)),
+    # Hemodinamia (VD)
+    Campo('vtmax', 'VTmax:', 'hemodinamia_vd', 'm/s', rango=(0, 7)),
+    Campo('tapse', 'TAPSE:', 'hemodinamia_vd', 'mm', rango=(0, 50)),
+    Campo('vti_pulmonar', 'VTI Pulmonar:', 'hemodinamia_vd', 'cm', rango=(1, 50)),
+    # 6. Datos Ventilatorios
+    Campo('modo', 'MODO:', 'ventilatorio', opciones=(('PCV', 'PCV'), ('VCV', 'VCV')), inicial='Selecciona Modo'),
+    Campo('vt_protec', 'VT protec. (ml/kg):', 'ventilatorio', 'ml/kg', rango=(2, 15)),
+    Campo('vt_ventilador', 'VT Ventilador (ml):', 'ventilatorio', 'ml', rango=(50, 2000)),
+    Campo('fr', 'FR (lpm):', 'ventilatorio', 'lpm', rango=(1, 80)),
+    Campo('peco2', 'PeCO₂ (mmHg):', 'ventilatorio', 'mmHg', rango=(0, 150)),
+    Campo('peep', 'PEEP (cmH₂O):', 'ventilatorio', 'cmH₂O', rango=(0, 30)),
+    Campo('fio2', 'FIO₂ (0.x):', 'ventilatorio', '0.x', rango=(0.21, 1)),
+    Campo('plateau', 'Plateau (cmH₂O):', 'ventilatorio', 'cmH₂O', rango=(0, 80)),
+    Campo('ppico', 'Ppico (cmH₂O):', 'ventilatorio', 'cmH₂O', rango=(0, 100)),
+    Campo('cstat_input', 'Cstat (medida):', 'ventilatorio', 'ml/cmH₂O', rango=(1, 200)),
+    Campo('cdin_input', 'Cdin (medida):', 'ventilatorio', 'ml/cmH₂O', rango=(1, 200)),
+    Campo('v_min', 'V/min (L/min):', 'ventilatorio', 'L/min', rango=(0.5, 40)),
+    Campo('pocc', 'POCC (cmH₂O):', 'ventilatorio', 'cmH₂O', rango=(0, 50)),
+    # 7. Monitorizacion Neurocritica
+    Campo('vs_acm', 'VS (ACM):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vd_acm', 'VD (ACM):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vs_ab', 'VS (AB):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vd_ab', 'VD (AB):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vaso_dtc', 'Arteria Medida:', 'neurocritico', inicial='Selecciona Arteria',
+          opciones=(('ACM', 'ACM'), ('ACA', 'ACA'), ('ACP', 'ACP'), ('AB', 'AB'))),
+    Campo('vs_dtc', 'VS (Gen.):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vd_dtc', 'VD (Gen.):', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vm_aci', 'VM Art. Carotida Int.:', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vm_ave', 'VM Art. Vertebral:', 'neurocritico', 'cm/s', rango=(0, 300)),
+    Campo('vno_der', 'VNO Der. (mm):', 'neurocritico', 'mm', rango=(1, 10)),
+    Campo('vno_izq', 'VNO Izq. (mm):', 'neurocritico', 'mm', rango=(1, 10)),
+    Campo('vno_dgo', 'DGO (mm):', 'neurocritico', 'mm', rango=(10, 40)),
+    Campo('ph_jo2', 'pH jO₂:', 'neurocritico', 'pH', rango=(6.5, 8.0)),
+    Campo('paco2_jo2', 'PjCO₂:', 'neurocritico', 'mmHg', rango=(5, 200)),
+    Campo('pao2_jo2', 'PjO₂:', 'neurocritico', 'mmHg', rango=(5, 700)),
+    Campo('sato2_jo2', 'SjO₂:', 'neurocritico', '%', rango=(0, 100)),
+    Campo('lactato_jo2', 'Lactato jO₂:', 'neurocritico', 'mmol/L', rango=(0, 30)),
+]
+
+CAMPOS_POR_NOMBRE = {campo.nombre: campo for campo in CAMPOS}
+ENTRADAS_NUMERICAS = [campo.nombre for campo in CAMPOS if not campo.es_seleccion]
+ENTRADAS_SELECCION = [campo.nombre for campo in CAMPOS if campo.es_seleccion]
+VALORES_INICIALES = {campo.nombre: campo.inicial for campo in CAMPOS}
+
+_GRUPOS = {}
+for _campo in CAMPOS:
+    _GRUPOS.setdefault(_campo.grupo, []).append(_campo.para_plantilla())
+del _campo
+
+
+def campos_de_grupo(grupo):
+    """Filas (etiqueta, nombre, placeholder, tipo, opciones) de un bloque del formulario."""
+    return _GRUPOS[grupo]
+
+
+# --- REGISTRO DE PACIENTE ---
+class RegistroPaciente:
+    """
+    Entradas de un paciente ya normalizadas: numeros como float (o None) y selecciones como texto.
+    'crudos' conserva lo que escribio el usuario para volver a mostrarlo en el formulario.
+    """
+    __slots__ = tuple(campo.nombre for campo in CAMPOS) + ('crudos', 'hay_datos')
+
+    _valores = attrgetter(*(campo.nombre for campo in CAMPOS))
+
+    def clave(self):
+        """Tupla canonica de las entradas ('7,35' y '7.35' dan la misma clave)."""
+        return self._valores(self)
+
+    def get(self, nombre, defecto=None):
+        return getattr(self, nombre, defecto)
+
+    def a_dict(self):
+        return dict(zip(CAMPOS_POR_NOMBRE, self.clave()))
+
+    def advertencias(self):
+        """Campos fuera de su rango plausible u opciones de <select> desconocidas (no bloquean el calculo)."""
+        avisos = []
+        for campo in CAMPOS:
+            valor = getattr(self, campo.nombre)
+            if valor is None:
+                continue
+            if campo.es_seleccion:
+                if valor and valor != campo.inicial and valor not in dict(campo.opciones):
+                    avisos.append(f"{campo.nombre}: opcion desconocida '{valor}'")
+            elif campo.rango and not (campo.rango[0] <= valor <= campo.rango[1]):
+                avisos.append(f"{campo.nombre}: {valor:g} fuera del rango plausible {campo.rango[0]}-{campo.rango[1]}")
+        return avisos
+
+
+def compilar_parser(con_iniciales):
+    """
+    Genera un parser en linea recta: lee cada campo una sola vez y lo convierte segun su tipo.
+    Los numeros se intentan primero con float() directo; solo si fallan se prueba la coma decimal
+    (mismo resultado que get_float(), sin el str().replace() en cada campo).
+    Con 'con_iniciales' los campos ausentes toman el valor inicial del formulario.
+    """
+    lineas = ['def _parsear(datos, R, get_float):',
+              '    r = R.__new__(R)',
+              '    leer = datos.get',
+              '    crudos = {}']
+    for campo in CAMPOS:
+        nombre = campo.nombre
+        lectura = f'leer({nombre!r}, {campo.inicial!r})' if con_iniciales else f'leer({nombre!r})'
+        lineas.append(f'    v = crudos[{nombre!r}] = {lectura}')
+        if campo.es_seleccion:
+            lineas.append(f'    r.{nombre} = v if v is None or v.__class__ is str else str(v)')
+            continue
+        lineas += [
+            "    if v is None or v == '':",
+            f'        r.{nombre} = None',
+            '    elif v.__class__ is str:',
+            '        try:',
+            f'            r.{nombre} = float(v)',
+            '        except ValueError:',
+            f'            r.{nombre} = get_float(v)',
+            '    else:',
+            f'        r.{nombre} = get_float(v)',
+        ]
+    lineas += ['    r.crudos = crudos',
+               '    r.hay_datos = any(crudos.values())',
+               '    return r']
+    espacio = {}
+    exec(compile('\n'.join(lineas), '<parser de entradas>', 'exec'), espacio)
+    funcion = espacio['_parsear']
+    return lambda datos: funcion(datos, RegistroPaciente, get_float)
+
+
+# request.form del formulario HTML: los campos que no llegan toman su valor inicial
+parsear_formulario = compilar_parser(con_iniciales=True)
+# JSON de la API / filas de un lote: lo que no llega queda vacio
+parsear_entradas = compilar_parser(con_iniciales=False)
+
+
+def como_registro(entradas):
+    """Acepta un RegistroPaciente o un diccionario de entradas (API, scripts) y devuelve el registro."""
+    return entradas if isinstance(entradas, RegistroPaciente) else parsear_entradas(entradas)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+# Archivos estaticos generados (CSS de construir_css.py, JS de generar_js.py).
+# Cada uno se publica como static/<carpeta>/<base>.<hash>.<ext>: el nombre cambia con el
+# contenido y puede cachearse para siempre. static/manifiesto.json asocia el nombre logico
+# ('css/estilos.css') con el archivo vigente ('css/estilos.e3c071c23c.css').
+
+import hashlib
+import json
+import os
+import re
+
+DIRECTORIO_ESTATICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+MANIFIESTO = os.path.join(DIRECTORIO_ESTATICOS, 'manifiesto.json')
+
+
+def leer_manifiesto(ruta=MANIFIESTO):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def publicar(nombre_logico, contenido):
+    """Escribe el archivo con hash, borra sus versiones anteriores y actualiza el manifiesto."""
+    carpeta, archivo = os.path.split(nombre_logico)
+    base, extension = os.path.splitext(archivo)
+    datos = contenido.encode('utf-8')
+    nombre = f"{base}.{hashlib.sha256(datos).hexdigest()[:10]}{extension}"
+    directorio = os.path.join(DIRECTORIO_ESTATICOS, carpeta)
+    os.makedirs(directorio, exist_ok=True)
+    patron = re.compile(re.escape(base) + r'\.[0-9a-f]+' + re.escape(extension))
+    for anterior in os.listdir(directorio):
+        if patron.fullmatch(anterior) and anterior != nombre:
+            os.remove(os.path.join(directorio, anterior))
+    with open(os.path.join(directorio, nombre), 'wb') as f:
+        f.write(datos)
+    manifiesto = leer_manifiesto()
+    manifiesto[nombre_logico] = f'{carpeta}/{nombre}' if carpeta else nombre
+    with open(MANIFIESTO, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(manifiesto.items())), f, indent=2)
+        f.write('\n')
+    return manifiesto[nombre_logico], len(datos)
@@ -0,0 +1,611 @@
+# -*- coding: utf-8 -*-
+#
+# Compilador de las formulas de datos.xlsx a Python.
+# Lee las formulas de las hojas HOJAS_PANEL con openpyxl, las traduce a expresiones
+# Python, las ordena por dependencias y genera una funcion en linea recta para todo
+# el libro mas una funcion por celda. El codigo compilado se guarda en disco junto
+# al libro ('datos.xlsx.formulas.pkl') y se reutiliza mientras el libro no cambie.
+#
+# Semantica de errores: una celda cuyo calculo falla (#DIV/0!, #VALUE!, celda vacia
+# usada en una operacion) vale None, igual que los nodos de grafo_formulas.
+#
+# Con FORMULAS_DESDE_EXCEL=1 manda el libro: sus formulas sustituyen a las escritas a mano
+# (salvo ESCRITOS_A_MANO) y las diferencias con el ejemplo del libro quedan en el log.
+#
+# Uso: python formulas_excel.py                -> diferencias con los datos de ejemplo del libro
+#      python formulas_excel.py --verificar N  -> ademas, nodos que difieren en N pacientes de prueba
+
+import importlib.util
+import logging
+import marshal
+import math
+import re
+from dataclasses import dataclass
+
+from cache_excel import leer_con_cache
+
+VERSION_COMPILADOR = 3
+
+logger = logging.getLogger(__name__)
+
+# --- CORRESPONDENCIA CELDA -> NODO DEL GRAFO ---
+# Valor: nombre del nodo/entrada, o (nombre, factor) cuando el libro usa otra escala:
+# valor en el libro = valor del grafo * factor. Vale para entradas (las saturaciones del libro
+# son fracciones; el formulario las pide en %) y para formulas (EM y CEO2 son fracciones en el
+# libro y % en los paneles; el libro da el strain MAPSE en valor absoluto).
+CELDAS = {
+    # Panel
+    'Panel!D5': 'sexo', 'Panel!D6': 'edad_anos', 'Panel!D7': 'peso_kg', 'Panel!D8': 'talla_m',
+    'Panel!D9': 'imc', 'Panel!D10': 'sct', 'Panel!D11': 'pi', 'Panel!D12': 'act',
+    'Panel!D18': 'tas', 'Panel!D19': 'tad', 'Panel!D20': 'tam', 'Panel!D21': 'fc', 'Panel!D22': 'sato2_sv',
+    'Panel!D27': 'hb', 'Panel!D30': 'ph_a', 'Panel!D31': 'paco2', 'Panel!D32': 'pao2',
+    'Panel!D33': ('sato2_a', 0.01), 'Panel!D34': 'lactato',
+    'Panel!D37': 'ph_v', 'Panel!D38': 'pvco2', 'Panel!D39': 'pvo2', 'Panel!D40': ('satvo2', 0.01),
+    # Microdinamia
+    'Microdinamia!D5': 'cao2', 'Microdinamia!D6': 'cvo2', 'Microdinamia!D7': 'cco2', 'Microdinamia!D8': 'davo2',
+    'Microdinamia!D9': 'vo2', 'Microdinamia!D10': 'vo2i', 'Microdinamia!D11': 'do2', 'Microdinamia!D12': 'do2i',
+    'Microdinamia!D13': 'exto2', 'Microdinamia!D15': 'davco2', 'Microdinamia!D18': 'gc_fick',
+    # Macrodinamia
+    'Macrodinamia!D7': 'vti', 'Macrodinamia!D8': 'tsvi', 'Macrodinamia!D9': 'tsvi_inf',
+    'Macrodinamia!D10': 'vs_macro', 'Macrodinamia!D11': 'gc', 'Macrodinamia!D12': 'ic',
+    'Macrodinamia!D13': 'vci', 'Macrodinamia!D14': 'vci_colaps', 'Macrodinamia!D15': 'pvc_eco',
+    'Macrodinamia!D16': 'pvc_medido', 'Macrodinamia!D17': 'rvs', 'Macrodinamia!D18': 'rvsi',
+    'Macrodinamia!D21': 'mapse_l', 'Macrodinamia!D22': 'mapse_s', 'Macrodinamia!D23': 'e_onda',
+    'Macrodinamia!D24': 'a_onda', 'Macrodinamia!D25': 'e_a', 'Macrodinamia!D26': 'eprim_lat',
+    'Macrodinamia!D27': 'eprim_med', 'Macrodinamia!D28': 'eprim_prom', 'Macrodinamia!D29': 'e_eprim',
+    'Macrodinamia!D30': 'vfs', 'Macrodinamia!D31': 'vfd', 'Macrodinamia!D32': 'fevi_simp',
+    'Macrodinamia!D33': 'long_vi', 'Macrodinamia!D34': ('strain_mapse', -1), 'Macrodinamia!D35': 'ea',
+    'Macrodinamia!D36': 'ee', 'Macrodinamia!D37': 'ava', 'Macrodinamia!D38': 'power_c',
+    'Macrodinamia!D40': 'welch', 'Macrodinamia!D41': 'vtmax', 'Macrodinamia!D42': 'gradiente_it',
+    'Macrodinamia!D43': 'tapse', 'Macrodinamia!D44': 'vti_pulmonar', 'Macrodinamia!D45': 'psap',
+    'Macrodinamia!D46': 'pmap', 'Macrodinamia!D47': 'rvs_pulm', 'Macrodinamia!D48': 'rvs_pulm_in',
+    'Macrodinamia!D49': 'avd',
+    # Ventilatorio (D24 V/min es formula en el libro pero entrada en el formulario: no se mapea)
+    'Ventilatorio!D6': 'modo', 'Ventilatorio!D7': 'peso_sdra', 'Ventilatorio!D8': 'vt_protec',
+    'Ventilatorio!D9': 'vt_protec_calc', 'Ventilatorio!D10': 'vt_ventilador', 'Ventilatorio!D11': 'fr',
+    'Ventilatorio!D13': 'peco2', 'Ventilatorio!D14': 'peep', 'Ventilatorio!D15': 'fio2',
+    'Ventilatorio!D16': 'plateau', 'Ventilatorio!D17': 'driving_p', 'Ventilatorio!D18': 'ppico',
+    'Ventilatorio!D19': 'cstat_input', 'Ventilatorio!D20': 'cstat_calc', 'Ventilatorio!D21': 'cdin_input',
+    'Ventilatorio!D22': 'cdin_calc', 'Ventilatorio!D23': 'raw', 'Ventilatorio!D25': 'pocc',
+    'Ventilatorio!D28': ('em', 0.01), 'Ventilatorio!D29': 'ev', 'Ventilatorio!D30': 'shunt',
+    'Ventilatorio!D31': 'pm', 'Ventilatorio!D32': 'ppmt',
+    # Neurocritico (la columna ACP del libro alimenta el DTC generico del formulario)
+    'Neurocritico!H6': 'vm_aci', 'Neurocritico!H7': 'vm_ave',
+    'Neurocritico!D9': 'vs_acm', 'Neurocritico!D10': 'vd_acm', 'Neurocritico!D11': 'vm_acm',
+    'Neurocritico!D12': 'ip_acm', 'Neurocritico!D13': 'ir_acm',
+    'Neurocritico!G9': 'vs_ab', 'Neurocritico!G10': 'vd_ab', 'Neurocritico!G11': 'vm_ab',
+    'Neurocritico!G12': 'ip_ab', 'Neurocritico!G13': 'ir_ab',
+    'Neurocritico!J9': 'vs_dtc', 'Neurocritico!J10': 'vd_dtc', 'Neurocritico!J11': 'vm_dtc',
+    'Neurocritico!J12': 'ip_dtc', 'Neurocritico!J13': 'ir_dtc',
+    'Neurocritico!D14': 'pic', 'Neurocritico!D15': 'ppc', 'Neurocritico!E17': 'il', 'Neurocritico!E18': 'isou',
+    'Neurocritico!D21': 'vno_der', 'Neurocritico!D22': 'vno_izq', 'Neurocritico!D23': 'vno_dgo',
+    'Neurocritico!D24': 'vno_dgo_calc',
+    'Neurocritico!H21': 'ph_jo2', 'Neurocritico!H22': 'paco2_jo2', 'Neurocritico!H23': 'pao2_jo2',
+    'Neurocritico!H24': ('sato2_jo2', 0.01), 'Neurocritico!H25': 'lactato_jo2',
+    'Neurocritico!D30': 'avdo2', 'Neurocritico!D31': ('ceo2', 0.01), 'Neurocritico!D33': 'cvjo2',
+}
+
+# Nodos que siguen escritos a mano aunque el libro tenga su formula, con el motivo. Cualquier
+# otra diferencia la decide el libro.
+ESCRITOS_A_MANO = {
+    'pic': "el grafo acota la PIC estimada en 0; el libro la da negativa con IP < 0.12",
+    'pvc_eco': "sin VCI el formulario usa la PVC medida, que no existe en el libro",
+    'pm': "el libro compara el modo con 'PVC' y el formulario envia 'PCV'",
+}
+
+# --- TRADUCCION DE FORMULAS ---
+_TOKEN = re.compile(r'''
+    (?P<espacio>\s+)
+  | (?P<texto>"(?:[^"]|"")*")
+  | (?P<celda>(?:(?:'[^']+'|[A-Za-z_][\w.]*)!)?\$?[A-Za-z]{1,3}\$?\d+(?![\w(]))
+  | (?P<funcion>[A-Za-z][A-Za-z0-9.]*(?=\())
+  | (?P<numero>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<logico>TRUE|FALSE|VERDADERO|FALSO)
+  | (?P<operador><=|>=|<>|[-+*/^&=<>(),;:%])
+''', re.VERBOSE | re.IGNORECASE)
+
+_COMPARACIONES = {'=': '==', '<>': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>='}
+
+# Funciones de Excel soportadas -> (aridad minima, aridad maxima, plantilla)
+_FUNCIONES = {
+    'IF': (2, 3, None),
+    'AND': (1, None, 'all(({},))'),
+    'OR': (1, None, 'any(({},))'),
+    'NOT': (1, 1, '(not {})'),
+    'ABS': (1, 1, 'abs({})'),
+    'SQRT': (1, 1, '_sqrt({})'),
+    'LN': (1, 1, '_ln({})'),
+    'LOG10': (1, 1, '_log10({})'),
+    'EXP': (1, 1, '_exp({})'),
+    'POWER': (2, 2, '_pot({})'),
+    'MAX': (1, None, 'max(({},))'),
+    'MIN': (1, None, 'min(({},))'),
+    'ROUND': (2, 2, '_redondear({})'),
+    'PI': (0, 0, '_PI'),
+}
+
+
+def _redondear(valor, decimales):
+    """ROUND de Excel: redondeo al alejarse de cero (Python redondea al par)."""
+    factor = 10 ** int(decimales)
+    return math.copysign(math.floor(abs(valor) * factor + 0.5) / factor, valor)
+
+
+# Nombres disponibles para el codigo generado
+_ENTORNO = {
+    '_pot': math.pow, '_sqrt': math.sqrt, '_ln': math.log, '_log10': math.log10, '_exp': math.exp,
+    '_redondear': _redondear, '_PI': math.pi,
+    '_ERRORES': (TypeError, ValueError, ZeroDivisionError, OverflowError),
+}
+
+
+def normalizar_celda(referencia, hoja_actual):
+    """'$D$8' en Macrodinamia -> 'Macrodinamia!D8'; "'Hoja 1'!a1" -> 'Hoja 1!A1'."""
+    hoja, _, celda = referencia.rpartition('!')
+    hoja = hoja.strip("'") or hoja_actual
+    return f"{hoja}!{celda.replace('$', '').upper()}"
+
+
+def _tokenizar(formula):
+    tokens = []
+    posicion = 0
+    while posicion < len(formula):
+        encontrado = _TOKEN.match(formula, posicion)
+        if encontrado is None:
+            raise ValueError(f"Caracter no reconocido en '{formula}' (posicion {posicion})")
+        posicion = encontrado.end()
+        tipo = encontrado.lastgroup
+        if tipo != 'espacio':
+            tokens.append((tipo, encontrado.group()))
+    return tokens
+
+
+class _Traductor:
+    """Analizador descendente recursivo: formula de Excel -> expresion Python."""
+
+    def __init__(self, formula, hoja, nombre_variable):
+        self.formula = formula
+        self.hoja = hoja
+        self.nombre_variable = nombre_variable
+        self.tokens = _tokenizar(formula.lstrip('='))
+        self.posicion = 0
+        self.referencias = []
+
+    def traducir(self):
+        expresion = self._comparacion()
+        if self.posicion != len(self.tokens):
+            raise ValueError(f"Sobra texto en la formula '{self.formula}'")
+        return expresion
+
+    def _siguiente(self):
+        return self.tokens[self.posicion] if self.posicion < len(self.tokens) else (None, None)
+
+    def _consumir(self, valor=None):
+        tipo, texto = self._siguiente()
+        if tipo is None or (valor is not None and texto != valor):
+            raise ValueError(f"Se esperaba '{valor}' en la formula '{self.formula}'")
+        self.posicion += 1
+        return tipo, texto
+
+    def _binario(self, operadores, siguiente_nivel, traducir_operador):
+        izquierda = siguiente_nivel()
+        while self._siguiente()[0] == 'operador' and self._siguiente()[1] in operadores:
+            _, operador = self._consumir()
+            izquierda = traducir_operador(operador, izquierda, siguiente_nivel())
+        return izquierda
+
+    # Precedencia de Excel (de menor a mayor): comparacion, &, + -, * /, ^, signo
+    def _comparacion(self):
+        return self._binario(_COMPARACIONES, self._concatenacion,
+                             lambda op, a, b: f'({a} {_COMPARACIONES[op]} {b})')
+
+    def _concatenacion(self):
+        return self._binario(('&',), self._suma, lambda op, a, b: f'(str({a}) + str({b}))')
+
+    def _suma(self):
+        return self._binario(('+', '-'), self._producto, lambda op, a, b: f'({a} {op} {b})')
+
+    def _producto(self):
+        return self._binario(('*', '/'), self._potencia, lambda op, a, b: f'({a} {op} {b})')
+
+    def _potencia(self):
+        return self._binario(('^',), self._signo, lambda op, a, b: f'_pot({a}, {b})')
+
+    def _signo(self):
+        tipo, texto = self._siguiente()
+        if tipo == 'operador' and texto in ('-', '+'):
+            self._consumir()
+            return f'({texto}{self._signo()})'
+        return self._primario()
+
+    def _primario(self):
+        tipo, texto = self._consumir()
+        if tipo == 'numero':
+            return repr(float(texto)) if ('.' in texto or 'e' in texto.lower()) else texto
+        if tipo == 'texto':
+            return repr(texto[1:-1].replace('""', '"'))
+        if tipo == 'logico':
+            return 'True' if texto.upper() in ('TRUE', 'VERDADERO') else 'False'
+        if tipo == 'celda':
+            if self._siguiente() == ('operador', ':'):
+                raise ValueError(f"Rangos no soportados en la formula '{self.formula}'")
+            celda = normalizar_celda(texto, self.hoja)
+            if celda not in self.referencias:
+                self.referencias.append(celda)
+            return self.nombre_variable(celda)
+        if tipo == 'funcion':
+            return self._funcion(texto.upper())
+        if texto == '(':
+            expresion = self._comparacion()
+            self._consumir(')')
+            return expresion
+        raise ValueError(f"Elemento inesperado '{texto}' en la formula '{self.formula}'")
+
+    def _funcion(self, nombre):
+        if nombre not in _FUNCIONES:
+            raise ValueError(f"Funcion de Excel no soportada: {nombre}")
+        self._consumir('(')
+        argumentos = []
+        if self._siguiente() != ('operador', ')'):
+            argumentos.append(self._comparacion())
+            while self._siguiente()[1] in (',', ';'):
+                self._consumir()
+                argumentos.append(self._comparacion())
+        self._consumir(')')
+        minimo, maximo, plantilla = _FUNCIONES[nombre]
+        if len(argumentos) < minimo or (maximo is not None and len(argumentos) > maximo):
+            raise ValueError(f"Numero de argumentos invalido para {nombre} en '{self.formula}'")
+        if nombre == 'IF':
+            # IF sin rama falsa: Excel devuelve FALSE; aqui se trata como "sin resultado"
+            falso = argumentos[2] if len(argumentos) == 3 else 'None'
+            return f'({argumentos[1]} if {argumentos[0]} else {falso})'
+        return plantilla.format(', '.join(argumentos))
+
+
+# --- LECTURA Y COMPILACION DEL LIBRO ---
+def leer_libro(ruta_excel, hojas):
+    """
+    Formulas y constantes de las hojas indicadas: ({celda: formula}, {celda: valor}).
+    Los textos y numeros sueltos son constantes; las etiquetas tambien, pero solo importan
+    las que alguna formula referencia.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta_excel, read_only=True, data_only=False)
+    formulas, constantes = {}, {}
+    try:
+        for hoja in hojas:
+            for fila in libro[hoja].iter_rows():
+                for celda in fila:
+                    valor = celda.value
+                    if valor is None or not hasattr(celda, 'coordinate'):
+                        continue
+                    clave = f'{hoja}!{celda.coordinate}'
+                    if isinstance(valor, str) and valor.startswith('='):
+                        formulas[clave] = valor
+                    elif isinstance(valor, (int, float, str)):
+                        constantes[clave] = valor
+    finally:
+        libro.close()
+    return formulas, constantes
+
+
+def _orden_topologico(dependencias):
+    """Celdas de formula en orden de calculo; ValueError si hay referencias circulares."""
+    orden, estado = [], {}
+
+    def visitar(celda, camino):
+        if estado.get(celda) == 'hecho':
+            return
+        if estado.get(celda) == 'visitando':
+            raise ValueError("Referencia circular: " + ' -> '.join(camino + [celda]))
+        estado[celda] = 'visitando'
+        for dep in dependencias[celda]:
+            if dep in dependencias:
+                visitar(dep, camino + [celda])
+        estado[celda] = 'hecho'
+        orden.append(celda)
+
+    for celda in dependencias:
+        visitar(celda, [])
+    return tuple(orden)
+
+
+def generar_codigo(formulas, constantes):
+    """
+    Fuente Python del libro: una funcion evaluar_libro(entradas) en linea recta, fiel al libro,
+    y una funcion celda_<i>(...) por formula para enchufar celdas sueltas al grafo (estas
+    devuelven None en lugar de los textos de error del libro).
+    """
+    variables = {}
+
+    def nombre_variable(celda):
+        if celda not in variables:
+            variables[celda] = f'v_{len(variables)}'
+        return variables[celda]
+
+    expresiones, dependencias = {}, {}
+    for celda, formula in formulas.items():
+        traductor = _Traductor(formula, celda.split('!')[0], nombre_variable)
+        expresiones[celda] = traductor.traducir()
+        dependencias[celda] = tuple(traductor.referencias)
+    orden = _orden_topologico(dependencias)
+    entradas = sorted({dep for deps in dependencias.values() for dep in deps if dep not in formulas},
+                      key=lambda celda: variables[celda])
+
+    lineas = []
+    for indice, celda in enumerate(orden):
+        lineas.append(f'def celda_{indice}({", ".join(variables[dep] for dep in dependencias[celda])}):  # {celda}')
+        lineas.append('    try:')
+        if '"' in formulas[celda]:
+            # Textos devueltos por la formula ("Error") -> sin resultado, como en el grafo
+            lineas.append(f'        valor = {expresiones[celda]}')
+            lineas.append('        return None if valor.__class__ is str else valor')
+        else:
+            lineas.append(f'        return {expresiones[celda]}')
+        lineas.append('    except _ERRORES:')
+        lineas.append('        return None')
+    lineas.append('def evaluar_libro(entradas):')
+    for celda in entradas:
+        lineas.append(f'    {variables[celda]} = entradas.get({celda!r}, {constantes.get(celda)!r})')
+    for celda in orden:
+        variable = nombre_variable(celda)
+        lineas.append('    try:')
+        lineas.append(f'        {variable} = {expresiones[celda]}  # {celda}')
+        lineas.append('    except _ERRORES:')
+        lineas.append(f'        {variable} = None')
+    lineas.append('    return {' + ', '.join(f'{celda!r}: {variables[celda]}' for celda in orden) + '}')
+    return '\n'.join(lineas) + '\n', orden, dependencias, {celda: constantes.get(celda) for celda in entradas}
+
+
+@dataclass
+class LibroCompilado:
+    """Formulas del libro compiladas: orden de calculo, referencias y funciones Python."""
+    formulas: dict        # celda -> texto de la formula en el libro
+    orden: tuple          # celdas de formula en orden de calculo
+    dependencias: dict    # celda -> celdas referenciadas
+    entradas: dict        # celdas constantes referenciadas -> valor en el libro
+    funciones: dict       # celda -> funcion de sus referencias
+    evaluar: object       # evaluar(entradas {celda: valor}) -> {celda: valor}
+
+
+def _compilar(ruta_excel, hojas):
+    formulas, constantes = leer_libro(ruta_excel, hojas)
+    fuente, orden, dependencias, entradas = generar_codigo(formulas, constantes)
+    codigo = compile(fuente, f'<formulas de {ruta_excel}>', 'exec')
+    return {'codigo': marshal.dumps(codigo), 'formulas': formulas, 'orden': orden,
+            'dependencias': dependencias, 'entradas': entradas}
+
+
+def compilar_libro(ruta_excel, hojas):
+    """
+    Compila las formulas de las hojas indicadas. El bytecode se cachea en disco; la clave incluye
+    la version de Python (el formato de marshal cambia entre versiones) y la del compilador.
+    """
+    hojas = list(hojas)
+    clave = (VERSION_COMPILADOR, importlib.util.MAGIC_NUMBER, hojas)
+    datos = leer_con_cache(ruta_excel, clave, lambda: _compilar(ruta_excel, hojas), sufijo='.formulas.pkl')
+    espacio = dict(_ENTORNO)
+    exec(marshal.loads(datos['codigo']), espacio)
+    funciones = {celda: espacio[f'celda_{indice}'] for indice, celda in enumerate(datos['orden'])}
+    return LibroCompilado(datos['formulas'], datos['orden'], datos['dependencias'], datos['entradas'],
+                          funciones, espacio['evaluar_libro'])
+
+
+# --- INTEGRACION CON EL GRAFO ---
+def _nombre_nodo(celda):
+    destino = CELDAS.get(celda)
+    if destino is None:
+        return 'xl_' + re.sub(r'\W', '_', celda)
+    return destino if isinstance(destino, str) else destino[0]
+
+
+def nodos_del_libro(libro):
+    """
+    Nodos de grafo_formulas equivalentes a las formulas del libro. Las celdas de formula sin nodo
+    propio (copias como Ventilatorio!D12 = Panel!D31) y las entradas reescaladas se exponen como
+    nodos 'xl_<Hoja>_<Celda>'. Las constantes que ni son entradas ni nodos quedan fijas.
+    """
+    from grafo_formulas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, NODOS, Nodo
+
+    entradas_formulario = set(ENTRADAS_NUMERICAS) | set(ENTRADAS_SELECCION)
+    nodos = {}
+
+    def referencia(celda):
+        destino = CELDAS.get(celda)
+        if destino is None or isinstance(destino, str):
+            if celda in libro.funciones:
+                return _nombre_nodo(celda)
+            return destino  # None: constante del libro
+        # Celda en otra escala (entrada o formula): las formulas del libro la leen en la suya
+        nombre, factor = destino
+        escalada = 'xl_' + re.sub(r'\W', '_', celda)
+        nodos[escalada] = Nodo(escalada, (nombre,), lambda valor, factor=factor: valor * factor)
+        return escalada
+
+    for celda in libro.orden:
+        nombre = _nombre_nodo(celda)
+        if nombre in entradas_formulario:
+            # El libro calcula lo que el formulario pide como dato (p. ej. V/min): manda el formulario
+            continue
+        argumentos = [(referencia(dep), libro.entradas.get(dep)) for dep in libro.dependencias[celda]]
+        dependencias = tuple(dep for dep, _ in argumentos if dep is not None)
+        funcion = libro.funciones[celda]
+        if len(dependencias) != len(argumentos):
+            fijos = [(dep, constante) for dep, constante in argumentos]
+
+            def funcion(*valores, funcion=funcion, fijos=fijos):
+                valores = iter(valores)
+                return funcion(*[next(valores) if dep is not None else constante for dep, constante in fijos])
+        if nombre not in NODOS and not nombre.startswith('xl_'):
+            continue
+        if not isinstance(CELDAS.get(celda, ''), str):
+            # Formula en otra escala: el nodo devuelve el valor en la escala del grafo
+            def funcion(*valores, funcion=funcion, factor=CELDAS[celda][1]):
+                valor = funcion(*valores)
+                return None if valor is None else valor / factor
+        # Solo las formulas con condiciones deciden que hacer con celdas vacias; en el resto
+        # una dependencia vacia da None sin llegar a llamar a la funcion
+        condicional = re.search(r'\b(IF|AND|OR|NOT)\(', libro.formulas[celda], re.IGNORECASE) is not None
+        nodos[nombre] = Nodo(nombre, dependencias, funcion, admite_vacios=condicional)
+    return nodos
+
+
+def usar_formulas_del_libro(ruta_excel, hojas):
+    """
+    Sustituye en grafo_formulas los nodos que tienen formula en el libro por las formulas
+    compiladas del libro. Los nodos sin celda (p. ej. Hemodinamia VD) y los de ESCRITOS_A_MANO
+    siguen escritos a mano. Las celdas cuyo valor cambia respecto al grafo con los datos de
+    ejemplo del libro se avisan en el log. Devuelve los nombres de los nodos reemplazados.
+    """
+    import grafo_formulas
+
+    libro = compilar_libro(ruta_excel, hojas)
+    diferencias = [d for d in diferencias_con_grafo(libro) if d[1] not in ESCRITOS_A_MANO]
+    if diferencias:
+        logger.warning("El libro cambia %d formulas escritas a mano (se usa la del libro): %s", len(diferencias),
+                       '; '.join(f"{nombre} ({celda}): {en_grafo!r} -> {en_libro!r}"
+                                 for celda, nombre, en_libro, en_grafo in diferencias))
+    nodos = {nombre: nodo for nombre, nodo in nodos_del_libro(libro).items() if nombre not in ESCRITOS_A_MANO}
+    grafo_formulas.NODOS.update(nodos)
+    for funcion_cacheada in (grafo_formulas.plan_de_evaluacion, grafo_formulas.plan_de_paneles,
+                             grafo_formulas._formulas_en_plan, grafo_formulas.compilar_plan,
+                             grafo_formulas._dependientes_directos):
+        funcion_cacheada.cache_clear()
+    return sorted(nombre for nombre in nodos if not nombre.startswith('xl_'))
+
+
+# --- COMPARACION LIBRO vs FORMULAS ESCRITAS A MANO ---
+def diferencias_con_grafo(libro, tolerancia=1e-6):
+    """
+    Evalua el libro con sus propios datos de ejemplo y el grafo con las mismas entradas,
+    y devuelve [(celda, nodo, valor_libro, valor_grafo)] para las celdas que no coinciden.
+    """
+    from grafo_formulas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, Evaluador
+
+    entradas_formulario = set(ENTRADAS_NUMERICAS) | set(ENTRADAS_SELECCION)
+    user_inputs = {}
+    for celda, valor in libro.entradas.items():
+        destino = CELDAS.get(celda)
+        if destino is None:
+            continue
+        nombre, factor = (destino, 1) if isinstance(destino, str) else destino
+        if nombre in entradas_formulario:
+            user_inputs[nombre] = valor / factor if isinstance(valor, (int, float)) else valor
+
+    valores_libro = libro.evaluar({})
+    evaluador = Evaluador(user_inputs)
+    diferencias = []
+    for celda in libro.orden:
+        destino = CELDAS.get(celda)
+        if destino is None:
+            continue
+        nombre, factor = (destino, 1) if isinstance(destino, str) else destino
+        if nombre in entradas_formulario:
+            continue
+        en_libro, en_grafo = valores_libro[celda], evaluador.valor(nombre)
+        if factor != 1 and isinstance(en_libro, (int, float)):
+            en_libro = en_libro / factor
+        iguales = (en_libro == en_grafo) or (
+            isinstance(en_libro, (int, float)) and isinstance(en_grafo, (int, float))
+            and math.isclose(en_libro, en_grafo, rel_tol=tolerancia, abs_tol=tolerancia))
+        if not iguales:
+            diferencias.append((celda, nombre, en_libro, en_grafo))
+    return diferencias
+
+
+def _registros_de_prueba(n, semilla=0):
+    """Pacientes con valores en el rango plausible de cada campo, algun cero o negativo y ~20% de vacios."""
+    import random
+
+    from esquema_entradas import CAMPOS
+
+    rnd = random.Random(semilla)
+    registros = []
+    for _ in range(n):
+        registro = {}
+        for campo in CAMPOS:
+            if campo.es_seleccion:
+                registro[campo.nombre] = rnd.choice([valor for valor, _ in campo.opciones])
+            elif rnd.random() < 0.2:
+                registro[campo.nombre] = ''
+            else:
+                valor = round(rnd.uniform(*(campo.rango or (0, 150))), 2)
+                registro[campo.nombre] = str(rnd.choice([0, -valor]) if rnd.random() < 0.06 else valor)
+        registros.append(registro)
+    return registros
+
+
+def nodos_distintos(nodos, registros):
+    """
+    Nodos del libro que, con las mismas entradas, no dan lo mismo que el nodo escrito a mano en algun
+    registro. Cada nodo se compara por separado, leyendo sus dependencias del grafo escrito a mano:
+    el libro puede coincidir en su ejemplo y no en los extremos (p. ej. una formula sin el max(0, ...)
+    del grafo). Es una comprobacion para revisar el libro, no se ejecuta al arrancar.
+    """
+    from grafo_formulas import NODOS, Evaluador
+
+    tolerancia = 1e-6
+    distintos = set()
+    for registro in registros:
+        evaluador = Evaluador(registro)
+        escalados = {}
+
+        def valor(nombre):
+            if nombre in escalados:
+                return escalados[nombre]
+            try:
+                return evaluador.valor(nombre)
+            except ArithmeticError:
+                return None
+
+        for nombre, nodo in nodos.items():
+            argumentos = [valor(dep) for dep in nodo.dependencias]
+            if not nodo.admite_vacios and any(a is None for a in argumentos):
+                en_libro = None
+            else:
+                try:
+                    en_libro = nodo.funcion(*argumentos)
+                except (ArithmeticError, TypeError, ValueError):
+                    en_libro = None
+            if nombre.startswith('xl_'):
+                escalados[nombre] = en_libro
+                continue
+            if nombre not in NODOS or nombre in distintos:
+                continue
+            try:
+                en_grafo = evaluador.valor(nombre)
+            except ArithmeticError:
+                continue  # la pagina muestra el error de calculo, no este valor
+            iguales = (en_libro == en_grafo) or (
+                isinstance(en_libro, (int, float)) and isinstance(en_grafo, (int, float))
+                and math.isclose(en_libro, en_grafo, rel_tol=tolerancia, abs_tol=tolerancia))
+            if not iguales:
+                distintos.add(nombre)
+    return distintos
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from app_de_excel import EXCEL_FILE_PATH, HOJAS_PANEL
+
+    parser = argparse.ArgumentParser(description="Formulas de datos.xlsx frente a las escritas a mano")
+    parser.add_argument('--verificar', type=int, nargs='?', const=300, metavar='N',
+                        help="Compara ademas cada nodo sobre N pacientes de prueba (ceros, negativos, vacios)")
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    libro = compilar_libro(EXCEL_FILE_PATH, HOJAS_PANEL)
+    print(f"{len(libro.orden)} formulas compiladas en {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    diferencias = diferencias_con_grafo(libro)
+    print(f"{len(diferencias)} celdas del libro difieren de las formulas escritas a mano:")
+    for celda, nombre, en_libro, en_grafo in diferencias:
+        print(f"  {celda:<22} {nombre:<14} libro={en_libro!r:<24} grafo={en_grafo!r}")
+    if argumentos.verificar:
+        distintos = nodos_distintos(nodos_del_libro(libro), _registros_de_prueba(argumentos.verificar))
+        print(f"{len(distintos)} nodos difieren en {argumentos.verificar} pacientes de prueba:")
+        for nombre in sorted(distintos):
+            motivo = ESCRITOS_A_MANO.get(nombre)
+            print(f"  {nombre:<14} " + (f"escrito a mano: {motivo}" if motivo else "manda el libro"))
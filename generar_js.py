@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+#
+# Genera formulas.js: las formulas de grafo_formulas.py, los paneles y su formato traducidos a
+# JavaScript, para que la pagina recalcule los resultados mientras se escribe sin ir al servidor.
+# Uso: python generar_js.py             (publica static/js/formulas.<hash>.js, ver estaticos.py)
+#      python generar_js.py --verificar (compara formulas.js con replicar_formulas() usando node)
+#
+# Se traduce el codigo fuente de cada nodo (lambda o funcion) con el modulo ast, asi que hay una
+# sola definicion de cada formula. El JS reproduce la semantica de Python que afecta al resultado:
+# ZeroDivisionError en '/', OverflowError en '**', max/min de Python y el redondeo de
+# '{:.2f}'.format (mitad al par en empates exactos, '-0.00'). Una base negativa con exponente
+# fraccionario, que en Python daria un complejo (SCT ya lo evita), no se reproduce:
+# calcular() devuelve null y la pagina espera al resultado del servidor, que sigue siendo la
+# referencia para la historia clinica, la API y la auditoria.
+# Tambien se traducen las reglas de alertas.py, para resaltar las mismas filas al recalcular.
+
+import argparse
+import ast
+import inspect
+import json
+import os
+import random
+import re
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import grafo_formulas
+from alertas import NIVELES, REGLAS, traducir
+from esquema_entradas import CAMPOS
+from estaticos import publicar
+from grafo_formulas import NODOS, PANELES, Salida, Seccion, plan_de_paneles
+
+_OPERADORES = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*'}
+_COMPARACIONES = {ast.Eq: '===', ast.NotEq: '!==', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=',
+                  ast.Is: '===', ast.IsNot: '!=='}
+_FUNCIONES = {'max': '_max', 'min': '_min', 'abs': 'Math.abs'}
+
+
+# --- TRADUCCION PYTHON -> JS ---
+class _TraductorJS:
+    """Traduce el subconjunto de Python usado por las formulas; cualquier otra construccion es un error."""
+
+    def expresion(self, nodo):
+        metodo = getattr(self, '_' + type(nodo).__name__, None)
+        if metodo is None:
+            raise ValueError(f"Construccion no soportada en formulas.js: {ast.unparse(nodo)}")
+        return metodo(nodo)
+
+    def _Constant(self, nodo):
+        if nodo.value is None:
+            return 'null'
+        if isinstance(nodo.value, bool):
+            return 'true' if nodo.value else 'false'
+        if isinstance(nodo.value, (int, float)):
+            return repr(nodo.value)
+        if isinstance(nodo.value, str):
+            return json.dumps(nodo.value, ensure_ascii=False)
+        raise ValueError(f"Constante no soportada: {nodo.value!r}")
+
+    def _Name(self, nodo):
+        return nodo.id
+
+    def _BinOp(self, nodo):
+        izquierda, derecha = self.expresion(nodo.left), self.expresion(nodo.right)
+        if isinstance(nodo.op, ast.Div):
+            return f'_div({izquierda}, {derecha})'
+        if isinstance(nodo.op, ast.Pow):
+            return f'_pot({izquierda}, {derecha})'
+        return f'({izquierda} {_OPERADORES[type(nodo.op)]} {derecha})'
+
+    def _UnaryOp(self, nodo):
+        operando = self.expresion(nodo.operand)
+        if isinstance(nodo.op, ast.Not):
+            return f'!_bool({operando})'
+        return f'({"-" if isinstance(nodo.op, ast.USub) else "+"}{operando})'
+
+    def _BoolOp(self, nodo):
+        # Las formulas solo usan and/or como condicion, donde basta la veracidad de Python
+        union = ' && ' if isinstance(nodo.op, ast.And) else ' || '
+        return '(' + union.join(f'_bool({self.expresion(v)})' for v in nodo.values) + ')'
+
+    def _Compare(self, nodo):
+        partes = []
+        izquierda = self.expresion(nodo.left)
+        for operador, comparado in zip(nodo.ops, nodo.comparators):
+            derecha = self.expresion(comparado)
+            if isinstance(operador, (ast.In, ast.NotIn)):
+                parte = f'{derecha}.includes({izquierda})'
+                partes.append(parte if isinstance(operador, ast.In) else f'!{parte}')
+            else:
+                partes.append(f'({izquierda} {_COMPARACIONES[type(operador)]} {derecha})')
+            izquierda = derecha
+        return partes[0] if len(partes) == 1 else '(' + ' && '.join(partes) + ')'
+
+    def _List(self, nodo):
+        return '[' + ', '.join(self.expresion(e) for e in nodo.elts) + ']'
+
+    _Tuple = _List
+
+    def _IfExp(self, nodo):
+        return f'(_bool({self.expresion(nodo.test)}) ? {self.expresion(nodo.body)} : {self.expresion(nodo.orelse)})'
+
+    def _Call(self, nodo):
+        if not isinstance(nodo.func, ast.Name) or nodo.func.id not in _FUNCIONES or nodo.keywords:
+            raise ValueError(f"Llamada no soportada en formulas.js: {ast.unparse(nodo)}")
+        return f'{_FUNCIONES[nodo.func.id]}(' + ', '.join(self.expresion(a) for a in nodo.args) + ')'
+
+    def _JoinedStr(self, nodo):
+        partes = []
+        for valor in nodo.values:
+            if isinstance(valor, ast.Constant):
+                partes.append(json.dumps(valor.value, ensure_ascii=False))
+            else:
+                especificacion = ''.join(p.value for p in valor.format_spec.values) if valor.format_spec else ''
+                partes.append(_formato_js(self.expresion(valor.value), especificacion))
+        return '(' + ' + '.join(partes) + ')'
+
+    # Sentencias (cuerpo de las funciones con 'def')
+    def sentencias(self, cuerpo, sangria):
+        lineas = []
+        for sentencia in cuerpo:
+            if isinstance(sentencia, ast.Return):
+                valor = 'null' if sentencia.value is None else self.expresion(sentencia.value)
+                lineas.append(f'{sangria}return {valor};')
+            elif isinstance(sentencia, ast.Assign) and len(sentencia.targets) == 1 \
+                    and isinstance(sentencia.targets[0], ast.Name):
+                lineas.append(f'{sangria}{sentencia.targets[0].id} = {self.expresion(sentencia.value)};')
+            elif isinstance(sentencia, ast.If):
+                lineas.append(f'{sangria}if (_bool({self.expresion(sentencia.test)})) {{')
+                lineas += self.sentencias(sentencia.body, sangria + '    ')
+                if sentencia.orelse:
+                    lineas.append(f'{sangria}}} else {{')
+                    lineas += self.sentencias(sentencia.orelse, sangria + '    ')
+                lineas.append(f'{sangria}}}')
+            elif isinstance(sentencia, ast.Expr) and isinstance(sentencia.value, ast.Constant):
+                continue  # docstring
+            else:
+                raise ValueError(f"Sentencia no soportada en formulas.js: {ast.unparse(sentencia)}")
+        return lineas
+
+    def funcion(self, definicion):
+        argumentos = ', '.join(a.arg for a in definicion.args.args)
+        if isinstance(definicion, ast.Lambda):
+            return f'({argumentos}) => {self.expresion(definicion.body)}'
+        locales = sorted({n.id for n in ast.walk(definicion) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)})
+        lineas = [f'function ({argumentos}) {{']
+        if locales:
+            lineas.append(f'    let {", ".join(locales)};')
+        lineas += self.sentencias(definicion.body, '    ')
+        lineas += ['    return null;', '}']
+        return '\n'.join(lineas)
+
+
+def _formato_js(valor, especificacion):
+    """'.2f' -> _fijo(valor, 2); '' -> String(valor). Otros formatos no se usan en los paneles."""
+    if especificacion == '':
+        return f'String({valor})'
+    if len(especificacion) >= 3 and especificacion[0] == '.' and especificacion[-1] == 'f' and especificacion[1:-1].isdigit():
+        return f'_fijo({valor}, {int(especificacion[1:-1])})'
+    raise ValueError(f"Formato no soportado en formulas.js: {especificacion!r}")
+
+
+def _definiciones_en_fuente(modulo):
+    """{linea: nodo ast} de cada lambda y funcion del modulo (las funciones decoradas, tambien por la linea del decorador)."""
+    arbol = ast.parse(inspect.getsource(modulo))
+    definiciones = {}
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Lambda):
+            definiciones.setdefault(nodo.lineno, []).append(nodo)
+        elif isinstance(nodo, ast.FunctionDef):
+            for linea in {nodo.lineno, *(d.lineno for d in nodo.decorator_list)}:
+                definiciones.setdefault(linea, []).append(nodo)
+    return definiciones
+
+
+def _definicion_de(funcion, definiciones, archivo):
+    codigo = funcion.__code__
+    if os.path.abspath(codigo.co_filename) != archivo:
+        raise ValueError(f"{funcion!r} no esta definida en grafo_formulas.py (FORMULAS_DESDE_EXCEL no se traduce)")
+    argumentos = list(codigo.co_varnames[:codigo.co_argcount])
+    candidatas = [d for d in definiciones.get(codigo.co_firstlineno, [])
+                  if [a.arg for a in d.args.args] == argumentos]
+    if len(candidatas) != 1:
+        raise ValueError(f"No se encontro una unica definicion para {funcion!r} en la linea {codigo.co_firstlineno}")
+    return candidatas[0]
+
+
+def _formato_de_salida(salida, traductor, definiciones, archivo):
+    """Funcion JS de formato de una fila (str.format ya ligado o lambda), o 'null' si se muestra tal cual."""
+    formato = salida.formato
+    if formato is None:
+        return 'null'
+    if getattr(formato, '__name__', None) == 'format' and isinstance(getattr(formato, '__self__', None), str):
+        partes = []
+        for literal, campo, especificacion, conversion in string.Formatter().parse(formato.__self__):
+            if literal:
+                partes.append(json.dumps(literal, ensure_ascii=False))
+            if campo is not None:
+                if campo != '' or conversion:
+                    raise ValueError(f"Formato no soportado en formulas.js: {formato.__self__!r}")
+                partes.append(_formato_js('v', especificacion))
+        return '(v) => ' + ' + '.join(partes)
+    return traductor.funcion(_definicion_de(formato, definiciones, archivo))
+
+
+# --- MODULO JS ---
+_SOPORTE = r'''
+class ErrorCalculo extends Error {}
+class ErrorDivisionCero extends ErrorCalculo {}
+class ErrorComplejo extends Error {}
+
+// Veracidad de Python: NaN es verdadero, 0 / '' / null / false no
+function _bool(x) { return x !== null && x !== undefined && x !== 0 && x !== '' && x !== false; }
+
+function _div(a, b) {
+    if (b === 0) throw new ErrorDivisionCero('division by zero');
+    return a / b;
+}
+
+function _pot(a, b) {
+    if (a === 0 && b < 0) throw new ErrorDivisionCero('0.0 cannot be raised to a negative power');
+    if (a < 0 && !Number.isInteger(b)) throw new ErrorComplejo('resultado complejo');
+    const r = a ** b;
+    if (!Number.isFinite(r) && Number.isFinite(a) && Number.isFinite(b)) {
+        throw new ErrorCalculo("OverflowError: (34, 'Numerical result out of range')");
+    }
+    return r;
+}
+
+// max/min de Python: se queda con el primero y solo lo cambia si el siguiente es estrictamente mayor/menor
+function _max(...valores) { return valores.reduce((a, b) => (b > a ? b : a)); }
+function _min(...valores) { return valores.reduce((a, b) => (b < a ? b : a)); }
+
+// '{:.Nf}'.format(x) de Python
+function _fijo(x, decimales) {
+    if (!Number.isFinite(x)) return Number.isNaN(x) ? 'nan' : (x > 0 ? 'inf' : '-inf');
+    const signo = (x < 0 || Object.is(x, -0)) ? '-' : '';
+    const a = Math.abs(x);
+    const j = a * 2 ** (decimales + 1);
+    let texto;
+    if (Number.isInteger(j) && j % 2 === 1) {
+        // Empate exacto (a * 10^N termina en .5): Python redondea al par, toFixed hacia arriba
+        let n = (BigInt(j) * 5n ** BigInt(decimales) - 1n) / 2n;
+        if (n % 2n === 1n) n += 1n;
+        texto = n.toString().padStart(decimales + 1, '0');
+        texto = decimales ? texto.slice(0, -decimales) + '.' + texto.slice(-decimales) : texto;
+    } else if (a >= 1e21) {
+        texto = BigInt(a).toString() + (decimales ? '.' + '0'.repeat(decimales) : '');
+    } else {
+        texto = a.toFixed(decimales);
+    }
+    return signo + texto;
+}
+
+// float() de Python sobre texto (guiones bajos entre digitos, inf, nan, espacios)
+const _NUMERO = /^[+-]?(?:(?:\d(?:_?\d)*)?\.\d(?:_?\d)*|\d(?:_?\d)*\.?)(?:[eE][+-]?\d(?:_?\d)*)?$/;
+const _ESPECIAL = /^([+-]?)(inf|infinity|nan)$/i;
+function _float(texto) {
+    texto = texto.trim();
+    if (_NUMERO.test(texto)) return Number(texto.replace(/_/g, ''));
+    const especial = _ESPECIAL.exec(texto);
+    if (especial === null) return null;
+    if (especial[2].toLowerCase() === 'nan') return NaN;
+    return especial[1] === '-' ? -Infinity : Infinity;
+}
+
+// Mismo resultado que esquema_entradas.parsear_entradas
+function parsear(datos) {
+    const registro = {};
+    const crudos = {};
+    for (const nombre of CAMPOS_NUMERICOS) {
+        const v = crudos[nombre] = datos[nombre] === undefined ? null : datos[nombre];
+        if (v === null || v === '') {
+            registro[nombre] = null;
+        } else if (typeof v === 'string') {
+            const numero = _float(v);
+            registro[nombre] = numero !== null ? numero : _float(v.replace(/,/g, '.'));
+        } else {
+            registro[nombre] = typeof v === 'number' ? v : null;
+        }
+    }
+    for (const nombre of CAMPOS_SELECCION) {
+        const v = crudos[nombre] = datos[nombre] === undefined ? null : datos[nombre];
+        registro[nombre] = v === null || typeof v === 'string' ? v : String(v);
+    }
+    registro.hay_datos = Object.values(crudos).some(_bool);
+    return registro;
+}
+
+// Nivel de alerta mas grave por nodo, como alertas.niveles_por_nodo(alertas.reglas_activas(valores))
+function nivelesDeAlerta(valores) {
+    const activas = alertas(valores), niveles = {};
+    REGLAS.forEach((regla, i) => {
+        if (!activas[i]) return;
+        for (const nodo of regla.variables) {
+            if (!(nodo in niveles) || NIVELES.indexOf(regla.nivel) > NIVELES.indexOf(niveles[nodo])) niveles[nodo] = regla.nivel;
+        }
+    });
+    return niveles;
+}
+
+// Mismo resultado que replicar_formulas(datos)[0]: {paneles: a_dict(), alertas: alertas_por_fila()}
+// o {error: '...'}; null si el resultado seria un numero complejo (lo resuelve el servidor)
+function calcular(datos) {
+    const registro = parsear(datos);
+    try {
+        const valores = evaluar(registro);
+        const paneles = {}, resaltadas = {};
+        if (!(_bool(valores.peso_kg) && _bool(valores.talla_m)) && !registro.hay_datos) return {paneles, alertas: resaltadas};
+        const niveles = nivelesDeAlerta(valores);
+        for (const [nombre, filas] of PANELES) {
+            const salida = paneles[nombre] = {};
+            for (const fila of filas) {
+                if (fila.titulo !== undefined) {
+                    salida['-- ' + fila.titulo + ' --'] = ' ';
+                    continue;
+                }
+                const valor = valores[fila.nodo];
+                if (valor === null) continue;
+                let texto;
+                if (fila.formato === null) {
+                    texto = _bool(valor) && !fila.omitir.includes(valor) ? valor : null;
+                } else {
+                    texto = fila.formato(valor);
+                }
+                if (texto === null) continue;
+                salida[fila.etiqueta] = texto;
+                if (niveles[fila.nodo]) (resaltadas[nombre] = resaltadas[nombre] || {})[fila.etiqueta] = niveles[fila.nodo];
+            }
+        }
+        return {paneles, alertas: resaltadas};
+    } catch (error) {
+        if (error instanceof ErrorDivisionCero) return {error: MENSAJE_DIVISION_CERO};
+        if (error instanceof ErrorCalculo) return {error: 'Error inesperado durante el calculo: ' + error.message};
+        if (error instanceof ErrorComplejo) return null;
+        throw error;
+    }
+}
+'''
+
+
+def generar_modulo():
+    """Texto de formulas.js."""
+    from app_de_excel import MENSAJE_DIVISION_CERO
+
+    archivo = os.path.abspath(inspect.getsourcefile(grafo_formulas))
+    definiciones = _definiciones_en_fuente(grafo_formulas)
+    traductor = _TraductorJS()
+    plan = plan_de_paneles(tuple(PANELES))
+
+    # Una funcion JS por funcion Python (los nodos del bucle de Neurocritico comparten lambda)
+    funciones, indice = [], {}
+    for nombre in plan:
+        if nombre in NODOS and id(NODOS[nombre].funcion) not in indice:
+            indice[id(NODOS[nombre].funcion)] = len(funciones)
+            funciones.append(traductor.funcion(_definicion_de(NODOS[nombre].funcion, definiciones, archivo)))
+
+    # evaluar(): mismo plan en linea recta y mismas guardas que grafo_formulas.compilar_plan
+    cuerpo = []
+    for nombre in plan:
+        nodo_formula = NODOS.get(nombre)
+        if nodo_formula is None:
+            cuerpo.append(f'    const v_{nombre} = entradas.{nombre};')
+            continue
+        llamada = f'F[{indice[id(nodo_formula.funcion)]}](' + ', '.join('v_' + d for d in nodo_formula.dependencias) + ')'
+        guardas = [] if nodo_formula.admite_vacios else [f'v_{d} !== null' for d in nodo_formula.dependencias]
+        guardas += [f'v_{d} !== 0' for d in nodo_formula.no_cero]
+        cuerpo.append(f'    const v_{nombre} = {" && ".join(guardas)} ? {llamada} : null;' if guardas
+                      else f'    const v_{nombre} = {llamada};')
+    cuerpo.append('    return {' + ', '.join(f'{n}: v_{n}' for n in plan) + '};')
+
+    paneles = []
+    for nombre, filas in PANELES.items():
+        salidas = []
+        for fila in filas:
+            if isinstance(fila, Seccion):
+                salidas.append(f'        {{titulo: {json.dumps(fila.titulo, ensure_ascii=False)}}},')
+            elif isinstance(fila, Salida):
+                formato = _formato_de_salida(fila, traductor, definiciones, archivo)
+                salidas.append(f'        {{etiqueta: {json.dumps(fila.etiqueta, ensure_ascii=False)}, nodo: {json.dumps(fila.nodo)}, '
+                               f'formato: {formato}, omitir: {json.dumps(list(fila.omitir), ensure_ascii=False)}}},')
+        paneles.append(f'    [{json.dumps(nombre)}, [\n' + '\n'.join(salidas) + '\n    ]],')
+
+    # alertas(): las reglas compiladas igual que alertas.compilar_reglas, leyendo null como NaN
+    variables = dict.fromkeys(n for regla in REGLAS for n in regla.variables)
+    reglas = [f'    {{nombre: {json.dumps(r.nombre)}, nivel: {json.dumps(r.nivel)}, variables: {json.dumps(list(r.variables))}}},'
+              for r in REGLAS]
+    alertas = [f'    const v_{n} = valores.{n} === null || valores.{n} === undefined ? NaN : valores.{n};' for n in variables]
+    alertas.append('    return [' + ', '.join(traducir(r.expresion, 'js') for r in REGLAS) + '];')
+
+    numericos = [c.nombre for c in CAMPOS if not c.es_seleccion]
+    seleccion = [c.nombre for c in CAMPOS if c.es_seleccion]
+    return '\n'.join([
+        '// Generado por generar_js.py a partir de grafo_formulas.py y esquema_entradas.py: no editar a mano.',
+        '(function (raiz) {',
+        "'use strict';",
+        f'const CAMPOS_NUMERICOS = {json.dumps(numericos)};',
+        f'const CAMPOS_SELECCION = {json.dumps(seleccion)};',
+        f'const MENSAJE_DIVISION_CERO = {json.dumps(MENSAJE_DIVISION_CERO, ensure_ascii=False)};',
+        _SOPORTE,
+        'const F = [',
+        *[f'    {f.replace(chr(10), chr(10) + "    ")},' for f in funciones],
+        '];',
+        '',
+        'function evaluar(entradas) {',
+        *cuerpo,
+        '}',
+        '',
+        'const PANELES = [',
+        *paneles,
+        '];',
+        '',
+        f'const NIVELES = {json.dumps(list(NIVELES))};',
+        'const REGLAS = [',
+        *reglas,
+        '];',
+        '',
+        'function alertas(valores) {',
+        *alertas,
+        '}',
+        '',
+        'raiz.FormulasUCI = {parsear, evaluar, calcular};',
+        "})(typeof module !== 'undefined' ? module.exports : window);",
+        '',
+    ])
+
+
+# --- PARIDAD CON PYTHON ---
+_COMPLEJO = re.compile(r'\d[+-]\d+(?:\.\d+)?j')  # '-12.66+14.83j'
+
+
+def _paciente_aleatorio(rnd):
+    """Valores dentro y fuera del rango plausible, negativos, vacios, ceros y coma decimal."""
+    registro = {}
+    for campo in CAMPOS:
+        if campo.es_seleccion:
+            registro[campo.nombre] = rnd.choice([valor for valor, _ in campo.opciones] + [campo.inicial, ''])
+            continue
+        sorteo = rnd.random()
+        if sorteo < 0.25:
+            registro[campo.nombre] = ''
+        elif sorteo < 0.3:
+            registro[campo.nombre] = '0'
+        elif sorteo < 0.33:
+            registro[campo.nombre] = str(-round(rnd.uniform(0, 50), 1))
+        else:
+            minimo, maximo = campo.rango or (0, 150)
+            valor = round(rnd.uniform(minimo, maximo * 1.2), rnd.choice([0, 1, 2, 3]))
+            registro[campo.nombre] = str(valor).replace('.', ',') if rnd.random() < 0.1 else str(valor)
+    return registro
+
+
+def verificar_paridad(pacientes):
+    """
+    Ejecuta formulas.js con node sobre los pacientes y lo compara con replicar_formulas().
+    Devuelve las discrepancias (indice, python, javascript) y cuantos pacientes se dejan al
+    servidor (resultado complejo, calcular() devuelve null).
+    """
+    from app_de_excel import replicar_formulas
+
+    node = shutil.which('node')
+    if node is None:
+        raise RuntimeError("Se necesita node para ejecutar formulas.js")
+    with tempfile.TemporaryDirectory() as directorio:
+        modulo = os.path.join(directorio, 'formulas.js')
+        with open(modulo, 'w', encoding='utf-8') as f:
+            f.write(generar_modulo())
+        programa = ("const F = require(process.argv[1]); let d = '';"
+                    "process.stdin.on('data', c => d += c).on('end', () => "
+                    "process.stdout.write(JSON.stringify(JSON.parse(d).map(F.FormulasUCI.calcular))));")
+        salida = subprocess.run([node, '-e', programa, modulo], input=json.dumps(pacientes),
+                                capture_output=True, text=True, check=True).stdout
+    discrepancias, delegados = [], 0
+    for i, (paciente, js) in enumerate(zip(pacientes, json.loads(salida))):
+        resultados, error = replicar_formulas(paciente)
+        python = {'error': error} if error else {'paneles': resultados.a_dict(), 'alertas': resultados.alertas_por_fila()}
+        if js is None and _COMPLEJO.search(json.dumps(python)):
+            delegados += 1
+        elif python != js:
+            discrepancias.append((i, python, js))
+    return discrepancias, delegados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Genera static/js/formulas.<hash>.js desde grafo_formulas.py")
+    parser.add_argument('--verificar', type=int, nargs='?', const=2000, metavar='N',
+                        help="Compara formulas.js con replicar_formulas() en N pacientes (por defecto 2000)")
+    argumentos = parser.parse_args()
+
+    if argumentos.verificar:
+        from benchmarks import FIXTURES
+
+        rnd = random.Random(0)
+        pacientes = list(FIXTURES.values()) + [_paciente_aleatorio(rnd) for _ in range(argumentos.verificar)]
+        errores, delegados = verificar_paridad(pacientes)
+        print(f"{len(pacientes)} pacientes, {len(errores)} discrepancias, {delegados} con resultado complejo (solo servidor)")
+        for indice, python, js in errores[:10]:
+            print(indice, json.dumps(python, ensure_ascii=False)[:300], '\n  js:', json.dumps(js, ensure_ascii=False)[:300])
+        sys.exit(1 if errores else 0)
+
+    ruta, tamano = publicar('js/formulas.js', generar_modulo())
+    print(f"static/{ruta}: {tamano} bytes")
@@ -0,0 +1,577 @@
+# -*- coding: utf-8 -*-
+#
+# Grafo de dependencias de las formulas de la hoja de calculo.
+# Cada formula se declara como un nodo con sus entradas explicitas
+# (p. ej. gc <- vs_macro, fc ; ppc <- tam, pic). La evaluacion es perezosa:
+# solo se calculan los nodos que necesitan los paneles solicitados.
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Las entradas del formulario se declaran en esquema_entradas.py; los nodos de entrada
+# leen los atributos de un RegistroPaciente (valores ya normalizados).
+from esquema_entradas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, como_registro
+
+# --- DEFINICION DE NODOS ---
+@dataclass(frozen=True)
+class Nodo:
+    nombre: str
+    dependencias: tuple
+    funcion: object
+    no_cero: tuple = ()         # dependencias usadas como denominador (0 -> sin resultado)
+    admite_vacios: bool = False  # la funcion recibe None y decide por si misma
+
+
+NODOS = {}
+
+
+def nodo(nombre, *dependencias, no_cero=(), admite_vacios=False):
+    """Registra una formula como nodo del grafo."""
+    def registrar(funcion):
+        NODOS[nombre] = Nodo(nombre, dependencias, funcion, tuple(no_cero), admite_vacios)
+        return funcion
+    return registrar
+
+
+# --- 1. PANEL ---
+# D20: TAM
+nodo('tam', 'tas', 'tad')(lambda tas, tad: (tas + (2 * tad)) / 3)
+nodo('talla_cm', 'talla_m')(lambda talla_m: talla_m * 100)
+# D10: SCT (con peso o talla negativos la potencia daria un complejo: sin resultado)
+nodo('sct', 'peso_kg', 'talla_m')(
+    lambda peso_kg, talla_m: (0.020247 * (peso_kg ** 0.425) * (talla_m ** 0.725)) * 10
+    if peso_kg >= 0 and talla_m >= 0 else None)
+nodo('imc', 'peso_kg', 'talla_m', no_cero=('talla_m',))(lambda peso_kg, talla_m: peso_kg / (talla_m ** 2))
+
+
+# D11: PI (Peso Ideal) -- FÓRMULA DE MILLER/BROCA CORREGIDA
+@nodo('pi', 'talla_m', 'sexo')
+def _pi(talla_m, sexo):
+    talla_pulgadas_menos_60 = (talla_m * 100 / 2.54) - 60
+    if sexo == "H":
+        return 56.2 + 1.41 * talla_pulgadas_menos_60
+    if sexo == "M":
+        return 53.1 + 1.36 * talla_pulgadas_menos_60
+    return None
+
+
+# D12: ACT (Watson)
+@nodo('act', 'sexo', 'edad_anos', 'peso_kg', 'talla_cm')
+def _act(sexo, edad, peso_kg, talla_cm):
+    if sexo == "H":
+        return 2.447 - (0.09156 * edad) + (0.3362 * peso_kg) + (0.1074 * talla_cm)
+    if sexo == "M":
+        return -2.097 + (0.1069 * talla_cm) + (0.2466 * peso_kg)
+    return None
+
+
+# --- 2. MACRODINAMIA ---
+# D10: VS (Volumen Sistolico - Macrodinamia)
+nodo('vs_macro', 'tsvi', 'vti')(lambda tsvi, vti: ((tsvi ** 2) * 0.785) * vti)
+# D11: GC (Gasto Cardiaco - Macrodinamia)
+nodo('gc', 'vs_macro', 'fc')(lambda vs_macro, fc: (vs_macro / 1000) * fc)
+# D12: IC (Indice Cardíaco)
+nodo('ic', 'gc', 'sct', no_cero=('sct',))(lambda gc, sct: gc / sct)
+nodo('tsvi_inf', 'talla_cm')(lambda talla_cm: (0.01 * talla_cm) + 0.25)
+
+
+# D15: PVC ECO (si no hay VCI valida se usa la PVC medida)
+@nodo('pvc_eco', 'vci', 'vci_colaps', 'pvc_medido', admite_vacios=True)
+def _pvc_eco(vci, vci_colaps, pvc_medido):
+    if vci is not None and vci_colaps is not None and vci > 0:
+        if vci < 1.5:
+            return 5
+        if vci >= 1.5 and vci <= 2.5:
+            if vci_colaps in ["total", ">50%"]: return 8
+            if vci_colaps == "<50%": return 13
+        elif vci > 2.5:
+            if vci_colaps == "<50%": return 18
+            if vci_colaps == "No cambios": return 20
+        return None
+    return pvc_medido
+
+
+nodo('rvs', 'tam', 'pvc_eco', 'gc', no_cero=('gc',))(lambda tam, pvc_eco, gc: ((tam - pvc_eco) * 80) / gc)
+nodo('rvsi', 'rvs', 'sct', no_cero=('sct',))(lambda rvs, sct: rvs / sct)
+
+# --- 3. MICRODINAMIA ---
+# Contenidos de O2 arterial, venoso y capilar
+nodo('cao2', 'hb', 'sato2_a', 'pao2')(lambda hb, sato2_a, pao2: (1.36 * hb * (sato2_a / 100.0)) + (0.0031 * pao2))
+nodo('cvo2', 'hb', 'satvo2', 'pvo2')(lambda hb, satvo2, pvo2: (1.36 * hb * (satvo2 / 100.0)) + (0.0031 * pvo2))
+nodo('cco2', 'hb', 'pao2')(lambda hb, pao2: (1.36 * hb * 1.0) + (0.0031 * pao2))
+nodo('davo2', 'cao2', 'cvo2')(lambda cao2, cvo2: cao2 - cvo2)
+nodo('exto2', 'davo2', 'cao2', no_cero=('cao2',))(lambda davo2, cao2: (davo2 / cao2) * 100)
+
+
+# Shunt Base (para uso en Ventilatorio y Microdinamia)
+@nodo('shunt', 'cco2', 'cao2', 'cvo2')
+def _shunt(cco2, cao2, cvo2):
+    shunt_denominador = cco2 - cvo2
+    if shunt_denominador == 0.0:
+        return None
+    return ((cco2 - cao2) / shunt_denominador) * 100
+
+
+nodo('vo2', 'gc', 'davo2')(lambda gc, davo2: gc * davo2 * 10)
+nodo('vo2i', 'vo2', 'sct', no_cero=('sct',))(lambda vo2, sct: vo2 / sct)
+nodo('do2', 'gc', 'cao2')(lambda gc, cao2: (gc * cao2) * 10)
+nodo('do2i', 'do2', 'sct', no_cero=('sct',))(lambda do2, sct: do2 / sct)
+nodo('davco2', 'pvco2', 'paco2')(lambda pvco2, paco2: pvco2 - paco2)
+# GC Fick: GC (L/min) = VO2 * 10 / DavO2 (donde DavO2 está en ml/dL)
+nodo('gc_fick', 'vo2', 'davo2', no_cero=('vo2', 'davo2'))(lambda vo2, davo2: (vo2 * 10) / (davo2 * 100))
+
+# --- 4. HEMODINAMIA (VI/VD) ---
+nodo('e_a', 'e_onda', 'a_onda', no_cero=('a_onda',))(lambda e_onda, a_onda: e_onda / a_onda)
+nodo('eprim_prom', 'eprim_lat', 'eprim_med')(lambda eprim_lat, eprim_med: (eprim_lat + eprim_med) / 2)
+nodo('e_eprim', 'e_onda', 'eprim_prom', no_cero=('eprim_prom',))(lambda e_onda, eprim_prom: e_onda / eprim_prom)
+nodo('fevi_simp', 'vfd', 'vfs', no_cero=('vfd',))(lambda vfd, vfs: ((vfd - vfs) / vfd) * 100)
+# Strain MAPSE: Se aplica la negación al resultado final para que sea negativo.
+nodo('strain_mapse', 'mapse_l', 'mapse_s', 'long_vi', no_cero=('long_vi',))(
+    lambda mapse_l, mapse_s, long_vi: -(((mapse_l + mapse_s) / 2) / long_vi * 100))
+# Ea = (0.9 * TAS) / VS_Macro ; Ee = (0.9 * TAS) / VFS ; AVA = Ea / Ee
+nodo('ea', 'tas', 'vs_macro', no_cero=('vs_macro',))(lambda tas, vs_macro: (0.9 * tas) / vs_macro)
+nodo('ee', 'tas', 'vfs', no_cero=('vfs',))(lambda tas, vfs: (0.9 * tas) / vfs)
+nodo('ava', 'ea', 'ee', no_cero=('ee',))(lambda ea, ee: ea / ee)
+nodo('power_c', 'tam', 'gc')(lambda tam, gc: (tam * gc) / 451)
+# VD
+nodo('welch', 'e_eprim')(lambda e_eprim: (e_eprim * 1.24) + 1.9)
+nodo('gradiente_it', 'vtmax')(lambda vtmax: 4 * (vtmax ** 2))
+nodo('psap', 'gradiente_it', 'pvc_eco')(lambda gradiente_it, pvc_eco: gradiente_it + pvc_eco)
+nodo('pmap', 'psap')(lambda psap: (0.6 * psap) + 2)
+nodo('rvs_pulm', 'vtmax', 'vti_pulmonar', no_cero=('vti_pulmonar',))(
+    lambda vtmax, vti_pulmonar: ((vtmax / vti_pulmonar) * 10) + 0.16)
+nodo('rvs_pulm_in', 'pmap', 'welch', 'ic', no_cero=('ic',))(lambda pmap, welch, ic: ((pmap - welch) / ic) * 80)
+nodo('avd', 'tapse', 'psap', no_cero=('psap',))(lambda tapse, psap: tapse / psap)
+
+# --- 5. VENTILATORIO ---
+nodo('peso_sdra', 'pi')(lambda pi: pi)
+nodo('vt_protec_calc', 'vt_protec', 'peso_sdra')(lambda vt_protec, peso_sdra: vt_protec * peso_sdra)
+nodo('driving_p', 'plateau', 'peep')(lambda plateau, peep: plateau - peep)
+nodo('cstat_calc', 'vt_ventilador', 'driving_p', no_cero=('driving_p',))(lambda vt, driving_p: vt / driving_p)
+nodo('ppico_menos_peep', 'ppico', 'peep')(lambda ppico, peep: ppico - peep)
+nodo('cdin_calc', 'vt_ventilador', 'ppico_menos_peep', no_cero=('ppico_menos_peep',))(lambda vt, dp: vt / dp)
+nodo('raw', 'ppico', 'plateau')(lambda ppico, plateau: ppico - plateau)
+# EM (Espacio Muerto Fisiológico)
+nodo('em', 'paco2', 'peco2', no_cero=('paco2',))(lambda paco2, peco2: ((paco2 - peco2) / paco2) * 100)
+
+
+# EV (Eficiencia Ventilatoria)
+@nodo('ev', 'pi', 'paco2', 'v_min')
+def _ev(pi, paco2, v_min):
+    ev_denominador = ((pi / 10) * 37.5)
+    if ev_denominador == 0.0:
+        return None
+    return (paco2 * v_min) / ev_denominador
+
+
+# PM (Power Mechanical): la presion usada depende del modo ventilatorio
+@nodo('pm', 'vt_ventilador', 'fr', 'modo', 'ppico', 'driving_p', 'peep', admite_vacios=True)
+def _pm(vt_ventilador, fr, modo, ppico, driving_p, peep):
+    if vt_ventilador is None or fr is None:
+        return None
+    C1 = 0.098 * fr * (vt_ventilador / 1000)
+    if modo == "VCV" and ppico is not None and driving_p is not None:
+        return C1 * (ppico - (driving_p / 2))
+    if modo == "PCV" and driving_p is not None and peep is not None:
+        return C1 * (driving_p + peep)
+    return None
+
+
+nodo('ppmt', 'ppico', 'peep', 'pocc', no_cero=('pocc',))(lambda ppico, peep, pocc: ((ppico - peep) - 2) / (3 * pocc))
+
+# --- 6. NEUROCRÍTICO ---
+for _sufijo in ('acm', 'ab', 'dtc'):
+    _vs, _vd, _vm = 'vs_' + _sufijo, 'vd_' + _sufijo, 'vm_' + _sufijo
+    nodo(_vm, _vs, _vd)(lambda vs, vd: (vs + (2 * vd)) / 3)
+    nodo('ip_' + _sufijo, _vs, _vd, _vm, no_cero=(_vm,))(lambda vs, vd, vm: (vs - vd) / vm)
+    nodo('ir_' + _sufijo, _vs, _vd, no_cero=(_vs,))(lambda vs, vd: (vs - vd) / vs)
+del _sufijo, _vs, _vd, _vm
+
+# PIC limitada a 0 si es negativa
+nodo('pic', 'ip_acm')(lambda ip_acm: max(0, (10.93 * ip_acm) - 1.28))
+nodo('ppc', 'tam', 'pic')(lambda tam, pic: tam - pic)
+nodo('il', 'vm_acm', 'vm_aci', no_cero=('vm_aci',))(lambda vm_acm, vm_aci: vm_acm / vm_aci)
+nodo('isou', 'vm_ab', 'vm_ave', no_cero=('vm_ave',))(lambda vm_ab, vm_ave: vm_ab / vm_ave)
+nodo('vno_dgo_calc', 'vno_der', 'vno_izq', 'vno_dgo', no_cero=('vno_dgo',))(
+    lambda vno_der, vno_izq, vno_dgo: (vno_der + vno_izq) / (2 * vno_dgo))
+nodo('cvjo2', 'hb', 'sato2_jo2', 'pao2_jo2')(
+    lambda hb, sjo2, pao2_jo2: (1.36 * hb * (sjo2 / 100.0)) + (0.0031 * pao2_jo2))
+nodo('avdo2', 'cao2', 'cvjo2')(lambda cao2, cvjo2: cao2 - cvjo2)
+nodo('ceo2', 'avdo2', 'cao2', no_cero=('cao2',))(lambda avdo2, cao2: (avdo2 / cao2) * 100)
+
+
+# --- DISEÑO DE LOS PANELES ---
+@dataclass(frozen=True)
+class Seccion:
+    titulo: str
+
+
+_FORMATO_NUMERICO = re.compile(r'\{:\.(\d+)f\} ?(.*)')  # '{:.2f} L/min' -> decimales 2, unidad 'L/min'
+
+
+@dataclass(frozen=True)
+class Salida:
+    """
+    Fila mostrada en un panel: etiqueta, nodo de origen y formato (None = texto tal cual).
+    De un formato '{:.Nf} unidad' se extraen 'decimales' y 'unidad' para quien quiera el numero sin texto.
+    """
+    etiqueta: str
+    nodo: str
+    formato: object = None
+    omitir: tuple = ()  # textos de relleno de los <select> que no se muestran
+    unidad: str = field(default='', init=False)
+    decimales: int = field(default=None, init=False)
+
+    def __post_init__(self):
+        # Los formatos '{:.2f} cm' se guardan ya como funcion (str.format) para no reinterpretarlos
+        if isinstance(self.formato, str):
+            numerico = _FORMATO_NUMERICO.fullmatch(self.formato)
+            if numerico:
+                object.__setattr__(self, 'decimales', int(numerico.group(1)))
+                object.__setattr__(self, 'unidad', numerico.group(2))
+            object.__setattr__(self, 'formato', self.formato.format)
+
+    def se_muestra(self, valor):
+        """Si la fila aparece en el panel con este valor; se decide sin formatear nada."""
+        if valor is None:
+            return False
+        return self.formato is not None or (bool(valor) and valor not in self.omitir)
+
+    def texto(self, valor):
+        """Texto de la celda (solo se llama para las celdas que se muestran)."""
+        return valor if self.formato is None else self.formato(valor)
+
+
+PANELES = {
+    'Panel': [
+        Seccion('Datos Antropometricos'),
+        Salida('Sexo', 'sexo'),
+        Salida('Edad', 'edad_anos', '{:.0f} anos'),
+        Salida('Peso', 'peso_kg', '{:.0f} Kg'),
+        Salida('Talla', 'talla_m', '{:.2f} m'),
+        Salida('IMC', 'imc', '{:.2f}'),
+        Salida('SCT', 'sct', '{:.2f} m²'),
+        Salida('PI', 'pi', '{:.2f} Kg'),
+        Salida('ACT', 'act', '{:.2f} L'),
+        Seccion('Signos Vitales'),
+        Salida('TAS', 'tas', '{:.0f} mmHg'),
+        Salida('TAD', 'tad', '{:.0f} mmHg'),
+        Salida('TAM', 'tam', '{:.0f} mmHg'),
+        Salida('FC', 'fc', '{:.0f} lpm'),
+        Salida('SatO₂ Pulsioximetria', 'sato2_sv', '{:.0f} %'),
+        Seccion('Gasometria Arterial 🩸'),
+        Salida('pH (a)', 'ph_a', '{:.2f}'),
+        Salida('PaCO₂', 'paco2', '{:.1f} mmHg'),
+        Salida('PaO₂', 'pao2', '{:.1f} mmHg'),
+        Salida('SatO₂ (a)', 'sato2_a', '{:.1f} %'),
+        Salida('Lactato', 'lactato', '{:.2f} mmol/L'),
+        Salida('Hb', 'hb', '{:.1f} g/dL'),
+        Seccion('Gasometria Venosa 🔵'),
+        Salida('pHv', 'ph_v', '{:.2f}'),
+        Salida('PvCO₂', 'pvco2', '{:.1f} mmHg'),
+        Salida('PvO₂', 'pvo2', '{:.1f} mmHg'),
+        Salida('SatvO₂', 'satvo2', '{:.1f} %'),
+    ],
+    'Macrodinamia': [
+        Salida('TSVI', 'tsvi', '{:.2f} cm'),
+        Salida('VTI', 'vti', '{:.2f} cm'),
+        Salida('TSVI Inferido', 'tsvi_inf', '{:.2f} cm'),
+        Salida('VS', 'vs_macro', '{:.0f} ml'),
+        Salida('GC', 'gc', '{:.2f} L/min'),
+        Salida('IC', 'ic', '{:.2f} L/min/m²'),
+        Salida('VCI', 'vci', '{:.2f} cm'),
+        Salida('VCI Colaps.', 'vci_colaps', omitir=('Selecciona Colapso',)),
+        Salida('PVC ECO', 'pvc_eco', '{:.0f} mmHg'),
+        Salida('PVC Medido', 'pvc_medido', '{:.0f} mmHg'),
+        Salida('RVS', 'rvs', '{:.0f} dyn.s/cm⁵'),
+        Salida('RVSI', 'rvsi', '{:.0f} dyn.s/cm⁵/m²'),
+    ],
+    'Microdinamia': [
+        Salida('CaO₂', 'cao2', '{:.2f} ml/dL'),
+        Salida('CvO₂', 'cvo2', '{:.2f} ml/dL'),
+        Salida('CcO₂', 'cco2', '{:.2f} ml/dL'),
+        Salida('DavO₂', 'davo2', '{:.2f} ml/dL'),
+        Salida('VO₂', 'vo2', '{:.2f} ml/min'),
+        Salida('VO₂I', 'vo2i', '{:.2f} ml/min/m²'),
+        Salida('DO₂', 'do2', '{:.2f} ml/min'),
+        Salida('DO₂I', 'do2i', '{:.2f} ml/min/m²'),
+        Salida('ExtO₂', 'exto2', '{:.2f} %'),
+        Salida('DavCO₂', 'davco2', '{:.1f} mmHg'),
+        Salida('Lactato', 'lactato', '{:.2f} mmol/L'),
+        Salida('SatvO₂', 'satvo2', '{:.1f} %'),
+        Salida('GC Fick', 'gc_fick', '{:.2f} L/min'),
+    ],
+    'Hemodinamia': [
+        Seccion('Ventriculo Izquierdo'),
+        Salida('MAPSE L', 'mapse_l', '{:.2f} cm'),
+        Salida('MAPSE S', 'mapse_s', '{:.2f} cm'),
+        Salida('E', 'e_onda', '{:.2f} m/s'),
+        Salida('A', 'a_onda', '{:.2f} m/s'),
+        Salida('E/A', 'e_a', '{:.2f}'),
+        Salida("E' lat", 'eprim_lat', '{:.2f} cm/s'),
+        Salida("E' med", 'eprim_med', '{:.2f} cm/s'),
+        Salida("E' Prom", 'eprim_prom', '{:.2f} cm/s'),
+        Salida("E/E'", 'e_eprim', '{:.2f}'),
+        Salida('VFS', 'vfs', '{:.0f} ml'),
+        Salida('VFD', 'vfd', '{:.0f} ml'),
+        Salida('FEVI SIMP', 'fevi_simp', '{:.1f} %'),
+        Salida('Long. VI', 'long_vi', '{:.1f} cm'),
+        Salida('Strain MAPSE', 'strain_mapse', '{:.2f} %'),
+        Salida('Ea', 'ea', '{:.2f} mmHg/ml'),
+        Salida('Ee', 'ee', '{:.2f} mmHg/ml'),
+        Salida('AVA', 'ava', '{:.2f}'),
+        Salida('Power C', 'power_c', '{:.2f} W'),
+        Seccion('Ventriculo Derecho'),
+        Salida('Welch', 'welch', '{:.2f}'),
+        Salida('VTmax', 'vtmax', '{:.2f} m/s'),
+        Salida('Gradiente IT', 'gradiente_it', '{:.2f} mmHg'),
+        Salida('TAPSE', 'tapse', '{:.2f} mm'),
+        Salida('VTI Pulmonar', 'vti_pulmonar', '{:.2f} cm'),
+        Salida('PSAP', 'psap', '{:.2f} mmHg'),
+        Salida('PMAP', 'pmap', '{:.2f} mmHg'),
+        Salida('RVSPulm.', 'rvs_pulm', '{:.2f} UW'),
+        Salida('RVSPulm. In.', 'rvs_pulm_in', '{:.2f} Dynas/m²'),
+        Salida('AVD', 'avd', '{:.2f}'),
+    ],
+    'Ventilatorio': [
+        Salida('MODO', 'modo', omitir=('Selecciona Modo',)),
+        Salida('Peso SDRA (PI)', 'peso_sdra', '{:.2f} Kg'),
+        Salida('VT protec.', 'vt_protec', '{:.1f} ml/Kg'),
+        Salida('VT protec. C.', 'vt_protec_calc', '{:.0f} ml'),
+        Salida('VT Ventilador', 'vt_ventilador', '{:.0f} ml'),
+        Salida('FR', 'fr', '{:.0f} lpm'),
+        Salida('PaCO₂', 'paco2', '{:.1f} mmHg'),
+        Salida('PeCO₂', 'peco2', '{:.1f} mmHg'),
+        Salida('PEEP', 'peep', '{:.0f} cmH₂O'),
+        Salida('FIO₂', 'fio2', '{:.2f}'),
+        Salida('Plateau', 'plateau', '{:.0f} cmH₂O'),
+        Salida('Driving P.', 'driving_p', '{:.0f} cmH₂O'),
+        Salida('Ppico', 'ppico', '{:.0f} cmH₂O'),
+        Salida('Cstat (medida)', 'cstat_input', '{:.1f} ml/cmH₂O'),
+        Salida('Cstat Calc', 'cstat_calc', '{:.1f} ml/cmH₂O'),
+        Salida('Cdin (medida)', 'cdin_input', '{:.1f} ml/cmH₂O'),
+        Salida('Cdin Calc', 'cdin_calc', '{:.1f} ml/cmH₂O'),
+        Salida('Raw', 'raw', '{:.1f} cmH₂O/L/s'),
+        Salida('V/min', 'v_min', '{:.1f} L/min'),
+        Salida('POCC', 'pocc', '{:.1f} cmH₂O'),
+        Salida('EM', 'em', '{:.2f} %'),
+        Salida('EV', 'ev', '{:.2f}'),
+        Salida('Shunt', 'shunt', '{:.2f} %'),
+        Salida('PM', 'pm', '{:.2f} J/min'),
+        Salida('PpMt', 'ppmt', '{:.2f}'),
+    ],
+    'Neurocritico': [
+        Seccion('DTC (ACM)'),
+        Salida('VS (ACM)', 'vs_acm', '{:.1f} cm/s'),
+        Salida('VD (ACM)', 'vd_acm', '{:.1f} cm/s'),
+        Salida('VM (ACM)', 'vm_acm', '{:.1f} cm/s'),
+        Salida('IP (ACM)', 'ip_acm', '{:.2f}'),
+        Salida('IR (ACM)', 'ir_acm', '{:.2f}'),
+        Salida('PIC (Calc.)', 'pic', '{:.1f} mmHg'),
+        Salida('PPC (Calc.)', 'ppc', '{:.1f} mmHg'),
+        Seccion('DTC (AB)'),
+        Salida('VS (AB)', 'vs_ab', '{:.1f} cm/s'),
+        Salida('VD (AB)', 'vd_ab', '{:.1f} cm/s'),
+        Salida('VM (AB)', 'vm_ab', '{:.1f} cm/s'),
+        # Los indices de pulsatilidad/resistencia no deberían ser negativos
+        Salida('IP (AB)', 'ip_ab', lambda v: f"{abs(v):.2f}"),
+        Salida('IR (AB)', 'ir_ab', lambda v: f"{abs(v):.2f}"),
+        Seccion('DTC (Genérico)'),
+        Salida('Arteria Medida', 'vaso_dtc', omitir=('Selecciona Arteria',)),
+        Salida('VS', 'vs_dtc', '{:.1f} cm/s'),
+        Salida('VD', 'vd_dtc', '{:.1f} cm/s'),
+        Salida('VM', 'vm_dtc', '{:.1f} cm/s'),
+        Salida('IP', 'ip_dtc', '{:.2f}'),
+        Salida('IR (DTc)', 'ir_dtc', '{:.2f}'),
+        Seccion('Flujo Vascular Extracraneal'),
+        Salida('VM Art. Carótida Int.', 'vm_aci', '{:.1f} cm/s'),
+        Salida('VM Art. Vertebral', 'vm_ave', '{:.1f} cm/s'),
+        Seccion('Indices Combinados'),
+        Salida('Indice Lindergard', 'il', '{:.2f}'),
+        Salida('Indice de Soustiel', 'isou', '{:.2f}'),
+        Seccion('VNO (Vaina Nervio Optico)'),
+        Salida('Der.', 'vno_der', '{:.1f} mm'),
+        Salida('Izq.', 'vno_izq', '{:.1f} mm'),
+        Salida('DGO', 'vno_dgo', '{:.1f} mm'),
+        Salida('VNO/DGO', 'vno_dgo_calc', '{:.2f}'),
+        Seccion('Gasometria yugular (jO₂)'),
+        Salida('pH', 'ph_jo2', '{:.2f}'),
+        Salida('PjCO₂', 'paco2_jo2', '{:.1f} mmHg'),
+        Salida('PjO₂', 'pao2_jo2', '{:.1f} mmHg'),
+        Salida('SjO₂', 'sato2_jo2', '{:.1f} %'),
+        Salida('Lactato', 'lactato_jo2', '{:.2f} mmol/L'),
+        Seccion('Neuro / Golfo Yugular'),
+        Salida('SjO₂ (Monit.)', 'sato2_jo2', '{:.1f} %'),
+        Salida('AVDO₂', 'avdo2', '{:.2f}'),
+        Salida('CEO₂', 'ceo2', '{:.2f} %'),
+    ],
+}
+
+
+def dependencias_de(objetivos):
+    """Conjunto de nodos (formulas y entradas) necesarios para calcular los objetivos."""
+    return set(plan_de_evaluacion(tuple(objetivos)))
+
+
+@lru_cache(maxsize=None)
+def plan_de_evaluacion(objetivos):
+    """Orden topologico (dependencias primero) de los nodos necesarios para los objetivos."""
+    orden = []
+    visitados = set()
+
+    def visitar(nombre):
+        if nombre in visitados:
+            return
+        visitados.add(nombre)
+        if nombre in NODOS:
+            for dep in NODOS[nombre].dependencias:
+                visitar(dep)
+        orden.append(nombre)
+
+    for objetivo in objetivos:
+        visitar(objetivo)
+    return tuple(orden)
+
+
+def nodos_de_panel(panel):
+    """Nodos mostrados directamente por un panel."""
+    return [fila.nodo for fila in PANELES[panel] if isinstance(fila, Salida)]
+
+
+@lru_cache(maxsize=None)
+def plan_de_paneles(paneles):
+    """Plan de evaluacion que cubre todas las filas de los paneles indicados."""
+    return plan_de_evaluacion(tuple(n for panel in paneles for n in nodos_de_panel(panel)))
+
+
+@lru_cache(maxsize=None)
+def _formulas_en_plan(plan):
+    return sum(1 for nombre in plan if nombre in NODOS)
+
+
+@lru_cache(maxsize=None)
+def compilar_plan(plan):
+    """
+    Genera una funcion Python en linea recta para un plan completo: cada nodo se convierte en
+    una asignacion a variable local con sus guardas (None / denominador 0) explicitas,
+    evitando el recorrido interpretado del grafo en cada calculo.
+    """
+    funciones = []
+    lineas = ['def _evaluar_plan(entradas, F):']
+    for nombre in plan:
+        nodo_formula = NODOS.get(nombre)
+        if nodo_formula is None:
+            # Entrada del formulario: el registro ya trae el valor normalizado
+            lineas.append(f'    v_{nombre} = entradas.{nombre}')
+            continue
+        funciones.append(nodo_formula.funcion)
+        llamada = f'F[{len(funciones) - 1}]({", ".join("v_" + dep for dep in nodo_formula.dependencias)})'
+        guardas = [] if nodo_formula.admite_vacios else [f'v_{dep} is not None' for dep in nodo_formula.dependencias]
+        guardas += [f'v_{dep} != 0.0' for dep in nodo_formula.no_cero]
+        if guardas:
+            lineas.append(f'    if {" and ".join(guardas)}:')
+            lineas.append(f'        v_{nombre} = {llamada}')
+            lineas.append(f'    else:')
+            lineas.append(f'        v_{nombre} = None')
+        else:
+            lineas.append(f'    v_{nombre} = {llamada}')
+    lineas.append('    return {' + ', '.join(f'{nombre!r}: v_{nombre}' for nombre in plan) + '}')
+    espacio = {}
+    exec(compile('\n'.join(lineas), '<plan de formulas>', 'exec'), espacio)
+    funcion = espacio['_evaluar_plan']
+    return lambda entradas: funcion(entradas, funciones)
+
+
+@lru_cache(maxsize=None)
+def _dependientes_directos():
+    """Grafo inverso: nodo -> formulas que lo usan como entrada."""
+    inverso = {}
+    for nodo_formula in NODOS.values():
+        for dep in nodo_formula.dependencias:
+            inverso.setdefault(dep, []).append(nodo_formula.nombre)
+    return inverso
+
+
+def dependientes_de(nombres):
+    """Nodos aguas abajo (incluidos los propios nombres) que dependen de alguno de los indicados."""
+    inverso = _dependientes_directos()
+    afectados = set()
+    pendientes = list(nombres)
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre in afectados:
+            continue
+        afectados.add(nombre)
+        pendientes.extend(inverso.get(nombre, ()))
+    return afectados
+
+
+# --- EVALUACION PEREZOSA ---
+class Evaluador:
+    """
+    Evalua nodos bajo demanda sobre las entradas de un paciente (RegistroPaciente o diccionario).
+    Conserva los valores calculados, por lo que puede reutilizarse entre envios
+    del mismo paciente: actualizar() invalida solo lo que depende de los campos modificados.
+    """
+
+    def __init__(self, user_inputs):
+        self.user_inputs = como_registro(user_inputs)
+        self.valores = {}
+        self.evaluados = 0      # formulas (re)calculadas en total
+        self.reevaluados = 0    # formulas (re)calculadas en la ultima llamada a evaluar()
+
+    def valor(self, nombre):
+        """Valor de un nodo; calcula (una sola vez) sus dependencias si hace falta."""
+        if nombre not in self.valores:
+            self.evaluar(plan_de_evaluacion((nombre,)))
+        return self.valores[nombre]
+
+    def actualizar(self, user_inputs):
+        """
+        Sustituye las entradas e invalida los nodos aguas abajo de los campos cuyo valor cambio
+        (ya normalizados: '7,35' y '7.35' son el mismo valor). Devuelve los campos modificados.
+        """
+        user_inputs = como_registro(user_inputs)
+        anteriores = self.user_inputs
+        cambiados = sorted(
+            nombre for nombre in (ENTRADAS_NUMERICAS + ENTRADAS_SELECCION)
+            if getattr(anteriores, nombre) != getattr(user_inputs, nombre)
+        )
+        for nombre in dependientes_de(cambiados):
+            self.valores.pop(nombre, None)
+        self.user_inputs = user_inputs
+        return cambiados
+
+    def evaluar(self, plan):
+        """Recorre un plan en orden topologico calculando los nodos que aun no tienen valor."""
+        valores = self.valores
+        user_inputs = self.user_inputs
+        if not valores:
+            # Evaluacion desde cero: se usa la version compilada del plan
+            self.valores = compilar_plan(plan)(user_inputs)
+            self.reevaluados = _formulas_en_plan(plan)
+            self.evaluados += self.reevaluados
+            return
+        reevaluados = 0
+        for nombre in plan:
+            if nombre in valores:
+                continue
+            nodo_formula = NODOS.get(nombre)
+            if nodo_formula is None:
+                valores[nombre] = getattr(user_inputs, nombre)
+                continue
+            reevaluados += 1
+            argumentos = [valores[dep] for dep in nodo_formula.dependencias]
+            if (None in argumentos and not nodo_formula.admite_vacios) or \
+                    any(valores[dep] == 0.0 for dep in nodo_formula.no_cero):
+                valores[nombre] = None
+                continue
+            valores[nombre] = nodo_formula.funcion(*argumentos)
+        self.reevaluados = reevaluados
+        self.evaluados += reevaluados
+
+    def formatear(self, salida):
+        """Texto de una fila del panel, o None si no hay valor que mostrar."""
+        valor = self.valores[salida.nodo] if salida.nodo in self.valores else self.valor(salida.nodo)
+        return salida.texto(valor) if salida.se_muestra(valor) else None
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# Configuracion de gunicorn: gunicorn app_de_excel:app
+# Prepara el modo multiproceso de prometheus_client para que /metrics sume todos los workers.
+# La aplicacion se importa y se prepara una sola vez en el maestro (preload_app + when_ready):
+# los workers la heredan al hacer fork y arrancan sin repetir ese trabajo. Con preload_app un
+# HUP no recarga el codigo; para desplegar una version nueva hay que reiniciar gunicorn.
+
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5002')
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+preload_app = True
+
+# Debe existir antes de importar prometheus_client: con preload_app eso ocurre al cargar la app en
+# el maestro, antes de on_starting, asi que se prepara aqui al leer la configuracion. Los archivos
+# de una ejecucion anterior falsearian los contadores; un HUP relee este archivo pero no los borra.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'icu_metricas'))
+if os.environ.get('ICU_METRICAS_PID') != str(os.getpid()):
+    os.environ['ICU_METRICAS_PID'] = str(os.getpid())
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+# Ya con la variable definida; importarlo dentro de child_exit puede coincidir con otra senal al apagar
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def when_ready(server):
+    # Corre en el maestro despues de cargar la aplicacion y antes de crear los workers
+    import gc
+
+    from app_de_excel import preparar_arranque
+
+    preparar_arranque()
+    # Lo creado hasta aqui queda fuera del recolector: sus pasadas no tocan (ni copian) esas paginas
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# Historial (auditoria) de los calculos de inicio() en SQLite.
+# La peticion solo encola el calculo; un hilo escritor por proceso lo serializa y lo
+# inserta en lotes (una transaccion por lote) en una base en modo WAL, de modo que los
+# lectores y los demas workers de gunicorn no se bloquean entre si. La lectura pagina
+# por cursor (instante, id) sobre los indices, sin OFFSET.
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import metricas
+
+RUTA_HISTORIAL = os.environ.get('RUTA_HISTORIAL', 'historial.sqlite3')
+TAMANO_LOTE = 200
+INTERVALO_LOTE = 0.5  # segundos maximos que un calculo espera en la cola antes de escribirse
+MAX_COLA = 10000
+LIMITE_PAGINA = 50
+MAX_LIMITE_PAGINA = 500
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS calculos (
+    id INTEGER PRIMARY KEY,
+    instante REAL NOT NULL,
+    id_paciente TEXT,
+    entradas TEXT NOT NULL,
+    resultados TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS calculos_paciente_instante ON calculos (id_paciente, instante, id);
+CREATE INDEX IF NOT EXISTS calculos_instante ON calculos (instante, id);
+"""
+
+registro_log = logging.getLogger(__name__)
+
+
+def conectar(ruta=RUTA_HISTORIAL):
+    conexion = sqlite3.connect(ruta, timeout=30)
+    conexion.execute('PRAGMA journal_mode=WAL')
+    # En WAL, NORMAL solo sincroniza en los checkpoints: un corte de luz puede perder el ultimo lote, no corromper
+    conexion.execute('PRAGMA synchronous=NORMAL')
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+class Historial:
+    """Cola de calculos pendientes y el hilo que los inserta por lotes."""
+
+    def __init__(self, ruta=RUTA_HISTORIAL, tamano_lote=TAMANO_LOTE, intervalo=INTERVALO_LOTE):
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self._cola = queue.Queue(MAX_COLA)
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._lectura = threading.local()
+
+    # --- ESCRITURA ---
+    def registrar(self, entradas, resultados=None, error=None, id_paciente=None, instante=None):
+        """
+        Encola un calculo sin tocar el disco. 'resultados' (objeto con a_dict()) se serializa
+        en el hilo escritor. Si la cola esta llena se descarta y se cuenta en /metrics.
+        """
+        self._arrancar()
+        try:
+            self._cola.put_nowait((time.time() if instante is None else instante, id_paciente,
+                                   entradas, resultados, error))
+        except queue.Full:
+            metricas.HISTORIAL_DESCARTADOS.inc()
+
+    def _arrancar(self):
+        # El hilo se crea en el proceso que escribe: uno creado antes del fork de gunicorn no existiria en los workers
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._cola = queue.Queue(MAX_COLA)
+                self._hilo = threading.Thread(target=self._escribir, name='historial', daemon=True)
+                self._hilo.start()
+                self._pid = os.getpid()
+
+    def _escribir(self):
+        conexion = conectar(self.ruta)
+        cola = self._cola
+        while True:
+            lote = [cola.get()]
+            limite = time.monotonic() + self.intervalo
+            while len(lote) < self.tamano_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            fin = None in lote
+            filas = [_fila(*calculo) for calculo in lote if calculo is not None]
+            try:
+                with conexion:
+                    conexion.executemany(
+                        'INSERT INTO calculos (instante, id_paciente, entradas, resultados, error) '
+                        'VALUES (?, ?, ?, ?, ?)', filas)
+            except sqlite3.Error as e:
+                metricas.HISTORIAL_DESCARTADOS.inc(len(filas))
+                registro_log.warning("No se pudo guardar un lote de %d calculos: %s", len(filas), e)
+            for _ in lote:
+                cola.task_done()
+            if fin:
+                conexion.close()
+                return
+
+    def esperar(self):
+        """Bloquea hasta que todo lo encolado en este proceso este escrito."""
+        if self._pid == os.getpid():
+            self._cola.join()
+
+    def cerrar(self, timeout=5):
+        if self._pid == os.getpid() and self._hilo.is_alive():
+            self._cola.put(None)
+            self._hilo.join(timeout)
+
+    # --- LECTURA ---
+    def _conexion_lectura(self):
+        conexion = getattr(self._lectura, 'conexion', None)
+        if conexion is None or getattr(self._lectura, 'pid', None) != os.getpid():
+            conexion = self._lectura.conexion = conectar(self.ruta)
+            self._lectura.pid = os.getpid()
+        return conexion
+
+    def pagina(self, id_paciente=None, cursor=None, limite=LIMITE_PAGINA):
+        """
+        Calculos del mas reciente al mas antiguo. 'cursor' es el 'siguiente' devuelto por la pagina
+        anterior ('instante:id'); cada pagina es un recorrido acotado del indice, sin importar la profundidad.
+        """
+        condiciones, parametros = [], []
+        if id_paciente is not None:
+            condiciones.append('id_paciente = ?')
+            parametros.append(id_paciente)
+        if cursor:
+            instante, _, id_calculo = cursor.partition(':')
+            condiciones.append('(instante, id) < (?, ?)')
+            parametros += [float(instante), int(id_calculo)]
+        consulta = 'SELECT id, instante, id_paciente, entradas, resultados, error FROM calculos'
+        if condiciones:
+            consulta += ' WHERE ' + ' AND '.join(condiciones)
+        consulta += ' ORDER BY instante DESC, id DESC LIMIT ?'
+        filas = self._conexion_lectura().execute(consulta, parametros + [limite + 1]).fetchall()
+        siguiente = None
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = f'{filas[-1][1]!r}:{filas[-1][0]}'
+        calculos = [{
+            'id': id_calculo,
+            'instante': instante,
+            'id_paciente': paciente,
+            'entradas': json.loads(entradas),
+            'resultados': None if resultados is None else json.loads(resultados),
+            'error': error,
+        } for id_calculo, instante, paciente, entradas, resultados, error in filas]
+        return calculos, siguiente
+
+
+def _fila(instante, id_paciente, entradas, resultados, error):
+    return (instante, id_paciente, json.dumps(entradas, ensure_ascii=False),
+            None if resultados is None else json.dumps(resultados.a_dict(), ensure_ascii=False), error)
+
+
+historial = Historial()
+atexit.register(historial.cerrar)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+# Metricas estilo Prometheus para /metrics.
+# Con gunicorn cada worker es un proceso: si PROMETHEUS_MULTIPROC_DIR esta definida
+# (ver gunicorn.conf.py) prometheus_client guarda los valores de cada worker en ese
+# directorio y /metrics los suma, en vez de mostrar solo los del worker que responde.
+#
+# No hay histograma por panel: replicar_formulas() evalua los nodos de todos los paneles de una
+# vez con un unico plan compilado (grafo_formulas.compilar_plan), asi que esa etapa es
+# 'evaluacion' entera; lo que queda por panel (armar las filas) son microsegundos.
+
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+
+# De 50 us a 1 s: la evaluacion ronda las decenas de microsegundos y el render el milisegundo
+BUCKETS_SEGUNDOS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+ETAPAS = ('formulario', 'evaluacion', 'render')
+
+DURACION_ETAPA = Histogram(
+    'icu_etapa_duracion_segundos', "Duracion de cada etapa de una peticion a inicio()",
+    ['etapa'], buckets=BUCKETS_SEGUNDOS)
+ERRORES_CALCULO = Counter(
+    'icu_errores_calculo_total', "Errores de calculo por tipo (division_cero / generico)", ['tipo'])
+PETICIONES = Counter(
+    'icu_peticiones_total', "Peticiones HTTP por metodo, ruta y codigo de respuesta", ['metodo', 'ruta', 'codigo'])
+HISTORIAL_DESCARTADOS = Counter(
+    'icu_historial_descartados_total', "Calculos no guardados en el historial (cola llena o error de SQLite)")
+
+# Hijos ya etiquetados: evita resolver las etiquetas en cada observacion
+TIEMPO_ETAPA = {etapa: DURACION_ETAPA.labels(etapa) for etapa in ETAPAS}
+ERROR_DIVISION_CERO = ERRORES_CALCULO.labels('division_cero')
+ERROR_GENERICO = ERRORES_CALCULO.labels('generico')
+
+def exponer():
+    """Texto de /metrics y su content-type, agregando todos los workers en modo multiproceso."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
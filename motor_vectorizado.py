@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+#
+# Motor vectorizado (NumPy/pandas) para recalcular lotes de pacientes.
+# Evalua los nodos de grafo_formulas.py sobre columnas completas, con el codigo de cada
+# formula traducido a NumPy (ver compilar_lote): las mismas formulas que replicar_formulas().
+#
+# Uso: calcular_lote(df) -> DataFrame con las columnas derivadas.
+#      python motor_vectorizado.py   (verifica la paridad con el calculo escalar)
+
+import ast
+import inspect
+import numbers
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import grafo_formulas
+from grafo_formulas import ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, NODOS, plan_de_evaluacion
+
+# Campos del formulario (mismos nombres que user_inputs)
+CAMPOS_NUMERICOS = ENTRADAS_NUMERICAS
+CAMPOS_SELECCION = ENTRADAS_SELECCION
+
+# Columna derivada -> (panel, etiqueta) en los resultados de replicar_formulas()
+COLUMNAS_DERIVADAS = {
+    'tam': ('Panel', 'TAM'),
+    'imc': ('Panel', 'IMC'),
+    'sct': ('Panel', 'SCT'),
+    'pi': ('Panel', 'PI'),
+    'act': ('Panel', 'ACT'),
+    'tsvi_inf': ('Macrodinamia', 'TSVI Inferido'),
+    'vs_macro': ('Macrodinamia', 'VS'),
+    'gc': ('Macrodinamia', 'GC'),
+    'ic': ('Macrodinamia', 'IC'),
+    'pvc_eco': ('Macrodinamia', 'PVC ECO'),
+    'rvs': ('Macrodinamia', 'RVS'),
+    'rvsi': ('Macrodinamia', 'RVSI'),
+    'cao2': ('Microdinamia', 'CaO₂'),
+    'cvo2': ('Microdinamia', 'CvO₂'),
+    'cco2': ('Microdinamia', 'CcO₂'),
+    'davo2': ('Microdinamia', 'DavO₂'),
+    'vo2': ('Microdinamia', 'VO₂'),
+    'vo2i': ('Microdinamia', 'VO₂I'),
+    'do2': ('Microdinamia', 'DO₂'),
+    'do2i': ('Microdinamia', 'DO₂I'),
+    'exto2': ('Microdinamia', 'ExtO₂'),
+    'davco2': ('Microdinamia', 'DavCO₂'),
+    'gc_fick': ('Microdinamia', 'GC Fick'),
+    'e_a': ('Hemodinamia', 'E/A'),
+    'eprim_prom': ('Hemodinamia', "E' Prom"),
+    'e_eprim': ('Hemodinamia', "E/E'"),
+    'fevi_simp': ('Hemodinamia', 'FEVI SIMP'),
+    'strain_mapse': ('Hemodinamia', 'Strain MAPSE'),
+    'ea': ('Hemodinamia', 'Ea'),
+    'ee': ('Hemodinamia', 'Ee'),
+    'ava': ('Hemodinamia', 'AVA'),
+    'power_c': ('Hemodinamia', 'Power C'),
+    'welch': ('Hemodinamia', 'Welch'),
+    'gradiente_it': ('Hemodinamia', 'Gradiente IT'),
+    'psap': ('Hemodinamia', 'PSAP'),
+    'pmap': ('Hemodinamia', 'PMAP'),
+    'rvs_pulm': ('Hemodinamia', 'RVSPulm.'),
+    'rvs_pulm_in': ('Hemodinamia', 'RVSPulm. In.'),
+    'avd': ('Hemodinamia', 'AVD'),
+    'vt_protec_calc': ('Ventilatorio', 'VT protec. C.'),
+    'driving_p': ('Ventilatorio', 'Driving P.'),
+    'cstat_calc': ('Ventilatorio', 'Cstat Calc'),
+    'cdin_calc': ('Ventilatorio', 'Cdin Calc'),
+    'raw': ('Ventilatorio', 'Raw'),
+    'em': ('Ventilatorio', 'EM'),
+    'ev': ('Ventilatorio', 'EV'),
+    'shunt': ('Ventilatorio', 'Shunt'),
+    'pm': ('Ventilatorio', 'PM'),
+    'ppmt': ('Ventilatorio', 'PpMt'),
+    'vm_acm': ('Neurocritico', 'VM (ACM)'),
+    'ip_acm': ('Neurocritico', 'IP (ACM)'),
+    'ir_acm': ('Neurocritico', 'IR (ACM)'),
+    'pic': ('Neurocritico', 'PIC (Calc.)'),
+    'ppc': ('Neurocritico', 'PPC (Calc.)'),
+    'vm_ab': ('Neurocritico', 'VM (AB)'),
+    'ip_ab': ('Neurocritico', 'IP (AB)'),
+    'ir_ab': ('Neurocritico', 'IR (AB)'),
+    'vm_dtc': ('Neurocritico', 'VM'),
+    'ip_dtc': ('Neurocritico', 'IP'),
+    'ir_dtc': ('Neurocritico', 'IR (DTc)'),
+    'il': ('Neurocritico', 'Indice Lindergard'),
+    'isou': ('Neurocritico', 'Indice de Soustiel'),
+    'vno_dgo_calc': ('Neurocritico', 'VNO/DGO'),
+    'cvjo2': (None, None),  # intermedio, no se muestra
+    'avdo2': ('Neurocritico', 'AVDO₂'),
+    'ceo2': ('Neurocritico', 'CEO₂'),
+}
+
+
+def _texto_a_float(valor):
+    try:
+        return float(valor.replace(',', '.'))
+    except ValueError:
+        return np.nan
+
+
+def _valor_a_float(valor):
+    """Mismas reglas que parsear_entradas(): numeros tal cual, texto con float() (o coma decimal), lo demas NaN."""
+    if valor.__class__ is str:
+        return _texto_a_float(valor)
+    if isinstance(valor, numbers.Real) and not isinstance(valor, (bool, np.bool_)):
+        return float(valor)
+    return np.nan
+
+
+def _a_numero(columna):
+    """Equivalente vectorizado de parsear_entradas(): '' / None / texto invalido / booleanos / listas -> NaN."""
+    if pd.api.types.is_bool_dtype(columna):
+        return np.full(len(columna), np.nan)
+    if pd.api.types.is_numeric_dtype(columna):
+        return columna.astype('float64').to_numpy()
+    if pd.api.types.infer_dtype(columna, skipna=True) in ('string', 'empty'):
+        # Cada texto distinto se convierte una sola vez; los registros clinicos repiten mucho los valores.
+        codigos, unicos = pd.factorize(columna, use_na_sentinel=True)
+        valores = np.array([_texto_a_float(u) for u in unicos] + [np.nan], dtype='float64')
+        return valores[codigos]
+    # Tipos mezclados (JSON con numeros, booleanos, listas...): valor a valor
+    return np.array([_valor_a_float(v) for v in columna.to_numpy(dtype=object)], dtype='float64')
+
+
+def _a_seleccion(columna):
+    """Como parsear_entradas() para un <select>: texto tal cual, ausente -> None, cualquier otro valor -> str()."""
+    if pd.api.types.infer_dtype(columna, skipna=True) in ('string', 'empty'):
+        return columna.astype('object').to_numpy()
+    return np.array([v if v is None or v.__class__ is str else None if isinstance(v, float) and v != v else str(v)
+                     for v in columna.to_numpy(dtype=object)], dtype=object)
+
+
+# --- TRADUCCION DE LOS NODOS A COLUMNAS ---
+# Cada nodo de grafo_formulas.py se traduce desde su codigo fuente (ast), como hace generar_js.py
+# para el navegador, asi que el lote no tiene una copia propia de las formulas. Un valor ausente
+# es NaN (None en las columnas de texto) y una division por cero da NaN, en vez de rechazar al
+# paciente entero como el calculo escalar. Los if/return de las funciones se convierten en mascaras.
+_OPERADORES = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*'}
+_COMPARACIONES = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='}
+_FUNCIONES = {'max': '_max', 'min': '_min', 'abs': 'np.abs'}
+
+
+class _TraductorNumpy:
+    """Traduce el subconjunto de Python usado por las formulas; cualquier otra construccion es un error."""
+
+    def expresion(self, nodo):
+        metodo = getattr(self, '_' + type(nodo).__name__, None)
+        if metodo is None:
+            raise ValueError(f"Construccion no soportada en el motor vectorizado: {ast.unparse(nodo)}")
+        return metodo(nodo)
+
+    def _Constant(self, nodo):
+        if nodo.value is None:
+            return 'np.nan'
+        if isinstance(nodo.value, (bool, int, float, str)):
+            return repr(nodo.value)
+        raise ValueError(f"Constante no soportada: {nodo.value!r}")
+
+    def _Name(self, nodo):
+        return 'a_' + nodo.id
+
+    def _BinOp(self, nodo):
+        izquierda, derecha = self.expresion(nodo.left), self.expresion(nodo.right)
+        if isinstance(nodo.op, ast.Div):
+            if isinstance(nodo.right, ast.Constant) and isinstance(nodo.right.value, (int, float)) and nodo.right.value:
+                return f'({izquierda} / {derecha})'
+            return f'_div({izquierda}, {derecha})'
+        if isinstance(nodo.op, ast.Pow):
+            return f'_pot({izquierda}, {derecha})'
+        if type(nodo.op) not in _OPERADORES:
+            raise ValueError(f"Operador no soportado en el motor vectorizado: {ast.unparse(nodo)}")
+        return f'({izquierda} {_OPERADORES[type(nodo.op)]} {derecha})'
+
+    def _UnaryOp(self, nodo):
+        operando = self.expresion(nodo.operand)
+        if isinstance(nodo.op, ast.Not):
+            return f'~_bool({operando})'
+        return f'({"-" if isinstance(nodo.op, ast.USub) else "+"}{operando})'
+
+    def _BoolOp(self, nodo):
+        union = ' & ' if isinstance(nodo.op, ast.And) else ' | '
+        return '(' + union.join(f'_bool({self.expresion(v)})' for v in nodo.values) + ')'
+
+    def _Compare(self, nodo):
+        partes = []
+        izquierda = self.expresion(nodo.left)
+        for operador, comparado in zip(nodo.ops, nodo.comparators):
+            derecha = self.expresion(comparado)
+            if isinstance(operador, (ast.Is, ast.IsNot)):
+                if not (isinstance(comparado, ast.Constant) and comparado.value is None):
+                    raise ValueError(f"Solo se admite 'is None' en el motor vectorizado: {ast.unparse(nodo)}")
+                parte = f'_presente({izquierda})'
+                partes.append(parte if isinstance(operador, ast.IsNot) else f'~{parte}')
+            elif isinstance(operador, (ast.In, ast.NotIn)):
+                parte = f'_en({izquierda}, {derecha})'
+                partes.append(parte if isinstance(operador, ast.In) else f'~{parte}')
+            else:
+                partes.append(f'({izquierda} {_COMPARACIONES[type(operador)]} {derecha})')
+            izquierda = derecha
+        return partes[0] if len(partes) == 1 else '(' + ' & '.join(partes) + ')'
+
+    def _List(self, nodo):
+        return '(' + ''.join(f'{self.expresion(e)}, ' for e in nodo.elts) + ')'
+
+    _Tuple = _List
+
+    def _IfExp(self, nodo):
+        return f'np.where(_bool({self.expresion(nodo.test)}), {self.expresion(nodo.body)}, {self.expresion(nodo.orelse)})'
+
+    def _Call(self, nodo):
+        if not isinstance(nodo.func, ast.Name) or nodo.func.id not in _FUNCIONES or nodo.keywords:
+            raise ValueError(f"Llamada no soportada en el motor vectorizado: {ast.unparse(nodo)}")
+        return f'{_FUNCIONES[nodo.func.id]}(' + ', '.join(self.expresion(a) for a in nodo.args) + ')'
+
+    # Sentencias (cuerpo de las funciones con 'def'): '_r' es el resultado y '_a' las filas que
+    # aun no han llegado a un return; 'condicion' son las filas que entran en el bloque
+    def sentencias(self, cuerpo, condicion, sangria):
+        lineas = []
+        for sentencia in cuerpo:
+            if isinstance(sentencia, ast.Return):
+                valor = 'np.nan' if sentencia.value is None else self.expresion(sentencia.value)
+                lineas.append(f'{sangria}_m = _a & {condicion}')
+                lineas.append(f'{sangria}_r = np.where(_m, {valor}, _r)')
+                lineas.append(f'{sangria}_a = _a & ~_m')
+            elif isinstance(sentencia, ast.Assign) and len(sentencia.targets) == 1 \
+                    and isinstance(sentencia.targets[0], ast.Name) and condicion == 'np.True_':
+                lineas.append(f'{sangria}a_{sentencia.targets[0].id} = {self.expresion(sentencia.value)}')
+            elif isinstance(sentencia, ast.If):
+                self._condiciones += 1
+                prueba = f'_c{self._condiciones}'
+                lineas.append(f'{sangria}{prueba} = _bool({self.expresion(sentencia.test)})')
+                lineas += self.sentencias(sentencia.body, f'({condicion} & {prueba})', sangria)
+                lineas += self.sentencias(sentencia.orelse, f'({condicion} & ~{prueba})', sangria)
+            elif isinstance(sentencia, ast.Expr) and isinstance(sentencia.value, ast.Constant):
+                continue  # docstring
+            else:
+                raise ValueError(f"Sentencia no soportada en el motor vectorizado: {ast.unparse(sentencia)}")
+        return lineas
+
+    def funcion(self, definicion, nombre):
+        argumentos = ', '.join('a_' + a.arg for a in definicion.args.args)
+        if isinstance(definicion, ast.Lambda):
+            return [f'def {nombre}({argumentos}):', f'    return {self.expresion(definicion.body)}']
+        self._condiciones = 0
+        lineas = [f'def {nombre}({argumentos}):', '    _r = np.nan', '    _a = np.True_']
+        lineas += self.sentencias(definicion.body, 'np.True_', '    ')
+        lineas.append('    return _r')
+        return lineas
+
+
+def _presente(columna):
+    return pd.notna(columna)
+
+
+def _bool(columna):
+    """Veracidad fila a fila; un valor ausente (NaN / None) es falso."""
+    columna = np.asarray(columna)
+    if columna.dtype == bool:
+        return columna
+    if columna.dtype == object:
+        return np.array([bool(v) and v == v for v in columna.ravel()], dtype=bool).reshape(columna.shape)
+    return (columna != 0) & ~np.isnan(columna)
+
+
+def _en(columna, opciones):
+    return np.array([v in opciones for v in np.asarray(columna, dtype=object).ravel()], dtype=bool)
+
+
+def _div(numerador, denominador):
+    """Division con la misma guarda que el calculo escalar: denominador 0 -> NaN."""
+    return np.where(denominador != 0.0, numerador / np.where(denominador != 0.0, denominador, 1.0), np.nan)
+
+
+def _pot(base, exponente):
+    """'**' de Python: 0 a exponente negativo (ZeroDivisionError) y desbordamiento (OverflowError) -> NaN."""
+    resultado = np.power(base, exponente)
+    return np.where(np.isfinite(resultado) | ~np.isfinite(base) | ~np.isfinite(exponente), resultado, np.nan)
+
+
+def _max(primero, *resto):
+    """max() de Python: se queda con el primero y solo lo cambia si el siguiente es estrictamente mayor."""
+    for valor in resto:
+        primero = np.where(valor > primero, valor, primero)
+    return primero
+
+
+def _min(primero, *resto):
+    for valor in resto:
+        primero = np.where(valor < primero, valor, primero)
+    return primero
+
+
+def _por_filas(funcion):
+    """
+    Nodo sin traduccion (p. ej. una formula del libro con FORMULAS_DESDE_EXCEL): la funcion escalar
+    fila a fila, con NaN como None; un error o un resultado no real deja la fila en NaN.
+    """
+    def columna(*argumentos):
+        filas = zip(*[[None if v is None or v != v else v for v in np.asarray(a, dtype=object).ravel()]
+                      for a in argumentos])
+        valores = []
+        for fila in filas:
+            try:
+                valor = funcion(*fila)
+            except (ArithmeticError, TypeError, ValueError):
+                valor = None
+            valores.append(valor if isinstance(valor, (int, float)) else np.nan)
+        return np.array(valores, dtype='float64')
+    return columna
+
+
+def _columna(valor, n, vigente=None):
+    """Resultado de un nodo como columna float64 de n filas; NaN donde no se cumplen sus guardas."""
+    valor = np.broadcast_to(np.asarray(valor, dtype='float64'), (n,))
+    return valor if vigente is None else np.where(vigente, valor, np.nan)
+
+
+@lru_cache(maxsize=None)
+def _compilar_lote(nodos):
+    from generar_js import _definicion_de, _definiciones_en_fuente
+
+    archivo = os.path.abspath(inspect.getsourcefile(grafo_formulas))
+    definiciones = _definiciones_en_fuente(grafo_formulas)
+    traductor = _TraductorNumpy()
+    espacio = {'np': np, '_presente': _presente, '_bool': _bool, '_en': _en, '_div': _div, '_pot': _pot,
+               '_max': _max, '_min': _min, '_columna': _columna}
+    lineas, funciones, indice = [], [], {}
+    for nombre, nodo_formula in nodos:
+        if nodo_formula is None or id(nodo_formula.funcion) in indice:
+            continue
+        # Una funcion por funcion Python (los nodos del bucle de Neurocritico comparten lambda)
+        indice[id(nodo_formula.funcion)] = len(funciones)
+        try:
+            definicion = _definicion_de(nodo_formula.funcion, definiciones, archivo)
+            lineas += traductor.funcion(definicion, f'_f{len(funciones)}')
+            funciones.append(None)
+        except ValueError:
+            funciones.append(_por_filas(nodo_formula.funcion))
+
+    # Mismo plan en linea recta y mismas guardas que grafo_formulas.compilar_plan
+    cuerpo = ['def _evaluar_lote(x, n, F):']
+    presentes = set()
+    for nombre, nodo_formula in nodos:
+        if nodo_formula is None:
+            cuerpo.append(f'    v_{nombre} = x[{nombre!r}]')
+            continue
+        i = indice[id(nodo_formula.funcion)]
+        funcion = f'_f{i}' if funciones[i] is None else f'F[{i}]'
+        llamada = f'{funcion}(' + ', '.join('v_' + d for d in nodo_formula.dependencias) + ')'
+        guardas = [] if nodo_formula.admite_vacios else [f'p_{d}' for d in nodo_formula.dependencias]
+        for dep in dict.fromkeys(guardas):
+            if dep not in presentes:
+                presentes.add(dep)
+                cuerpo.append(f'    {dep} = _presente(v_{dep[2:]})')
+        guardas += [f'(v_{d} != 0.0)' for d in nodo_formula.no_cero]
+        cuerpo.append(f'    v_{nombre} = _columna({llamada}, n{", " + " & ".join(guardas) if guardas else ""})')
+    cuerpo.append('    return {' + ', '.join(f'{nombre!r}: v_{nombre}' for nombre, _ in nodos) + '}')
+    exec(compile('\n'.join(lineas + cuerpo), '<plan vectorizado>', 'exec'), espacio)
+    funcion = espacio['_evaluar_lote']
+    return lambda x, n: funcion(x, n, funciones)
+
+
+def compilar_lote(plan):
+    """
+    Funcion que evalua un plan de grafo_formulas sobre columnas: f(x, n) -> {nodo: columna}, con
+    'x' las columnas de entrada ya convertidas (numericas float64, de seleccion object).
+    """
+    return _compilar_lote(tuple((nombre, NODOS.get(nombre)) for nombre in plan))
+
+
+def calcular_lote(df, incluir_entradas=False):
+    """
+    Calcula todos los indices derivados de un DataFrame de pacientes en una sola pasada.
+    Las columnas de entrada usan los mismos nombres que el formulario; las que falten se tratan como vacias.
+    """
+    n = len(df)
+    vacio = np.full(n, np.nan)
+    x = {c: (_a_numero(df[c]) if c in df.columns else vacio) for c in CAMPOS_NUMERICOS}
+    x.update({c: (_a_seleccion(df[c]) if c in df.columns else np.full(n, None, dtype=object))
+              for c in CAMPOS_SELECCION})
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        d = compilar_lote(plan_de_evaluacion(tuple(COLUMNAS_DERIVADAS)))(x, n)
+
+    derivadas = pd.DataFrame({c: d[c] for c in COLUMNAS_DERIVADAS}, index=df.index)
+    if incluir_entradas:
+        entradas = pd.DataFrame({c: x[c] for c in CAMPOS_NUMERICOS}, index=df.index)
+        return pd.concat([entradas, derivadas], axis=1)
+    return derivadas
+
+
+def verificar_paridad(registros):
+    """
+    Compara calcular_lote() contra replicar_formulas() registro por registro. Se omiten los
+    registros que el calculo escalar rechaza (division por cero), que el lote deja en NaN.
+    Devuelve (discrepancias [(indice, panel, etiqueta, escalar, vectorizado)], registros comparados).
+    """
+    from app_de_excel import replicar_formulas
+
+    lote = calcular_lote(pd.DataFrame(registros))
+    discrepancias, comparados = [], 0
+    for i, registro in enumerate(registros):
+        resultados, error = replicar_formulas(registro)
+        if error:
+            continue
+        comparados += 1
+        paneles = resultados.a_dict()
+        for columna, (panel, etiqueta) in COLUMNAS_DERIVADAS.items():
+            if panel is None:
+                continue
+            escalar = paneles.get(panel, {}).get(etiqueta)
+            valor = lote.iloc[i][columna]
+            if escalar is None:
+                if not np.isnan(valor):
+                    discrepancias.append((i, panel, etiqueta, escalar, valor))
+                continue
+            numero = escalar.split()[0]
+            decimales = len(numero.split('.')[1]) if '.' in numero else 0
+            if columna in ('ip_ab', 'ir_ab'):
+                valor = abs(valor)
+            if np.isnan(valor) or f"{valor:.{decimales}f}" != numero:
+                discrepancias.append((i, panel, etiqueta, escalar, valor))
+    return discrepancias, comparados
+
+
+if __name__ == '__main__':
+    import random
+
+    def _paciente_aleatorio(rnd):
+        registro = {c: (str(round(rnd.uniform(0, 150), 3)) if rnd.random() < 0.7 else '') for c in CAMPOS_NUMERICOS}
+        registro['sexo'] = rnd.choice(['H', 'M'])
+        registro['vci_colaps'] = rnd.choice(['total', '>50%', '<50%', 'No cambios'])
+        registro['modo'] = rnd.choice(['PCV', 'VCV'])
+        registro['vaso_dtc'] = rnd.choice(['ACM', 'ACA', 'ACP', 'AB'])
+        return registro
+
+    def _paciente_json(rnd):
+        """Como llegan por la API: numeros, booleanos, listas y objetos mezclados con texto."""
+        registro = _paciente_aleatorio(rnd)
+        for c in CAMPOS_NUMERICOS:
+            sorteo = rnd.random()
+            if sorteo < 0.3:
+                registro[c] = round(rnd.uniform(0, 150), rnd.choice([0, 2]))
+            elif sorteo < 0.35:
+                registro[c] = rnd.choice([True, False, [1.5], {'valor': 2}, None, 7])
+        registro['sexo'] = rnd.choice(['H', 'M', True, ['H'], None])
+        return registro
+
+    from generar_js import _paciente_aleatorio as _paciente_con_ruido
+
+    rnd = random.Random(0)
+    muestra = ([_paciente_aleatorio(rnd) for _ in range(2000)] + [_paciente_json(rnd) for _ in range(1000)]
+               + [_paciente_con_ruido(rnd) for _ in range(2000)])
+    errores, comparados = verificar_paridad(muestra)
+    print(f"{len(muestra)} registros (1000 con valores JSON no textuales, 2000 con negativos y fuera de rango), "
+          f"{comparados} comparados, {len(errores)} discrepancias")
+    for e in errores[:20]:
+        print(e)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Prueba de carga con clientes lentos contra un servidor ya levantado.
+# Uso:
+#   gunicorn app_de_excel:app -c gunicorn.conf.py                      (workers sincronos)
+#   uvicorn servidor_asgi:app --port 5002 --workers 2                  (modo ASGI)
+#   python prueba_carga.py --url http://127.0.0.1:5002 --conexiones 10,100,1000 --lentitud 2
+#
+# Por cada nivel se mantienen '--conexiones' clientes lentos en vuelo durante '--duracion'
+# segundos: cada uno envia un POST /api/calcular del paciente de ejemplo repartiendo el cuerpo
+# en trozos a lo largo de '--lentitud' segundos (un telefono con mala cobertura) y al terminar
+# empieza otro. A la vez un cliente rapido envia peticiones normales de una en una; su latencia
+# muestra si los lentos acaparan el servidor. Se informa cuantas de cada tipo terminaron con 200
+# dentro del '--timeout' y la latencia p50/p99 de las rapidas.
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import PACIENTE_EJEMPLO
+
+TROZOS = 4
+
+
+async def peticion(host, puerto, ruta, cuerpo, lentitud=0.0):
+    """Una peticion HTTP/1.1 con el cuerpo enviado en TROZOS espaciados; devuelve el codigo de estado."""
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        escritor.write((f'POST {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                        f'Content-Length: {len(cuerpo)}\r\nConnection: close\r\n\r\n').encode('latin-1'))
+        tamano = -(-len(cuerpo) // TROZOS)
+        for i in range(0, len(cuerpo), tamano):
+            if lentitud:
+                await asyncio.sleep(lentitud / TROZOS)
+            escritor.write(cuerpo[i:i + tamano])
+            await escritor.drain()
+        respuesta = await lector.read()
+        return int(respuesta.split(b' ', 2)[1])
+    finally:
+        escritor.close()
+
+
+def _percentil(valores, fraccion):
+    return round(valores[min(len(valores) - 1, int(len(valores) * fraccion))], 3) if valores else None
+
+
+async def nivel(url, conexiones, lentitud, duracion, timeout, ruta='/api/calcular'):
+    partes = urlsplit(url)
+    host, puerto = partes.hostname, partes.port or 80
+    cuerpo = json.dumps(PACIENTE_EJEMPLO).encode('utf-8')
+    fin = time.perf_counter() + duracion
+    conteo = {'lentas_ok': 0, 'rapidas_ok': 0}
+    errores = {}
+    latencias = []
+
+    async def una(clave, espera):
+        inicio = time.perf_counter()
+        try:
+            codigo = await asyncio.wait_for(peticion(host, puerto, ruta, cuerpo, espera), timeout)
+        except asyncio.TimeoutError:
+            codigo = 'timeout'
+        except (OSError, IndexError, ValueError) as e:
+            codigo = type(e).__name__
+        if codigo == 200:
+            conteo[clave] += 1
+            return time.perf_counter() - inicio
+        errores[f'{clave[:-3]}:{codigo}'] = errores.get(f'{clave[:-3]}:{codigo}', 0) + 1
+        return None
+
+    async def lento(retraso):
+        await asyncio.sleep(retraso)
+        while time.perf_counter() < fin:
+            await una('lentas_ok', lentitud)
+
+    async def rapido():
+        await asyncio.sleep(lentitud)  # que los lentos ya esten en vuelo
+        while time.perf_counter() < fin:
+            latencia = await una('rapidas_ok', 0.0)
+            if latencia is not None:
+                latencias.append(latencia)
+
+    # Los lentos arrancan escalonados a lo largo de una 'lentitud' para no terminar todos a la vez
+    await asyncio.gather(rapido(), *(lento(i * lentitud / conexiones) for i in range(conexiones)))
+    latencias.sort()
+    return dict(conteo, conexiones=conexiones, errores=errores,
+                rapidas_p50_s=_percentil(latencias, 0.5), rapidas_p99_s=_percentil(latencias, 0.99))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prueba de carga con clientes lentos")
+    parser.add_argument('--url', default='http://127.0.0.1:5002')
+    parser.add_argument('--conexiones', default='10,100,1000', help="Clientes lentos simultaneos, separados por comas")
+    parser.add_argument('--lentitud', type=float, default=2.0, help="Segundos que tarda cada cliente lento en enviar el cuerpo")
+    parser.add_argument('--duracion', type=float, default=10.0, help="Segundos de cada nivel")
+    parser.add_argument('--timeout', type=float, default=10.0)
+    argumentos = parser.parse_args()
+
+    print(f"{'conexiones':>10} {'lentas ok':>10} {'rapidas ok':>10} {'p50 s':>7} {'p99 s':>7}  errores")
+    for conexiones in (int(n) for n in argumentos.conexiones.split(',')):
+        r = asyncio.run(nivel(argumentos.url, conexiones, argumentos.lentitud, argumentos.duracion, argumentos.timeout))
+        print(f"{r['conexiones']:>10} {r['lentas_ok']:>10} {r['rapidas_ok']:>10} {str(r['rapidas_p50_s']):>7} "
+              f"{str(r['rapidas_p99_s']):>7}  {r['errores'] or ''}")
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# Recalculo de todos los indices derivados para una cohorte completa (p. ej. un ano de ingresos)
+# repartido en un pool de procesos.
+# Uso: python recalculo_cohorte.py ingresos.csv [--salida derivados.csv] [--procesos N] [--bloque N]
+#      python recalculo_cohorte.py --escalado 200000   (registros/s con 1..N procesos, cohorte sintetica)
+#      python recalculo_cohorte.py --verificar 5000    (paridad con el calculo de replicar_formulas)
+#
+# Las entradas se convierten una sola vez en el proceso principal (por columnas, como el motor
+# vectorizado) a una matriz float64 con NaN en los vacios y las selecciones a codigos enteros.
+# Esas matrices y la de salida viven en memoria compartida (multiprocessing.shared_memory): cada
+# tarea del pool es solo (inicio, fin), el worker lee sus filas, evalua el plan compilado de
+# grafo_formulas fila a fila (mismas formulas y guardas que replicar_formulas) y escribe en su
+# tramo de la salida. No se serializa ningun diccionario por registro y el orden de entrada se
+# conserva por construccion.
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from esquema_entradas import CAMPOS, ENTRADAS_NUMERICAS, ENTRADAS_SELECCION, RegistroPaciente, parsear_entradas
+from grafo_formulas import compilar_plan, plan_de_evaluacion
+from motor_vectorizado import _a_numero
+from serie_temporal import COLUMNAS_DERIVADAS
+
+TAMANO_BLOQUE = 2000
+
+# Estado de cada registro (columna 'estado' del resultado)
+ESTADO_OK = 0
+ESTADO_DIVISION_CERO = 1   # replicar_formulas mostraria MENSAJE_DIVISION_CERO
+ESTADO_ERROR = 2           # cualquier otra excepcion, o un resultado no real (complejo)
+
+_PLAN = plan_de_evaluacion(COLUMNAS_DERIVADAS)
+
+
+# --- MEMORIA COMPARTIDA ---
+class MatrizCompartida:
+    """Array de NumPy sobre un bloque de memoria compartida; se abre en los workers por nombre."""
+
+    def __init__(self, forma, dtype, nombre=None):
+        self.forma, self.dtype = tuple(forma), np.dtype(dtype)
+        tamano = max(1, math.prod(self.forma) * self.dtype.itemsize)
+        self.memoria = SharedMemory(name=nombre, create=nombre is None, size=tamano if nombre is None else 0)
+        self.array = np.ndarray(self.forma, dtype=self.dtype, buffer=self.memoria.buf)
+
+    def descriptor(self):
+        return self.memoria.name, self.forma, self.dtype.str
+
+    def cerrar(self, liberar=False):
+        self.array = None
+        self.memoria.close()
+        if liberar:
+            self.memoria.unlink()
+
+
+# Matrices abiertas en cada worker (las fija _iniciar_worker)
+_compartidas = None
+
+
+def _iniciar_worker(descriptores, opciones_seleccion):
+    global _compartidas
+    _compartidas = [MatrizCompartida(forma, dtype, nombre) for nombre, forma, dtype in descriptores]
+    _compartidas.append(opciones_seleccion)
+
+
+def _evaluar_tramo(tramo):
+    """Evalua las filas [inicio, fin) de las matrices compartidas del worker."""
+    entradas, selecciones, salida, estados, opciones_seleccion = _compartidas
+    _evaluar_filas(entradas.array, selecciones.array, salida.array, estados.array, opciones_seleccion, *tramo)
+    return tramo
+
+
+def _evaluar_filas(entradas, selecciones, salida, estados, opciones_seleccion, inicio, fin):
+    evaluar = compilar_plan(_PLAN)
+    numericos = ENTRADAS_NUMERICAS
+    seleccion = list(zip(ENTRADAS_SELECCION, opciones_seleccion))
+    for i in range(inicio, fin):
+        registro = RegistroPaciente.__new__(RegistroPaciente)
+        for nombre, valor in zip(numericos, entradas[i].tolist()):
+            setattr(registro, nombre, None if valor != valor else valor)
+        for (nombre, opciones), codigo in zip(seleccion, selecciones[i].tolist()):
+            setattr(registro, nombre, None if codigo < 0 else opciones[codigo])
+        try:
+            valores = evaluar(registro)
+            salida[i] = [math.nan if valores[c] is None else valores[c] for c in COLUMNAS_DERIVADAS]
+            estados[i] = ESTADO_OK
+        except ZeroDivisionError:
+            salida[i] = math.nan
+            estados[i] = ESTADO_DIVISION_CERO
+        except Exception:
+            salida[i] = math.nan
+            estados[i] = ESTADO_ERROR
+
+
+# --- RECALCULO ---
+def _columnas_de_entrada(df):
+    """Matriz de entradas numericas (NaN = vacio), codigos de seleccion (-1 = ausente) y sus opciones."""
+    n = len(df)
+    entradas = np.full((n, len(ENTRADAS_NUMERICAS)), np.nan)
+    for j, nombre in enumerate(ENTRADAS_NUMERICAS):
+        if nombre in df.columns:
+            entradas[:, j] = _a_numero(df[nombre])
+    selecciones = np.full((n, len(ENTRADAS_SELECCION)), -1, dtype=np.int32)
+    opciones_seleccion = []
+    for j, nombre in enumerate(ENTRADAS_SELECCION):
+        unicos = ()
+        if nombre in df.columns:
+            codigos, unicos = pd.factorize(df[nombre], use_na_sentinel=True)
+            selecciones[:, j] = codigos
+        # Mismo criterio que parsear_entradas: las selecciones se guardan como texto
+        opciones_seleccion.append(tuple(u if isinstance(u, str) else str(u) for u in unicos))
+    return entradas, selecciones, opciones_seleccion
+
+
+def recalcular_cohorte(registros, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Indices derivados (columnas de COLUMNAS_DERIVADAS, NaN si no se pueden calcular) y 'estado'
+    de cada registro, en el orden de entrada. 'registros' es un DataFrame o una lista de
+    diccionarios con los nombres de campo del formulario; procesos=None usa todos los nucleos.
+    """
+    df = registros if isinstance(registros, pd.DataFrame) else pd.DataFrame.from_records(registros)
+    n = len(df)
+    procesos = procesos or os.cpu_count() or 1
+    entradas, selecciones, opciones_seleccion = _columnas_de_entrada(df)
+    tramos = [(inicio, min(inicio + tamano_bloque, n)) for inicio in range(0, n, tamano_bloque)]
+
+    if procesos == 1 or len(tramos) <= 1:
+        salida = np.empty((n, len(COLUMNAS_DERIVADAS)))
+        estados = np.empty(n, dtype=np.int8)
+        _evaluar_filas(entradas, selecciones, salida, estados, opciones_seleccion, 0, n)
+    else:
+        compartidas = [MatrizCompartida(entradas.shape, entradas.dtype),
+                       MatrizCompartida(selecciones.shape, selecciones.dtype),
+                       MatrizCompartida((n, len(COLUMNAS_DERIVADAS)), np.float64),
+                       MatrizCompartida((n,), np.int8)]
+        try:
+            compartidas[0].array[:] = entradas
+            compartidas[1].array[:] = selecciones
+            del entradas, selecciones
+            descriptores = [m.descriptor() for m in compartidas]
+            with multiprocessing.get_context().Pool(min(procesos, len(tramos)), initializer=_iniciar_worker,
+                                                    initargs=(descriptores, opciones_seleccion)) as pool:
+                for _ in pool.imap_unordered(_evaluar_tramo, tramos):
+                    pass
+            salida, estados = compartidas[2].array.copy(), compartidas[3].array.copy()
+        finally:
+            for matriz in compartidas:
+                matriz.cerrar(liberar=True)
+
+    resultado = pd.DataFrame(salida, columns=list(COLUMNAS_DERIVADAS), index=df.index)
+    resultado['estado'] = estados
+    return resultado
+
+
+def leer_cohorte(ruta):
+    """DataFrame (todo texto) de un CSV o XLSX con los mismos lectores que la carga masiva."""
+    from carga_masiva import filas_csv, filas_xlsx
+
+    with open(ruta, 'rb') as archivo:
+        if ruta.lower().endswith('.xlsx'):
+            encabezado, filas = filas_xlsx(archivo)
+        else:
+            encabezado, filas = filas_csv(archivo)
+        ancho = len(encabezado)
+        return pd.DataFrame.from_records(
+            [tuple(fila[:ancho]) + ('',) * (ancho - len(fila)) for fila in filas], columns=encabezado)
+
+
+# --- VERIFICACION Y ESCALADO ---
+def cohorte_sintetica(n, semilla=0):
+    """Registros con valores dentro del rango plausible de cada campo, ~20% vacios y coma decimal ocasional."""
+    rnd = random.Random(semilla)
+    registros = []
+    for _ in range(n):
+        registro = {}
+        for campo in CAMPOS:
+            if campo.es_seleccion:
+                registro[campo.nombre] = rnd.choice([valor for valor, _ in campo.opciones])
+            elif rnd.random() < 0.2:
+                registro[campo.nombre] = ''
+            else:
+                valor = str(round(rnd.uniform(*campo.rango), 2))
+                registro[campo.nombre] = valor.replace('.', ',') if rnd.random() < 0.05 else valor
+        registros.append(registro)
+    return registros
+
+
+def verificar_paridad(registros, procesos=2, tamano_bloque=500):
+    """
+    Compara recalcular_cohorte() con el calculo escalar registro a registro (parsear_entradas y
+    el plan compilado, como replicar_formulas). Devuelve la lista de indices con discrepancias.
+    """
+    lote = recalcular_cohorte(registros, procesos=procesos, tamano_bloque=tamano_bloque)
+    evaluar = compilar_plan(_PLAN)
+    discrepancias = []
+    for i, registro in enumerate(registros):
+        try:
+            valores = evaluar(parsear_entradas(registro))
+            esperado = np.array([math.nan if valores[c] is None else valores[c] for c in COLUMNAS_DERIVADAS],
+                                dtype=float)
+            estado = ESTADO_OK
+        except ZeroDivisionError:
+            estado, esperado = ESTADO_DIVISION_CERO, None
+        except Exception:
+            estado, esperado = ESTADO_ERROR, None
+        fila = lote.iloc[i]
+        if fila['estado'] != estado or (esperado is not None and not np.array_equal(
+                fila[list(COLUMNAS_DERIVADAS)].to_numpy(dtype=float), esperado, equal_nan=True)):
+            discrepancias.append(i)
+    return discrepancias
+
+
+def medir_escalado(n, max_procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """Segundos y registros/s de recalcular_cohorte() con 1..max_procesos procesos."""
+    df = pd.DataFrame.from_records(cohorte_sintetica(n))
+    filas = []
+    for procesos in range(1, (max_procesos or os.cpu_count() or 1) + 1):
+        inicio = time.perf_counter()
+        recalcular_cohorte(df, procesos=procesos, tamano_bloque=tamano_bloque)
+        segundos = time.perf_counter() - inicio
+        filas.append({'procesos': procesos, 'segundos': round(segundos, 3), 'registros_s': round(n / segundos)})
+    for fila in filas:
+        fila['aceleracion'] = round(filas[0]['segundos'] / fila['segundos'], 2)
+        fila['eficiencia'] = round(fila['aceleracion'] / fila['procesos'], 2)
+    return filas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Recalculo de indices derivados de una cohorte en un pool de procesos")
+    parser.add_argument('archivo', nargs='?', help="CSV o XLSX con los campos del formulario como columnas")
+    parser.add_argument('--salida', default='derivados.csv')
+    parser.add_argument('--procesos', type=int, default=None, help="Por defecto, todos los nucleos")
+    parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE, help="Registros por tarea del pool")
+    parser.add_argument('--escalado', type=int, metavar='N', help="Mide 1..--procesos procesos con N registros sinteticos")
+    parser.add_argument('--verificar', type=int, metavar='N', help="Compara con el calculo escalar en N registros sinteticos")
+    argumentos = parser.parse_args()
+
+    if argumentos.verificar:
+        errores = verificar_paridad(cohorte_sintetica(argumentos.verificar, semilla=1))
+        print(f"{argumentos.verificar} registros, {len(errores)} discrepancias {errores[:20]}")
+    elif argumentos.escalado:
+        print(f"{argumentos.escalado} registros, bloques de {argumentos.bloque} (nucleos disponibles: {os.cpu_count()})")
+        print(f"{'procesos':>8} {'segundos':>9} {'registros/s':>12} {'aceleracion':>12} {'eficiencia':>11}")
+        for fila in medir_escalado(argumentos.escalado, argumentos.procesos, argumentos.bloque):
+            print(f"{fila['procesos']:>8} {fila['segundos']:>9} {fila['registros_s']:>12} "
+                  f"{fila['aceleracion']:>12} {fila['eficiencia']:>11}")
+    elif argumentos.archivo:
+        cohorte = leer_cohorte(argumentos.archivo)
+        inicio = time.perf_counter()
+        derivados = recalcular_cohorte(cohorte, argumentos.procesos, argumentos.bloque)
+        segundos = time.perf_counter() - inicio
+        pd.concat([cohorte, derivados], axis=1).to_csv(argumentos.salida, index=False)
+        print(f"{len(cohorte)} registros en {segundos:.2f} s -> {argumentos.salida} "
+              f"({int((derivados['estado'] != ESTADO_OK).sum())} con error)")
+    else:
+        parser.print_help()
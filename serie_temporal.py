@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Serie temporal por paciente (cama): instantaneas de entradas e indices derivados.
+# Cada paciente tiene un archivo binario de solo anexado ('series/<id>.f64') con filas
+# de float64 de ancho fijo [t, columna_1, ..., columna_n]; un envio es un unico write()
+# con O_APPEND, asi que varios workers de gunicorn pueden anexar al mismo archivo.
+# Como las filas tienen ancho fijo y se anexan en orden de tiempo, la primera fila de la
+# ventana (ultimas 72 h) se encuentra por busqueda binaria leyendo solo la columna de
+# tiempo, y la ventana completa es un unico pread() contiguo: nunca se lee el historial
+# entero ni se guarda en memoria entre peticiones.
+# numpy se importa con el modulo: con preload_app lo carga una vez el maestro y los workers
+# lo heredan al hacer fork.
+
+import hashlib
+import math
+import os
+import struct
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from grafo_formulas import ENTRADAS_NUMERICAS, NODOS, PANELES, Salida, plan_de_evaluacion
+
+DIRECTORIO_SERIES = os.environ.get('DIRECTORIO_SERIES', 'series')
+HORAS_TENDENCIA = 72
+
+# Indices derivados mostrados en los paneles + entradas numericas del formulario
+COLUMNAS_DERIVADAS = tuple(OrderedDict.fromkeys(
+    fila.nodo for filas in PANELES.values() for fila in filas
+    if isinstance(fila, Salida) and fila.nodo in NODOS))
+COLUMNAS = COLUMNAS_DERIVADAS + tuple(ENTRADAS_NUMERICAS)
+INDICE_COLUMNA = {nombre: i + 1 for i, nombre in enumerate(COLUMNAS)}  # la columna 0 es el tiempo
+ANCHO_FILA = len(COLUMNAS) + 1
+BYTES_FILA = 8 * ANCHO_FILA
+# Si cambia la lista de columnas cambia el nombre de los archivos (los antiguos no se mezclan)
+_VERSION_COLUMNAS = hashlib.sha256(','.join(COLUMNAS).encode()).hexdigest()[:8]
+
+# Tendencias mostradas junto a los resultados: (nodo, etiqueta, formato)
+TENDENCIAS = [
+    ('tam', 'TAM', '{:.0f} mmHg'),
+    ('gc', 'GC', '{:.2f} L/min'),
+    ('do2', 'DO₂', '{:.0f} ml/min'),
+    ('driving_p', 'Driving P.', '{:.0f} cmH₂O'),
+    ('ppc', 'PPC', '{:.1f} mmHg'),
+    ('lactato', 'Lactato', '{:.2f} mmol/L'),
+]
+
+
+def ruta_serie(id_paciente):
+    """El id se resume con SHA-256: cualquier texto es un nombre de archivo valido y no se expone en disco."""
+    resumen = hashlib.sha256(id_paciente.encode('utf-8')).hexdigest()[:24]
+    return os.path.join(DIRECTORIO_SERIES, f'{resumen}-{_VERSION_COLUMNAS}.f64')
+
+
+def valores_instantanea(evaluador):
+    """
+    Valores de todas las columnas a partir del Evaluador del calculo (None, complejos y textos -> NaN).
+    Los derivados ya calculados para los paneles se reutilizan; solo se calculan los que falten
+    (por ejemplo, si la API pidio un subconjunto de paneles o el resultado vino de la cache).
+    """
+    evaluador.evaluar(plan_de_evaluacion(COLUMNAS_DERIVADAS))  # cacheado; se rehace si cambian los NODOS
+    valores, registro = evaluador.valores, evaluador.user_inputs
+    fila = [valores[nombre] if nombre in valores else getattr(registro, nombre) for nombre in COLUMNAS]
+    # Un peso negativo hace complejas SCT y derivadas: la pagina las muestra, la serie no las guarda
+    return [float(v) if isinstance(v, (int, float)) else math.nan for v in fila]
+
+
+class SeriePaciente:
+    """Archivo de la serie de un paciente; cada consulta lee solo las filas de su ventana."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def agregar(self, valores, instante=None):
+        fila = np.array([time.time() if instante is None else instante] + list(valores), dtype='<f8')
+        os.makedirs(os.path.dirname(self.ruta) or '.', exist_ok=True)
+        descriptor = os.open(self.ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            os.write(descriptor, fila.tobytes())
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def _primera_fila_desde(descriptor, n, desde):
+        """Indice de la primera de las 'n' filas con tiempo >= desde (busqueda binaria sobre el archivo)."""
+        bajo, alto = 0, n
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            (tiempo,) = struct.unpack('<d', os.pread(descriptor, 8, medio * BYTES_FILA))
+            if tiempo < desde:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def ventana(self, columnas, horas=HORAS_TENDENCIA, ahora=None):
+        """
+        (tiempos, [valores por columna]) de las ultimas 'horas'. Solo se leen del disco las
+        filas de la ventana; todas las columnas salen de la misma lectura y tienen la misma longitud.
+        """
+        desde = (time.time() if ahora is None else ahora) - horas * 3600
+        try:
+            descriptor = os.open(self.ruta, os.O_RDONLY)
+        except FileNotFoundError:
+            return np.empty(0), [np.empty(0) for _ in columnas]
+        try:
+            n = os.fstat(descriptor).st_size // BYTES_FILA  # una fila a medio escribir se lee en la siguiente consulta
+            inicio = self._primera_fila_desde(descriptor, n, desde)
+            datos = os.pread(descriptor, (n - inicio) * BYTES_FILA, inicio * BYTES_FILA)
+        finally:
+            os.close(descriptor)
+        filas = np.frombuffer(datos, dtype='<f8').reshape(-1, ANCHO_FILA)
+        return filas[:, 0], [filas[:, INDICE_COLUMNA[c]] for c in columnas]
+
+
+class AlmacenSeries:
+    """Acceso a las series por id de paciente; no guarda datos en memoria entre peticiones."""
+
+    def serie(self, id_paciente):
+        return SeriePaciente(ruta_serie(id_paciente))
+
+    def registrar(self, id_paciente, evaluador, instante=None):
+        """Anexa la instantanea (entradas + derivados) del calculo hecho con 'evaluador'."""
+        self.serie(id_paciente).agregar(valores_instantanea(evaluador), instante)
+
+    def tendencias(self, id_paciente, horas=HORAS_TENDENCIA, ancho=100, alto=24):
+        """
+        Resumen de TENDENCIAS para la plantilla: ultimo valor, minimo, maximo y los puntos
+        de una linea SVG (viewBox 0 0 ancho alto). Se omiten los indices sin datos en la ventana.
+        """
+        todos_tiempos, columnas = self.serie(id_paciente).ventana([nodo for nodo, _, _ in TENDENCIAS], horas)
+        filas = []
+        for (nodo, etiqueta, formato), valores in zip(TENDENCIAS, columnas):
+            validos = ~np.isnan(valores)
+            if not validos.any():
+                continue
+            tiempos, valores = todos_tiempos[validos], valores[validos]
+            minimo, maximo = float(valores.min()), float(valores.max())
+            t0, dt = tiempos[0], (tiempos[-1] - tiempos[0]) or 1.0
+            dv = (maximo - minimo) or 1.0
+            puntos = ' '.join(f'{(t - t0) / dt * ancho:.1f},{alto - (v - minimo) / dv * alto:.1f}'
+                              for t, v in zip(tiempos, valores))
+            filas.append({
+                'etiqueta': etiqueta,
+                'ultimo': formato.format(valores[-1]),
+                'minimo': formato.format(minimo),
+                'maximo': formato.format(maximo),
+                'n': len(valores),
+                'puntos': puntos,
+            })
+        return filas
+
+
+almacen_series = AlmacenSeries()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+# Modo de servicio asincrono (ASGI) para despliegues con muchas conexiones concurrentes.
+# Uso: uvicorn servidor_asgi:app --host 0.0.0.0 --port 5002 --workers 2
+#   o: gunicorn servidor_asgi:app -k uvicorn.workers.UvicornWorker -c gunicorn.conf.py
+#
+# Con workers sincronos un cliente lento (un telefono con mala Wi-Fi de planta) ocupa un
+# worker entero mientras sube el formulario o descarga el HTML. Aqui el bucle de asyncio
+# recibe el cuerpo y envia la respuesta sin ocupar hilos; solo el trabajo de CPU (la app
+# Flask: replicar_formulas, cache, render) corre en un pool de hilos acotado.
+# Los cuerpos grandes (el archivo y el CSV de /api/carga-masiva) no se juntan en memoria:
+# pasado UMBRAL_FLUJO el hilo lee el resto de la subida segun la pide la aplicacion y envia
+# la respuesta por partes segun la produce. Solo esas peticiones ocupan el hilo mientras dura
+# la transferencia.
+# Se reutiliza la aplicacion Flask tal cual: mismas rutas, mismos resultados.
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import ClientDisconnected
+
+from app_de_excel import app as app_flask
+from historial import historial
+
+# Hilos de calculo por proceso y peticiones que pueden esperar turno antes de recibir 503
+HILOS_CALCULO = int(os.environ.get('ASGI_HILOS', str(min(4, os.cpu_count() or 1))))
+MAX_PENDIENTES = int(os.environ.get('ASGI_MAX_PENDIENTES', '1024'))
+# Cuerpos (de peticion o de respuesta) hasta este tamano se mueven enteros en el bucle; el resto
+# (la carga masiva) fluye por partes desde el hilo del pool
+UMBRAL_FLUJO = 256 * 1024
+
+
+class AplicacionASGI:
+    """Adaptador ASGI -> WSGI con E/S en el bucle de eventos y la aplicacion en un pool acotado."""
+
+    def __init__(self, app_wsgi, hilos=HILOS_CALCULO, max_pendientes=MAX_PENDIENTES):
+        self.app_wsgi = app_wsgi
+        self.hilos = hilos
+        self.max_pendientes = max_pendientes
+        self.pendientes = 0
+        self._pool = None
+
+    @property
+    def pool(self):
+        # Se crea en el proceso del worker (tras el fork), no al importar
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.hilos, thread_name_prefix='calculo')
+        return self._pool
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._ciclo_de_vida(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _ciclo_de_vida(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                if self._pool is not None:
+                    self._pool.shutdown(wait=True)
+                historial.cerrar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        # 1. Cuerpo en el bucle hasta UMBRAL_FLUJO: un cliente lento no retiene ningun hilo
+        partes = []
+        recibidos = 0
+        terminado = False
+        while recibidos <= UMBRAL_FLUJO:
+            mensaje = await receive()
+            if mensaje['type'] == 'http.disconnect':
+                return
+            parte = mensaje.get('body', b'')
+            recibidos += len(parte)
+            partes.append(parte)
+            if not mensaje.get('more_body', False):
+                terminado = True
+                break
+
+        # 2. Calculo en el pool acotado; por encima del limite se rechaza en vez de encolar sin fin
+        if self.pendientes >= self.max_pendientes:
+            await _responder(send, 503, [(b'content-type', b'text/plain'), (b'retry-after', b'1')],
+                             b'Servidor ocupado')
+            return
+        self.pendientes += 1
+        bucle = asyncio.get_running_loop()
+        try:
+            cuerpo = b''.join(partes)
+            if not terminado:
+                # El resto de la subida lo lee el hilo a medida que la aplicacion lo consume
+                cuerpo = io.BufferedReader(CuerpoEntrante(cuerpo, receive, bucle))
+            entorno = entorno_wsgi(scope, cuerpo)
+            estado, cabeceras, partes = await bucle.run_in_executor(
+                self.pool, _ejecutar_wsgi, self.app_wsgi, entorno, _enviar_desde_hilo(send, bucle))
+        finally:
+            self.pendientes -= 1
+
+        # 3. Respuesta en el bucle (salvo que el hilo ya la haya enviado por partes)
+        if estado is not None:
+            await _responder(send, estado, cabeceras, b''.join(partes))
+
+
+class CuerpoEntrante(io.RawIOBase):
+    """
+    wsgi.input para subidas grandes: entrega lo ya recibido y despues pide al bucle los
+    siguientes mensajes http.request segun los lee la aplicacion (desde el hilo del pool).
+    """
+
+    def __init__(self, inicio, receive, bucle):
+        self._pendiente = memoryview(inicio)
+        self._receive = receive
+        self._bucle = bucle
+        self._terminado = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        while not self._pendiente and not self._terminado:
+            mensaje = asyncio.run_coroutine_threadsafe(self._receive(), self._bucle).result()
+            if mensaje['type'] == 'http.disconnect':
+                self._terminado = True
+                raise ClientDisconnected()
+            self._pendiente = memoryview(mensaje.get('body', b''))
+            self._terminado = not mensaje.get('more_body', False)
+        n = min(len(destino), len(self._pendiente))
+        destino[:n] = self._pendiente[:n]
+        self._pendiente = self._pendiente[n:]
+        return n
+
+
+def entorno_wsgi(scope, cuerpo):
+    """
+    Entorno WSGI (PEP 3333) equivalente a un scope HTTP de ASGI. 'cuerpo' son los bytes completos
+    o un archivo que se lee por partes; en ese caso la longitud es la de la cabecera, si la hay.
+    """
+    servidor = scope.get('server') or ('localhost', 80)
+    cliente = scope.get('client') or ('', 0)
+    entorno = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': servidor[0],
+        'SERVER_PORT': str(servidor[1]),
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'REMOTE_ADDR': cliente[0],
+        'REMOTE_PORT': str(cliente[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(cuerpo) if isinstance(cuerpo, bytes) else cuerpo,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for nombre, valor in scope.get('headers', []):
+        nombre = nombre.decode('latin-1').upper().replace('-', '_')
+        valor = valor.decode('latin-1')
+        if nombre in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            entorno[nombre] = valor
+        else:
+            clave = 'HTTP_' + nombre
+            entorno[clave] = entorno[clave] + ',' + valor if clave in entorno else valor
+    if isinstance(cuerpo, bytes):
+        entorno['CONTENT_LENGTH'] = str(len(cuerpo))
+    elif 'CONTENT_LENGTH' not in entorno:
+        entorno['wsgi.input_terminated'] = True  # cuerpo por partes (chunked): se lee hasta el final
+    return entorno
+
+
+def _enviar_desde_hilo(send, bucle):
+    """send() de ASGI para llamarlo desde un hilo del pool: espera a que el bucle envie el mensaje."""
+    def enviar(mensaje):
+        asyncio.run_coroutine_threadsafe(send(mensaje), bucle).result()
+    return enviar
+
+
+def _ejecutar_wsgi(app_wsgi, entorno, enviar):
+    """
+    Corre la aplicacion en un hilo del pool. Si la respuesta cabe en UMBRAL_FLUJO devuelve
+    (estado, cabeceras, partes) para que el bucle la envie y el hilo quede libre; si no (las
+    respuestas de flujo de la carga masiva) la envia por partes con 'enviar' segun se produce,
+    sin juntarla en memoria, y devuelve (None, None, None).
+    """
+    inicio = {}
+
+    def start_response(estado, cabeceras, exc_info=None):
+        inicio['estado'] = int(estado.split(' ', 1)[0])
+        inicio['cabeceras'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in cabeceras]
+
+    iterable = app_wsgi(entorno, start_response)
+    try:
+        iterador = iter(iterable)
+        partes = []
+        tamano = 0
+        for parte in iterador:
+            partes.append(parte)
+            tamano += len(parte)
+            if tamano > UMBRAL_FLUJO:
+                break
+        else:
+            return inicio['estado'], inicio['cabeceras'], partes
+        try:
+            enviar({'type': 'http.response.start', 'status': inicio['estado'], 'headers': inicio['cabeceras']})
+            enviar({'type': 'http.response.body', 'body': b''.join(partes), 'more_body': True})
+            for parte in iterador:
+                if parte:
+                    enviar({'type': 'http.response.body', 'body': parte, 'more_body': True})
+            enviar({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass  # el cliente se desconecto: se deja de generar la respuesta
+        return None, None, None
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+async def _responder(send, estado, cabeceras, cuerpo):
+    await send({'type': 'http.response.start', 'status': estado, 'headers': cabeceras})
+    await send({'type': 'http.response.body', 'body': cuerpo})
+
+
+app = AplicacionASGI(app_flask)
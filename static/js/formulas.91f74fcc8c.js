@@ -0,0 +1,618 @@
+// Generado por generar_js.py a partir de grafo_formulas.py y esquema_entradas.py: no editar a mano.
+(function (raiz) {
+'use strict';
+const CAMPOS_NUMERICOS = ["edad_anos", "peso_kg", "talla_m", "tas", "tad", "fc", "sato2_sv", "ph_a", "paco2", "pao2", "sato2_a", "lactato", "hb", "ph_v", "pvco2", "pvo2", "satvo2", "vti", "tsvi", "vci", "pvc_medido", "mapse_l", "mapse_s", "e_onda", "a_onda", "eprim_lat", "eprim_med", "vfs", "vfd", "long_vi", "vtmax", "tapse", "vti_pulmonar", "vt_protec", "vt_ventilador", "fr", "peco2", "peep", "fio2", "plateau", "ppico", "cstat_input", "cdin_input", "v_min", "pocc", "vs_acm", "vd_acm", "vs_ab", "vd_ab", "vs_dtc", "vd_dtc", "vm_aci", "vm_ave", "vno_der", "vno_izq", "vno_dgo", "ph_jo2", "paco2_jo2", "pao2_jo2", "sato2_jo2", "lactato_jo2"];
+const CAMPOS_SELECCION = ["sexo", "vci_colaps", "modo", "vaso_dtc"];
+const MENSAJE_DIVISION_CERO = "Error de Division por Cero. Revisa los campos que resultan en un cero en el denominador (e.g., PaCO₂, CI, VFD, VM, VTI Pulmonar, POCC, etc.).";
+
+class ErrorCalculo extends Error {}
+class ErrorDivisionCero extends ErrorCalculo {}
+class ErrorComplejo extends Error {}
+
+// Veracidad de Python: NaN es verdadero, 0 / '' / null / false no
+function _bool(x) { return x !== null && x !== undefined && x !== 0 && x !== '' && x !== false; }
+
+function _div(a, b) {
+    if (b === 0) throw new ErrorDivisionCero('division by zero');
+    return a / b;
+}
+
+function _pot(a, b) {
+    if (a === 0 && b < 0) throw new ErrorDivisionCero('0.0 cannot be raised to a negative power');
+    if (a < 0 && !Number.isInteger(b)) throw new ErrorComplejo('resultado complejo');
+    const r = a ** b;
+    if (!Number.isFinite(r) && Number.isFinite(a) && Number.isFinite(b)) {
+        throw new ErrorCalculo("OverflowError: (34, 'Numerical result out of range')");
+    }
+    return r;
+}
+
+// max/min de Python: se queda con el primero y solo lo cambia si el siguiente es estrictamente mayor/menor
+function _max(...valores) { return valores.reduce((a, b) => (b > a ? b : a)); }
+function _min(...valores) { return valores.reduce((a, b) => (b < a ? b : a)); }
+
+// '{:.Nf}'.format(x) de Python
+function _fijo(x, decimales) {
+    if (!Number.isFinite(x)) return Number.isNaN(x) ? 'nan' : (x > 0 ? 'inf' : '-inf');
+    const signo = (x < 0 || Object.is(x, -0)) ? '-' : '';
+    const a = Math.abs(x);
+    const j = a * 2 ** (decimales + 1);
+    let texto;
+    if (Number.isInteger(j) && j % 2 === 1) {
+        // Empate exacto (a * 10^N termina en .5): Python redondea al par, toFixed hacia arriba
+        let n = (BigInt(j) * 5n ** BigInt(decimales) - 1n) / 2n;
+        if (n % 2n === 1n) n += 1n;
+        texto = n.toString().padStart(decimales + 1, '0');
+        texto = decimales ? texto.slice(0, -decimales) + '.' + texto.slice(-decimales) : texto;
+    } else if (a >= 1e21) {
+        texto = BigInt(a).toString() + (decimales ? '.' + '0'.repeat(decimales) : '');
+    } else {
+        texto = a.toFixed(decimales);
+    }
+    return signo + texto;
+}
+
+// float() de Python sobre texto (guiones bajos entre digitos, inf, nan, espacios)
+const _NUMERO = /^[+-]?(?:(?:\d(?:_?\d)*)?\.\d(?:_?\d)*|\d(?:_?\d)*\.?)(?:[eE][+-]?\d(?:_?\d)*)?$/;
+const _ESPECIAL = /^([+-]?)(inf|infinity|nan)$/i;
+function _float(texto) {
+    texto = texto.trim();
+    if (_NUMERO.test(texto)) return Number(texto.replace(/_/g, ''));
+    const especial = _ESPECIAL.exec(texto);
+    if (especial === null) return null;
+    if (especial[2].toLowerCase() === 'nan') return NaN;
+    return especial[1] === '-' ? -Infinity : Infinity;
+}
+
+// Mismo resultado que esquema_entradas.parsear_entradas
+function parsear(datos) {
+    const registro = {};
+    const crudos = {};
+    for (const nombre of CAMPOS_NUMERICOS) {
+        const v = crudos[nombre] = datos[nombre] === undefined ? null : datos[nombre];
+        if (v === null || v === '') {
+            registro[nombre] = null;
+        } else if (typeof v === 'string') {
+            const numero = _float(v);
+            registro[nombre] = numero !== null ? numero : _float(v.replace(/,/g, '.'));
+        } else {
+            registro[nombre] = typeof v === 'number' ? v : null;
+        }
+    }
+    for (const nombre of CAMPOS_SELECCION) {
+        const v = crudos[nombre] = datos[nombre] === undefined ? null : datos[nombre];
+        registro[nombre] = v === null || typeof v === 'string' ? v : String(v);
+    }
+    registro.hay_datos = Object.values(crudos).some(_bool);
+    return registro;
+}
+
+// Nivel de alerta mas grave por nodo, como alertas.niveles_por_nodo(alertas.reglas_activas(valores))
+function nivelesDeAlerta(valores) {
+    const activas = alertas(valores), niveles = {};
+    REGLAS.forEach((regla, i) => {
+        if (!activas[i]) return;
+        for (const nodo of regla.variables) {
+            if (!(nodo in niveles) || NIVELES.indexOf(regla.nivel) > NIVELES.indexOf(niveles[nodo])) niveles[nodo] = regla.nivel;
+        }
+    });
+    return niveles;
+}
+
+// Mismo resultado que replicar_formulas(datos)[0]: {paneles: a_dict(), alertas: alertas_por_fila()}
+// o {error: '...'}; null si el resultado seria un numero complejo (lo resuelve el servidor)
+function calcular(datos) {
+    const registro = parsear(datos);
+    try {
+        const valores = evaluar(registro);
+        const paneles = {}, resaltadas = {};
+        if (!(_bool(valores.peso_kg) && _bool(valores.talla_m)) && !registro.hay_datos) return {paneles, alertas: resaltadas};
+        const niveles = nivelesDeAlerta(valores);
+        for (const [nombre, filas] of PANELES) {
+            const salida = paneles[nombre] = {};
+            for (const fila of filas) {
+                if (fila.titulo !== undefined) {
+                    salida['-- ' + fila.titulo + ' --'] = ' ';
+                    continue;
+                }
+                const valor = valores[fila.nodo];
+                if (valor === null) continue;
+                let texto;
+                if (fila.formato === null) {
+                    texto = _bool(valor) && !fila.omitir.includes(valor) ? valor : null;
+                } else {
+                    texto = fila.formato(valor);
+                }
+                if (texto === null) continue;
+                salida[fila.etiqueta] = texto;
+                if (niveles[fila.nodo]) (resaltadas[nombre] = resaltadas[nombre] || {})[fila.etiqueta] = niveles[fila.nodo];
+            }
+        }
+        return {paneles, alertas: resaltadas};
+    } catch (error) {
+        if (error instanceof ErrorDivisionCero) return {error: MENSAJE_DIVISION_CERO};
+        if (error instanceof ErrorCalculo) return {error: 'Error inesperado durante el calculo: ' + error.message};
+        if (error instanceof ErrorComplejo) return null;
+        throw error;
+    }
+}
+
+const F = [
+    (peso_kg, talla_m) => _div(peso_kg, _pot(talla_m, 2)),
+    (peso_kg, talla_m) => (_bool((_bool((peso_kg >= 0)) && _bool((talla_m >= 0)))) ? (((0.020247 * _pot(peso_kg, 0.425)) * _pot(talla_m, 0.725)) * 10) : null),
+    function (talla_m, sexo) {
+        let talla_pulgadas_menos_60;
+        talla_pulgadas_menos_60 = (_div((talla_m * 100), 2.54) - 60);
+        if (_bool((sexo === "H"))) {
+            return (56.2 + (1.41 * talla_pulgadas_menos_60));
+        }
+        if (_bool((sexo === "M"))) {
+            return (53.1 + (1.36 * talla_pulgadas_menos_60));
+        }
+        return null;
+        return null;
+    },
+    (talla_m) => (talla_m * 100),
+    function (sexo, edad, peso_kg, talla_cm) {
+        if (_bool((sexo === "H"))) {
+            return (((2.447 - (0.09156 * edad)) + (0.3362 * peso_kg)) + (0.1074 * talla_cm));
+        }
+        if (_bool((sexo === "M"))) {
+            return (((-2.097) + (0.1069 * talla_cm)) + (0.2466 * peso_kg));
+        }
+        return null;
+        return null;
+    },
+    (tas, tad) => _div((tas + (2 * tad)), 3),
+    (talla_cm) => ((0.01 * talla_cm) + 0.25),
+    (tsvi, vti) => ((_pot(tsvi, 2) * 0.785) * vti),
+    (vs_macro, fc) => (_div(vs_macro, 1000) * fc),
+    (gc, sct) => _div(gc, sct),
+    function (vci, vci_colaps, pvc_medido) {
+        if (_bool((_bool((vci !== null)) && _bool((vci_colaps !== null)) && _bool((vci > 0))))) {
+            if (_bool((vci < 1.5))) {
+                return 5;
+            }
+            if (_bool((_bool((vci >= 1.5)) && _bool((vci <= 2.5))))) {
+                if (_bool(["total", ">50%"].includes(vci_colaps))) {
+                    return 8;
+                }
+                if (_bool((vci_colaps === "<50%"))) {
+                    return 13;
+                }
+            } else {
+                if (_bool((vci > 2.5))) {
+                    if (_bool((vci_colaps === "<50%"))) {
+                        return 18;
+                    }
+                    if (_bool((vci_colaps === "No cambios"))) {
+                        return 20;
+                    }
+                }
+            }
+            return null;
+        }
+        return pvc_medido;
+        return null;
+    },
+    (tam, pvc_eco, gc) => _div(((tam - pvc_eco) * 80), gc),
+    (rvs, sct) => _div(rvs, sct),
+    (hb, sato2_a, pao2) => (((1.36 * hb) * _div(sato2_a, 100.0)) + (0.0031 * pao2)),
+    (hb, satvo2, pvo2) => (((1.36 * hb) * _div(satvo2, 100.0)) + (0.0031 * pvo2)),
+    (hb, pao2) => (((1.36 * hb) * 1.0) + (0.0031 * pao2)),
+    (cao2, cvo2) => (cao2 - cvo2),
+    (gc, davo2) => ((gc * davo2) * 10),
+    (vo2, sct) => _div(vo2, sct),
+    (gc, cao2) => ((gc * cao2) * 10),
+    (do2, sct) => _div(do2, sct),
+    (davo2, cao2) => (_div(davo2, cao2) * 100),
+    (pvco2, paco2) => (pvco2 - paco2),
+    (vo2, davo2) => _div((vo2 * 10), (davo2 * 100)),
+    (e_onda, a_onda) => _div(e_onda, a_onda),
+    (eprim_lat, eprim_med) => _div((eprim_lat + eprim_med), 2),
+    (e_onda, eprim_prom) => _div(e_onda, eprim_prom),
+    (vfd, vfs) => (_div((vfd - vfs), vfd) * 100),
+    (mapse_l, mapse_s, long_vi) => (-(_div(_div((mapse_l + mapse_s), 2), long_vi) * 100)),
+    (tas, vs_macro) => _div((0.9 * tas), vs_macro),
+    (tas, vfs) => _div((0.9 * tas), vfs),
+    (ea, ee) => _div(ea, ee),
+    (tam, gc) => _div((tam * gc), 451),
+    (e_eprim) => ((e_eprim * 1.24) + 1.9),
+    (vtmax) => (4 * _pot(vtmax, 2)),
+    (gradiente_it, pvc_eco) => (gradiente_it + pvc_eco),
+    (psap) => ((0.6 * psap) + 2),
+    (vtmax, vti_pulmonar) => ((_div(vtmax, vti_pulmonar) * 10) + 0.16),
+    (pmap, welch, ic) => (_div((pmap - welch), ic) * 80),
+    (tapse, psap) => _div(tapse, psap),
+    (pi) => pi,
+    (vt_protec, peso_sdra) => (vt_protec * peso_sdra),
+    (plateau, peep) => (plateau - peep),
+    (vt, driving_p) => _div(vt, driving_p),
+    (ppico, peep) => (ppico - peep),
+    (vt, dp) => _div(vt, dp),
+    (ppico, plateau) => (ppico - plateau),
+    (paco2, peco2) => (_div((paco2 - peco2), paco2) * 100),
+    function (pi, paco2, v_min) {
+        let ev_denominador;
+        ev_denominador = (_div(pi, 10) * 37.5);
+        if (_bool((ev_denominador === 0.0))) {
+            return null;
+        }
+        return _div((paco2 * v_min), ev_denominador);
+        return null;
+    },
+    function (cco2, cao2, cvo2) {
+        let shunt_denominador;
+        shunt_denominador = (cco2 - cvo2);
+        if (_bool((shunt_denominador === 0.0))) {
+            return null;
+        }
+        return (_div((cco2 - cao2), shunt_denominador) * 100);
+        return null;
+    },
+    function (vt_ventilador, fr, modo, ppico, driving_p, peep) {
+        let C1;
+        if (_bool((_bool((vt_ventilador === null)) || _bool((fr === null))))) {
+            return null;
+        }
+        C1 = ((0.098 * fr) * _div(vt_ventilador, 1000));
+        if (_bool((_bool((modo === "VCV")) && _bool((ppico !== null)) && _bool((driving_p !== null))))) {
+            return (C1 * (ppico - _div(driving_p, 2)));
+        }
+        if (_bool((_bool((modo === "PCV")) && _bool((driving_p !== null)) && _bool((peep !== null))))) {
+            return (C1 * (driving_p + peep));
+        }
+        return null;
+        return null;
+    },
+    (ppico, peep, pocc) => _div(((ppico - peep) - 2), (3 * pocc)),
+    (vs, vd) => _div((vs + (2 * vd)), 3),
+    (vs, vd, vm) => _div((vs - vd), vm),
+    (vs, vd) => _div((vs - vd), vs),
+    (ip_acm) => _max(0, ((10.93 * ip_acm) - 1.28)),
+    (tam, pic) => (tam - pic),
+    (vs, vd) => _div((vs + (2 * vd)), 3),
+    (vs, vd, vm) => _div((vs - vd), vm),
+    (vs, vd) => _div((vs - vd), vs),
+    (vs, vd) => _div((vs + (2 * vd)), 3),
+    (vs, vd, vm) => _div((vs - vd), vm),
+    (vs, vd) => _div((vs - vd), vs),
+    (vm_acm, vm_aci) => _div(vm_acm, vm_aci),
+    (vm_ab, vm_ave) => _div(vm_ab, vm_ave),
+    (vno_der, vno_izq, vno_dgo) => _div((vno_der + vno_izq), (2 * vno_dgo)),
+    (hb, sjo2, pao2_jo2) => (((1.36 * hb) * _div(sjo2, 100.0)) + (0.0031 * pao2_jo2)),
+    (cao2, cvjo2) => (cao2 - cvjo2),
+    (avdo2, cao2) => (_div(avdo2, cao2) * 100),
+];
+
+function evaluar(entradas) {
+    const v_sexo = entradas.sexo;
+    const v_edad_anos = entradas.edad_anos;
+    const v_peso_kg = entradas.peso_kg;
+    const v_talla_m = entradas.talla_m;
+    const v_imc = v_peso_kg !== null && v_talla_m !== null && v_talla_m !== 0 ? F[0](v_peso_kg, v_talla_m) : null;
+    const v_sct = v_peso_kg !== null && v_talla_m !== null ? F[1](v_peso_kg, v_talla_m) : null;
+    const v_pi = v_talla_m !== null && v_sexo !== null ? F[2](v_talla_m, v_sexo) : null;
+    const v_talla_cm = v_talla_m !== null ? F[3](v_talla_m) : null;
+    const v_act = v_sexo !== null && v_edad_anos !== null && v_peso_kg !== null && v_talla_cm !== null ? F[4](v_sexo, v_edad_anos, v_peso_kg, v_talla_cm) : null;
+    const v_tas = entradas.tas;
+    const v_tad = entradas.tad;
+    const v_tam = v_tas !== null && v_tad !== null ? F[5](v_tas, v_tad) : null;
+    const v_fc = entradas.fc;
+    const v_sato2_sv = entradas.sato2_sv;
+    const v_ph_a = entradas.ph_a;
+    const v_paco2 = entradas.paco2;
+    const v_pao2 = entradas.pao2;
+    const v_sato2_a = entradas.sato2_a;
+    const v_lactato = entradas.lactato;
+    const v_hb = entradas.hb;
+    const v_ph_v = entradas.ph_v;
+    const v_pvco2 = entradas.pvco2;
+    const v_pvo2 = entradas.pvo2;
+    const v_satvo2 = entradas.satvo2;
+    const v_tsvi = entradas.tsvi;
+    const v_vti = entradas.vti;
+    const v_tsvi_inf = v_talla_cm !== null ? F[6](v_talla_cm) : null;
+    const v_vs_macro = v_tsvi !== null && v_vti !== null ? F[7](v_tsvi, v_vti) : null;
+    const v_gc = v_vs_macro !== null && v_fc !== null ? F[8](v_vs_macro, v_fc) : null;
+    const v_ic = v_gc !== null && v_sct !== null && v_sct !== 0 ? F[9](v_gc, v_sct) : null;
+    const v_vci = entradas.vci;
+    const v_vci_colaps = entradas.vci_colaps;
+    const v_pvc_medido = entradas.pvc_medido;
+    const v_pvc_eco = F[10](v_vci, v_vci_colaps, v_pvc_medido);
+    const v_rvs = v_tam !== null && v_pvc_eco !== null && v_gc !== null && v_gc !== 0 ? F[11](v_tam, v_pvc_eco, v_gc) : null;
+    const v_rvsi = v_rvs !== null && v_sct !== null && v_sct !== 0 ? F[12](v_rvs, v_sct) : null;
+    const v_cao2 = v_hb !== null && v_sato2_a !== null && v_pao2 !== null ? F[13](v_hb, v_sato2_a, v_pao2) : null;
+    const v_cvo2 = v_hb !== null && v_satvo2 !== null && v_pvo2 !== null ? F[14](v_hb, v_satvo2, v_pvo2) : null;
+    const v_cco2 = v_hb !== null && v_pao2 !== null ? F[15](v_hb, v_pao2) : null;
+    const v_davo2 = v_cao2 !== null && v_cvo2 !== null ? F[16](v_cao2, v_cvo2) : null;
+    const v_vo2 = v_gc !== null && v_davo2 !== null ? F[17](v_gc, v_davo2) : null;
+    const v_vo2i = v_vo2 !== null && v_sct !== null && v_sct !== 0 ? F[18](v_vo2, v_sct) : null;
+    const v_do2 = v_gc !== null && v_cao2 !== null ? F[19](v_gc, v_cao2) : null;
+    const v_do2i = v_do2 !== null && v_sct !== null && v_sct !== 0 ? F[20](v_do2, v_sct) : null;
+    const v_exto2 = v_davo2 !== null && v_cao2 !== null && v_cao2 !== 0 ? F[21](v_davo2, v_cao2) : null;
+    const v_davco2 = v_pvco2 !== null && v_paco2 !== null ? F[22](v_pvco2, v_paco2) : null;
+    const v_gc_fick = v_vo2 !== null && v_davo2 !== null && v_vo2 !== 0 && v_davo2 !== 0 ? F[23](v_vo2, v_davo2) : null;
+    const v_mapse_l = entradas.mapse_l;
+    const v_mapse_s = entradas.mapse_s;
+    const v_e_onda = entradas.e_onda;
+    const v_a_onda = entradas.a_onda;
+    const v_e_a = v_e_onda !== null && v_a_onda !== null && v_a_onda !== 0 ? F[24](v_e_onda, v_a_onda) : null;
+    const v_eprim_lat = entradas.eprim_lat;
+    const v_eprim_med = entradas.eprim_med;
+    const v_eprim_prom = v_eprim_lat !== null && v_eprim_med !== null ? F[25](v_eprim_lat, v_eprim_med) : null;
+    const v_e_eprim = v_e_onda !== null && v_eprim_prom !== null && v_eprim_prom !== 0 ? F[26](v_e_onda, v_eprim_prom) : null;
+    const v_vfs = entradas.vfs;
+    const v_vfd = entradas.vfd;
+    const v_fevi_simp = v_vfd !== null && v_vfs !== null && v_vfd !== 0 ? F[27](v_vfd, v_vfs) : null;
+    const v_long_vi = entradas.long_vi;
+    const v_strain_mapse = v_mapse_l !== null && v_mapse_s !== null && v_long_vi !== null && v_long_vi !== 0 ? F[28](v_mapse_l, v_mapse_s, v_long_vi) : null;
+    const v_ea = v_tas !== null && v_vs_macro !== null && v_vs_macro !== 0 ? F[29](v_tas, v_vs_macro) : null;
+    const v_ee = v_tas !== null && v_vfs !== null && v_vfs !== 0 ? F[30](v_tas, v_vfs) : null;
+    const v_ava = v_ea !== null && v_ee !== null && v_ee !== 0 ? F[31](v_ea, v_ee) : null;
+    const v_power_c = v_tam !== null && v_gc !== null ? F[32](v_tam, v_gc) : null;
+    const v_welch = v_e_eprim !== null ? F[33](v_e_eprim) : null;
+    const v_vtmax = entradas.vtmax;
+    const v_gradiente_it = v_vtmax !== null ? F[34](v_vtmax) : null;
+    const v_tapse = entradas.tapse;
+    const v_vti_pulmonar = entradas.vti_pulmonar;
+    const v_psap = v_gradiente_it !== null && v_pvc_eco !== null ? F[35](v_gradiente_it, v_pvc_eco) : null;
+    const v_pmap = v_psap !== null ? F[36](v_psap) : null;
+    const v_rvs_pulm = v_vtmax !== null && v_vti_pulmonar !== null && v_vti_pulmonar !== 0 ? F[37](v_vtmax, v_vti_pulmonar) : null;
+    const v_rvs_pulm_in = v_pmap !== null && v_welch !== null && v_ic !== null && v_ic !== 0 ? F[38](v_pmap, v_welch, v_ic) : null;
+    const v_avd = v_tapse !== null && v_psap !== null && v_psap !== 0 ? F[39](v_tapse, v_psap) : null;
+    const v_modo = entradas.modo;
+    const v_peso_sdra = v_pi !== null ? F[40](v_pi) : null;
+    const v_vt_protec = entradas.vt_protec;
+    const v_vt_protec_calc = v_vt_protec !== null && v_peso_sdra !== null ? F[41](v_vt_protec, v_peso_sdra) : null;
+    const v_vt_ventilador = entradas.vt_ventilador;
+    const v_fr = entradas.fr;
+    const v_peco2 = entradas.peco2;
+    const v_peep = entradas.peep;
+    const v_fio2 = entradas.fio2;
+    const v_plateau = entradas.plateau;
+    const v_driving_p = v_plateau !== null && v_peep !== null ? F[42](v_plateau, v_peep) : null;
+    const v_ppico = entradas.ppico;
+    const v_cstat_input = entradas.cstat_input;
+    const v_cstat_calc = v_vt_ventilador !== null && v_driving_p !== null && v_driving_p !== 0 ? F[43](v_vt_ventilador, v_driving_p) : null;
+    const v_cdin_input = entradas.cdin_input;
+    const v_ppico_menos_peep = v_ppico !== null && v_peep !== null ? F[44](v_ppico, v_peep) : null;
+    const v_cdin_calc = v_vt_ventilador !== null && v_ppico_menos_peep !== null && v_ppico_menos_peep !== 0 ? F[45](v_vt_ventilador, v_ppico_menos_peep) : null;
+    const v_raw = v_ppico !== null && v_plateau !== null ? F[46](v_ppico, v_plateau) : null;
+    const v_v_min = entradas.v_min;
+    const v_pocc = entradas.pocc;
+    const v_em = v_paco2 !== null && v_peco2 !== null && v_paco2 !== 0 ? F[47](v_paco2, v_peco2) : null;
+    const v_ev = v_pi !== null && v_paco2 !== null && v_v_min !== null ? F[48](v_pi, v_paco2, v_v_min) : null;
+    const v_shunt = v_cco2 !== null && v_cao2 !== null && v_cvo2 !== null ? F[49](v_cco2, v_cao2, v_cvo2) : null;
+    const v_pm = F[50](v_vt_ventilador, v_fr, v_modo, v_ppico, v_driving_p, v_peep);
+    const v_ppmt = v_ppico !== null && v_peep !== null && v_pocc !== null && v_pocc !== 0 ? F[51](v_ppico, v_peep, v_pocc) : null;
+    const v_vs_acm = entradas.vs_acm;
+    const v_vd_acm = entradas.vd_acm;
+    const v_vm_acm = v_vs_acm !== null && v_vd_acm !== null ? F[52](v_vs_acm, v_vd_acm) : null;
+    const v_ip_acm = v_vs_acm !== null && v_vd_acm !== null && v_vm_acm !== null && v_vm_acm !== 0 ? F[53](v_vs_acm, v_vd_acm, v_vm_acm) : null;
+    const v_ir_acm = v_vs_acm !== null && v_vd_acm !== null && v_vs_acm !== 0 ? F[54](v_vs_acm, v_vd_acm) : null;
+    const v_pic = v_ip_acm !== null ? F[55](v_ip_acm) : null;
+    const v_ppc = v_tam !== null && v_pic !== null ? F[56](v_tam, v_pic) : null;
+    const v_vs_ab = entradas.vs_ab;
+    const v_vd_ab = entradas.vd_ab;
+    const v_vm_ab = v_vs_ab !== null && v_vd_ab !== null ? F[57](v_vs_ab, v_vd_ab) : null;
+    const v_ip_ab = v_vs_ab !== null && v_vd_ab !== null && v_vm_ab !== null && v_vm_ab !== 0 ? F[58](v_vs_ab, v_vd_ab, v_vm_ab) : null;
+    const v_ir_ab = v_vs_ab !== null && v_vd_ab !== null && v_vs_ab !== 0 ? F[59](v_vs_ab, v_vd_ab) : null;
+    const v_vaso_dtc = entradas.vaso_dtc;
+    const v_vs_dtc = entradas.vs_dtc;
+    const v_vd_dtc = entradas.vd_dtc;
+    const v_vm_dtc = v_vs_dtc !== null && v_vd_dtc !== null ? F[60](v_vs_dtc, v_vd_dtc) : null;
+    const v_ip_dtc = v_vs_dtc !== null && v_vd_dtc !== null && v_vm_dtc !== null && v_vm_dtc !== 0 ? F[61](v_vs_dtc, v_vd_dtc, v_vm_dtc) : null;
+    const v_ir_dtc = v_vs_dtc !== null && v_vd_dtc !== null && v_vs_dtc !== 0 ? F[62](v_vs_dtc, v_vd_dtc) : null;
+    const v_vm_aci = entradas.vm_aci;
+    const v_vm_ave = entradas.vm_ave;
+    const v_il = v_vm_acm !== null && v_vm_aci !== null && v_vm_aci !== 0 ? F[63](v_vm_acm, v_vm_aci) : null;
+    const v_isou = v_vm_ab !== null && v_vm_ave !== null && v_vm_ave !== 0 ? F[64](v_vm_ab, v_vm_ave) : null;
+    const v_vno_der = entradas.vno_der;
+    const v_vno_izq = entradas.vno_izq;
+    const v_vno_dgo = entradas.vno_dgo;
+    const v_vno_dgo_calc = v_vno_der !== null && v_vno_izq !== null && v_vno_dgo !== null && v_vno_dgo !== 0 ? F[65](v_vno_der, v_vno_izq, v_vno_dgo) : null;
+    const v_ph_jo2 = entradas.ph_jo2;
+    const v_paco2_jo2 = entradas.paco2_jo2;
+    const v_pao2_jo2 = entradas.pao2_jo2;
+    const v_sato2_jo2 = entradas.sato2_jo2;
+    const v_lactato_jo2 = entradas.lactato_jo2;
+    const v_cvjo2 = v_hb !== null && v_sato2_jo2 !== null && v_pao2_jo2 !== null ? F[66](v_hb, v_sato2_jo2, v_pao2_jo2) : null;
+    const v_avdo2 = v_cao2 !== null && v_cvjo2 !== null ? F[67](v_cao2, v_cvjo2) : null;
+    const v_ceo2 = v_avdo2 !== null && v_cao2 !== null && v_cao2 !== 0 ? F[68](v_avdo2, v_cao2) : null;
+    return {sexo: v_sexo, edad_anos: v_edad_anos, peso_kg: v_peso_kg, talla_m: v_talla_m, imc: v_imc, sct: v_sct, pi: v_pi, talla_cm: v_talla_cm, act: v_act, tas: v_tas, tad: v_tad, tam: v_tam, fc: v_fc, sato2_sv: v_sato2_sv, ph_a: v_ph_a, paco2: v_paco2, pao2: v_pao2, sato2_a: v_sato2_a, lactato: v_lactato, hb: v_hb, ph_v: v_ph_v, pvco2: v_pvco2, pvo2: v_pvo2, satvo2: v_satvo2, tsvi: v_tsvi, vti: v_vti, tsvi_inf: v_tsvi_inf, vs_macro: v_vs_macro, gc: v_gc, ic: v_ic, vci: v_vci, vci_colaps: v_vci_colaps, pvc_medido: v_pvc_medido, pvc_eco: v_pvc_eco, rvs: v_rvs, rvsi: v_rvsi, cao2: v_cao2, cvo2: v_cvo2, cco2: v_cco2, davo2: v_davo2, vo2: v_vo2, vo2i: v_vo2i, do2: v_do2, do2i: v_do2i, exto2: v_exto2, davco2: v_davco2, gc_fick: v_gc_fick, mapse_l: v_mapse_l, mapse_s: v_mapse_s, e_onda: v_e_onda, a_onda: v_a_onda, e_a: v_e_a, eprim_lat: v_eprim_lat, eprim_med: v_eprim_med, eprim_prom: v_eprim_prom, e_eprim: v_e_eprim, vfs: v_vfs, vfd: v_vfd, fevi_simp: v_fevi_simp, long_vi: v_long_vi, strain_mapse: v_strain_mapse, ea: v_ea, ee: v_ee, ava: v_ava, power_c: v_power_c, welch: v_welch, vtmax: v_vtmax, gradiente_it: v_gradiente_it, tapse: v_tapse, vti_pulmonar: v_vti_pulmonar, psap: v_psap, pmap: v_pmap, rvs_pulm: v_rvs_pulm, rvs_pulm_in: v_rvs_pulm_in, avd: v_avd, modo: v_modo, peso_sdra: v_peso_sdra, vt_protec: v_vt_protec, vt_protec_calc: v_vt_protec_calc, vt_ventilador: v_vt_ventilador, fr: v_fr, peco2: v_peco2, peep: v_peep, fio2: v_fio2, plateau: v_plateau, driving_p: v_driving_p, ppico: v_ppico, cstat_input: v_cstat_input, cstat_calc: v_cstat_calc, cdin_input: v_cdin_input, ppico_menos_peep: v_ppico_menos_peep, cdin_calc: v_cdin_calc, raw: v_raw, v_min: v_v_min, pocc: v_pocc, em: v_em, ev: v_ev, shunt: v_shunt, pm: v_pm, ppmt: v_ppmt, vs_acm: v_vs_acm, vd_acm: v_vd_acm, vm_acm: v_vm_acm, ip_acm: v_ip_acm, ir_acm: v_ir_acm, pic: v_pic, ppc: v_ppc, vs_ab: v_vs_ab, vd_ab: v_vd_ab, vm_ab: v_vm_ab, ip_ab: v_ip_ab, ir_ab: v_ir_ab, vaso_dtc: v_vaso_dtc, vs_dtc: v_vs_dtc, vd_dtc: v_vd_dtc, vm_dtc: v_vm_dtc, ip_dtc: v_ip_dtc, ir_dtc: v_ir_dtc, vm_aci: v_vm_aci, vm_ave: v_vm_ave, il: v_il, isou: v_isou, vno_der: v_vno_der, vno_izq: v_vno_izq, vno_dgo: v_vno_dgo, vno_dgo_calc: v_vno_dgo_calc, ph_jo2: v_ph_jo2, paco2_jo2: v_paco2_jo2, pao2_jo2: v_pao2_jo2, sato2_jo2: v_sato2_jo2, lactato_jo2: v_lactato_jo2, cvjo2: v_cvjo2, avdo2: v_avdo2, ceo2: v_ceo2};
+}
+
+const PANELES = [
+    ["Panel", [
+        {titulo: "Datos Antropometricos"},
+        {etiqueta: "Sexo", nodo: "sexo", formato: null, omitir: []},
+        {etiqueta: "Edad", nodo: "edad_anos", formato: (v) => _fijo(v, 0) + " anos", omitir: []},
+        {etiqueta: "Peso", nodo: "peso_kg", formato: (v) => _fijo(v, 0) + " Kg", omitir: []},
+        {etiqueta: "Talla", nodo: "talla_m", formato: (v) => _fijo(v, 2) + " m", omitir: []},
+        {etiqueta: "IMC", nodo: "imc", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "SCT", nodo: "sct", formato: (v) => _fijo(v, 2) + " m²", omitir: []},
+        {etiqueta: "PI", nodo: "pi", formato: (v) => _fijo(v, 2) + " Kg", omitir: []},
+        {etiqueta: "ACT", nodo: "act", formato: (v) => _fijo(v, 2) + " L", omitir: []},
+        {titulo: "Signos Vitales"},
+        {etiqueta: "TAS", nodo: "tas", formato: (v) => _fijo(v, 0) + " mmHg", omitir: []},
+        {etiqueta: "TAD", nodo: "tad", formato: (v) => _fijo(v, 0) + " mmHg", omitir: []},
+        {etiqueta: "TAM", nodo: "tam", formato: (v) => _fijo(v, 0) + " mmHg", omitir: []},
+        {etiqueta: "FC", nodo: "fc", formato: (v) => _fijo(v, 0) + " lpm", omitir: []},
+        {etiqueta: "SatO₂ Pulsioximetria", nodo: "sato2_sv", formato: (v) => _fijo(v, 0) + " %", omitir: []},
+        {titulo: "Gasometria Arterial 🩸"},
+        {etiqueta: "pH (a)", nodo: "ph_a", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "PaCO₂", nodo: "paco2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PaO₂", nodo: "pao2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "SatO₂ (a)", nodo: "sato2_a", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+        {etiqueta: "Lactato", nodo: "lactato", formato: (v) => _fijo(v, 2) + " mmol/L", omitir: []},
+        {etiqueta: "Hb", nodo: "hb", formato: (v) => _fijo(v, 1) + " g/dL", omitir: []},
+        {titulo: "Gasometria Venosa 🔵"},
+        {etiqueta: "pHv", nodo: "ph_v", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "PvCO₂", nodo: "pvco2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PvO₂", nodo: "pvo2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "SatvO₂", nodo: "satvo2", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+    ]],
+    ["Macrodinamia", [
+        {etiqueta: "TSVI", nodo: "tsvi", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "VTI", nodo: "vti", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "TSVI Inferido", nodo: "tsvi_inf", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "VS", nodo: "vs_macro", formato: (v) => _fijo(v, 0) + " ml", omitir: []},
+        {etiqueta: "GC", nodo: "gc", formato: (v) => _fijo(v, 2) + " L/min", omitir: []},
+        {etiqueta: "IC", nodo: "ic", formato: (v) => _fijo(v, 2) + " L/min/m²", omitir: []},
+        {etiqueta: "VCI", nodo: "vci", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "VCI Colaps.", nodo: "vci_colaps", formato: null, omitir: ["Selecciona Colapso"]},
+        {etiqueta: "PVC ECO", nodo: "pvc_eco", formato: (v) => _fijo(v, 0) + " mmHg", omitir: []},
+        {etiqueta: "PVC Medido", nodo: "pvc_medido", formato: (v) => _fijo(v, 0) + " mmHg", omitir: []},
+        {etiqueta: "RVS", nodo: "rvs", formato: (v) => _fijo(v, 0) + " dyn.s/cm⁵", omitir: []},
+        {etiqueta: "RVSI", nodo: "rvsi", formato: (v) => _fijo(v, 0) + " dyn.s/cm⁵/m²", omitir: []},
+    ]],
+    ["Microdinamia", [
+        {etiqueta: "CaO₂", nodo: "cao2", formato: (v) => _fijo(v, 2) + " ml/dL", omitir: []},
+        {etiqueta: "CvO₂", nodo: "cvo2", formato: (v) => _fijo(v, 2) + " ml/dL", omitir: []},
+        {etiqueta: "CcO₂", nodo: "cco2", formato: (v) => _fijo(v, 2) + " ml/dL", omitir: []},
+        {etiqueta: "DavO₂", nodo: "davo2", formato: (v) => _fijo(v, 2) + " ml/dL", omitir: []},
+        {etiqueta: "VO₂", nodo: "vo2", formato: (v) => _fijo(v, 2) + " ml/min", omitir: []},
+        {etiqueta: "VO₂I", nodo: "vo2i", formato: (v) => _fijo(v, 2) + " ml/min/m²", omitir: []},
+        {etiqueta: "DO₂", nodo: "do2", formato: (v) => _fijo(v, 2) + " ml/min", omitir: []},
+        {etiqueta: "DO₂I", nodo: "do2i", formato: (v) => _fijo(v, 2) + " ml/min/m²", omitir: []},
+        {etiqueta: "ExtO₂", nodo: "exto2", formato: (v) => _fijo(v, 2) + " %", omitir: []},
+        {etiqueta: "DavCO₂", nodo: "davco2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "Lactato", nodo: "lactato", formato: (v) => _fijo(v, 2) + " mmol/L", omitir: []},
+        {etiqueta: "SatvO₂", nodo: "satvo2", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+        {etiqueta: "GC Fick", nodo: "gc_fick", formato: (v) => _fijo(v, 2) + " L/min", omitir: []},
+    ]],
+    ["Hemodinamia", [
+        {titulo: "Ventriculo Izquierdo"},
+        {etiqueta: "MAPSE L", nodo: "mapse_l", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "MAPSE S", nodo: "mapse_s", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "E", nodo: "e_onda", formato: (v) => _fijo(v, 2) + " m/s", omitir: []},
+        {etiqueta: "A", nodo: "a_onda", formato: (v) => _fijo(v, 2) + " m/s", omitir: []},
+        {etiqueta: "E/A", nodo: "e_a", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "E' lat", nodo: "eprim_lat", formato: (v) => _fijo(v, 2) + " cm/s", omitir: []},
+        {etiqueta: "E' med", nodo: "eprim_med", formato: (v) => _fijo(v, 2) + " cm/s", omitir: []},
+        {etiqueta: "E' Prom", nodo: "eprim_prom", formato: (v) => _fijo(v, 2) + " cm/s", omitir: []},
+        {etiqueta: "E/E'", nodo: "e_eprim", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "VFS", nodo: "vfs", formato: (v) => _fijo(v, 0) + " ml", omitir: []},
+        {etiqueta: "VFD", nodo: "vfd", formato: (v) => _fijo(v, 0) + " ml", omitir: []},
+        {etiqueta: "FEVI SIMP", nodo: "fevi_simp", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+        {etiqueta: "Long. VI", nodo: "long_vi", formato: (v) => _fijo(v, 1) + " cm", omitir: []},
+        {etiqueta: "Strain MAPSE", nodo: "strain_mapse", formato: (v) => _fijo(v, 2) + " %", omitir: []},
+        {etiqueta: "Ea", nodo: "ea", formato: (v) => _fijo(v, 2) + " mmHg/ml", omitir: []},
+        {etiqueta: "Ee", nodo: "ee", formato: (v) => _fijo(v, 2) + " mmHg/ml", omitir: []},
+        {etiqueta: "AVA", nodo: "ava", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "Power C", nodo: "power_c", formato: (v) => _fijo(v, 2) + " W", omitir: []},
+        {titulo: "Ventriculo Derecho"},
+        {etiqueta: "Welch", nodo: "welch", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "VTmax", nodo: "vtmax", formato: (v) => _fijo(v, 2) + " m/s", omitir: []},
+        {etiqueta: "Gradiente IT", nodo: "gradiente_it", formato: (v) => _fijo(v, 2) + " mmHg", omitir: []},
+        {etiqueta: "TAPSE", nodo: "tapse", formato: (v) => _fijo(v, 2) + " mm", omitir: []},
+        {etiqueta: "VTI Pulmonar", nodo: "vti_pulmonar", formato: (v) => _fijo(v, 2) + " cm", omitir: []},
+        {etiqueta: "PSAP", nodo: "psap", formato: (v) => _fijo(v, 2) + " mmHg", omitir: []},
+        {etiqueta: "PMAP", nodo: "pmap", formato: (v) => _fijo(v, 2) + " mmHg", omitir: []},
+        {etiqueta: "RVSPulm.", nodo: "rvs_pulm", formato: (v) => _fijo(v, 2) + " UW", omitir: []},
+        {etiqueta: "RVSPulm. In.", nodo: "rvs_pulm_in", formato: (v) => _fijo(v, 2) + " Dynas/m²", omitir: []},
+        {etiqueta: "AVD", nodo: "avd", formato: (v) => _fijo(v, 2), omitir: []},
+    ]],
+    ["Ventilatorio", [
+        {etiqueta: "MODO", nodo: "modo", formato: null, omitir: ["Selecciona Modo"]},
+        {etiqueta: "Peso SDRA (PI)", nodo: "peso_sdra", formato: (v) => _fijo(v, 2) + " Kg", omitir: []},
+        {etiqueta: "VT protec.", nodo: "vt_protec", formato: (v) => _fijo(v, 1) + " ml/Kg", omitir: []},
+        {etiqueta: "VT protec. C.", nodo: "vt_protec_calc", formato: (v) => _fijo(v, 0) + " ml", omitir: []},
+        {etiqueta: "VT Ventilador", nodo: "vt_ventilador", formato: (v) => _fijo(v, 0) + " ml", omitir: []},
+        {etiqueta: "FR", nodo: "fr", formato: (v) => _fijo(v, 0) + " lpm", omitir: []},
+        {etiqueta: "PaCO₂", nodo: "paco2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PeCO₂", nodo: "peco2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PEEP", nodo: "peep", formato: (v) => _fijo(v, 0) + " cmH₂O", omitir: []},
+        {etiqueta: "FIO₂", nodo: "fio2", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "Plateau", nodo: "plateau", formato: (v) => _fijo(v, 0) + " cmH₂O", omitir: []},
+        {etiqueta: "Driving P.", nodo: "driving_p", formato: (v) => _fijo(v, 0) + " cmH₂O", omitir: []},
+        {etiqueta: "Ppico", nodo: "ppico", formato: (v) => _fijo(v, 0) + " cmH₂O", omitir: []},
+        {etiqueta: "Cstat (medida)", nodo: "cstat_input", formato: (v) => _fijo(v, 1) + " ml/cmH₂O", omitir: []},
+        {etiqueta: "Cstat Calc", nodo: "cstat_calc", formato: (v) => _fijo(v, 1) + " ml/cmH₂O", omitir: []},
+        {etiqueta: "Cdin (medida)", nodo: "cdin_input", formato: (v) => _fijo(v, 1) + " ml/cmH₂O", omitir: []},
+        {etiqueta: "Cdin Calc", nodo: "cdin_calc", formato: (v) => _fijo(v, 1) + " ml/cmH₂O", omitir: []},
+        {etiqueta: "Raw", nodo: "raw", formato: (v) => _fijo(v, 1) + " cmH₂O/L/s", omitir: []},
+        {etiqueta: "V/min", nodo: "v_min", formato: (v) => _fijo(v, 1) + " L/min", omitir: []},
+        {etiqueta: "POCC", nodo: "pocc", formato: (v) => _fijo(v, 1) + " cmH₂O", omitir: []},
+        {etiqueta: "EM", nodo: "em", formato: (v) => _fijo(v, 2) + " %", omitir: []},
+        {etiqueta: "EV", nodo: "ev", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "Shunt", nodo: "shunt", formato: (v) => _fijo(v, 2) + " %", omitir: []},
+        {etiqueta: "PM", nodo: "pm", formato: (v) => _fijo(v, 2) + " J/min", omitir: []},
+        {etiqueta: "PpMt", nodo: "ppmt", formato: (v) => _fijo(v, 2), omitir: []},
+    ]],
+    ["Neurocritico", [
+        {titulo: "DTC (ACM)"},
+        {etiqueta: "VS (ACM)", nodo: "vs_acm", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VD (ACM)", nodo: "vd_acm", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VM (ACM)", nodo: "vm_acm", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "IP (ACM)", nodo: "ip_acm", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "IR (ACM)", nodo: "ir_acm", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "PIC (Calc.)", nodo: "pic", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PPC (Calc.)", nodo: "ppc", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {titulo: "DTC (AB)"},
+        {etiqueta: "VS (AB)", nodo: "vs_ab", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VD (AB)", nodo: "vd_ab", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VM (AB)", nodo: "vm_ab", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "IP (AB)", nodo: "ip_ab", formato: (v) => (_fijo(Math.abs(v), 2)), omitir: []},
+        {etiqueta: "IR (AB)", nodo: "ir_ab", formato: (v) => (_fijo(Math.abs(v), 2)), omitir: []},
+        {titulo: "DTC (Genérico)"},
+        {etiqueta: "Arteria Medida", nodo: "vaso_dtc", formato: null, omitir: ["Selecciona Arteria"]},
+        {etiqueta: "VS", nodo: "vs_dtc", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VD", nodo: "vd_dtc", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VM", nodo: "vm_dtc", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "IP", nodo: "ip_dtc", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "IR (DTc)", nodo: "ir_dtc", formato: (v) => _fijo(v, 2), omitir: []},
+        {titulo: "Flujo Vascular Extracraneal"},
+        {etiqueta: "VM Art. Carótida Int.", nodo: "vm_aci", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {etiqueta: "VM Art. Vertebral", nodo: "vm_ave", formato: (v) => _fijo(v, 1) + " cm/s", omitir: []},
+        {titulo: "Indices Combinados"},
+        {etiqueta: "Indice Lindergard", nodo: "il", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "Indice de Soustiel", nodo: "isou", formato: (v) => _fijo(v, 2), omitir: []},
+        {titulo: "VNO (Vaina Nervio Optico)"},
+        {etiqueta: "Der.", nodo: "vno_der", formato: (v) => _fijo(v, 1) + " mm", omitir: []},
+        {etiqueta: "Izq.", nodo: "vno_izq", formato: (v) => _fijo(v, 1) + " mm", omitir: []},
+        {etiqueta: "DGO", nodo: "vno_dgo", formato: (v) => _fijo(v, 1) + " mm", omitir: []},
+        {etiqueta: "VNO/DGO", nodo: "vno_dgo_calc", formato: (v) => _fijo(v, 2), omitir: []},
+        {titulo: "Gasometria yugular (jO₂)"},
+        {etiqueta: "pH", nodo: "ph_jo2", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "PjCO₂", nodo: "paco2_jo2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "PjO₂", nodo: "pao2_jo2", formato: (v) => _fijo(v, 1) + " mmHg", omitir: []},
+        {etiqueta: "SjO₂", nodo: "sato2_jo2", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+        {etiqueta: "Lactato", nodo: "lactato_jo2", formato: (v) => _fijo(v, 2) + " mmol/L", omitir: []},
+        {titulo: "Neuro / Golfo Yugular"},
+        {etiqueta: "SjO₂ (Monit.)", nodo: "sato2_jo2", formato: (v) => _fijo(v, 1) + " %", omitir: []},
+        {etiqueta: "AVDO₂", nodo: "avdo2", formato: (v) => _fijo(v, 2), omitir: []},
+        {etiqueta: "CEO₂", nodo: "ceo2", formato: (v) => _fijo(v, 2) + " %", omitir: []},
+    ]],
+];
+
+const NIVELES = ["aviso", "critica"];
+const REGLAS = [
+    {nombre: "hipotension", nivel: "critica", variables: ["tam"]},
+    {nombre: "ppc_baja", nivel: "critica", variables: ["ppc"]},
+    {nombre: "pic_alta", nivel: "critica", variables: ["pic"]},
+    {nombre: "lactato_alto", nivel: "aviso", variables: ["lactato"]},
+    {nombre: "lactato_muy_alto", nivel: "critica", variables: ["lactato"]},
+    {nombre: "ic_bajo", nivel: "aviso", variables: ["ic"]},
+    {nombre: "driving_alto", nivel: "aviso", variables: ["driving_p"]},
+    {nombre: "shunt_alto", nivel: "aviso", variables: ["shunt"]},
+    {nombre: "exto2_alta", nivel: "aviso", variables: ["exto2"]},
+    {nombre: "presion_llenado_alta", nivel: "aviso", variables: ["e_eprim"]},
+];
+
+function alertas(valores) {
+    const v_tam = valores.tam === null || valores.tam === undefined ? NaN : valores.tam;
+    const v_ppc = valores.ppc === null || valores.ppc === undefined ? NaN : valores.ppc;
+    const v_pic = valores.pic === null || valores.pic === undefined ? NaN : valores.pic;
+    const v_lactato = valores.lactato === null || valores.lactato === undefined ? NaN : valores.lactato;
+    const v_ic = valores.ic === null || valores.ic === undefined ? NaN : valores.ic;
+    const v_driving_p = valores.driving_p === null || valores.driving_p === undefined ? NaN : valores.driving_p;
+    const v_shunt = valores.shunt === null || valores.shunt === undefined ? NaN : valores.shunt;
+    const v_exto2 = valores.exto2 === null || valores.exto2 === undefined ? NaN : valores.exto2;
+    const v_e_eprim = valores.e_eprim === null || valores.e_eprim === undefined ? NaN : valores.e_eprim;
+    return [(v_tam < 65), (v_ppc < 60), (v_pic > 22), (v_lactato > 2), (v_lactato > 4), (v_ic < 2.2), (v_driving_p > 15), (v_shunt > 20), (v_exto2 > 30), (v_e_eprim > 14)];
+}
+
+raiz.FormulasUCI = {parsear, evaluar, calcular};
+})(typeof module !== 'undefined' ? module.exports : window);
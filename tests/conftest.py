@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+#
+# Uso: python -m pytest -q (desde la raiz del repositorio; la paridad JS se omite sin node).
+# Las pruebas importan los modulos de la raiz del repositorio y escriben el historial y las
+# series en un directorio temporal (las rutas se leen al importar, por eso se fijan aqui).
+
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+_TEMPORAL = tempfile.mkdtemp(prefix='icu_pruebas_')
+os.environ.setdefault('RUTA_HISTORIAL', os.path.join(_TEMPORAL, 'historial.sqlite3'))
+os.environ.setdefault('DIRECTORIO_SERIES', os.path.join(_TEMPORAL, 'series'))
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+import pytest
+
+import app_de_excel
+from benchmarks import PACIENTE_EJEMPLO
+
+
+@pytest.fixture
+def cliente():
+    return app_de_excel.app.test_client()
+
+
+@pytest.mark.parametrize('metodo, ruta, cuerpo, estado', [
+    ('get', '/api/paneles', None, 200),
+    ('post', '/api/calcular', PACIENTE_EJEMPLO, 200),
+    ('post', '/api/calcular', [PACIENTE_EJEMPLO], 400),
+    ('post', '/api/calcular?paneles=Panel,NoExiste', PACIENTE_EJEMPLO, 400),
+    ('post', '/api/calcular?paneles=Panel&numeros=1', PACIENTE_EJEMPLO, 200),
+    ('post', '/api/calcular/batch', [PACIENTE_EJEMPLO, {'peso_kg': '80'}], 200),
+    ('post', '/api/calcular/batch', {'pacientes': [PACIENTE_EJEMPLO]}, 200),
+    ('post', '/api/calcular/batch', {'pacientes': 'no'}, 400),
+    ('post', '/api/calcular/batch', [PACIENTE_EJEMPLO, 3], 400),
+    ('get', '/api/alertas', None, 200),
+    ('get', '/api/alertas?nivel=critica', None, 200),
+    ('get', '/api/alertas?reglas=no_existe', None, 400),
+    ('post', '/api/alertas', [PACIENTE_EJEMPLO], 200),
+    ('post', '/api/alertas', [{'peso_kg': [70]}], 400),
+    ('post', '/api/alertas', {'pacientes': None}, 400),
+    ('get', '/api/pacientes/cama-1/serie', None, 200),
+    ('get', '/api/pacientes/cama-1/serie?variables=tam,no_existe', None, 400),
+    ('get', '/api/pacientes/cama-1/serie?horas=mucho', None, 400),
+    ('get', '/api/historial', None, 200),
+    ('get', '/api/historial?limite=x', None, 400),
+    ('get', '/api/historial?cursor=no-es-un-cursor', None, 400),
+    ('get', '/api/cache', None, 200),
+    ('post', '/api/carga-masiva', None, 400),
+])
+def test_codigos_de_estado(cliente, metodo, ruta, cuerpo, estado):
+    respuesta = getattr(cliente, metodo)(ruta, json=cuerpo) if cuerpo is not None else getattr(cliente, metodo)(ruta)
+    assert respuesta.status_code == estado, respuesta.get_data(as_text=True)
+    assert respuesta.mimetype == 'application/json'
+
+
+def test_lote_demasiado_grande(cliente, monkeypatch):
+    monkeypatch.setattr(app_de_excel, 'MAX_PACIENTES_LOTE', 2)
+    assert cliente.post('/api/calcular/batch', json=[PACIENTE_EJEMPLO] * 3).status_code == 413
+    assert cliente.post('/api/alertas', json=[PACIENTE_EJEMPLO] * 3).status_code == 413
+
+
+def test_carga_masiva_devuelve_csv(cliente):
+    csv = 'peso_kg,talla_m,tas,tad\n70,1.70,120,80\n'.encode()
+    respuesta = cliente.post('/api/carga-masiva', data={'archivo': (io.BytesIO(csv), 'cohorte.csv')})
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'text/csv'
+    assert 'cohorte_resultados.csv' in respuesta.headers['Content-Disposition']
+    assert respuesta.get_data(as_text=True).splitlines()[0].startswith('peso_kg,talla_m,tas,tad')
+
+
+def test_serie_de_paciente_tras_calcular(cliente):
+    for tas in ('120', '150'):
+        assert cliente.post('/api/calcular', json={'id_paciente': 'cama-api', 'tas': tas, 'tad': '60'}).status_code == 200
+    datos = cliente.get('/api/pacientes/cama-api/serie?variables=tam,gc').get_json()
+    assert datos['series']['tam'] == [80.0, 90.0]
+    assert datos['series']['gc'] == [None, None]
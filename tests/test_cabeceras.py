@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Cabeceras de cache HTTP (pagina inicial y estaticos), cache de resultados y contexto de sesion.
+
+import pytest
+
+import app_de_excel
+from benchmarks import PACIENTE_EJEMPLO
+
+
+@pytest.fixture
+def cliente():
+    app_de_excel.cache_resultados.limpiar()
+    return app_de_excel.app.test_client()
+
+
+def test_pagina_inicial_etag_y_revalidacion(cliente):
+    respuesta = cliente.get('/')
+    assert respuesta.status_code == 200
+    assert respuesta.cache_control.no_cache
+    assert 'Accept-Encoding' in respuesta.vary
+    etag, _ = respuesta.get_etag()
+    assert etag
+    revalidada = cliente.get('/', headers={'If-None-Match': f'"{etag}"'})
+    assert revalidada.status_code == 304
+    assert revalidada.get_etag()[0] == etag and not revalidada.data
+
+
+def test_pagina_inicial_comprimida(cliente):
+    plana = cliente.get('/', headers={'Accept-Encoding': 'identity'})
+    comprimida = cliente.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert plana.content_encoding is None
+    assert comprimida.content_encoding == 'gzip'
+    assert len(comprimida.data) < len(plana.data)
+    assert comprimida.get_etag() == plana.get_etag()
+
+
+@pytest.mark.skipif(app_de_excel.URL_FORMULAS_JS is None, reason="sin static/manifiesto.json")
+def test_estaticos_inmutables(cliente):
+    respuesta = cliente.get(app_de_excel.URL_FORMULAS_JS)
+    assert respuesta.status_code == 200
+    assert respuesta.cache_control.immutable and respuesta.cache_control.public
+    assert respuesta.cache_control.max_age == app_de_excel.CACHE_ESTATICOS_SEGUNDOS
+
+
+def test_cache_de_resultados_comparte_entradas_normalizadas(cliente):
+    assert cliente.post('/api/calcular', json={**PACIENTE_EJEMPLO, 'ph_a': '7.08'}).status_code == 200
+    assert cliente.post('/api/calcular', json={**PACIENTE_EJEMPLO, 'ph_a': '7,08'}).status_code == 200
+    estadisticas = cliente.get('/api/cache').get_json()
+    assert (estadisticas['aciertos'], estadisticas['fallos'], estadisticas['entradas']) == (1, 1, 1)
+
+
+def test_contexto_recalcula_solo_lo_modificado(cliente):
+    formulario = {**PACIENTE_EJEMPLO, 'action': 'calculate'}
+    primera = cliente.post('/resultados', data=formulario)
+    assert primera.status_code == 200
+    cookie = cliente.get_cookie(app_de_excel.COOKIE_CONTEXTO)
+    assert cookie is not None and cookie.http_only
+    todos = int(primera.headers['X-Nodos-Reevaluados'])
+    assert todos > 0
+
+    modificada = cliente.post('/resultados', data={**formulario, 'fc': '100'})
+    assert 0 < int(modificada.headers['X-Nodos-Reevaluados']) < todos
+    assert cliente.get_cookie(app_de_excel.COOKIE_CONTEXTO).value == cookie.value
+
+    # Mismas entradas: acierto de la cache de resultados, nada que recalcular
+    repetida = cliente.post('/resultados', data={**formulario, 'fc': '100'})
+    assert repetida.headers['X-Nodos-Reevaluados'] == '0'
+
+
+def test_sin_cookie_se_crea_contexto_nuevo(cliente):
+    formulario = {**PACIENTE_EJEMPLO, 'action': 'calculate'}
+    cliente.post('/', data=formulario)
+    otro = app_de_excel.app.test_client()
+    respuesta = otro.post('/', data={**formulario, 'fc': '101'})
+    assert otro.get_cookie(app_de_excel.COOKIE_CONTEXTO).value != cliente.get_cookie(app_de_excel.COOKIE_CONTEXTO).value
+    assert int(respuesta.headers['X-Nodos-Reevaluados']) > 0
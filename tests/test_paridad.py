@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# Las verificaciones de paridad de cada modulo (--verificar) con N reducido.
+
+import os
+import random
+import shutil
+
+import pytest
+
+from benchmarks import FIXTURES
+from generar_js import _paciente_aleatorio
+from recalculo_cohorte import cohorte_sintetica
+
+N = 300
+
+
+@pytest.fixture(scope='module')
+def pacientes():
+    """Fixtures de benchmarks, pacientes plausibles y pacientes con ruido (negativos, ceros, vacios, coma)."""
+    rnd = random.Random(0)
+    return list(FIXTURES.values()) + cohorte_sintetica(N, semilla=1) + [_paciente_aleatorio(rnd) for _ in range(N)]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="formulas.js se ejecuta con node")
+@pytest.mark.skipif(os.environ.get('FORMULAS_DESDE_EXCEL') == '1', reason="las formulas del libro no se traducen a JS")
+def test_paridad_javascript(pacientes):
+    from generar_js import verificar_paridad
+
+    discrepancias, _ = verificar_paridad(pacientes)
+    assert discrepancias == []
+
+
+def test_paridad_motor_vectorizado(pacientes):
+    from motor_vectorizado import verificar_paridad
+
+    discrepancias, comparados = verificar_paridad(pacientes)
+    assert discrepancias == []
+    assert comparados > N
+
+
+def test_paridad_alertas(pacientes):
+    from alertas import reglas_sinteticas, verificar_paridad
+
+    discrepancias, comparados = verificar_paridad(pacientes)
+    assert discrepancias == []
+    assert comparados > N
+    discrepancias, _ = verificar_paridad(pacientes, reglas_sinteticas(50))
+    assert discrepancias == []
+
+
+def test_paridad_cohorte(pacientes):
+    from recalculo_cohorte import verificar_paridad
+
+    assert verificar_paridad(pacientes, procesos=2, tamano_bloque=100) == []
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import math
+
+import pytest
+
+from esquema_entradas import parsear_entradas
+from grafo_formulas import Evaluador, PANELES, plan_de_paneles
+from serie_temporal import COLUMNAS, SeriePaciente, valores_instantanea
+
+PACIENTE_PESO_NEGATIVO = {'id_paciente': 'cama-neg', 'peso_kg': '-70', 'talla_m': '1.70', 'sexo': 'H', 'edad_anos': '60'}
+
+
+def test_instantanea_reutiliza_lo_evaluado():
+    evaluador = Evaluador(parsear_entradas({'peso_kg': '70', 'talla_m': '1.70', 'tas': '120', 'tad': '80'}))
+    evaluador.evaluar(plan_de_paneles(tuple(PANELES)))
+    fila = valores_instantanea(evaluador)
+    assert evaluador.reevaluados == 0
+    assert fila[COLUMNAS.index('peso_kg')] == 70.0
+    assert fila[COLUMNAS.index('tam')] == evaluador.valores['tam'] == pytest.approx(280 / 3)
+
+
+def test_instantanea_peso_negativo_deja_sct_vacia():
+    fila = valores_instantanea(Evaluador(parsear_entradas(PACIENTE_PESO_NEGATIVO)))
+    assert math.isnan(fila[COLUMNAS.index('sct')])
+    assert fila[COLUMNAS.index('peso_kg')] == -70.0
+
+
+@pytest.mark.parametrize('horas, esperadas', [(72, 73), (1, 2), (0.5, 1), (1000, 200)])
+def test_ventana_lee_solo_las_ultimas_horas(tmp_path, horas, esperadas):
+    serie = SeriePaciente(str(tmp_path / 'serie.f64'))
+    ahora = 1_000_000.0
+    for i in range(200):  # una fila por hora, la mas reciente en 'ahora'
+        serie.agregar([float(i)] * len(COLUMNAS), instante=ahora - (199 - i) * 3600)
+    tiempos, (tam,) = serie.ventana(['tam'], horas, ahora=ahora)
+    assert len(tiempos) == len(tam) == esperadas
+    assert tiempos[0] >= ahora - horas * 3600 and tiempos[-1] == ahora
+    assert tam[-1] == 199.0
+
+
+def test_ventana_sin_archivo(tmp_path):
+    tiempos, (tam, gc) = SeriePaciente(str(tmp_path / 'no_existe.f64')).ventana(['tam', 'gc'])
+    assert len(tiempos) == len(tam) == len(gc) == 0
+
+
+def test_fila_a_medio_escribir_no_se_lee(tmp_path):
+    ruta = tmp_path / 'serie.f64'
+    serie = SeriePaciente(str(ruta))
+    serie.agregar([1.0] * len(COLUMNAS), instante=100.0)
+    with open(ruta, 'ab') as f:
+        f.write(b'\0' * 12)
+    tiempos, _ = serie.ventana(['tam'], horas=1, ahora=100.0)
+    assert tiempos.tolist() == [100.0]
+
+
+@pytest.mark.parametrize('ruta, enviar', [
+    ('/', lambda cliente, datos: cliente.post('/', data={**datos, 'action': 'calculate'})),
+    ('/resultados', lambda cliente, datos: cliente.post('/resultados', data={**datos, 'action': 'calculate'})),
+    ('/api/calcular', lambda cliente, datos: cliente.post('/api/calcular', json=datos)),
+])
+def test_resultado_complejo_con_id_no_devuelve_500(ruta, enviar):
+    # Regresion: peso negativo -> SCT compleja; con id de paciente las rutas que registran la serie daban 500
+    from app_de_excel import app
+
+    assert enviar(app.test_client(), PACIENTE_PESO_NEGATIVO).status_code == 200
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Informe del tiempo de arranque frente a un presupuesto.
+# Uso: python tiempo_arranque.py [--repeticiones 5] [--gunicorn] [--presupuesto-primera-respuesta-ms 1200]
+#
+# Cada medida se toma en un proceso nuevo (una importacion solo se puede medir una vez por proceso):
+#   importacion        import app_de_excel
+#   primera_respuesta  importacion + GET / + POST /api/calcular con el cliente de pruebas de Flask
+#   proceso            lo anterior mas el arranque del interprete, visto desde fuera
+# y se anotan la memoria residente maxima y que modulos pesados (pandas, numpy, openpyxl) quedaron
+# cargados. Con --gunicorn se lanza gunicorn (gunicorn.conf.py) en un puerto libre y se mide hasta
+# la primera respuesta 200 de GET /, junto con la memoria privada y compartida de cada worker.
+# Sale con codigo 1 si alguna mediana supera su presupuesto, para poder usarlo en CI.
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+MODULOS_PESADOS = ('pandas', 'numpy', 'openpyxl')
+
+# Presupuestos por defecto (ms): ~1.7x lo medido en un servidor de una CPU (290 / 370 / 480 / 440 ms).
+# Volver a importar pandas al arrancar (700 ms de importacion) los supera.
+PRESUPUESTOS = {
+    'importacion': 500,
+    'primera_respuesta': 650,
+    'proceso': 800,
+    'gunicorn': 1200,
+}
+
+_PROGRAMA = '''
+import json, resource, sys, time
+inicio = time.perf_counter()
+import app_de_excel
+importado = time.perf_counter()
+cliente = app_de_excel.app.test_client()
+assert cliente.get('/').status_code == 200
+assert cliente.post('/api/calcular', json=json.loads(sys.argv[1])).status_code == 200
+fin = time.perf_counter()
+print(json.dumps({
+    'importacion': (importado - inicio) * 1000,
+    'primera_respuesta': (fin - inicio) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modulos_pesados': [m for m in %r if m in sys.modules],
+}))
+''' % (MODULOS_PESADOS,)
+
+
+def _entorno(directorio):
+    # Historial, series y metricas de la medida en un directorio temporal, no en los del servicio
+    os.makedirs(os.path.join(directorio, 'metricas'))
+    return dict(os.environ, RUTA_HISTORIAL=os.path.join(directorio, 'historial.sqlite3'),
+                DIRECTORIO_SERIES=os.path.join(directorio, 'series'),
+                PROMETHEUS_MULTIPROC_DIR=os.path.join(directorio, 'metricas'))
+
+
+def medir_proceso(paciente):
+    """Una medida en un interprete nuevo: {importacion, primera_respuesta, proceso, rss_mb, modulos_pesados}."""
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, '-c', _PROGRAMA, json.dumps(paciente)], cwd=DIRECTORIO,
+                                env=_entorno(directorio), capture_output=True, text=True, check=True).stdout
+        medida = json.loads(salida.strip().splitlines()[-1])
+        medida['proceso'] = (time.perf_counter() - inicio) * 1000
+    return medida
+
+
+def _memoria_proceso(pid):
+    """(privada, compartida) en MB segun /proc/<pid>/smaps_rollup; None fuera de Linux."""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            campos = {linea.split(':')[0]: int(linea.split()[1]) for linea in f if linea.split()[-1] == 'kB'}
+    except OSError:
+        return None
+    privada = campos.get('Private_Clean', 0) + campos.get('Private_Dirty', 0)
+    compartida = campos.get('Shared_Clean', 0) + campos.get('Shared_Dirty', 0)
+    return round(privada / 1024, 1), round(compartida / 1024, 1)
+
+
+def medir_gunicorn(workers=2, timeout=30.0):
+    """ms desde el lanzamiento de gunicorn hasta la primera respuesta 200, y memoria de sus workers."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        puerto = s.getsockname()[1]
+    with tempfile.TemporaryDirectory() as directorio:
+        entorno = dict(_entorno(directorio), GUNICORN_BIND=f'127.0.0.1:{puerto}', GUNICORN_WORKERS=str(workers))
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app_de_excel:app', '-c', 'gunicorn.conf.py'],
+                                   cwd=DIRECTORIO, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                if time.perf_counter() - inicio > timeout or proceso.poll() is not None:
+                    raise RuntimeError("gunicorn no respondio")
+                try:
+                    with urllib.request.urlopen(f'http://127.0.0.1:{puerto}/', timeout=1) as respuesta:
+                        if respuesta.status == 200:
+                            break
+                except OSError:
+                    time.sleep(0.01)
+            primera = (time.perf_counter() - inicio) * 1000
+            time.sleep(0.5)  # que todos los workers terminen de arrancar
+            try:
+                with open(f'/proc/{proceso.pid}/task/{proceso.pid}/children') as f:
+                    hijos = f.read().split()
+            except OSError:
+                hijos = []
+            memoria = [m for m in (_memoria_proceso(pid) for pid in hijos) if m is not None]
+        finally:
+            proceso.terminate()
+            proceso.wait(timeout)
+    return primera, memoria
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la aplicacion frente a un presupuesto")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--gunicorn', action='store_true', help="Mide tambien el arranque real con gunicorn")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--json', action='store_true', help="Imprime el informe en JSON")
+    for medida, ms in PRESUPUESTOS.items():
+        parser.add_argument(f"--presupuesto-{medida.replace('_', '-')}-ms", type=float, default=ms, dest='presupuesto_' + medida)
+    argumentos = parser.parse_args()
+
+    sys.path.insert(0, DIRECTORIO)
+    from benchmarks import PACIENTE_EJEMPLO
+
+    medidas = [medir_proceso(PACIENTE_EJEMPLO) for _ in range(argumentos.repeticiones)]
+    informe = {nombre: round(statistics.median(m[nombre] for m in medidas), 1)
+               for nombre in ('importacion', 'primera_respuesta', 'proceso')}
+    extra = {'rss_mb': round(max(m['rss_mb'] for m in medidas), 1), 'modulos_pesados': medidas[-1]['modulos_pesados']}
+    if argumentos.gunicorn:
+        tiempos, memoria = zip(*(medir_gunicorn(argumentos.workers) for _ in range(argumentos.repeticiones)))
+        informe['gunicorn'] = round(statistics.median(tiempos), 1)
+        extra['workers_privada_compartida_mb'] = memoria[-1]
+
+    presupuestos = {nombre: getattr(argumentos, 'presupuesto_' + nombre) for nombre in informe}
+    excedidos = [nombre for nombre, ms in informe.items() if ms > presupuestos[nombre]]
+    if argumentos.json:
+        print(json.dumps({'medianas_ms': informe, 'presupuestos_ms': presupuestos,
+                          'excedidos': excedidos, **extra}, indent=2))
+    else:
+        print(f"{'medida':<20} {'mediana ms':>11} {'presupuesto':>12}")
+        for nombre, ms in informe.items():
+            print(f"{nombre:<20} {ms:>11} {presupuestos[nombre]:>12}  {'EXCEDIDO' if nombre in excedidos else 'ok'}")
+        for nombre, valor in extra.items():
+            print(f"{nombre}: {valor}")
+    sys.exit(1 if excedidos else 0)